@@ -1,10 +1,12 @@
 import os
 import time
 import logging
-from typing import List, Dict, Any, Optional
-from contextlib import asynccontextmanager
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+from contextlib import asynccontextmanager, contextmanager, ExitStack
+from itertools import chain
 
 import psycopg
+from psycopg_pool import PoolTimeout
 from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks
 from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
@@ -15,11 +17,23 @@ from .models import (
     QueryRequest, QueryResponse, DownloadCSVRequest, ErrorResponse
 )
 from .sql_safety import ensure_safe_select, sanitize_sql
-from .schema_introspect import get_schema_summary, format_schema_for_llm
+from .schema_introspect import get_cached_schema_summary
+from .schema_prompt import get_schema_prompt, get_schema_prompt_settings
 from .llm_sql import LLMSQLGenerator
-from .formatters import rows_to_html_table, csv_stream
-from .pagination import add_pagination, create_count_query, validate_pagination_params
+from .formatters import rows_to_html_table, csv_stream_batches
+from .pagination import (
+    add_pagination, get_total_rows, validate_pagination_params,
+    parse_order_by, encode_cursor, decode_cursor, add_keyset_pagination,
+    keyset_table, supports_keyset
+)
 from .hints import format_error_with_hints
+from .db import (
+    open_pool, close_pool, pooled_connection,
+    server_side_cursor, iter_batches, get_export_batch_size, build_copy_csv_sql
+)
+from .cache import ResultCache, get_result_cache, get_data_versions
+from .sql_cache import get_sql_cache
+from .compression import CompressionMiddleware, get_compression_settings
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -27,21 +41,17 @@ logger = logging.getLogger(__name__)
 
 # Global variables
 llm_generator = None
-db_conn = None
-
-
-def get_db_connection():
-    """Get database connection."""
-    global db_conn
-    if db_conn is None or db_conn.closed:
-        db_conn = psycopg.connect(
-            host=os.getenv("DB_HOST", "127.0.0.1"),
-            port=os.getenv("DB_PORT", "5432"),
-            dbname=os.getenv("DB_NAME", "trendsql"),
-            user=os.getenv("DB_USER", "postgres"),
-            password=os.getenv("DB_PASSWORD", "postgres")
-        )
-    return db_conn
+
+
+@contextmanager
+def get_db_connection() -> Iterator[psycopg.Connection]:
+    """Check out a pooled database connection for one unit of work."""
+    try:
+        with pooled_connection() as conn:
+            yield conn
+    except PoolTimeout as e:
+        logger.error(f"Database pool exhausted: {e}")
+        raise HTTPException(status_code=503, detail="Database busy, please retry")
 
 
 def get_llm_generator():
@@ -52,16 +62,37 @@ def get_llm_generator():
     return llm_generator
 
 
+def schema_text_for_prompt(schema_summary: Dict[str, Any], prompt: str) -> str:
+    """Schema text for an LLM prompt, pruned to the relevant tables within SCHEMA_PROMPT_MAX_TOKENS."""
+    settings = get_schema_prompt_settings()
+    embed = get_llm_generator().embed_texts if settings["embeddings"] else None
+    return get_schema_prompt(schema_summary).render(prompt, settings["max_tokens"], embed)
+
+
+def generate_sql_for_prompt(schema_summary: Dict[str, Any], prompt: str) -> Tuple[Optional[str], bool]:
+    """Generate SQL for a prompt through the SQL cache; returns the SQL and whether it was a cache hit."""
+    schema_text = schema_text_for_prompt(schema_summary, prompt)
+    return get_llm_generator().generate_sql(prompt, schema_text, get_schema_prompt(schema_summary).version)
+
+
+def forget_sql_for_prompt(schema_summary: Dict[str, Any], prompt: str) -> None:
+    """Drop the cached SQL of a prompt whose SQL failed to execute."""
+    cache = get_sql_cache()
+    if cache is not None:
+        cache.forget(prompt, get_schema_prompt(schema_summary).version, get_llm_generator().model)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager."""
     # Startup
     logger.info("Starting trendsql application...")
     try:
-        # Test database connection
-        conn = get_db_connection()
-        with conn.cursor() as cursor:
-            cursor.execute("SELECT 1")
+        # Open the connection pool and test a connection
+        open_pool()
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
         logger.info("Database connection established")
     except Exception as e:
         logger.error(f"Database connection failed: {e}")
@@ -70,8 +101,7 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Shutting down trendsql application...")
-    if db_conn and not db_conn.closed:
-        db_conn.close()
+    close_pool()
 
 
 app = FastAPI(
@@ -90,6 +120,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Negotiated gzip/zstd compression, applied chunk by chunk to streamed bodies
+app.add_middleware(CompressionMiddleware, **get_compression_settings())
+
 
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
@@ -98,20 +131,22 @@ async def health_check():
 
 
 @app.get("/schema", response_model=SchemaResponse)
-async def get_schema(schemas: str = "public"):
+def get_schema(schemas: str = "public"):
     """Get database schema information."""
     try:
-        conn = get_db_connection()
         schema_list = [s.strip() for s in schemas.split(",")]
-        schema_summary = get_schema_summary(conn, schema_list)
+        with get_db_connection() as conn:
+            schema_summary = get_cached_schema_summary(conn, schema_list)
         return SchemaResponse(schemas=schema_summary)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting schema: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/generate-sql", response_model=GenerateSQLResponse)
-async def generate_sql(request: GenerateSQLRequest):
+def generate_sql(request: GenerateSQLRequest):
     """Generate SQL from natural language prompt."""
     start_time = time.time()
     
@@ -120,13 +155,12 @@ async def generate_sql(request: GenerateSQLRequest):
         page, page_size = validate_pagination_params(request.page, request.page_size)
         
         # Get schema information
-        conn = get_db_connection()
-        schema_summary = get_schema_summary(conn, request.schemas)
-        schema_text = format_schema_for_llm(schema_summary)
+        with get_db_connection() as conn:
+            schema_summary = get_cached_schema_summary(conn, request.schemas)
         
-        # Generate SQL using LLM
+        # Generate SQL using LLM (or the SQL cache)
         llm = get_llm_generator()
-        sql = llm.generate_sql(request.prompt, schema_text)
+        sql, cache_hit = generate_sql_for_prompt(schema_summary, request.prompt)
         
         if not sql:
             raise HTTPException(status_code=400, detail="Failed to generate SQL")
@@ -141,6 +175,7 @@ async def generate_sql(request: GenerateSQLRequest):
         
         response = GenerateSQLResponse(
             sql=sql,
+            cache_hit=cache_hit,
             page=page,
             page_size=page_size
         )
@@ -152,24 +187,24 @@ async def generate_sql(request: GenerateSQLRequest):
                 paginated_sql = add_pagination(sql, page, page_size)
                 
                 # Execute query
-                with conn.cursor() as cursor:
-                    cursor.execute(paginated_sql)
-                    rows = cursor.fetchall()
-                    columns = [desc[0] for desc in cursor.description]
+                with get_db_connection() as conn:
+                    with conn.cursor() as cursor:
+                        cursor.execute(paginated_sql)
+                        rows = cursor.fetchall()
+                        columns = [desc[0] for desc in cursor.description]
+                        
+                        # Convert to list of dicts
+                        results = [dict(zip(columns, row)) for row in rows]
                     
-                    # Convert to list of dicts
-                    results = [dict(zip(columns, row)) for row in rows]
+                    # Get total count if requested
+                    if request.include_total:
+                        with conn.cursor() as cursor:
+                            response.total_rows, response.count_mode = get_total_rows(
+                                cursor, sql, request.count_mode
+                            )
                 
                 response.preview = results
                 
-                # Get total count if requested
-                if request.include_total:
-                    count_sql = create_count_query(sql)
-                    with conn.cursor() as cursor:
-                        cursor.execute(count_sql)
-                        total = cursor.fetchone()[0]
-                    response.total_rows = total
-                
                 # Generate HTML if requested
                 if request.as_html:
                     response.html = rows_to_html_table(results, "Query Results")
@@ -177,8 +212,11 @@ async def generate_sql(request: GenerateSQLRequest):
                 # Generate explanation
                 response.explain = llm.explain_sql(sql)
                 
+            except HTTPException:
+                raise
             except Exception as e:
                 logger.error(f"Error executing SQL: {e}")
+                forget_sql_for_prompt(schema_summary, request.prompt)
                 error_info = format_error_with_hints(str(e))
                 raise HTTPException(
                     status_code=400,
@@ -197,7 +235,7 @@ async def generate_sql(request: GenerateSQLRequest):
 
 
 @app.post("/generate-html", response_model=GenerateHTMLResponse)
-async def generate_html(request: GenerateHTMLRequest):
+def generate_html(request: GenerateHTMLRequest):
     """Generate HTML table from natural language prompt."""
     start_time = time.time()
     
@@ -206,13 +244,11 @@ async def generate_html(request: GenerateHTMLRequest):
         page, page_size = validate_pagination_params(request.page, request.page_size)
         
         # Get schema information
-        conn = get_db_connection()
-        schema_summary = get_schema_summary(conn, request.schemas)
-        schema_text = format_schema_for_llm(schema_summary)
+        with get_db_connection() as conn:
+            schema_summary = get_cached_schema_summary(conn, request.schemas)
         
-        # Generate SQL using LLM
-        llm = get_llm_generator()
-        sql = llm.generate_sql(request.prompt, schema_text)
+        # Generate SQL using LLM (or the SQL cache)
+        sql, _ = generate_sql_for_prompt(schema_summary, request.prompt)
         
         if not sql:
             raise HTTPException(status_code=400, detail="Failed to generate SQL")
@@ -226,11 +262,12 @@ async def generate_html(request: GenerateHTMLRequest):
         # Execute query with pagination
         paginated_sql = add_pagination(sql, page, page_size)
         
-        with conn.cursor() as cursor:
-            cursor.execute(paginated_sql)
-            rows = cursor.fetchall()
-            columns = [desc[0] for desc in cursor.description]
-            results = [dict(zip(columns, row)) for row in rows]
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(paginated_sql)
+                rows = cursor.fetchall()
+                columns = [desc[0] for desc in cursor.description]
+                results = [dict(zip(columns, row)) for row in rows]
         
         # Generate HTML
         html = rows_to_html_table(results, "Query Results")
@@ -249,7 +286,7 @@ async def generate_html(request: GenerateHTMLRequest):
 
 
 @app.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
+def chat(request: ChatRequest):
     """Chat endpoint with multi-block responses."""
     start_time = time.time()
     
@@ -258,24 +295,24 @@ async def chat(request: ChatRequest):
         page, page_size = validate_pagination_params(request.page, request.page_size)
         
         # Get schema information
-        conn = get_db_connection()
-        schema_summary = get_schema_summary(conn, request.schemas)
-        schema_text = format_schema_for_llm(schema_summary)
+        with get_db_connection() as conn:
+            schema_summary = get_cached_schema_summary(conn, request.schemas)
         
-        # Generate SQL using LLM
+        # Generate SQL using LLM (or the SQL cache)
         llm = get_llm_generator()
-        sql = llm.generate_sql(request.message, schema_text)
+        sql, _ = generate_sql_for_prompt(schema_summary, request.message)
         
         results = None
         if sql:
             # Execute query with pagination
             paginated_sql = add_pagination(sql, page, page_size)
             
-            with conn.cursor() as cursor:
-                cursor.execute(paginated_sql)
-                rows = cursor.fetchall()
-                columns = [desc[0] for desc in cursor.description]
-                results = [dict(zip(columns, row)) for row in rows]
+            with get_db_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(paginated_sql)
+                    rows = cursor.fetchall()
+                    columns = [desc[0] for desc in cursor.description]
+                    results = [dict(zip(columns, row)) for row in rows]
         
         # Generate chat response
         chat_response = llm.chat_response(request.message, sql, results)
@@ -286,13 +323,15 @@ async def chat(request: ChatRequest):
             execution_time_ms=(time.time() - start_time) * 1000
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in chat: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/query", response_model=QueryResponse)
-async def execute_query(request: QueryRequest):
+def execute_query(request: QueryRequest):
     """Execute a safe SELECT query."""
     start_time = time.time()
     
@@ -306,31 +345,60 @@ async def execute_query(request: QueryRequest):
         if not is_safe:
             raise HTTPException(status_code=400, detail=f"SQL failed safety check: {error}")
         
-        # Execute query with pagination
-        conn = get_db_connection()
-        paginated_sql = add_pagination(sql, page, page_size)
-        
-        with conn.cursor() as cursor:
-            cursor.execute(paginated_sql)
-            rows = cursor.fetchall()
-            columns = [desc[0] for desc in cursor.description]
-            results = [dict(zip(columns, row)) for row in rows]
+        # Use keyset pagination when a cursor is given, LIMIT/OFFSET otherwise
+        order_keys = parse_order_by(sql)
+        params = None
+        if request.cursor:
+            if not order_keys or keyset_table(sql) is None:
+                raise HTTPException(status_code=400, detail="Cursor pagination requires an ORDER BY on columns of one table")
+            try:
+                cursor_values = decode_cursor(sql, order_keys, request.cursor)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            paginated_sql, params = add_keyset_pagination(sql, order_keys, cursor_values, page_size)
+        else:
+            paginated_sql = add_pagination(sql, page, page_size)
         
-        response = QueryResponse(
-            results=results,
-            page=page,
-            page_size=page_size,
-            execution_time_ms=(time.time() - start_time) * 1000
+        cache = get_result_cache()
+        cache_key = ResultCache.make_key(
+            sql, page, page_size, request.cursor, request.include_total, request.count_mode
         )
         
-        # Get total count if requested
-        if request.include_total:
-            count_sql = create_count_query(sql)
-            with conn.cursor() as cursor:
-                cursor.execute(count_sql)
-                total = cursor.fetchone()[0]
-            response.total_rows = total
+        with get_db_connection() as conn:
+            versions = get_data_versions(conn) if cache else None
+            cached = cache.get(cache_key, versions) if cache else None
+            if cached is not None:
+                response = QueryResponse(**cached)
+            else:
+                with conn.cursor() as cursor:
+                    cursor.execute(paginated_sql, params)
+                    rows = cursor.fetchall()
+                    columns = [desc[0] for desc in cursor.description]
+                    results = [dict(zip(columns, row)) for row in rows]
+                    
+                    # A full page may have more rows after it
+                    next_cursor = None
+                    if len(results) == page_size and supports_keyset(cursor, sql, order_keys):
+                        next_cursor = encode_cursor(sql, order_keys, results[-1])
+                
+                response = QueryResponse(
+                    results=results,
+                    page=page,
+                    page_size=page_size,
+                    next_cursor=next_cursor
+                )
+                
+                # Get total count if requested
+                if request.include_total:
+                    with conn.cursor() as cursor:
+                        response.total_rows, response.count_mode = get_total_rows(
+                            cursor, sql, request.count_mode
+                        )
+                
+                if cache:
+                    cache.put(cache_key, sql, response.model_dump(exclude={"execution_time_ms"}), versions)
         
+        response.execution_time_ms = (time.time() - start_time) * 1000
         return response
         
     except HTTPException:
@@ -345,12 +413,20 @@ async def execute_query(request: QueryRequest):
         )
 
 
+@app.get("/cache/stats")
+async def cache_stats():
+    """Get result cache and SQL cache hit/miss counters."""
+    cache = get_result_cache()
+    sql_cache = get_sql_cache()
+    stats = {"enabled": False} if cache is None else {"enabled": True, **cache.get_stats()}
+    stats["sql_cache"] = {"enabled": False} if sql_cache is None else {"enabled": True, **sql_cache.get_stats()}
+    return stats
+
+
 @app.post("/download-csv")
-async def download_csv(request: DownloadCSVRequest):
+def download_csv(request: DownloadCSVRequest):
     """Download CSV data."""
     try:
-        conn = get_db_connection()
-        
         if request.sql:
             # Use provided SQL
             sql = sanitize_sql(request.sql)
@@ -359,11 +435,10 @@ async def download_csv(request: DownloadCSVRequest):
                 raise HTTPException(status_code=400, detail=f"SQL failed safety check: {error}")
         elif request.prompt:
             # Generate SQL from prompt
-            schema_summary = get_schema_summary(conn, request.schemas)
-            schema_text = format_schema_for_llm(schema_summary)
+            with get_db_connection() as conn:
+                schema_summary = get_cached_schema_summary(conn, request.schemas)
             
-            llm = get_llm_generator()
-            sql = llm.generate_sql(request.prompt, schema_text)
+            sql, _ = generate_sql_for_prompt(schema_summary, request.prompt)
             
             if not sql:
                 raise HTTPException(status_code=400, detail="Failed to generate SQL")
@@ -379,23 +454,66 @@ async def download_csv(request: DownloadCSVRequest):
         if "LIMIT" not in sql.upper():
             sql = f"{sql.rstrip()} LIMIT {request.max_rows}"
         
-        # Execute query
-        with conn.cursor() as cursor:
+        headers = {"Content-Disposition": "attachment; filename=export.csv"}
+        
+        if request.fast:
+            # Relay COPY output as-is; the first chunk is read before
+            # responding so query errors still produce an error status
+            stack = ExitStack()
+            try:
+                conn = stack.enter_context(get_db_connection())
+                cursor = stack.enter_context(conn.cursor())
+                copy = stack.enter_context(cursor.copy(build_copy_csv_sql(sql)))
+                first_chunk = bytes(copy.read())
+            except BaseException:
+                stack.close()
+                raise
+            
+            def relay_copy():
+                try:
+                    yield first_chunk
+                    for chunk in copy:
+                        yield bytes(chunk)
+                except Exception as e:
+                    # The status is already sent; abort so the export is not mistaken for complete
+                    logger.error(f"CSV export failed mid-stream: {e}")
+                    raise
+                finally:
+                    stack.close()
+            
+            return StreamingResponse(relay_copy(), media_type="text/csv", headers=headers)
+        
+        # Execute on a server-side cursor; the connection is held until the
+        # stream finishes and the first batch is fetched before responding so
+        # query errors still produce an error status
+        batch_size = get_export_batch_size()
+        stack = ExitStack()
+        try:
+            conn = stack.enter_context(get_db_connection())
+            cursor = stack.enter_context(server_side_cursor(conn, batch_size))
             cursor.execute(sql)
-            rows = cursor.fetchall()
+            first_batch = cursor.fetchmany(batch_size)
             columns = [desc[0] for desc in cursor.description]
-            results = [dict(zip(columns, row)) for row in rows]
+        except BaseException:
+            stack.close()
+            raise
         
-        # Generate CSV stream
+        # Generate CSV stream, one batch per chunk
         def generate_csv():
-            for chunk in csv_stream(results, "export.csv"):
-                yield chunk
+            try:
+                if not first_batch:
+                    yield ""
+                    return
+                batches = chain([first_batch], iter_batches(cursor, batch_size))
+                yield from csv_stream_batches(columns, batches)
+            except Exception as e:
+                # The status is already sent; abort so the export is not mistaken for complete
+                logger.error(f"CSV export failed mid-stream: {e}")
+                raise
+            finally:
+                stack.close()
         
-        return StreamingResponse(
-            generate_csv(),
-            media_type="text/csv",
-            headers={"Content-Disposition": "attachment; filename=export.csv"}
-        )
+        return StreamingResponse(generate_csv(), media_type="text/csv", headers=headers)
         
     except HTTPException:
         raise
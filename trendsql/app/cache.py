@@ -0,0 +1,193 @@
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+import psycopg
+
+logger = logging.getLogger(__name__)
+
+# Versions are bumped by the ingestion connectors when they commit
+DATA_VERSIONS_SQL = "SELECT table_name, version FROM data_versions"
+
+IDENTIFIER_PATTERN = re.compile(r'[a-z_][a-z0-9_$]*')
+
+
+class ResultCache:
+    """
+    In-process LRU + TTL cache of query result pages.
+
+    Each entry remembers the data version of every versioned table its SQL
+    mentions; a lookup with newer versions for any of them is a miss.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, max_entry_bytes: int = 4 * 1024 * 1024,
+                 ttl_seconds: float = 300.0):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._counters = {"hits": 0, "misses": 0, "stale": 0, "expired": 0, "evictions": 0, "bypassed": 0}
+
+    @staticmethod
+    def make_key(sql: str, *parts: Any) -> str:
+        """
+        Build a cache key from sanitized SQL and the paging parameters.
+        """
+        normalized = re.sub(r'\s+', ' ', sql).strip().rstrip(';')
+        raw = json.dumps([normalized, parts], default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, versions: Optional[Dict[str, int]]) -> Optional[Any]:
+        """
+        Look up a cached value, or None on a miss.
+
+        versions is the current data_versions snapshot; None means the
+        snapshot is unavailable and the cache is bypassed.
+        """
+        with self._lock:
+            if versions is None:
+                self._counters["bypassed"] += 1
+                return None
+
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+
+            if entry["expires_at"] <= time.monotonic():
+                self._remove(key)
+                self._counters["expired"] += 1
+                self._counters["misses"] += 1
+                return None
+
+            if self._is_stale(entry, versions):
+                self._remove(key)
+                self._counters["stale"] += 1
+                self._counters["misses"] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+            return entry["value"]
+
+    def put(self, key: str, sql: str, value: Any, versions: Optional[Dict[str, int]]) -> bool:
+        """
+        Store a value computed against the given data_versions snapshot.
+
+        Returns False if the value was not cached (no snapshot or too large).
+        """
+        if versions is None:
+            return False
+
+        size = len(json.dumps(value, default=str).encode("utf-8"))
+        if size > self.max_entry_bytes or size > self.max_bytes:
+            return False
+
+        tables = set(IDENTIFIER_PATTERN.findall(sql.lower()))
+        entry = {
+            "value": value,
+            "size": size,
+            "expires_at": time.monotonic() + self.ttl_seconds,
+            "tables": tables,
+            "versions": {t: v for t, v in versions.items() if t in tables},
+        }
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._bytes += size
+
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._counters["evictions"] += 1
+
+        return True
+
+    def clear(self) -> None:
+        """
+        Drop all entries (counters are kept).
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get hit/miss counters and current size.
+        """
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                **self._counters,
+                "hit_ratio": self._counters["hits"] / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry["size"]
+
+    def _is_stale(self, entry: Dict[str, Any], versions: Dict[str, int]) -> bool:
+        # Tables first versioned after the entry was stored count as version 0
+        for table, version in versions.items():
+            if table in entry["tables"] and entry["versions"].get(table, 0) != version:
+                return True
+        return False
+
+
+def get_data_versions(conn: psycopg.Connection) -> Optional[Dict[str, int]]:
+    """
+    Read the data_versions table, or None if it cannot be read.
+
+    Runs in a savepoint so a missing table does not abort the caller's
+    transaction.
+    """
+    try:
+        with conn.transaction():
+            with conn.cursor() as cursor:
+                cursor.execute(DATA_VERSIONS_SQL)
+                return {row[0]: row[1] for row in cursor.fetchall()}
+    except psycopg.Error as e:
+        logger.warning(f"Result cache bypassed, data versions unavailable: {e}")
+        return None
+
+
+def get_cache_settings() -> Dict[str, Any]:
+    """
+    Read result cache limits from environment variables.
+    """
+    return {
+        "max_bytes": int(os.getenv("RESULT_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+        "max_entry_bytes": int(os.getenv("RESULT_CACHE_MAX_ENTRY_BYTES", str(4 * 1024 * 1024))),
+        "ttl_seconds": float(os.getenv("RESULT_CACHE_TTL", "300")),
+    }
+
+
+# Global cache, None when disabled (RESULT_CACHE_MAX_BYTES=0)
+result_cache: Optional[ResultCache] = None
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """
+    Get the global result cache, creating it on first use.
+    """
+    global result_cache
+    if result_cache is None:
+        settings = get_cache_settings()
+        if settings["max_bytes"] <= 0:
+            return None
+        result_cache = ResultCache(**settings)
+    return result_cache
@@ -0,0 +1,166 @@
+import os
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import zstandard
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Preferred first when the client weighs encodings equally
+SUPPORTED_ENCODINGS = ("zstd", "gzip")
+
+# Already compressed payloads are passed through
+EXCLUDED_MEDIA_PREFIXES = ("application/vnd.apache.", "image/", "application/zip", "application/gzip")
+
+
+class StreamCompressor:
+    """
+    Incremental gzip/zstd compressor.
+
+    Every chunk is flushed to a block boundary so the client can decode each
+    piece of a streamed body as it arrives.
+    """
+
+    def __init__(self, encoding: str, gzip_level: int = 6, zstd_level: int = 3):
+        self.encoding = encoding
+        if encoding == "gzip":
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+        elif encoding == "zstd":
+            self._compressor = zstandard.ZstdCompressor(level=zstd_level).compressobj()
+        else:
+            raise ValueError(f"Unsupported encoding: {encoding}")
+
+    def compress(self, data: bytes) -> bytes:
+        """
+        Compress a chunk and flush it.
+        """
+        if self.encoding == "gzip":
+            return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        """
+        End the compressed stream.
+        """
+        return self._compressor.flush()
+
+
+def select_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Pick the best supported encoding from an Accept-Encoding header.
+    """
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            weights[name] = quality
+
+    candidates: List[Tuple[float, int, str]] = []
+    for rank, encoding in enumerate(SUPPORTED_ENCODINGS):
+        quality = weights.get(encoding, weights.get("*", 0.0))
+        if quality > 0:
+            candidates.append((quality, -rank, encoding))
+
+    return max(candidates)[2] if candidates else None
+
+
+class CompressionMiddleware:
+    """
+    Negotiated gzip/zstd Content-Encoding for HTML, JSON and CSV responses.
+
+    Streaming responses are compressed chunk by chunk as they are produced,
+    never buffered whole. Bodies smaller than minimum_size that arrive in a
+    single message are sent uncompressed.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, zstd_level: int = 3):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.zstd_level = zstd_level
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = select_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self._start: Optional[Message] = None
+        self._compressor: Optional[StreamCompressor] = None
+        self._passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Hold the headers until the first body chunk decides the encoding
+            self._start = message
+            return
+
+        if message["type"] != "http.response.body" or self._passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self._compressor is None:
+            if not self._should_compress(body, more_body):
+                self._passthrough = True
+                await self._send(self._start)
+                await self._send(message)
+                return
+
+            self._compressor = StreamCompressor(
+                self.encoding, self.middleware.gzip_level, self.middleware.zstd_level
+            )
+            headers = MutableHeaders(raw=self._start["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if "content-length" in headers:
+                del headers["Content-Length"]
+            self._start["headers"] = headers.raw
+            await self._send(self._start)
+
+        data = self._compressor.compress(body) if body else b""
+        if not more_body:
+            data += self._compressor.finish()
+        await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+    def _should_compress(self, body: bytes, more_body: bool) -> bool:
+        headers = Headers(raw=self._start["headers"])
+        if "content-encoding" in headers:
+            return False
+        if headers.get("content-type", "").startswith(EXCLUDED_MEDIA_PREFIXES):
+            return False
+        return more_body or len(body) >= self.middleware.minimum_size
+
+
+def get_compression_settings() -> Dict[str, int]:
+    """
+    Read response compression settings from environment variables.
+    """
+    return {
+        "minimum_size": int(os.getenv("COMPRESSION_MIN_SIZE", "1024")),
+        "gzip_level": int(os.getenv("COMPRESSION_GZIP_LEVEL", "6")),
+        "zstd_level": int(os.getenv("COMPRESSION_ZSTD_LEVEL", "3")),
+    }
@@ -0,0 +1,141 @@
+import os
+import uuid
+import logging
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+import psycopg
+from psycopg.conninfo import make_conninfo
+from psycopg_pool import ConnectionPool
+
+logger = logging.getLogger(__name__)
+
+# Global pool, opened and closed by the application lifespan
+db_pool: Optional[ConnectionPool] = None
+
+
+def get_conninfo() -> str:
+    """
+    Build the libpq connection string from environment variables.
+    """
+    return make_conninfo(
+        host=os.getenv("DB_HOST", "127.0.0.1"),
+        port=os.getenv("DB_PORT", "5432"),
+        dbname=os.getenv("DB_NAME", "trendsql"),
+        user=os.getenv("DB_USER", "postgres"),
+        password=os.getenv("DB_PASSWORD", "postgres")
+    )
+
+
+def get_pool_settings() -> Dict[str, Any]:
+    """
+    Read connection pool sizing from environment variables.
+    """
+    min_size = max(0, int(os.getenv("DB_POOL_MIN_SIZE", "2")))
+    max_size = max(1, min_size, int(os.getenv("DB_POOL_MAX_SIZE", "10")))
+
+    return {
+        "min_size": min_size,
+        "max_size": max_size,
+        "timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+        "max_idle": float(os.getenv("DB_POOL_MAX_IDLE", "300")),
+        "max_lifetime": float(os.getenv("DB_POOL_MAX_LIFETIME", "3600")),
+    }
+
+
+def open_pool() -> ConnectionPool:
+    """
+    Open the global connection pool (idempotent).
+
+    Connections are health-checked on checkout, so a connection broken by a
+    server restart is discarded instead of being handed to a request.
+    """
+    global db_pool
+    if db_pool is None or db_pool.closed:
+        settings = get_pool_settings()
+        db_pool = ConnectionPool(
+            conninfo=get_conninfo(),
+            check=ConnectionPool.check_connection,
+            name="trendsql",
+            open=False,
+            **settings
+        )
+        db_pool.open(wait=False)
+        logger.info(
+            f"Database pool opened (min_size={settings['min_size']}, "
+            f"max_size={settings['max_size']}, timeout={settings['timeout']}s)"
+        )
+    return db_pool
+
+
+def close_pool() -> None:
+    """
+    Close the global connection pool.
+    """
+    global db_pool
+    if db_pool is not None and not db_pool.closed:
+        db_pool.close()
+        logger.info("Database pool closed")
+    db_pool = None
+
+
+@contextmanager
+def pooled_connection() -> Iterator[psycopg.Connection]:
+    """
+    Check a connection out of the pool for the duration of the block.
+
+    The transaction is committed on success and rolled back on error, so a
+    failed statement never leaks an aborted transaction to the next request.
+    Raises psycopg_pool.PoolTimeout if no connection frees up in time.
+    """
+    pool = db_pool if db_pool is not None and not db_pool.closed else open_pool()
+    with pool.connection() as conn:
+        yield conn
+
+
+def get_export_batch_size() -> int:
+    """
+    Rows per server-side cursor fetch for streamed exports.
+    """
+    return max(1, int(os.getenv("EXPORT_BATCH_SIZE", "5000")))
+
+
+def iter_batches(cursor: psycopg.Cursor, batch_size: int) -> Iterator[List[Tuple[Any, ...]]]:
+    """
+    Yield fetchmany() batches from an executed cursor until it is exhausted.
+    """
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield rows
+
+
+@contextmanager
+def server_side_cursor(conn: psycopg.Connection, batch_size: int) -> Iterator[psycopg.ServerCursor]:
+    """
+    Open a named (server-side) cursor that fetches batch_size rows per round trip.
+
+    The connection must stay in its transaction while the cursor is in use,
+    which pooled connections do until they are returned.
+    """
+    with conn.cursor(name=f"stream_{uuid.uuid4().hex[:12]}") as cursor:
+        cursor.itersize = batch_size
+        yield cursor
+
+
+def build_copy_csv_sql(sql: str) -> str:
+    """
+    Wrap a validated SELECT in COPY (...) TO STDOUT WITH CSV HEADER.
+    """
+    query = sql.strip().rstrip(";").rstrip()
+    return f"COPY ({query}) TO STDOUT WITH (FORMAT CSV, HEADER)"
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """
+    Get pool usage counters (empty if the pool is not open).
+    """
+    if db_pool is None or db_pool.closed:
+        return {}
+    return db_pool.get_stats()
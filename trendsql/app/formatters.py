@@ -1,6 +1,6 @@
 import csv
 import io
-from typing import List, Dict, Any, Generator
+from typing import List, Dict, Any, Generator, Iterable, Sequence
 from datetime import datetime
 
 
@@ -91,6 +91,41 @@ def csv_stream(rows: List[Dict[str, Any]], filename: str = "export.csv") -> Gene
         output.truncate()
 
 
+def format_csv_value(value: Any) -> str:
+    """
+    Format a single value for CSV output.
+    """
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    return str(value)
+
+
+def csv_stream_batches(columns: List[str], batches: Iterable[Sequence[Sequence[Any]]]) -> Generator[str, None, None]:
+    """
+    Generate CSV content from batches of row tuples.
+    
+    Each batch is formatted and yielded before the next one is pulled, so
+    with a server-side cursor only one batch is held in memory.
+    """
+    output = io.StringIO()
+    writer = csv.writer(output)
+    
+    writer.writerow(columns)
+    yield output.getvalue()
+    output.seek(0)
+    output.truncate()
+    
+    for batch in batches:
+        for row in batch:
+            writer.writerow([format_csv_value(value) for value in row])
+        
+        yield output.getvalue()
+        output.seek(0)
+        output.truncate()
+
+
 def format_number(value: Any) -> str:
     """
     Format numbers for display.
@@ -1,9 +1,10 @@
 import os
 import json
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 from openai import OpenAI
 from .sql_safety import extract_sql_from_code_block, ensure_safe_select
+from .sql_cache import get_sql_cache, normalize_prompt
 
 logger = logging.getLogger(__name__)
 
@@ -15,14 +16,28 @@ class LLMSQLGenerator:
             base_url=os.getenv("OPENAI_BASE_URL")  # Optional for custom endpoints
         )
         self.model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+        self.embedding_model = os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-3-small")
+        self.sql_cache = get_sql_cache()
         
         if not os.getenv("OPENAI_API_KEY"):
             logger.warning("OPENAI_API_KEY not set - LLM features will not work")
     
-    def generate_sql(self, prompt: str, schema_summary: str) -> Optional[str]:
+    def generate_sql(self, prompt: str, schema_summary: str,
+                     schema_version: Optional[str] = None) -> Tuple[Optional[str], bool]:
         """
         Generate SQL from natural language prompt using OpenAI.
+        
+        With a schema version, the SQL cache is consulted first and a hit
+        skips the LLM call. Returns the SQL and whether it was a cache hit.
         """
+        cache = self.sql_cache if schema_version else None
+        embedding = None
+        if cache is not None:
+            embedding = self._cache_embedding(prompt) if cache.semantic else None
+            sql = cache.get(prompt, schema_version, self.model, embedding, self.embedding_model)
+            if sql:
+                return sql, True
+        
         if not os.getenv("OPENAI_API_KEY"):
             raise ValueError("OPENAI_API_KEY not configured")
         
@@ -44,7 +59,7 @@ Example output:
 ```sql
 SELECT column1, column2 FROM table WHERE condition ORDER BY column1 DESC LIMIT 10
 ```"""
-
+        
         user_prompt = f"Generate SQL for: {prompt}"
         
         try:
@@ -66,20 +81,37 @@ SELECT column1, column2 FROM table WHERE condition ORDER BY column1 DESC LIMIT 1
             
             if not sql:
                 logger.error("No SQL found in LLM response")
-                return None
+                return None, False
             
             # Validate SQL safety
             is_safe, error = ensure_safe_select(sql)
             if not is_safe:
                 logger.error(f"Generated SQL failed safety check: {error}")
-                return None
+                return None, False
             
-            return sql
+            if cache is not None:
+                cache.put(prompt, schema_version, self.model, sql, embedding, self.embedding_model)
+            return sql, False
             
         except Exception as e:
             logger.error(f"Error generating SQL: {e}")
             raise
     
+    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed texts with the configured embedding model.
+        """
+        response = self.client.embeddings.create(model=self.embedding_model, input=texts)
+        return [item.embedding for item in response.data]
+    
+    def _cache_embedding(self, prompt: str) -> Optional[List[float]]:
+        # Without an embedding the SQL cache still answers exact matches
+        try:
+            return self.embed_texts([normalize_prompt(prompt)])[0]
+        except Exception as e:
+            logger.warning(f"Prompt embedding failed, SQL cache limited to exact matches: {e}")
+            return None
+    
     def explain_sql(self, sql: str) -> Optional[str]:
         """
         Generate explanation for SQL query.
@@ -94,7 +126,7 @@ Rules:
 - Focus on the business logic
 - Explain any complex joins or aggregations
 - Mention the expected output format"""
-
+        
         user_prompt = f"Explain this SQL query: {sql}"
         
         try:
@@ -134,7 +166,7 @@ Available blocks:
 - meta: Additional information
 
 Format your response as a JSON object with a "blocks" array."""
-
+        
         context = f"User message: {message}"
         if sql:
             context += f"\nGenerated SQL: {sql}"
@@ -18,17 +18,20 @@ class GenerateSQLRequest(BaseModel):
     page: int = Field(default=1, ge=1, description="Page number for pagination")
     page_size: int = Field(default=50, ge=1, le=1000, description="Page size for pagination")
     include_total: bool = Field(default=False, description="Include total row count")
+    count_mode: str = Field(default="exact", pattern="^(exact|estimate|auto)$", description="How total_rows is computed: exact, estimate (planner) or auto")
     as_html: bool = Field(default=False, description="Return results as HTML table")
 
 
 class GenerateSQLResponse(BaseModel):
     sql: str
+    cache_hit: bool = Field(default=False, description="SQL was served from the SQL cache without an LLM call")
     explain: Optional[str] = None
     preview: Optional[List[Dict[str, Any]]] = None
     html: Optional[str] = None
     page: int
     page_size: int
     total_rows: Optional[int] = None
+    count_mode: Optional[str] = None
     execution_time_ms: Optional[float] = None
 
 
@@ -63,6 +66,8 @@ class QueryRequest(BaseModel):
     page: int = Field(default=1, ge=1, description="Page number for pagination")
     page_size: int = Field(default=50, ge=1, le=1000, description="Page size for pagination")
     include_total: bool = Field(default=False, description="Include total row count")
+    count_mode: str = Field(default="exact", pattern="^(exact|estimate|auto)$", description="How total_rows is computed: exact, estimate (planner) or auto")
+    cursor: Optional[str] = Field(default=None, description="Cursor from a previous response's next_cursor; overrides page")
 
 
 class QueryResponse(BaseModel):
@@ -70,6 +75,8 @@ class QueryResponse(BaseModel):
     page: int
     page_size: int
     total_rows: Optional[int] = None
+    count_mode: Optional[str] = None
+    next_cursor: Optional[str] = None
     execution_time_ms: Optional[float] = None
 
 
@@ -78,6 +85,7 @@ class DownloadCSVRequest(BaseModel):
     sql: Optional[str] = Field(None, description="SQL query to execute")
     schemas: List[str] = Field(default=["public"], description="Database schemas to include")
     max_rows: int = Field(default=5000, ge=1, le=50000, description="Maximum rows to export")
+    fast: bool = Field(default=False, description="Let PostgreSQL format the CSV (COPY TO STDOUT); values use PostgreSQL text output")
 
 
 class ErrorResponse(BaseModel):
@@ -1,4 +1,11 @@
-from typing import Tuple, Optional
+import os
+import re
+import json
+import base64
+import hashlib
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Tuple, Optional, List, Dict, Any
 
 
 def add_pagination(sql: str, page: int = 1, page_size: int = 50) -> str:
@@ -60,6 +67,49 @@ def create_count_query(sql: str) -> str:
     return count_sql
 
 
+# Total-row counting modes: exact COUNT(*), planner estimate, or estimate
+# first and exact only when the estimate is small enough to count cheaply
+COUNT_MODES = ("exact", "estimate", "auto")
+AUTO_COUNT_THRESHOLD = int(os.getenv("COUNT_AUTO_THRESHOLD", "100000"))
+
+
+def create_estimate_query(sql: str) -> str:
+    """
+    Create an EXPLAIN query whose plan carries the planner's row estimate.
+    """
+    return f"EXPLAIN (FORMAT JSON) {_strip_limit_offset(sql)}"
+
+
+def parse_plan_rows(plan: Any) -> int:
+    """
+    Extract the top-level row estimate from EXPLAIN (FORMAT JSON) output.
+    """
+    if isinstance(plan, (str, bytes)):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def get_total_rows(cursor, sql: str, count_mode: str = "exact", auto_threshold: Optional[int] = None) -> Tuple[int, str]:
+    """
+    Get the total row count using the requested count mode.
+    
+    Returns (total_rows, mode) where mode is "exact" or "estimate" and says
+    which method produced the total.
+    """
+    if count_mode not in COUNT_MODES:
+        raise ValueError(f"Unknown count_mode: {count_mode}")
+    
+    if count_mode in ("estimate", "auto"):
+        cursor.execute(create_estimate_query(sql))
+        estimate = parse_plan_rows(cursor.fetchone()[0])
+        threshold = AUTO_COUNT_THRESHOLD if auto_threshold is None else auto_threshold
+        if count_mode == "estimate" or estimate >= threshold:
+            return estimate, "estimate"
+    
+    cursor.execute(create_count_query(sql))
+    return cursor.fetchone()[0], "exact"
+
+
 def validate_pagination_params(page: int, page_size: int) -> Tuple[int, int]:
     """
     Validate and normalize pagination parameters.
@@ -94,3 +144,340 @@ def get_pagination_info(page: int, page_size: int, total_rows: Optional[int] = N
         })
     
     return info
+
+
+# Keyset (cursor) pagination
+#
+# A cursor encodes the ORDER BY key values of the last row of a page. The next
+# page is fetched with WHERE (k1, k2) > (v1, v2) ORDER BY k1, k2 LIMIT n, which
+# an index on the ordering columns serves in constant time regardless of depth.
+# The ordering must be unique and free of NULLs for pages not to skip rows: rows
+# tied with the last row of a page fail the strict comparison, and NULL keys
+# never satisfy it. Cursors are therefore only issued for a plain projection of
+# one table whose ORDER BY covers a unique index on NOT NULL columns.
+
+ORDER_TERM_PATTERN = re.compile(
+    r'^(?:(?:[A-Za-z_]\w*|"[^"]+")\.)?([A-Za-z_]\w*|"[^"]+")(?:\s+(ASC|DESC))?$',
+    re.IGNORECASE
+)
+
+# A plain (optionally qualified) column or star in a SELECT list
+SELECT_TERM_PATTERN = re.compile(r'^(?:(?:[A-Za-z_]\w*|"[^"]+")\.)?(?:[A-Za-z_]\w*|"[^"]+"|\*)$')
+
+# A single (optionally schema-qualified and aliased) table in FROM
+FROM_TABLE_PATTERN = re.compile(
+    r'^((?:[A-Za-z_]\w*|"[^"]+")(?:\.(?:[A-Za-z_]\w*|"[^"]+"))?)(?:\s+(?:AS\s+)?[A-Za-z_]\w*)?$',
+    re.IGNORECASE
+)
+
+# Whether the given columns cover every key column of a unique, non-partial,
+# non-expression index of the table, and whether all of them are NOT NULL
+KEYSET_KEYS_SQL = """
+SELECT
+    EXISTS (
+        SELECT 1
+        FROM pg_index i
+        WHERE i.indrelid = t.oid
+          AND i.indisunique
+          AND i.indpred IS NULL
+          AND i.indexprs IS NULL
+          AND NOT EXISTS (
+              SELECT 1
+              FROM unnest(i.indkey::int2[]) WITH ORDINALITY AS k(attnum, ord)
+              JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = k.attnum
+              WHERE k.ord <= i.indnkeyatts AND a.attname <> ALL(%(columns)s::name[])
+          )
+    ),
+    (
+        SELECT count(*)
+        FROM pg_attribute a
+        WHERE a.attrelid = t.oid AND a.attnum > 0 AND NOT a.attisdropped
+          AND a.attnotnull AND a.attname = ANY(%(columns)s::name[])
+    ) = cardinality(%(columns)s::name[])
+FROM (SELECT to_regclass(%(table)s) AS oid) AS t
+"""
+
+
+def _find_top_level_keyword(sql: str, keyword: str) -> int:
+    """
+    Find the last occurrence of a keyword outside parentheses and quotes.
+    """
+    pattern = re.compile(r'\b' + keyword.replace(' ', r'\s+') + r'\b', re.IGNORECASE)
+    depth = 0
+    in_quote = None
+    top_level = []
+    for i, ch in enumerate(sql):
+        if in_quote:
+            if ch == in_quote:
+                in_quote = None
+        elif ch in ("'", '"'):
+            in_quote = ch
+        elif ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+        elif depth == 0:
+            top_level.append(i)
+    
+    top_level_positions = set(top_level)
+    position = -1
+    for match in pattern.finditer(sql):
+        if match.start() in top_level_positions:
+            position = match.start()
+    return position
+
+
+def _split_top_level(text: str, separator: str = ",") -> List[str]:
+    """
+    Split text on a separator that is not inside parentheses or quotes.
+    """
+    parts = []
+    depth = 0
+    in_quote = None
+    current = []
+    for ch in text:
+        if in_quote:
+            if ch == in_quote:
+                in_quote = None
+        elif ch in ("'", '"'):
+            in_quote = ch
+        elif ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+        elif ch == separator and depth == 0:
+            parts.append("".join(current).strip())
+            current = []
+            continue
+        current.append(ch)
+    parts.append("".join(current).strip())
+    return parts
+
+
+def _strip_limit_offset(sql: str) -> str:
+    """
+    Remove a trailing top-level LIMIT/OFFSET clause.
+    """
+    sql = sql.strip().rstrip(';').rstrip()
+    for keyword in ('LIMIT', 'OFFSET'):
+        pos = _find_top_level_keyword(sql, keyword)
+        if pos != -1:
+            sql = sql[:pos].rstrip()
+    return sql
+
+
+def parse_order_by(sql: str) -> Optional[List[Tuple[str, str]]]:
+    """
+    Parse the top-level ORDER BY into (output column, direction) pairs.
+    
+    Returns None when the ordering cannot drive keyset pagination, i.e. there
+    is no ORDER BY or a term is an expression, ordinal or uses NULLS FIRST/LAST.
+    """
+    base_sql = _strip_limit_offset(sql)
+    order_pos = _find_top_level_keyword(base_sql, 'ORDER BY')
+    if order_pos == -1:
+        return None
+    
+    clause = re.sub(r'^ORDER\s+BY\s+', '', base_sql[order_pos:], flags=re.IGNORECASE)
+    keys = []
+    for term in _split_top_level(clause):
+        match = ORDER_TERM_PATTERN.match(term.strip())
+        if not match:
+            return None
+        column, direction = match.group(1), (match.group(2) or 'ASC').upper()
+        if column.startswith('"'):
+            column = column[1:-1]
+        else:
+            column = column.lower()
+        keys.append((column, direction))
+    
+    return keys or None
+
+
+def keyset_table(sql: str) -> Optional[str]:
+    """
+    Find the table a keyset cursor would page through.
+    
+    Returns the table name when the query is a plain projection of one table,
+    so its output columns keep the table's unique and NOT NULL constraints,
+    and None for joins, grouping, DISTINCT, set operations, CTEs and computed
+    or renamed columns.
+    """
+    base_sql = _strip_limit_offset(sql)
+    order_pos = _find_top_level_keyword(base_sql, 'ORDER BY')
+    if order_pos != -1:
+        base_sql = base_sql[:order_pos].rstrip()
+    
+    if not re.match(r'^SELECT\s', base_sql, re.IGNORECASE):
+        return None
+    for keyword in ('GROUP BY', 'HAVING', 'WINDOW', 'UNION', 'INTERSECT', 'EXCEPT'):
+        if _find_top_level_keyword(base_sql, keyword) != -1:
+            return None
+    
+    from_pos = _find_top_level_keyword(base_sql, 'FROM')
+    if from_pos == -1:
+        return None
+    select_list = re.sub(r'^SELECT\s+', '', base_sql[:from_pos], flags=re.IGNORECASE)
+    if not all(SELECT_TERM_PATTERN.match(term) for term in _split_top_level(select_list)):
+        return None
+    
+    from_clause = re.sub(r'^FROM\s+', '', base_sql[from_pos:], flags=re.IGNORECASE)
+    where_pos = _find_top_level_keyword(from_clause, 'WHERE')
+    if where_pos != -1:
+        from_clause = from_clause[:where_pos]
+    match = FROM_TABLE_PATTERN.match(from_clause.strip())
+    return match.group(1) if match else None
+
+
+def supports_keyset(cursor, sql: str, order_keys: Optional[List[Tuple[str, str]]]) -> bool:
+    """
+    Check that cursors can page a query without skipping rows.
+    
+    The ORDER BY columns of a plain single-table query must include every
+    column of a unique index and all be NOT NULL; other queries are paged by
+    OFFSET only.
+    """
+    table = keyset_table(sql) if order_keys else None
+    if table is None:
+        return False
+    
+    columns = list(dict.fromkeys(column for column, _ in order_keys))
+    cursor.execute(KEYSET_KEYS_SQL, {"table": table, "columns": columns})
+    row = cursor.fetchone()
+    return bool(row and row[0] and row[1])
+
+
+def _query_signature(sql: str, order_keys: List[Tuple[str, str]]) -> str:
+    """
+    Fingerprint the query a cursor belongs to.
+    """
+    normalized = re.sub(r'\s+', ' ', _strip_limit_offset(sql)).strip().lower()
+    normalized += "|" + ",".join(f"{col} {direction}" for col, direction in order_keys)
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+def _encode_value(value: Any) -> Any:
+    """
+    Encode a key value as JSON, tagging types JSON cannot carry.
+    """
+    if isinstance(value, datetime):
+        return {"t": "datetime", "v": value.isoformat()}
+    if isinstance(value, date):
+        return {"t": "date", "v": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"t": "decimal", "v": str(value)}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    """
+    Decode a key value encoded by _encode_value.
+    """
+    if isinstance(value, dict):
+        kind, raw = value.get("t"), value.get("v")
+        if kind == "datetime":
+            return datetime.fromisoformat(raw)
+        if kind == "date":
+            return date.fromisoformat(raw)
+        if kind == "decimal":
+            return Decimal(raw)
+        raise ValueError(f"Unknown cursor value type: {kind}")
+    return value
+
+
+def encode_cursor(sql: str, order_keys: Optional[List[Tuple[str, str]]], last_row: Dict[str, Any]) -> Optional[str]:
+    """
+    Build an opaque cursor token from the last row of a page.
+    
+    Returns None if the row lacks an ORDER BY column or a key value is NULL.
+    """
+    if not order_keys or not last_row:
+        return None
+    
+    values = []
+    for column, _ in order_keys:
+        if column not in last_row or last_row[column] is None:
+            return None
+        values.append(_encode_value(last_row[column]))
+    
+    payload = {"s": _query_signature(sql, order_keys), "k": values}
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(sql: str, order_keys: List[Tuple[str, str]], cursor: str) -> List[Any]:
+    """
+    Decode a cursor token into ORDER BY key values.
+    
+    Raises ValueError if the token is malformed or was issued for another query.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        values = [_decode_value(v) for v in payload["k"]]
+        signature = payload["s"]
+    except Exception:
+        raise ValueError("Invalid pagination cursor")
+    
+    if signature != _query_signature(sql, order_keys) or len(values) != len(order_keys):
+        raise ValueError("Pagination cursor does not match this query")
+    
+    return values
+
+
+def _keyset_predicate(order_keys: List[Tuple[str, str]]) -> str:
+    """
+    Build the WHERE predicate selecting rows after the cursor.
+    """
+    columns = [f'"{column}"' for column, _ in order_keys]
+    directions = {direction for _, direction in order_keys}
+    
+    # Uniform direction: a row comparison can use a composite index directly
+    if len(directions) == 1:
+        op = ">" if directions == {"ASC"} else "<"
+        placeholders = ", ".join(["%s"] * len(columns))
+        return f"({', '.join(columns)}) {op} ({placeholders})"
+    
+    # Mixed directions: expand to (k1 > v1) OR (k1 = v1 AND k2 < v2) ...
+    clauses = []
+    for i, (column, direction) in enumerate(order_keys):
+        op = ">" if direction == "ASC" else "<"
+        parts = [f"{columns[j]} = %s" for j in range(i)] + [f"{columns[i]} {op} %s"]
+        clauses.append("(" + " AND ".join(parts) + ")")
+    return "(" + " OR ".join(clauses) + ")"
+
+
+def _keyset_params(order_keys: List[Tuple[str, str]], values: List[Any]) -> List[Any]:
+    """
+    Expand cursor values into the parameter list for _keyset_predicate.
+    """
+    if len({direction for _, direction in order_keys}) == 1:
+        return list(values)
+    
+    params = []
+    for i in range(len(order_keys)):
+        params.extend(values[:i + 1])
+    return params
+
+
+def add_keyset_pagination(sql: str, order_keys: List[Tuple[str, str]], cursor_values: List[Any], page_size: int = 50) -> Tuple[str, List[Any]]:
+    """
+    Rewrite SQL to fetch the page after the cursor.
+    
+    Returns the SQL and its parameters. Literal % signs in the original SQL
+    are escaped since the rewritten query is executed with parameters.
+    """
+    base_sql = _strip_limit_offset(sql)
+    order_pos = _find_top_level_keyword(base_sql, 'ORDER BY')
+    if order_pos != -1:
+        base_sql = base_sql[:order_pos].rstrip()
+    
+    base_sql = base_sql.replace('%', '%%')
+    order_clause = ", ".join(f'"{column}" {direction}' for column, direction in order_keys)
+    
+    keyset_sql = (
+        f"SELECT * FROM ({base_sql}) AS keyset_page "
+        f"WHERE {_keyset_predicate(order_keys)} "
+        f"ORDER BY {order_clause} LIMIT {page_size}"
+    )
+    return keyset_sql, _keyset_params(order_keys, cursor_values)
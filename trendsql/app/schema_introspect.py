@@ -1,9 +1,52 @@
-import psycopg
-from typing import Dict, List, Any
+import os
+import time
 import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple
+
+import psycopg
+
+from .schema_prompt import get_schema_prompt
 
 logger = logging.getLogger(__name__)
 
+# Hash of the catalog rows describing the tables in a set of schemas. Any
+# DDL (create/drop/alter, rewrite, constraint, default or comment change)
+# writes a new row version, so the xmins and relfilenodes change with it.
+SCHEMA_FINGERPRINT_SQL = """
+SELECT md5(COALESCE(string_agg(entry, ',' ORDER BY entry), ''))
+FROM (
+    SELECT 'r' || c.oid || ':' || c.relfilenode || ':' || c.xmin AS entry
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = ANY(%(schemas)s)
+    UNION ALL
+    SELECT 'a' || a.attrelid || ':' || a.attnum || ':' || a.xmin
+    FROM pg_attribute a
+    JOIN pg_class c ON c.oid = a.attrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = ANY(%(schemas)s) AND a.attnum > 0
+    UNION ALL
+    SELECT 'd' || ad.oid || ':' || ad.xmin
+    FROM pg_attrdef ad
+    JOIN pg_class c ON c.oid = ad.adrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = ANY(%(schemas)s)
+    UNION ALL
+    SELECT 'k' || con.oid || ':' || con.xmin
+    FROM pg_constraint con
+    JOIN pg_namespace n ON n.oid = con.connamespace
+    WHERE n.nspname = ANY(%(schemas)s)
+    UNION ALL
+    SELECT 'm' || d.objoid || ':' || d.objsubid || ':' || d.xmin
+    FROM pg_description d
+    JOIN pg_class c ON c.oid = d.objoid AND d.classoid = 'pg_class'::regclass
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = ANY(%(schemas)s)
+) AS catalog_entries
+"""
+
 
 def get_schema_summary(conn: psycopg.Connection, schemas: List[str] = None) -> Dict[str, Dict[str, List[Dict[str, str]]]]:
     """
@@ -62,6 +105,122 @@ def get_schema_summary(conn: psycopg.Connection, schemas: List[str] = None) -> D
     return result
 
 
+class SchemaCache:
+    """
+    Introspected schemas keyed by schema list, validated against a catalog fingerprint.
+    
+    An entry is served without touching the database for check_interval
+    seconds after it was stored or last validated; after that the caller
+    compares the current fingerprint and reloads only if the catalog changed.
+    """
+    
+    def __init__(self, check_interval: float = 30.0, max_entries: int = 32):
+        self.check_interval = check_interval
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, ...], Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "validated": 0, "reloads": 0}
+    
+    @staticmethod
+    def make_key(schemas: List[str]) -> Tuple[str, ...]:
+        return tuple(schemas)
+    
+    def get(self, key: Tuple[str, ...]) -> Optional[Any]:
+        """
+        Return the cached value if it was validated within check_interval, else None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry["checked_at"] >= self.check_interval:
+                return None
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+            return entry["value"]
+    
+    def revalidate(self, key: Tuple[str, ...], fingerprint: str) -> Optional[Any]:
+        """
+        Return the cached value if it was built at this catalog fingerprint, else None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry["fingerprint"] != fingerprint:
+                return None
+            entry["checked_at"] = time.monotonic()
+            self._entries.move_to_end(key)
+            self._counters["validated"] += 1
+            return entry["value"]
+    
+    def put(self, key: Tuple[str, ...], fingerprint: str, value: Any) -> None:
+        """
+        Store a value introspected at the given catalog fingerprint.
+        """
+        with self._lock:
+            self._entries[key] = {"value": value, "fingerprint": fingerprint, "checked_at": time.monotonic()}
+            self._entries.move_to_end(key)
+            self._counters["reloads"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get hit/validation/reload counters.
+        """
+        with self._lock:
+            return {**self._counters, "entries": len(self._entries), "check_interval": self.check_interval}
+
+
+def get_schema_fingerprint(conn: psycopg.Connection, schemas: List[str]) -> str:
+    """
+    Get a hash that changes whenever DDL touches a table in the schemas.
+    """
+    with conn.cursor() as cursor:
+        cursor.execute(SCHEMA_FINGERPRINT_SQL, {"schemas": list(schemas)})
+        return cursor.fetchone()[0]
+
+
+# Global cache shared by every endpoint that prompts with the schema
+schema_cache: Optional[SchemaCache] = None
+
+
+def get_schema_cache() -> SchemaCache:
+    """
+    Get the global schema cache, creating it on first use.
+    """
+    global schema_cache
+    if schema_cache is None:
+        schema_cache = SchemaCache(check_interval=float(os.getenv("SCHEMA_CACHE_CHECK_INTERVAL", "30")))
+    return schema_cache
+
+
+def get_cached_schema_summary(conn: psycopg.Connection, schemas: List[str] = None) -> Dict[str, Dict[str, List[Dict[str, str]]]]:
+    """
+    Get the schema summary from the shared cache, re-introspecting only
+    after the catalog fingerprint of the schemas changed.
+    
+    The returned summary is shared; callers must not modify it.
+    """
+    if schemas is None:
+        schemas = ["public"]
+    
+    cache = get_schema_cache()
+    key = cache.make_key(schemas)
+    summary = cache.get(key)
+    if summary is not None:
+        return summary
+    
+    # Fingerprint first, so DDL racing with the introspection forces a reload
+    fingerprint = get_schema_fingerprint(conn, schemas)
+    summary = cache.revalidate(key, fingerprint)
+    if summary is None:
+        summary = get_schema_summary(conn, schemas)
+        cache.put(key, fingerprint, summary)
+    return summary
+
+
 def get_table_info(conn: psycopg.Connection, table_name: str, schema: str = "public") -> Dict[str, Any]:
     """
     Get detailed information about a specific table.
@@ -108,19 +267,6 @@ def get_table_info(conn: psycopg.Connection, table_name: str, schema: str = "pub
 
 def format_schema_for_llm(schema_summary: Dict[str, Dict[str, List[Dict[str, str]]]]) -> str:
     """
-    Format schema summary for LLM prompting.
+    Format schema summary for LLM prompting (precomputed once per schema version).
     """
-    lines = ["Database Schema:"]
-    
-    for schema_name, tables in schema_summary.items():
-        lines.append(f"\nSchema: {schema_name}")
-        
-        for table_name, columns in tables.items():
-            lines.append(f"  Table: {table_name}")
-            
-            for col in columns:
-                nullable = "NULL" if col["nullable"] else "NOT NULL"
-                default = f" DEFAULT {col['default']}" if col.get("default") else ""
-                lines.append(f"    {col['column']}: {col['type']} {nullable}{default}")
-    
-    return "\n".join(lines)
+    return get_schema_prompt(schema_summary).full_text
@@ -0,0 +1,234 @@
+import math
+import hashlib
+import os
+import re
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Rough token count for budgeting (about 4 characters per token for schema text)
+CHARS_PER_TOKEN = 4
+
+WORD_PATTERN = re.compile(r"[a-z][a-z0-9]*|[0-9]+")
+
+STOP_WORDS = {
+    "a", "an", "and", "are", "as", "at", "by", "for", "from", "get", "give", "how", "in", "is",
+    "list", "me", "of", "on", "or", "per", "show", "that", "the", "their", "them", "to", "top",
+    "what", "which", "with",
+}
+
+# Lexical weights of a prompt term found in a table name or a column name
+TABLE_NAME_WEIGHT = 3.0
+COLUMN_NAME_WEIGHT = 1.0
+
+# Weight of the prompt/table cosine similarity when embeddings are enabled
+EMBEDDING_WEIGHT = 4.0
+
+# Omitted tables are still named (most relevant first), up to this many
+MAX_OTHER_TABLES = 30
+
+SCHEMA_HEADER = "Database Schema:"
+
+Embedder = Callable[[List[str]], List[List[float]]]
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the prompt tokens of a text.
+    """
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def extract_terms(text: Optional[str]) -> Set[str]:
+    """
+    Lowercase words of a name or prompt, singularized, without stop words.
+    """
+    terms = set()
+    for word in WORD_PATTERN.findall((text or "").lower().replace("_", " ")):
+        if word in STOP_WORDS:
+            continue
+        if len(word) > 4 and word.endswith("ies"):
+            word = word[:-3] + "y"
+        elif len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        terms.add(word)
+    return terms
+
+
+class SchemaPrompt:
+    """
+    Schema text of one schema version, precomputed per table for pruning.
+    
+    Built from a get_schema_summary result; render() returns the same text
+    as format_schema_for_llm when the schema fits the token budget.
+    """
+    
+    def __init__(self, schema_summary: Dict[str, Dict[str, List[Dict[str, Any]]]]):
+        self.schemas = []
+        self.tables = []
+        for schema_name, tables in schema_summary.items():
+            self.schemas.append(schema_name)
+            for table_name, columns in tables.items():
+                column_lines = []
+                for col in columns:
+                    nullable = "NULL" if col["nullable"] else "NOT NULL"
+                    default = f" DEFAULT {col['default']}" if col.get("default") else ""
+                    column_lines.append((f"    {col['column']}: {col['type']} {nullable}{default}", extract_terms(col["column"])))
+                text = "\n".join([f"  Table: {table_name}"] + [line for line, _ in column_lines])
+                self.tables.append({
+                    "schema": schema_name,
+                    "name": table_name,
+                    "columns": column_lines,
+                    "text": text,
+                    "tokens": estimate_tokens(text) + 1,
+                    "name_terms": extract_terms(table_name),
+                    "column_terms": set().union(*(terms for _, terms in column_lines)),
+                    "embedding_text": " ".join([table_name.replace("_", " ")] + [col["column"].replace("_", " ") for col in columns]),
+                })
+        self.full_text = self._join(range(len(self.tables)), {})
+        self.full_tokens = estimate_tokens(self.full_text)
+        # Content hash, the same in every worker for the same schema
+        self.version = hashlib.sha256(self.full_text.encode("utf-8")).hexdigest()[:16]
+        self._embeddings: Optional[List[List[float]]] = None
+        self._lock = threading.Lock()
+    
+    def render(self, prompt: Optional[str] = None, max_tokens: Optional[int] = None,
+               embed: Optional[Embedder] = None) -> str:
+        """
+        Get the schema text for a prompt within max_tokens (None or 0: unlimited).
+        
+        Tables are ranked by relevance to the prompt (name matches, plus
+        embedding similarity when embed is given). Relevant tables are added
+        with all columns while they fit, else with only the columns the
+        prompt mentions; less relevant tables are listed by name only.
+        Without any relevant table the schema is cut in its own order.
+        """
+        if not max_tokens or self.full_tokens <= max_tokens or not self.tables:
+            return self.full_text
+        
+        prompt_terms = extract_terms(prompt)
+        scores = self.score(prompt or "", prompt_terms, embed)
+        ranked = sorted(range(len(self.tables)), key=lambda i: -scores[i])
+        relevant = [i for i in ranked if scores[i] > 0]
+        candidates = relevant if relevant else list(range(len(self.tables)))
+        
+        budget = max_tokens - estimate_tokens(SCHEMA_HEADER) - sum(estimate_tokens(f"\nSchema: {s}") for s in self.schemas)
+        chosen: Dict[int, str] = {}
+        for i in candidates:
+            table = self.tables[i]
+            text = table["text"]
+            if table["tokens"] > budget and relevant:
+                columns = [line for line, terms in table["columns"] if terms & prompt_terms]
+                text = "\n".join([f"  Table: {table['name']}"] + columns + [f"    ... {len(table['columns']) - len(columns)} more columns"])
+            tokens = estimate_tokens(text) + 1
+            if tokens <= budget:
+                chosen[i] = text
+                budget -= tokens
+        
+        text = self._join(sorted(chosen), chosen)
+        others = [f"{self.tables[i]['schema']}.{self.tables[i]['name']}" for i in ranked if i not in chosen]
+        if others:
+            text += "\n" + _other_tables_line(others, budget)
+        return text
+    
+    def score(self, prompt: str, prompt_terms: Set[str], embed: Optional[Embedder] = None) -> List[float]:
+        """
+        Relevance of every table to a prompt (lexical, plus cosine similarity with embed).
+        """
+        scores = [
+            TABLE_NAME_WEIGHT * len(prompt_terms & table["name_terms"])
+            + COLUMN_NAME_WEIGHT * len(prompt_terms & table["column_terms"])
+            for table in self.tables
+        ]
+        if embed is None:
+            return scores
+        
+        try:
+            table_vectors = self._table_embeddings(embed)
+            prompt_vector = _normalize(embed([prompt])[0])
+        except Exception as e:
+            logger.warning(f"Schema embedding failed, ranking tables lexically: {e}")
+            return scores
+        
+        return [
+            score + EMBEDDING_WEIGHT * max(0.0, sum(a * b for a, b in zip(vector, prompt_vector)))
+            for score, vector in zip(scores, table_vectors)
+        ]
+    
+    def _table_embeddings(self, embed: Embedder) -> List[List[float]]:
+        # Computed once per schema version, on first use
+        with self._lock:
+            if self._embeddings is None:
+                self._embeddings = [_normalize(vector) for vector in embed([table["embedding_text"] for table in self.tables])]
+            return self._embeddings
+    
+    def _join(self, indexes, texts: Dict[int, str]) -> str:
+        lines = [SCHEMA_HEADER]
+        schema = None
+        for i in indexes:
+            table = self.tables[i]
+            if table["schema"] != schema:
+                schema = table["schema"]
+                lines.append(f"\nSchema: {schema}")
+            lines.append(texts.get(i, table["text"]))
+        return "\n".join(lines)
+
+
+def _other_tables_line(names: List[str], budget: int) -> str:
+    listed = []
+    budget -= estimate_tokens("Other tables: , and 99999 more")
+    for name in names[:MAX_OTHER_TABLES]:
+        budget -= estimate_tokens(name) + 1
+        if budget < 0:
+            break
+        listed.append(name)
+    
+    remaining = len(names) - len(listed)
+    if not listed:
+        return f"({remaining} less relevant tables omitted)"
+    return f"Other tables: {', '.join(listed)}" + (f", and {remaining} more" if remaining else "")
+
+
+def _normalize(vector: List[float]) -> List[float]:
+    norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+    return [value / norm for value in vector]
+
+
+# Precomputed prompts of recent schema versions. The schema cache hands out
+# the same summary until the catalog changes, so its identity is the
+# version; entries hold the summary so the id is never reused while cached.
+_schema_prompts: "OrderedDict[int, Any]" = OrderedDict()
+_schema_prompts_lock = threading.Lock()
+MAX_SCHEMA_PROMPTS = 8
+
+
+def get_schema_prompt(schema_summary: Dict[str, Dict[str, List[Dict[str, Any]]]]) -> SchemaPrompt:
+    """
+    Get the precomputed SchemaPrompt of a schema summary, building it on first use.
+    """
+    with _schema_prompts_lock:
+        entry = _schema_prompts.get(id(schema_summary))
+        if entry is not None and entry[0] is schema_summary:
+            _schema_prompts.move_to_end(id(schema_summary))
+            return entry[1]
+    
+    schema_prompt = SchemaPrompt(schema_summary)
+    with _schema_prompts_lock:
+        _schema_prompts[id(schema_summary)] = (schema_summary, schema_prompt)
+        while len(_schema_prompts) > MAX_SCHEMA_PROMPTS:
+            _schema_prompts.popitem(last=False)
+    return schema_prompt
+
+
+def get_schema_prompt_settings() -> Dict[str, Any]:
+    """
+    Read the schema prompt token budget and embedding ranking switch from environment variables.
+    """
+    max_tokens = int(os.getenv("SCHEMA_PROMPT_MAX_TOKENS", "4000"))
+    return {
+        "max_tokens": max_tokens if max_tokens > 0 else None,
+        "embeddings": os.getenv("SCHEMA_PROMPT_EMBEDDINGS", "false").lower() in ("1", "true", "yes"),
+    }
@@ -0,0 +1,289 @@
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+
+import psycopg
+from psycopg_pool import PoolTimeout
+
+from .db import pooled_connection
+
+logger = logging.getLogger(__name__)
+
+# Exact tier: one row per normalized prompt, schema version and model
+SQL_CACHE_LOOKUP_SQL = """
+    UPDATE sql_cache SET hits = hits + 1, last_hit_at = NOW()
+    WHERE cache_key = %(cache_key)s AND created_at > NOW() - make_interval(secs => %(ttl)s)
+    RETURNING sql
+"""
+
+# Semantic tier: embeddings are stored unit length, so the dot product is the cosine
+SQL_CACHE_SIMILAR_SQL = """
+    SELECT prompt, sql, similarity
+    FROM (
+        SELECT prompt, sql,
+               (SELECT SUM(a * b) FROM unnest(embedding, %(embedding)s::float8[]) AS v(a, b)) AS similarity
+        FROM sql_cache
+        WHERE schema_version = %(schema_version)s
+          AND model = %(model)s
+          AND embedding_model = %(embedding_model)s
+          AND created_at > NOW() - make_interval(secs => %(ttl)s)
+    ) candidates
+    WHERE similarity >= %(threshold)s
+    ORDER BY similarity DESC
+    LIMIT 5
+"""
+
+SQL_CACHE_STORE_SQL = """
+    INSERT INTO sql_cache (cache_key, schema_version, model, prompt, sql, embedding_model, embedding)
+    VALUES (%(cache_key)s, %(schema_version)s, %(model)s, %(prompt)s, %(sql)s, %(embedding_model)s, %(embedding)s)
+    ON CONFLICT (cache_key) DO UPDATE SET
+        prompt = EXCLUDED.prompt,
+        sql = EXCLUDED.sql,
+        embedding_model = EXCLUDED.embedding_model,
+        embedding = EXCLUDED.embedding,
+        hits = 0,
+        created_at = NOW(),
+        last_hit_at = NULL
+"""
+
+SQL_CACHE_FORGET_SQL = "DELETE FROM sql_cache WHERE cache_key = %(cache_key)s"
+
+SQL_CACHE_EXPIRE_SQL = "DELETE FROM sql_cache WHERE created_at < NOW() - make_interval(secs => %(ttl)s)"
+
+# Numbers and quoted strings in a prompt, plus words with capitals (codes, names)
+LITERAL_PATTERN = re.compile(r"'[^']*'|\"[^\"]*\"|\d+(?:\.\d+)?|\b\w*[A-Z]\w*\b")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Case-fold a prompt and collapse whitespace and trailing punctuation.
+    """
+    return re.sub(r"\s+", " ", prompt).strip().rstrip("?!.;").strip().casefold()
+
+
+def prompt_literals(prompt: str) -> List[str]:
+    """
+    Values a prompt pins down: numbers, quoted strings and capitalized words after the first word.
+
+    Two prompts can be close in embedding space yet ask for different
+    values ("top 10 topics in US" / "top 20 topics in IN"); a similar
+    prompt is only reused when these match exactly.
+    """
+    words = prompt.strip().split(" ", 1)
+    return sorted(LITERAL_PATTERN.findall(words[1] if len(words) > 1 else ""))
+
+
+class SQLCache:
+    """
+    Two-tier cache of generated SQL per prompt.
+
+    Lookups try an in-process LRU on the normalized prompt, schema version
+    and model, then the shared sql_cache table (exact key, then the most
+    similar prompt by embedding when a similarity threshold is set). The
+    schema version is part of every key, so DDL makes old entries
+    unreachable; the table is pruned of expired rows when SQL is stored.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: float = 7 * 24 * 3600,
+                 similarity_threshold: Optional[float] = None, shared: bool = True):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.shared = shared
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "shared_hits": 0, "similar_hits": 0, "misses": 0, "stores": 0, "errors": 0}
+
+    @property
+    def semantic(self) -> bool:
+        """
+        Whether lookups also match similar prompts (needs prompt embeddings).
+        """
+        return bool(self.similarity_threshold) and self.shared
+
+    @staticmethod
+    def make_key(prompt: str, schema_version: str, model: str) -> str:
+        """
+        Build a cache key from the normalized prompt, schema version and model.
+        """
+        raw = json.dumps([normalize_prompt(prompt), schema_version, model])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, prompt: str, schema_version: str, model: str, embedding: Optional[List[float]] = None,
+            embedding_model: Optional[str] = None) -> Optional[str]:
+        """
+        Look up the SQL of a prompt, or None on a miss.
+        """
+        key = self.make_key(prompt, schema_version, model)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry["created_at"] < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self._counters["hits"] += 1
+                return entry["sql"]
+
+        sql = None
+        if self.shared:
+            sql = self._shared_lookup(key, prompt, schema_version, model, embedding, embedding_model)
+        with self._lock:
+            if sql is None:
+                self._counters["misses"] += 1
+            else:
+                self._remember(key, sql)
+        return sql
+
+    def put(self, prompt: str, schema_version: str, model: str, sql: str,
+            embedding: Optional[List[float]] = None, embedding_model: Optional[str] = None) -> None:
+        """
+        Store the SQL generated for a prompt in both tiers.
+        """
+        key = self.make_key(prompt, schema_version, model)
+        with self._lock:
+            self._remember(key, sql)
+            self._counters["stores"] += 1
+        if not self.shared:
+            return
+
+        params = {
+            "cache_key": key,
+            "schema_version": schema_version,
+            "model": model,
+            "prompt": prompt,
+            "sql": sql,
+            "embedding_model": embedding_model if embedding else None,
+            "embedding": _normalize(embedding) if embedding else None,
+            "ttl": self.ttl_seconds,
+        }
+
+        def store(cursor: psycopg.Cursor) -> None:
+            cursor.execute(SQL_CACHE_STORE_SQL, params)
+            cursor.execute(SQL_CACHE_EXPIRE_SQL, params)
+
+        self._execute_shared(store)
+
+    def forget(self, prompt: str, schema_version: str, model: str) -> None:
+        """
+        Drop the SQL of a prompt from both tiers, e.g. after it failed to execute.
+        """
+        key = self.make_key(prompt, schema_version, model)
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.shared:
+            self._execute_shared(lambda cursor: cursor.execute(SQL_CACHE_FORGET_SQL, {"cache_key": key}))
+
+    def clear(self) -> None:
+        """
+        Drop all in-process entries (the shared table is left as is).
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get hit/miss counters and the in-process entry count.
+        """
+        with self._lock:
+            return {
+                **self._counters,
+                "entries": len(self._entries),
+                "shared": self.shared,
+                "semantic": self.semantic,
+            }
+
+    def _remember(self, key: str, sql: str) -> None:
+        # Caller holds the lock
+        self._entries[key] = {"sql": sql, "created_at": time.monotonic()}
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _shared_lookup(self, key: str, prompt: str, schema_version: str, model: str,
+                       embedding: Optional[List[float]], embedding_model: Optional[str]) -> Optional[str]:
+        params = {
+            "cache_key": key,
+            "schema_version": schema_version,
+            "model": model,
+            "embedding_model": embedding_model,
+            "embedding": _normalize(embedding) if embedding else None,
+            "threshold": self.similarity_threshold,
+            "ttl": self.ttl_seconds,
+        }
+
+        def lookup(cursor: psycopg.Cursor) -> Optional[str]:
+            cursor.execute(SQL_CACHE_LOOKUP_SQL, params)
+            row = cursor.fetchone()
+            if row is not None:
+                self._count("shared_hits")
+                return row[0]
+            if not (self.semantic and embedding and embedding_model):
+                return None
+
+            cursor.execute(SQL_CACHE_SIMILAR_SQL, params)
+            literals = prompt_literals(prompt)
+            for similar_prompt, sql, similarity in cursor.fetchall():
+                if prompt_literals(similar_prompt) == literals:
+                    logger.info(f"SQL cache: reusing SQL of similar prompt {similar_prompt!r} ({similarity:.3f})")
+                    self._count("similar_hits")
+                    return sql
+            return None
+
+        return self._execute_shared(lookup)
+
+    def _execute_shared(self, work) -> Any:
+        # The shared tier is best effort: a database error is a miss, never a failed request
+        try:
+            with pooled_connection() as conn:
+                with conn.cursor() as cursor:
+                    return work(cursor)
+        except psycopg.errors.UndefinedTable:
+            logger.warning("SQL cache table missing (apply db/schema.sql), using the in-process tier only")
+            self.shared = False
+        except (psycopg.Error, PoolTimeout) as e:
+            logger.warning(f"Shared SQL cache unavailable: {e}")
+            self._count("errors")
+        return None
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self._counters[counter] += 1
+
+
+def _normalize(vector: List[float]) -> List[float]:
+    norm = sum(value * value for value in vector) ** 0.5 or 1.0
+    return [value / norm for value in vector]
+
+
+def get_sql_cache_settings() -> Dict[str, Any]:
+    """
+    Read SQL cache limits and the similarity threshold from environment variables.
+    """
+    threshold = float(os.getenv("SQL_CACHE_SIMILARITY", "0"))
+    return {
+        "max_entries": int(os.getenv("SQL_CACHE_MAX_ENTRIES", "1000")),
+        "ttl_seconds": float(os.getenv("SQL_CACHE_TTL", str(7 * 24 * 3600))),
+        "similarity_threshold": threshold if threshold > 0 else None,
+        "shared": os.getenv("SQL_CACHE_SHARED", "true").lower() in ("1", "true", "yes"),
+    }
+
+
+# Global cache, None when disabled (SQL_CACHE_MAX_ENTRIES=0)
+sql_cache: Optional[SQLCache] = None
+
+
+def get_sql_cache() -> Optional[SQLCache]:
+    """
+    Get the global SQL cache, creating it on first use.
+    """
+    global sql_cache
+    if sql_cache is None:
+        settings = get_sql_cache_settings()
+        if settings["max_entries"] <= 0:
+            return None
+        sql_cache = SQLCache(**settings)
+    return sql_cache
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Response compression benchmark
+
+Builds realistic /generate-html, /query (JSON) and /download-csv payloads
+from gt_interest_over_time-shaped rows and reports size and compression
+time for identity, gzip and zstd, chunked the way the API streams them.
+
+Usage:
+    python benchmarks/bench_compression.py
+    python benchmarks/bench_compression.py --rows 1000 50000
+"""
+
+import argparse
+import gzip
+import json
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import List
+
+import zstandard
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.compression import StreamCompressor
+from app.formatters import rows_to_html_table, csv_stream_batches
+
+COLUMNS = ["keyword", "date", "interest", "geo", "category", "gprop"]
+
+
+def make_rows(count: int) -> List[tuple]:
+    """Synthetic gt_interest_over_time rows."""
+    start = date(2023, 1, 1)
+    return [
+        (f"keyword {i % 50}", start + timedelta(days=i // 50), (i * 7919) % 101, "US", 0, "")
+        for i in range(count)
+    ]
+
+
+def make_payloads(rows: List[tuple], batch_size: int):
+    """Chunks of each payload as the endpoints would send them."""
+    dict_rows = [dict(zip(COLUMNS, row)) for row in rows]
+    html = rows_to_html_table(dict_rows).encode("utf-8")
+    body = json.dumps({"results": dict_rows, "page": 1, "page_size": len(rows)}, default=str).encode("utf-8")
+    batches = (rows[i:i + batch_size] for i in range(0, len(rows), batch_size))
+    csv_chunks = [chunk.encode("utf-8") for chunk in csv_stream_batches(COLUMNS, batches)]
+    return {"html": [html], "json": [body], "csv": csv_chunks}
+
+
+def compress_chunks(chunks: List[bytes], encoding: str) -> bytes:
+    """Compress chunk by chunk, flushing each, like CompressionMiddleware."""
+    if encoding == "identity":
+        return b"".join(chunks)
+    compressor = StreamCompressor(encoding)
+    return b"".join(compressor.compress(chunk) for chunk in chunks) + compressor.finish()
+
+
+def decompress(data: bytes, encoding: str) -> bytes:
+    if encoding == "gzip":
+        return gzip.decompress(data)
+    if encoding == "zstd":
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Response compression benchmark")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1000, 10000, 100000])
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    print(f"{'payload':<8} {'rows':>7} {'encoding':<9} {'KB':>10} {'ratio':>7} {'compress ms':>12} {'decompress ms':>14}")
+    for count in args.rows:
+        payloads = make_payloads(make_rows(count), args.batch_size)
+        for name, chunks in payloads.items():
+            raw_size = sum(len(chunk) for chunk in chunks)
+            for encoding in ("identity", "gzip", "zstd"):
+                start = time.perf_counter()
+                data = compress_chunks(chunks, encoding)
+                compress_ms = (time.perf_counter() - start) * 1000
+
+                start = time.perf_counter()
+                assert len(decompress(data, encoding)) == raw_size
+                decompress_ms = (time.perf_counter() - start) * 1000
+
+                print(
+                    f"{name:<8} {count:>7} {encoding:<9} {len(data) / 1024:>10.1f} "
+                    f"{raw_size / len(data):>7.1f} {compress_ms:>12.1f} {decompress_ms:>14.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+CSV export benchmark
+
+Exports synthetic result sets of growing size through the old buffered path
+(fetchall + csv_stream), the server-side cursor path (fetchmany batches +
+csv_stream_batches) and the fast COPY TO STDOUT relay, each in a fresh
+process, and reports throughput and peak RSS.
+
+Usage:
+    python benchmarks/bench_csv_export.py
+    python benchmarks/bench_csv_export.py --rows 100000 1000000 10000000 --batch-size 10000
+"""
+
+import argparse
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import psycopg
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.db import get_conninfo, server_side_cursor, iter_batches, build_copy_csv_sql
+from app.formatters import csv_stream, csv_stream_batches
+
+# Synthetic rows, no seeding needed
+EXPORT_SQL = (
+    "SELECT g AS id, 'bench keyword ' || (g % 1000) AS keyword, "
+    "DATE '2000-01-01' + (g % 7000) AS date, (g * 7919) % 101 AS interest, "
+    "md5(g::text) AS label FROM generate_series(1, {rows}) AS g"
+)
+
+
+def export_buffered(conn: psycopg.Connection, sql: str, batch_size: int) -> int:
+    """Previous /download-csv path: all rows materialized before streaming."""
+    with conn.cursor() as cursor:
+        cursor.execute(sql)
+        rows = cursor.fetchall()
+        columns = [desc[0] for desc in cursor.description]
+        results = [dict(zip(columns, row)) for row in rows]
+    return sum(len(chunk.encode("utf-8")) for chunk in csv_stream(results))
+
+
+def export_streamed(conn: psycopg.Connection, sql: str, batch_size: int) -> int:
+    """Current /download-csv path: one batch in memory at a time."""
+    with server_side_cursor(conn, batch_size) as cursor:
+        cursor.execute(sql)
+        columns = [desc[0] for desc in cursor.description]
+        chunks = csv_stream_batches(columns, iter_batches(cursor, batch_size))
+        return sum(len(chunk.encode("utf-8")) for chunk in chunks)
+
+
+def export_copy(conn: psycopg.Connection, sql: str, batch_size: int) -> int:
+    """fast=true /download-csv path: PostgreSQL formats the CSV."""
+    with conn.cursor() as cursor:
+        with cursor.copy(build_copy_csv_sql(sql)) as copy:
+            return sum(len(chunk) for chunk in copy)
+
+
+EXPORTS = {"buffered": export_buffered, "streamed": export_streamed, "copy": export_copy}
+
+
+def run_child(mode: str, rows: int, batch_size: int) -> None:
+    """Run one export and print bytes, seconds and peak RSS (MB)."""
+    export = EXPORTS[mode]
+    with psycopg.connect(get_conninfo()) as conn:
+        start = time.perf_counter()
+        written = export(conn, EXPORT_SQL.format(rows=rows), batch_size)
+        elapsed = time.perf_counter() - start
+
+    # ru_maxrss is KiB on Linux
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{written} {elapsed:.3f} {peak_mb:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CSV export throughput and memory benchmark")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--modes", nargs="+", default=list(EXPORTS), choices=list(EXPORTS))
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "ROWS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child[0], int(args.child[1]), args.batch_size)
+        return
+
+    # Fresh process per run so peak RSS is not inherited
+    print(f"{'mode':<10} {'rows':>10} {'MB out':>9} {'seconds':>9} {'MB/s':>8} {'peak RSS MB':>12}")
+    for rows in args.rows:
+        for mode in args.modes:
+            output = subprocess.run(
+                [sys.executable, __file__, "--batch-size", str(args.batch_size), "--child", mode, str(rows)],
+                capture_output=True, text=True, check=True
+            ).stdout.split()
+            written, elapsed, peak_mb = int(output[0]), float(output[1]), float(output[2])
+            mb_per_s = written / 1e6 / elapsed if elapsed else 0.0
+            print(f"{mode:<10} {rows:>10} {written / 1e6:>9.1f} {elapsed:>9.2f} {mb_per_s:>8.1f} {peak_mb:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
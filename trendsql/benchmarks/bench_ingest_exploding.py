@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Exploding Topics ingestion benchmark
+
+Loads synthetic rows through the per-row upsert path (_upsert_row) and the
+bulk path (COPY into staging + one merge), three times each: the first
+pass inserts every key, the second changes every row and the third
+changes nothing (skipped by the IS DISTINCT FROM guard). Each run happens
+in its own transaction and is rolled back, so exploding_topics is left
+untouched.
+
+Usage:
+    python benchmarks/bench_ingest_exploding.py
+    python benchmarks/bench_ingest_exploding.py --rows 10000 100000 --modes bulk
+"""
+
+import argparse
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from connectors.exploding import ExplodingTopicsConnector
+
+
+def make_rows(count: int) -> List[Dict[str, Any]]:
+    """Synthetic exploding_topics rows with unique (topic, region) keys."""
+    start = date(2024, 1, 1)
+    return [
+        {
+            "topic": f"bench topic {i}",
+            "category": f"category {i % 20}",
+            "source": "exploding",
+            "first_seen_date": start + timedelta(days=i % 365),
+            "growth_score": (i * 7919) % 1000 / 10,
+            "popularity_score": (i * 104729) % 1000 / 10,
+            "region": ("US", "IN")[i % 2],
+            "url": f"https://example.com/topics/{i}",
+        }
+        for i in range(count)
+    ]
+
+
+def load_per_row(connector: ExplodingTopicsConnector, cursor, rows: List[Dict[str, Any]]):
+    """Previous ingest_data path: one INSERT ... ON CONFLICT round trip per row."""
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+    for row in rows:
+        counts[connector._upsert_row(cursor, row)] += 1
+    return counts["inserted"], counts["updated"], counts["unchanged"]
+
+
+def load_bulk(connector: ExplodingTopicsConnector, cursor, rows: List[Dict[str, Any]]):
+    """bulk_load path: COPY into staging, one set-based merge."""
+    return connector._bulk_merge(cursor, rows)
+
+
+LOADERS = {"per-row": load_per_row, "bulk": load_bulk}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exploding Topics ingestion benchmark")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--modes", nargs="+", default=list(LOADERS), choices=list(LOADERS))
+    args = parser.parse_args()
+
+    connector = ExplodingTopicsConnector({"upsert": True})
+    try:
+        print(
+            f"{'mode':<8} {'rows':>9} {'pass':<9} {'inserted':>9} {'updated':>9} {'unchanged':>9} "
+            f"{'seconds':>9} {'rows/s':>10}"
+        )
+        for count in args.rows:
+            rows = make_rows(count)
+            changed = [dict(row, growth_score=row["growth_score"] + 1) for row in rows]
+            passes = [("insert", rows), ("update", changed), ("unchanged", changed)]
+            for mode in args.modes:
+                try:
+                    with connector.db_conn.cursor() as cursor:
+                        for label, pass_rows in passes:
+                            start = time.perf_counter()
+                            inserted, updated, unchanged = LOADERS[mode](connector, cursor, pass_rows)
+                            elapsed = time.perf_counter() - start
+                            print(
+                                f"{mode:<8} {count:>9} {label:<9} {inserted:>9} {updated:>9} {unchanged:>9} "
+                                f"{elapsed:>9.2f} {count / elapsed:>10.0f}"
+                            )
+                finally:
+                    connector.db_conn.rollback()
+    finally:
+        connector.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Google Trends ingestion benchmark
+
+Upserts synthetic gt_interest_over_time rows through
+GoogleTrendsConnector._upsert_batches at several batch sizes (batch_size 1
+is the old one-statement-per-row path) and reports throughput for an
+insert pass, an update pass and an unchanged pass. Benchmark rows use a
+'bench keyword' prefix and are deleted afterwards.
+
+Usage:
+    python benchmarks/bench_ingest_google.py
+    python benchmarks/bench_ingest_google.py --rows 50000 --batch-sizes 100 1000 10000
+"""
+
+import argparse
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import List
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from connectors.google_trends import GoogleTrendsConnector, INTEREST_UPSERT_SQL, InterestRow
+
+CLEANUP_SQL = "DELETE FROM gt_interest_over_time WHERE keyword LIKE 'bench keyword %'"
+
+
+def make_rows(count: int) -> List[InterestRow]:
+    """Synthetic interest rows, 200 keywords with a daily series each."""
+    start = date(2004, 1, 1)
+    return [
+        InterestRow(f"bench keyword {i % 200}", start + timedelta(days=i // 200), (i * 7919) % 101, "US", 0, "")
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Google Trends upsert throughput by batch size")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 100, 500, 2000, 10000])
+    args = parser.parse_args()
+
+    # No pytrends session is needed to write rows
+    with patch("connectors.google_trends.TrendReq"):
+        connector = GoogleTrendsConnector({})
+
+    rows = make_rows(args.rows)
+    changed = [row._replace(interest=row.interest + 1) for row in rows]
+    passes = [("insert", rows), ("update", changed), ("unchanged", changed)]
+    try:
+        print(f"{'batch':>7} {'pass':<9} {'inserted':>9} {'updated':>9} {'unchanged':>9} {'seconds':>9} {'rows/s':>10}")
+        for batch_size in args.batch_sizes:
+            connector.batch_size = batch_size
+            for label, pass_rows in passes:
+                start = time.perf_counter()
+                inserted, updated, unchanged = connector._upsert_batches(
+                    INTEREST_UPSERT_SQL, pass_rows, "gt_interest_over_time"
+                )
+                elapsed = time.perf_counter() - start
+                print(
+                    f"{batch_size:>7} {label:<9} {inserted:>9} {updated:>9} {unchanged:>9} "
+                    f"{elapsed:>9.2f} {len(rows) / elapsed:>10.0f}"
+                )
+
+            with connector.db_conn.cursor() as cursor:
+                cursor.execute(CLEANUP_SQL)
+            connector.db_conn.commit()
+    finally:
+        connector.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Connection pool load benchmark
+
+Fires concurrent /query requests at a running TrendSQL API and reports
+p50/p99 latency and throughput as concurrency grows from 1 to 64.
+
+Usage:
+    python benchmarks/bench_pool.py --url http://localhost:8000
+    python benchmarks/bench_pool.py --requests 500 --sql "SELECT * FROM gt_interest_over_time"
+"""
+
+import argparse
+import json
+import statistics
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+
+DEFAULT_SQL = "SELECT keyword, date, interest FROM gt_interest_over_time ORDER BY date DESC"
+CONCURRENCY_LEVELS = [1, 2, 4, 8, 16, 32, 64]
+
+
+def send_query(url: str, sql: str) -> Tuple[float, bool]:
+    """Send one /query request and return (latency_ms, ok)."""
+    body = json.dumps({"sql": sql, "page": 1, "page_size": 50}).encode("utf-8")
+    req = urllib.request.Request(
+        f"{url.rstrip('/')}/query",
+        data=body,
+        headers={"Content-Type": "application/json"},
+        method="POST"
+    )
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=60) as resp:
+            resp.read()
+            ok = resp.status == 200
+    except Exception:
+        ok = False
+    return (time.perf_counter() - start) * 1000, ok
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def run_level(url: str, sql: str, concurrency: int, total_requests: int) -> dict:
+    """Run total_requests at a fixed concurrency level."""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda _: send_query(url, sql), range(total_requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies = [latency for latency, ok in results if ok]
+    return {
+        "concurrency": concurrency,
+        "ok": len(latencies),
+        "errors": total_requests - len(latencies),
+        "p50_ms": percentile(latencies, 50),
+        "p99_ms": percentile(latencies, 99),
+        "mean_ms": statistics.mean(latencies) if latencies else 0.0,
+        "rps": total_requests / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TrendSQL connection pool load benchmark")
+    parser.add_argument("--url", default="http://localhost:8000", help="API base URL")
+    parser.add_argument("--sql", default=DEFAULT_SQL, help="SQL sent to /query")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per concurrency level")
+    args = parser.parse_args()
+
+    # Warm up the pool before measuring
+    run_level(args.url, args.sql, 4, 20)
+
+    print(f"{'conc':>5} {'ok':>6} {'err':>5} {'p50 ms':>9} {'p99 ms':>9} {'mean ms':>9} {'req/s':>9}")
+    for concurrency in CONCURRENCY_LEVELS:
+        r = run_level(args.url, args.sql, concurrency, max(args.requests, concurrency))
+        print(
+            f"{r['concurrency']:>5} {r['ok']:>6} {r['errors']:>5} {r['p50_ms']:>9.1f} "
+            f"{r['p99_ms']:>9.1f} {r['mean_ms']:>9.1f} {r['rps']:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
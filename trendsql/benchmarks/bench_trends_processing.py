@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Google Trends DataFrame conversion micro-benchmark
+
+Times the previous iterrows() conversion of interest over time and related
+topics frames against the column-wise GoogleTrendsConnector methods on
+synthetic pytrends-shaped frames (daily series, five keywords per frame
+plus isPartial). No network or database is used.
+
+Usage:
+    python benchmarks/bench_trends_processing.py
+    python benchmarks/bench_trends_processing.py --days 1825 --frames 40
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from connectors.google_trends import GoogleTrendsConnector
+
+
+def legacy_interest(connector, df, keyword: str) -> List[Dict[str, Any]]:
+    """Previous _process_interest_data: one dict per row via iterrows()."""
+    data = []
+    for date_str, row in df.iterrows():
+        if date_str == 'isPartial':
+            continue
+        interest_value = row[keyword]
+        if pd.isna(interest_value):
+            continue
+        data.append({
+            "keyword": keyword,
+            "date": date_str.date() if hasattr(date_str, 'date') else date_str,
+            "interest": int(interest_value),
+            "geo": connector.geo,
+            "category": connector.category,
+            "gprop": connector.gprop
+        })
+    return data
+
+
+def legacy_related(connector, related_dict, keyword: str) -> List[Dict[str, Any]]:
+    """Previous _process_related_topics: one dict per row via iterrows()."""
+    data = []
+    for topic_type in ("top", "rising"):
+        if topic_type in related_dict and related_dict[topic_type] is not None:
+            for _, row in related_dict[topic_type].iterrows():
+                data.append({
+                    "keyword": keyword,
+                    "related_topic": row['topic_title'],
+                    "type": topic_type,
+                    "value": int(row['value']),
+                    "geo": connector.geo
+                })
+    return data
+
+
+def make_interest_frame(days: int, keywords: List[str], seed: int) -> pd.DataFrame:
+    """Interest over time frame shaped like TrendReq.interest_over_time()."""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2019-01-01", periods=days, freq="D", name="date")
+    frame = pd.DataFrame({kw: rng.integers(0, 101, days) for kw in keywords}, index=index)
+    frame["isPartial"] = False
+    frame.iloc[-1, frame.columns.get_loc("isPartial")] = True
+    return frame
+
+
+def make_related(rows: int) -> Dict[str, pd.DataFrame]:
+    """Related topics dict shaped like TrendReq.related_topics()[keyword]."""
+    def frame(prefix):
+        return pd.DataFrame({
+            "value": np.arange(rows, 0, -1),
+            "formattedValue": [str(v) for v in range(rows)],
+            "link": [f"/trends/explore?q={prefix}{i}" for i in range(rows)],
+            "topic_mid": [f"/m/{prefix}{i}" for i in range(rows)],
+            "topic_title": [f"{prefix} topic {i}" for i in range(rows)],
+            "topic_type": ["Topic"] * rows
+        })
+    return {"top": frame("top"), "rising": frame("rising")}
+
+
+def timed(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Google Trends DataFrame conversion micro-benchmark")
+    parser.add_argument("--days", type=int, nargs="+", default=[90, 365, 1825])
+    parser.add_argument("--frames", type=int, default=20, help="payload frames of five keywords each")
+    parser.add_argument("--related-rows", type=int, default=25)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with patch("connectors.google_trends.psycopg.connect"), patch("connectors.google_trends.TrendReq"):
+        connector = GoogleTrendsConnector({"geo": "US"})
+
+    print(f"{'kind':<9} {'days':>6} {'rows':>9} {'iterrows s':>11} {'columnar s':>11} {'speedup':>8}")
+    for days in args.days:
+        frames = []
+        for f in range(args.frames):
+            keywords = [f"kw{f}_{k}" for k in range(5)]
+            frames.append((make_interest_frame(days, keywords, seed=f), keywords))
+
+        def run(convert):
+            return sum(len(convert(connector, df, kw)) for df, keywords in frames for kw in keywords)
+
+        rows = run(GoogleTrendsConnector._process_interest_data)
+        assert rows == run(legacy_interest)
+        legacy_s = timed(lambda: run(legacy_interest), args.repeat)
+        columnar_s = timed(lambda: run(GoogleTrendsConnector._process_interest_data), args.repeat)
+        print(f"{'interest':<9} {days:>6} {rows:>9} {legacy_s:>11.3f} {columnar_s:>11.3f} {legacy_s / columnar_s:>7.1f}x")
+
+    related = [(make_related(args.related_rows), f"kw{k}") for k in range(args.frames * 5)]
+
+    def run_related(convert):
+        return sum(len(convert(connector, frame, kw)) for frame, kw in related)
+
+    rows = run_related(GoogleTrendsConnector._process_related_topics)
+    legacy_s = timed(lambda: run_related(legacy_related), args.repeat)
+    columnar_s = timed(lambda: run_related(GoogleTrendsConnector._process_related_topics), args.repeat)
+    print(f"{'related':<9} {'-':>6} {rows:>9} {legacy_s:>11.3f} {columnar_s:>11.3f} {legacy_s / columnar_s:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+import logging
+from typing import Iterable
+
+logger = logging.getLogger(__name__)
+
+# Per-table change counters read by the API result caches; the data_versions
+# table is created by db/schema.sql, so ingestion only runs the upsert
+BUMP_DATA_VERSIONS_SQL = """
+INSERT INTO data_versions (table_name, version, updated_at)
+SELECT table_name, 1, NOW() FROM unnest(%s::text[]) AS t(table_name)
+ON CONFLICT (table_name)
+DO UPDATE SET version = data_versions.version + 1, updated_at = NOW()
+"""
+
+
+def bump_data_versions(cursor, tables: Iterable[str]) -> None:
+    """
+    Bump the data version of each table written by an ingestion run.
+
+    Call inside the ingestion transaction, right before commit, so cached
+    query results over these tables go stale exactly when the data changes.
+    """
+    tables = sorted(set(tables))
+    if not tables:
+        return
+
+    cursor.execute(BUMP_DATA_VERSIONS_SQL, (tables,))
+    logger.debug(f"Bumped data versions for {', '.join(tables)}")
@@ -1,12 +1,102 @@
 import os
+import io
 import csv
+import hashlib
 import logging
-from typing import Dict, List, Any, Optional
+from itertools import islice
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Tuple
 from datetime import datetime, date
 import psycopg
 
+from .data_versions import bump_data_versions
+from .fetch_cache import FetchCache, fetch_cache_from_config, public_params
+from .run_ledger import RunLedger, run_fingerprint
+from .watermarks import get_watermarks, set_watermarks
+
 logger = logging.getLogger(__name__)
 
+WATERMARK_SOURCE = "exploding_topics"
+
+DATE_FORMATS = ["%Y-%m-%d", "%m/%d/%Y", "%d/%m/%Y"]
+
+# first_seen_date values sampled per file to pick its date format
+DATE_SAMPLE_ROWS = 1000
+
+# Detected date format per (path, size, mtime)
+_date_format_cache: Dict[Tuple[str, int, int], Optional[str]] = {}
+
+STAGING_COLUMNS = [
+    "topic", "category", "source", "first_seen_date",
+    "growth_score", "popularity_score", "region", "url"
+]
+
+# Bulk mode: rows are COPYed here, then merged into exploding_topics
+CREATE_STAGING_SQL = """
+CREATE TEMP TABLE exploding_topics_staging (
+    seq BIGSERIAL,
+    topic TEXT NOT NULL,
+    category TEXT,
+    source TEXT,
+    first_seen_date DATE,
+    growth_score NUMERIC,
+    popularity_score NUMERIC,
+    region TEXT,
+    url TEXT
+)
+"""
+
+DROP_STAGING_SQL = "DROP TABLE exploding_topics_staging"
+
+COPY_STAGING_SQL = f"COPY exploding_topics_staging ({', '.join(STAGING_COLUMNS)}) FROM STDIN"
+
+# Rows identical to the stored ones are skipped, not rewritten
+CHANGED_ROW_SQL = """
+(exploding_topics.category, exploding_topics.source, exploding_topics.first_seen_date,
+ exploding_topics.growth_score, exploding_topics.popularity_score, exploding_topics.url)
+IS DISTINCT FROM
+(EXCLUDED.category, EXCLUDED.source, EXCLUDED.first_seen_date,
+ EXCLUDED.growth_score, EXCLUDED.popularity_score, EXCLUDED.url)
+"""
+
+MERGE_STAGING_SQL = f"""
+WITH deduped AS (
+    SELECT DISTINCT ON (topic, COALESCE(region, ''))
+        topic, category, source, first_seen_date, growth_score, popularity_score, region, url
+    FROM exploding_topics_staging
+    ORDER BY topic, COALESCE(region, ''), seq DESC
+), merged AS (
+    INSERT INTO exploding_topics
+    (topic, category, source, first_seen_date, growth_score, popularity_score, region, url)
+    SELECT * FROM deduped
+    ON CONFLICT (topic, COALESCE(region, ''))
+    DO UPDATE SET
+        category = EXCLUDED.category,
+        source = EXCLUDED.source,
+        first_seen_date = EXCLUDED.first_seen_date,
+        growth_score = EXCLUDED.growth_score,
+        popularity_score = EXCLUDED.popularity_score,
+        url = EXCLUDED.url,
+        created_at = NOW()
+    WHERE {CHANGED_ROW_SQL}
+    RETURNING (xmax = 0) AS is_insert
+)
+SELECT COUNT(*) FILTER (WHERE is_insert), COUNT(*) FILTER (WHERE NOT is_insert),
+    (SELECT COUNT(*) FROM deduped) - COUNT(*)
+FROM merged
+"""
+
+INSERT_STAGING_SQL = """
+WITH merged AS (
+    INSERT INTO exploding_topics
+    (topic, category, source, first_seen_date, growth_score, popularity_score, region, url)
+    SELECT topic, category, source, first_seen_date, growth_score, popularity_score, region, url
+    FROM exploding_topics_staging
+    ORDER BY seq
+    RETURNING 1
+)
+SELECT COUNT(*), 0, 0 FROM merged
+"""
+
 
 class ExplodingTopicsConnector:
     def __init__(self, config: Dict[str, Any]):
@@ -17,6 +107,14 @@ class ExplodingTopicsConnector:
         self.api_config = config.get("api", {})
         self.filters = config.get("filters", {})
         self.upsert = config.get("upsert", True)
+        self.bulk_load = config.get("bulk_load", False)
+        self.chunk_size = max(1, int(config.get("chunk_size", 10000)))
+        self.incremental = config.get("incremental", False)
+        self.progress = {"rows_read": 0, "rows_kept": 0, "bytes_read": 0, "bytes_total": 0}
+        self._hash_cache: Optional[Tuple[Tuple[str, int, int], str]] = None
+        
+        # Local cache of API responses (CSV mode reads the file directly)
+        self.cache = fetch_cache_from_config(config)
         
         # Database connection
         self.db_conn = psycopg.connect(
@@ -32,7 +130,7 @@ class ExplodingTopicsConnector:
         if self.fetch_mode == "csv":
             return self._fetch_from_csv()
         elif self.fetch_mode == "api":
-            return self._fetch_from_api()
+            return self._fetch_from_api_cached()
         else:
             raise ValueError(f"Unsupported fetch_mode: {self.fetch_mode}")
     
@@ -43,16 +141,8 @@ class ExplodingTopicsConnector:
             logger.info("Using sample data instead")
             return self._get_sample_data()
         
-        data = []
         try:
-            with open(self.csv_path, 'r', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    # Map CSV columns to our schema
-                    mapped_row = self._map_csv_row(row)
-                    if self._apply_filters(mapped_row):
-                        data.append(mapped_row)
-            
+            data = list(self._iter_csv_rows())
             logger.info(f"Loaded {len(data)} rows from CSV")
             return data
             
@@ -61,39 +151,156 @@ class ExplodingTopicsConnector:
             logger.info("Using sample data instead")
             return self._get_sample_data()
     
+    def iter_chunks(self) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Yield mapped, filtered rows in lists of at most chunk_size.
+        
+        CSV files are streamed, so memory stays bounded by one chunk however
+        large the file is. Other modes chunk the fetch_data() result.
+        """
+        if self.fetch_mode == "csv" and os.path.exists(self.csv_path):
+            rows = self._iter_csv_rows()
+        else:
+            rows = iter(self.fetch_data())
+        
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                return
+            self._log_progress()
+            yield chunk
+    
+    def _iter_csv_rows(self) -> Iterator[Dict[str, Any]]:
+        """Stream the CSV file, mapping and filtering one row at a time."""
+        date_format = self._detect_date_format(self.csv_path)
+        progress = self.progress = {
+            "rows_read": 0,
+            "rows_kept": 0,
+            "bytes_read": 0,
+            "bytes_total": os.path.getsize(self.csv_path)
+        }
+        
+        # Binary handle underneath so the byte position stays readable while iterating
+        with open(self.csv_path, 'rb') as raw:
+            reader = csv.DictReader(io.TextIOWrapper(raw, encoding='utf-8', newline=''))
+            for row in reader:
+                progress["rows_read"] += 1
+                if progress["rows_read"] % 1000 == 0:
+                    progress["bytes_read"] = raw.tell()
+                
+                # Map CSV columns to our schema
+                mapped_row = self._map_csv_row(row, date_format)
+                if self._apply_filters(mapped_row):
+                    progress["rows_kept"] += 1
+                    yield mapped_row
+            
+            progress["bytes_read"] = progress["bytes_total"]
+    
+    def _log_progress(self):
+        """Report rows and bytes read so far."""
+        progress = self.progress
+        if progress["bytes_total"]:
+            percent = 100 * progress["bytes_read"] / progress["bytes_total"]
+            logger.info(
+                f"Read {progress['rows_read']} rows ({percent:.0f}% of {self.csv_path}), "
+                f"{progress['rows_kept']} kept"
+            )
+    
+    def _detect_date_format(self, path: str) -> Optional[str]:
+        """
+        Pick the date format of a file's first_seen_date column from a sample.
+        
+        The format that parses the most sampled values wins, which also
+        settles %m/%d vs %d/%m once any day is past the 12th. Cached per
+        file until it changes.
+        """
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        if key in _date_format_cache:
+            return _date_format_cache[key]
+        
+        with open(path, 'r', encoding='utf-8', newline='') as file:
+            samples = [
+                row["first_seen_date"].strip()
+                for row in islice(csv.DictReader(file), DATE_SAMPLE_ROWS)
+                if (row.get("first_seen_date") or "").strip()
+            ]
+        
+        best_format = None
+        best_matches = 0
+        for fmt in DATE_FORMATS:
+            matches = sum(1 for value in samples if self._matches_date_format(value, fmt))
+            if matches > best_matches:
+                best_format, best_matches = fmt, matches
+        
+        logger.info(f"Detected date format {best_format} for {path}")
+        _date_format_cache[key] = best_format
+        return best_format
+    
+    @staticmethod
+    def _matches_date_format(value: str, fmt: str) -> bool:
+        try:
+            datetime.strptime(value, fmt)
+            return True
+        except ValueError:
+            return False
+    
+    def _fetch_from_api_cached(self) -> List[Dict[str, Any]]:
+        """Serve the API response from the fetch cache when it was fetched recently."""
+        if self.cache is None:
+            return self._fetch_from_api()
+        
+        key = FetchCache.make_key("exploding_topics.api", public_params(self.api_config))
+        data = self.cache.get(key)
+        if data is not None:
+            logger.info(f"Using cached API response ({len(data)} rows)")
+            return data
+        
+        data = self._fetch_from_api()
+        self.cache.put(key, data)
+        return data
+    
     def _fetch_from_api(self) -> List[Dict[str, Any]]:
         """Fetch data from API (stub implementation)."""
         logger.warning("API mode not implemented yet - using sample data")
         return self._get_sample_data()
     
-    def _map_csv_row(self, row: Dict[str, str]) -> Dict[str, Any]:
+    def _map_csv_row(self, row: Dict[str, str], date_format: Optional[str] = None) -> Dict[str, Any]:
         """Map CSV row to our schema."""
         return {
             "topic": row.get("topic", ""),
             "category": row.get("category", ""),
             "source": row.get("source", "exploding"),
-            "first_seen_date": self._parse_date(row.get("first_seen_date", "")),
+            "first_seen_date": self._parse_date(row.get("first_seen_date", ""), date_format),
             "growth_score": self._parse_numeric(row.get("growth_score", "")),
             "popularity_score": self._parse_numeric(row.get("popularity_score", "")),
             "region": row.get("region", ""),
             "url": row.get("url", "")
         }
     
-    def _parse_date(self, date_str: str) -> Optional[date]:
-        """Parse date string to date object."""
+    def _parse_date(self, date_str: str, date_format: Optional[str] = None) -> Optional[date]:
+        """Parse date string to date object, trying the detected format first."""
         if not date_str:
             return None
         
-        try:
-            # Try common date formats
-            for fmt in ["%Y-%m-%d", "%m/%d/%Y", "%d/%m/%Y"]:
-                try:
-                    return datetime.strptime(date_str, fmt).date()
-                except ValueError:
-                    continue
-            return None
-        except Exception:
-            return None
+        if date_format == "%Y-%m-%d":
+            try:
+                return date.fromisoformat(date_str)
+            except ValueError:
+                pass
+        elif date_format:
+            try:
+                return datetime.strptime(date_str, date_format).date()
+            except ValueError:
+                pass
+        
+        # Try common date formats
+        for fmt in DATE_FORMATS:
+            try:
+                return datetime.strptime(date_str, fmt).date()
+            except ValueError:
+                continue
+        return None
     
     def _parse_numeric(self, value: str) -> Optional[float]:
         """Parse numeric string to float."""
@@ -159,45 +366,172 @@ class ExplodingTopicsConnector:
             }
         ]
     
-    def ingest_data(self) -> Dict[str, int]:
-        """Ingest data into database."""
-        data = self.fetch_data()
+    def ingest_data(self, ledger: Optional[RunLedger] = None) -> Dict[str, int]:
+        """
+        Ingest data into database, streaming it chunk by chunk.
+        
+        Each chunk is loaded and committed with its run ledger checkpoint
+        in one transaction, so a resumed run skips the chunks already
+        stored. The file's watermark advances after the last chunk.
+        """
+        ledger = ledger or RunLedger()
+        result = {"inserted": 0, "updated": 0, "unchanged": 0}
+        content_hash = self._unchanged_file_check()
+        if content_hash is False:
+            return result
+        
+        chunks = self.iter_chunks()
+        index = 0
+        skipped = 0
+        while True:
+            with ledger.stage("read"):
+                chunk = next(chunks, None)
+            if chunk is None:
+                break
+            
+            unit = f"chunk:{index}"
+            index += 1
+            if ledger.is_done(unit):
+                skipped += 1
+                continue
+            
+            with ledger.stage("load"):
+                counts = self._load_chunk(chunk, ledger, unit)
+            for key, value in counts.items():
+                result[key] += value
         
-        if not data:
+        if index == 0:
             logger.warning("No data to ingest")
-            return {"inserted": 0, "updated": 0}
+            return result
+        if skipped:
+            logger.info(f"Skipped {skipped} chunks completed by run {ledger.run_id}")
         
+        if content_hash:
+            try:
+                with self.db_conn.cursor() as cursor:
+                    set_watermarks(cursor, WATERMARK_SOURCE, [(self._watermark_key(), None, content_hash)])
+                self.db_conn.commit()
+            except Exception:
+                self.db_conn.rollback()
+                raise
+        
+        logger.info(
+            f"Ingestion complete: {result['inserted']} inserted, {result['updated']} updated, "
+            f"{result['unchanged']} unchanged"
+        )
+        return result
+    
+    def _load_chunk(self, chunk: List[Dict[str, Any]], ledger: RunLedger, unit: str) -> Dict[str, int]:
+        """Load one chunk and mark it done in a single transaction."""
         inserted = 0
         updated = 0
+        unchanged = 0
         
         try:
             with self.db_conn.cursor() as cursor:
-                for row in data:
-                    if self.upsert:
-                        # Use upsert (INSERT ... ON CONFLICT)
-                        result = self._upsert_row(cursor, row)
-                        if result == "inserted":
-                            inserted += 1
+                if self.bulk_load:
+                    inserted, updated, unchanged = self._bulk_merge(cursor, chunk)
+                else:
+                    for row in chunk:
+                        if self.upsert:
+                            # Use upsert (INSERT ... ON CONFLICT)
+                            result = self._upsert_row(cursor, row)
+                            if result == "inserted":
+                                inserted += 1
+                            elif result == "updated":
+                                updated += 1
+                            else:
+                                unchanged += 1
                         else:
-                            updated += 1
-                    else:
-                        # Simple insert
-                        self._insert_row(cursor, row)
-                        inserted += 1
+                            # Simple insert
+                            self._insert_row(cursor, row)
+                            inserted += 1
+                
+                if inserted or updated:
+                    bump_data_versions(cursor, ["exploding_topics"])
+                counts = {"inserted": inserted, "updated": updated, "unchanged": unchanged}
+                ledger.mark_done(cursor, unit, counts)
             
             self.db_conn.commit()
-            logger.info(f"Ingestion complete: {inserted} inserted, {updated} updated")
-            
         except Exception as e:
             self.db_conn.rollback()
-            logger.error(f"Error during ingestion: {e}")
+            logger.error(f"Error during ingestion of {unit}: {e}")
             raise
         
-        return {"inserted": inserted, "updated": updated}
+        logger.debug(f"Committed {unit}: {inserted} inserted, {updated} updated, {unchanged} unchanged")
+        return counts
+    
+    def run_fingerprint(self) -> str:
+        """Run ledger fingerprint: the config plus the CSV file's content."""
+        if self.fetch_mode == "csv" and os.path.exists(self.csv_path):
+            return run_fingerprint(self.config, file_hash=self._file_hash())
+        return run_fingerprint(self.config)
+    
+    def _watermark_key(self) -> str:
+        return os.path.abspath(self.csv_path)
+    
+    def _file_hash(self) -> str:
+        """SHA-256 of the CSV file, read in 1 MB blocks and kept until the file changes."""
+        stat = os.stat(self.csv_path)
+        key = (os.path.abspath(self.csv_path), stat.st_size, stat.st_mtime_ns)
+        if self._hash_cache and self._hash_cache[0] == key:
+            return self._hash_cache[1]
+        
+        digest = hashlib.sha256()
+        with open(self.csv_path, 'rb') as file:
+            for block in iter(lambda: file.read(1 << 20), b""):
+                digest.update(block)
+        self._hash_cache = (key, digest.hexdigest())
+        return self._hash_cache[1]
+    
+    def _unchanged_file_check(self):
+        """
+        Compare the CSV file's hash with its watermark.
+        
+        Returns False when the file was already ingested unchanged, its hash
+        when it should be ingested, or None when incremental mode does not
+        apply (disabled, API mode, or no file).
+        """
+        if not self.incremental or self.fetch_mode != "csv" or not os.path.exists(self.csv_path):
+            return None
+        
+        content_hash = self._file_hash()
+        try:
+            with self.db_conn.cursor() as cursor:
+                watermark = get_watermarks(cursor, WATERMARK_SOURCE).get(self._watermark_key())
+            self.db_conn.commit()
+        except Exception as e:
+            self.db_conn.rollback()
+            logger.warning(f"Could not read watermarks, ingesting the whole file: {e}")
+            return content_hash
+        
+        if watermark is not None and watermark[1] == content_hash:
+            logger.info(f"{self.csv_path} unchanged since the last ingestion; skipping")
+            return False
+        return content_hash
+    
+    def _bulk_merge(self, cursor, data: Iterable[Dict[str, Any]]) -> Tuple[int, int, int]:
+        """
+        COPY rows into a temp staging table and merge them in one statement.
+        
+        Returns (inserted, updated, unchanged). Rows repeating a (topic,
+        region) key collapse to the last one, as they would with per-row
+        upserts; rows matching the stored values are not rewritten.
+        """
+        cursor.execute(CREATE_STAGING_SQL)
+        
+        with cursor.copy(COPY_STAGING_SQL) as copy:
+            for row in data:
+                copy.write_row([row[column] for column in STAGING_COLUMNS])
+        
+        cursor.execute(MERGE_STAGING_SQL if self.upsert else INSERT_STAGING_SQL)
+        inserted, updated, unchanged = cursor.fetchone()
+        cursor.execute(DROP_STAGING_SQL)
+        return inserted, updated, unchanged
     
     def _upsert_row(self, cursor, row: Dict[str, Any]) -> str:
         """Upsert a row into exploding_topics table."""
-        query = """
+        query = f"""
         INSERT INTO exploding_topics 
         (topic, category, source, first_seen_date, growth_score, popularity_score, region, url)
         VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
@@ -210,6 +544,7 @@ class ExplodingTopicsConnector:
             popularity_score = EXCLUDED.popularity_score,
             url = EXCLUDED.url,
             created_at = NOW()
+        WHERE {CHANGED_ROW_SQL}
         RETURNING (xmax = 0) as is_insert
         """
         
@@ -225,6 +560,8 @@ class ExplodingTopicsConnector:
         ))
         
         result = cursor.fetchone()
+        if result is None:
+            return "unchanged"
         return "inserted" if result[0] else "updated"
     
     def _insert_row(self, cursor, row: Dict[str, Any]):
@@ -247,6 +584,8 @@ class ExplodingTopicsConnector:
         ))
     
     def close(self):
-        """Close database connection."""
+        """Close database connection and fetch cache."""
         if self.db_conn and not self.db_conn.closed:
             self.db_conn.close()
+        if self.cache is not None:
+            self.cache.close()
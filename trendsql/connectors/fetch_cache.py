@@ -0,0 +1,257 @@
+import base64
+import hashlib
+import io
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Payloads are stored once per content hash; request keys point at them
+CREATE_CACHE_SQL = """
+CREATE TABLE IF NOT EXISTS blobs (
+    hash TEXT PRIMARY KEY,
+    data BLOB NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    hash TEXT NOT NULL REFERENCES blobs (hash),
+    stored_at REAL NOT NULL,
+    used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_used_at ON entries (used_at);
+"""
+
+DELETE_ORPHAN_BLOBS_SQL = "DELETE FROM blobs WHERE hash NOT IN (SELECT hash FROM entries)"
+
+# Config keys ending in these words (api_key, access_token) are never hashed into a request key
+SECRET_MARKERS = ("key", "token", "secret", "password")
+
+
+def _encode_default(value: Any) -> Dict[str, Any]:
+    """Tag the values JSON has no type for; DataFrames keep their dtypes and index."""
+    if isinstance(value, pd.DataFrame):
+        return {
+            "__frame__": json.loads(value.to_json(orient="table", date_format="iso", date_unit="ns")),
+            "dtypes": [str(dtype) for dtype in value.dtypes],
+            "index_dtype": str(value.index.dtype),
+            "index_freq": getattr(value.index, "freqstr", None)
+        }
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, date):
+        return {"__date__": value.isoformat()}
+    if isinstance(value, bytes):
+        return {"__bytes__": base64.b64encode(value).decode("ascii")}
+    raise TypeError(f"{type(value).__name__} values cannot be cached")
+
+
+def _decode_hook(obj: Dict[str, Any]) -> Any:
+    """Rebuild the values tagged by _encode_default."""
+    if "__frame__" in obj:
+        frame = pd.read_json(io.StringIO(json.dumps(obj["__frame__"])), orient="table")
+        # JSON loses datetime resolution, integer widths and index frequency; restore what was stored
+        dtypes = dict(zip(frame.columns, obj["dtypes"]))
+        changed = {column: dtype for column, dtype in dtypes.items() if str(frame[column].dtype) != dtype}
+        if changed:
+            frame = frame.astype(changed)
+        if str(frame.index.dtype) != obj["index_dtype"]:
+            frame.index = frame.index.astype(obj["index_dtype"])
+        if obj.get("index_freq"):
+            frame.index = pd.DatetimeIndex(frame.index, freq=obj["index_freq"])
+        return frame
+    if "__datetime__" in obj:
+        return datetime.fromisoformat(obj["__datetime__"])
+    if "__date__" in obj:
+        return date.fromisoformat(obj["__date__"])
+    if "__bytes__" in obj:
+        return base64.b64decode(obj["__bytes__"])
+    return obj
+
+
+def encode_value(value: Any) -> bytes:
+    """Serialize a cached value to zlib-compressed JSON (deterministic, so equal payloads share a hash)."""
+    return zlib.compress(json.dumps(value, default=_encode_default, separators=(",", ":")).encode("utf-8"))
+
+
+def decode_value(data: bytes) -> Any:
+    """Inverse of encode_value; raises ValueError for blobs that are not cache JSON."""
+    try:
+        text = zlib.decompress(data).decode("utf-8")
+    except zlib.error as e:
+        raise ValueError(f"corrupt fetch cache blob: {e}") from e
+    return json.loads(text, object_hook=_decode_hook)
+
+
+class FetchCacheMiss(LookupError):
+    """Raised in offline mode when a request was never recorded."""
+
+
+class FetchCache:
+    """
+    On-disk, content-addressed cache of upstream responses (SQLite).
+    
+    Values are stored as zlib-compressed JSON (DataFrames in pandas'
+    table format) and never unpickled, so recorded caches are safe to
+    share; identical payloads fetched under different requests share one
+    blob. Entries expire after
+    ttl_seconds and the least recently used are evicted once blobs exceed
+    max_bytes. In offline mode nothing is fetched: a miss raises
+    FetchCacheMiss, so recorded caches can be replayed as fixtures.
+    Safe to share between threads and processes.
+    """
+    
+    def __init__(self, path: str, ttl_seconds: float = 12 * 3600, max_bytes: int = 512 * 1024 * 1024,
+                 offline: bool = False, clock: Callable[[], float] = time.time):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "expired": 0, "stores": 0, "evictions": 0}
+        
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(CREATE_CACHE_SQL)
+    
+    @staticmethod
+    def make_key(namespace: str, *parts: Any) -> str:
+        """Hash a request: its namespace plus every parameter that shapes the response."""
+        raw = json.dumps([namespace, parts], sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Return the cached value, or None on a miss.
+        
+        Raises FetchCacheMiss instead of returning None in offline mode;
+        expired entries are still served offline.
+        """
+        now = self._clock()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT e.stored_at, b.data FROM entries e JOIN blobs b ON b.hash = e.hash WHERE e.key = ?",
+                (key,)
+            ).fetchone()
+            
+            if row is not None and not self.offline and row[0] + self.ttl_seconds <= now:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._counters["expired"] += 1
+                row = None
+            
+            if row is None:
+                self._counters["misses"] += 1
+                if self.offline:
+                    raise FetchCacheMiss(f"{key} is not in the offline cache {self.path}")
+                return None
+            
+            self._conn.execute("UPDATE entries SET used_at = ? WHERE key = ?", (now, key))
+            self._counters["hits"] += 1
+        
+        try:
+            return decode_value(row[1])
+        except ValueError:
+            # Blobs written by older versions were pickled; drop them rather than unpickle
+            logger.warning(f"Discarding undecodable fetch cache entry {key}")
+            if self.offline:
+                raise FetchCacheMiss(f"{key} is not decodable in the offline cache {self.path}")
+            with self._lock:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            return None
+    
+    def put(self, key: str, value: Any) -> bool:
+        """
+        Store a value under a request key.
+        
+        Returns False when the value alone exceeds max_bytes or in offline
+        mode (recorded caches are never modified by a replay).
+        """
+        if self.offline:
+            return False
+        
+        data = encode_value(value)
+        if len(data) > self.max_bytes:
+            return False
+        
+        content_hash = hashlib.sha256(data).hexdigest()
+        now = self._clock()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO blobs (hash, data, size) VALUES (?, ?, ?)",
+                    (content_hash, data, len(data))
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, hash, stored_at, used_at) VALUES (?, ?, ?, ?)",
+                    (key, content_hash, now, now)
+                )
+                self._evict(now)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._counters["stores"] += 1
+        return True
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and current size."""
+        with self._lock:
+            entries, = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+            size, = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()
+            return {**self._counters, "entries": entries, "bytes": size, "max_bytes": self.max_bytes}
+    
+    def close(self) -> None:
+        self._conn.close()
+    
+    def _evict(self, now: float) -> None:
+        # Expired entries go first, then the least recently used while over the cap
+        self._conn.execute("DELETE FROM entries WHERE stored_at <= ?", (now - self.ttl_seconds,))
+        self._conn.execute(DELETE_ORPHAN_BLOBS_SQL)
+        while self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0] > self.max_bytes:
+            deleted = self._conn.execute(
+                "DELETE FROM entries WHERE key = (SELECT key FROM entries ORDER BY used_at LIMIT 1)"
+            ).rowcount
+            self._conn.execute(DELETE_ORPHAN_BLOBS_SQL)
+            self._counters["evictions"] += deleted
+            if not deleted:
+                break
+
+
+def public_params(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Config without credentials, for hashing into request keys."""
+    return {
+        name: value for name, value in config.items()
+        if name.lower().rsplit("_", 1)[-1] not in SECRET_MARKERS
+    }
+
+
+def fetch_cache_from_config(config: Dict[str, Any]) -> Optional[FetchCache]:
+    """
+    Build the fetch cache from a connector's `cache` config block, or None
+    when it is absent or disabled.
+    """
+    settings = config.get("cache") or {}
+    if not settings.get("enabled", False):
+        return None
+    
+    cache = FetchCache(
+        path=settings.get("path", "./.cache/fetch_cache.sqlite"),
+        ttl_seconds=float(settings.get("ttl_hours", 12)) * 3600,
+        max_bytes=int(float(settings.get("max_mb", 512)) * 1024 * 1024),
+        offline=settings.get("offline", False)
+    )
+    logger.info(f"Fetch cache {cache.path} ({'offline' if cache.offline else f'ttl {cache.ttl_seconds:.0f}s'})")
+    return cache
@@ -1,12 +1,79 @@
 import os
+import math
+import queue
 import logging
-from typing import Dict, List, Any, Optional
-from datetime import datetime, date
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+from typing import Dict, Iterator, List, Any, Optional, Tuple
+from datetime import datetime, date, timedelta
 import psycopg
 from pytrends.request import TrendReq
 
+from .data_versions import bump_data_versions
+from .fetch_cache import FetchCache, FetchCacheMiss, fetch_cache_from_config
+from .rate_limit import TokenBucket, call_with_backoff
+from .run_ledger import RunLedger, run_fingerprint
+from .watermarks import get_watermarks, set_watermarks
+
 logger = logging.getLogger(__name__)
 
+# pytrends compares at most five keywords per payload
+MAX_KEYWORDS_PER_PAYLOAD = 5
+
+WATERMARK_SOURCE = "google_trends"
+
+# Google returns daily points only for windows up to about nine months;
+# narrowing a longer (weekly) timeframe would change the granularity
+MAX_DAILY_WINDOW_DAYS = 269
+
+STORED_INTEREST_SQL = """
+SELECT date, interest FROM gt_interest_over_time
+WHERE keyword = %s AND COALESCE(geo, '') = %s AND COALESCE(gprop, '') = %s AND COALESCE(category, 0) = %s
+AND date BETWEEN %s AND %s
+"""
+
+INTEREST_COLUMNS = ["keyword", "date", "interest", "geo", "category", "gprop"]
+
+# Rows are tuples in upsert parameter order, passed to executemany as-is
+InterestRow = namedtuple("InterestRow", INTEREST_COLUMNS)
+
+INTEREST_UPSERT_SQL = """
+INSERT INTO gt_interest_over_time 
+(keyword, date, interest, geo, category, gprop)
+VALUES (%s, %s, %s, %s, %s, %s)
+ON CONFLICT (keyword, date, COALESCE(geo, ''), COALESCE(gprop, ''), COALESCE(category, 0))
+DO UPDATE SET
+    interest = EXCLUDED.interest,
+    created_at = NOW()
+WHERE gt_interest_over_time.interest IS DISTINCT FROM EXCLUDED.interest
+RETURNING (xmax = 0) as is_insert
+"""
+
+RELATED_COLUMNS = ["keyword", "related_topic", "type", "value", "geo"]
+
+RelatedRow = namedtuple("RelatedRow", RELATED_COLUMNS)
+
+RELATED_UPSERT_SQL = """
+INSERT INTO gt_related_topics 
+(keyword, related_topic, type, value, geo)
+VALUES (%s, %s, %s, %s, %s)
+ON CONFLICT (keyword, related_topic, type, COALESCE(geo, ''))
+DO UPDATE SET
+    value = EXCLUDED.value,
+    created_at = NOW()
+WHERE gt_related_topics.value IS DISTINCT FROM EXCLUDED.value
+RETURNING (xmax = 0) as is_insert
+"""
+
+RESULT_KEYS = [
+    "interest_inserted", "interest_updated", "interest_unchanged",
+    "related_inserted", "related_updated", "related_unchanged"
+]
+
+# One payload's converted rows, ready to store as a run ledger unit
+FetchedBatch = namedtuple("FetchedBatch", ["unit", "interest", "related", "watermarks", "reference_total"])
+
 
 class GoogleTrendsConnector:
     def __init__(self, config: Dict[str, Any]):
@@ -18,6 +85,29 @@ class GoogleTrendsConnector:
         self.gprop = config.get("gprop", "")
         self.tz_offset_minutes = config.get("tz_offset_minutes", 0)
         self.fetch_related_topics = config.get("fetch_related_topics", True)
+        self.batch_size = max(1, int(config.get("batch_size", 500)))
+        self.keywords_per_payload = min(max(1, int(config.get("keywords_per_payload", 1))), MAX_KEYWORDS_PER_PAYLOAD)
+        self.anchor_keyword = config.get("anchor_keyword")
+        
+        # Incremental runs fetch from each series' watermark minus an overlap
+        self.incremental = config.get("incremental", False)
+        self.overlap_days = max(1, int(config.get("overlap_days", 7)))
+        self._new_watermarks: Dict[str, date] = {}
+        self.failed_batches = 0
+        
+        # Concurrency and rate limiting shared by all upstream calls
+        rate_limit = config.get("rate_limit", {})
+        self.workers = max(1, int(rate_limit.get("workers", 1)))
+        self.rate_limiter = TokenBucket(
+            rate=float(rate_limit.get("requests_per_second", 1.0)),
+            capacity=float(rate_limit.get("burst", 1))
+        )
+        self.max_retries = int(rate_limit.get("max_retries", 5))
+        self.backoff_base_seconds = float(rate_limit.get("backoff_base_seconds", 1.0))
+        self.backoff_max_seconds = float(rate_limit.get("backoff_max_seconds", 60.0))
+        
+        # Local cache of upstream responses; re-runs of a payload cost no calls
+        self.cache = fetch_cache_from_config(config)
         
         # Initialize pytrends
         self.pytrends = TrendReq(tz=self.tz_offset_minutes)
@@ -31,205 +121,532 @@ class GoogleTrendsConnector:
             password=os.getenv("DB_PASSWORD", "postgres")
         )
     
-    def fetch_data(self) -> Dict[str, List[Dict[str, Any]]]:
+    def fetch_data(self) -> Dict[str, List[Tuple]]:
         """Fetch Google Trends data for all keywords."""
-        if not self.keywords:
-            logger.warning("No keywords configured")
-            return {"interest_over_time": [], "related_topics": []}
-        
         interest_data = []
         related_data = []
+        self._new_watermarks = {}
         
-        for keyword in self.keywords:
-            logger.info(f"Fetching data for keyword: {keyword}")
-            
-            try:
-                # Build payload
-                self.pytrends.build_payload(
-                    kw_list=[keyword],
-                    cat=self.category,
-                    timeframe=self.timeframe,
-                    geo=self.geo,
-                    gprop=self.gprop
-                )
-                
-                # Fetch interest over time
-                interest_df = self.pytrends.interest_over_time()
-                if not interest_df.empty:
-                    keyword_interest = self._process_interest_data(interest_df, keyword)
-                    interest_data.extend(keyword_interest)
-                
-                # Fetch related topics if requested
-                if self.fetch_related_topics:
-                    try:
-                        related_topics = self.pytrends.related_topics()
-                        if keyword in related_topics:
-                            keyword_related = self._process_related_topics(related_topics[keyword], keyword)
-                            related_data.extend(keyword_related)
-                    except Exception as e:
-                        logger.warning(f"Error fetching related topics for {keyword}: {e}")
-                
-                # Rate limiting - be nice to Google
-                import time
-                time.sleep(1)
-                
-            except Exception as e:
-                logger.error(f"Error fetching data for keyword {keyword}: {e}")
-                continue
+        for batch in self._iter_fetched_batches():
+            interest_data.extend(batch.interest)
+            related_data.extend(batch.related)
+            self._new_watermarks.update(batch.watermarks)
         
         return {
             "interest_over_time": interest_data,
             "related_topics": related_data
         }
     
-    def _process_interest_data(self, df, keyword: str) -> List[Dict[str, Any]]:
-        """Process interest over time DataFrame."""
-        data = []
+    def _iter_fetched_batches(self, ledger: Optional[RunLedger] = None) -> Iterator[FetchedBatch]:
+        """
+        Fetch and convert every payload, yielding them in batch order.
         
-        for date_str, row in df.iterrows():
-            # Skip the 'isPartial' column
-            if date_str == 'isPartial':
+        Payloads the ledger already completed are not fetched again, and
+        failed payloads are not yielded. Later payloads keep downloading
+        while the caller stores earlier ones.
+        """
+        ledger = ledger or RunLedger()
+        if not self.keywords:
+            logger.warning("No keywords configured")
+            return
+        
+        batches = self._keyword_batches()
+        pending = [kw_list for kw_list in batches if not ledger.is_done(self._unit_key(kw_list))]
+        # Keywords from completed payloads (the anchor among them) are stored already
+        fetched = {kw for kw_list in batches if ledger.is_done(self._unit_key(kw_list)) for kw in kw_list}
+        if len(pending) < len(batches):
+            logger.info(f"Skipping {len(batches) - len(pending)} keyword payloads completed by run {ledger.run_id}")
+        
+        incremental = self._load_incremental_state()
+        timeframes = [self._batch_timeframe(kw_list, incremental) for kw_list in pending]
+        anchor = self._anchor_keyword()
+        # A resumed run keeps the scale set by its first payload
+        reference_total = ledger.state.get("reference_total")
+        if reference_total is not None and not (math.isfinite(reference_total) and reference_total > 0):
+            logger.warning(f"Ignoring degenerate anchor reference {reference_total} from run {ledger.run_id}")
+            reference_total = None
+        self.failed_batches = 0
+        
+        results = self._iter_fetch_results(pending, timeframes, ledger)
+        # Results are processed in batch order so the first payload sets the scale
+        for kw_list, timeframe, (interest_df, related_topics) in zip(pending, timeframes, results):
+            if interest_df is None:
+                self.failed_batches += 1
                 continue
             
-            interest_value = row[keyword]
-            if pd.isna(interest_value):
-                continue
+            with ledger.stage("process"):
+                keywords = [kw for kw in kw_list if kw in self.keywords and kw not in fetched]
+                is_incremental = timeframe != self.timeframe
+                interest_rows = []
+                related_rows = []
+                watermarks = {}
+                
+                if not interest_df.empty:
+                    last_complete = self._last_complete_date(interest_df)
+                    factor = 1.0
+                    if anchor is not None and not is_incremental:
+                        # Values are 0-100 relative to each payload's peak;
+                        # the shared anchor puts every batch on the first one's scale
+                        anchor_total = self._anchor_total(interest_df, anchor)
+                        if anchor_total is None:
+                            # A zero or missing anchor cannot set or follow the scale;
+                            # the next payload with anchor interest becomes the reference
+                            logger.warning(
+                                f"Anchor keyword {anchor} has no interest in batch {kw_list}; values left unscaled"
+                                + ("" if reference_total is not None else " and the next batch sets the scale")
+                            )
+                        elif reference_total is None:
+                            reference_total = anchor_total
+                        else:
+                            factor = reference_total / anchor_total
+                    
+                    if factor != 1.0:
+                        interest_df = interest_df[keywords].mul(factor).round()
+                    for keyword in keywords:
+                        if is_incremental:
+                            # Put the narrow window on the stored scale, keep only new days
+                            keyword_df = self._align_to_stored(interest_df, keyword, *incremental[keyword])
+                        else:
+                            keyword_df = interest_df
+                        keyword_rows = self._process_interest_data(keyword_df, keyword)
+                        interest_rows.extend(keyword_rows)
+                        if keyword_rows and last_complete is not None:
+                            watermarks[keyword] = last_complete
+                
+                for keyword in keywords:
+                    if keyword in related_topics:
+                        related_rows.extend(self._process_related_topics(related_topics[keyword], keyword))
+                
+                fetched.update(keywords)
             
-            data.append({
-                "keyword": keyword,
-                "date": date_str.date() if hasattr(date_str, 'date') else date_str,
-                "interest": int(interest_value),
-                "geo": self.geo,
-                "category": self.category,
-                "gprop": self.gprop
-            })
+            yield FetchedBatch(self._unit_key(kw_list), interest_rows, related_rows, watermarks, reference_total)
+    
+    def run_fingerprint(self) -> str:
+        """Run ledger fingerprint of this configuration."""
+        return run_fingerprint(self.config)
+    
+    def _unit_key(self, kw_list: List[str]) -> str:
+        """Run ledger unit of one payload."""
+        return "keywords:" + ",".join(kw_list)
+    
+    def _watermark_key(self, keyword: str) -> str:
+        """Watermark key of one series; category is part of the row key too."""
+        return "|".join([keyword, self.geo or "", self.gprop or "", str(self.category or 0)])
+    
+    def _timeframe_window(self, today: Optional[date] = None) -> Optional[Tuple[date, date]]:
+        """
+        (start, end) dates of a daily-granularity timeframe, or None.
         
-        return data
+        Hourly ('now ...'), 'all' and windows long enough to come back
+        weekly are never fetched incrementally.
+        """
+        today = today or date.today()
+        parts = self.timeframe.split()
+        if len(parts) != 2:
+            return None
+        
+        if parts[0] == "today":
+            try:
+                amount, unit = parts[1].split("-")
+                offset = {"d": pd.DateOffset(days=int(amount)), "m": pd.DateOffset(months=int(amount)),
+                          "y": pd.DateOffset(years=int(amount))}[unit]
+            except (ValueError, KeyError):
+                return None
+            start, end = (pd.Timestamp(today) - offset).date(), today
+        else:
+            try:
+                start, end = date.fromisoformat(parts[0]), date.fromisoformat(parts[1])
+            except ValueError:
+                return None
+        
+        if (end - start).days > MAX_DAILY_WINDOW_DAYS:
+            return None
+        return start, end
+    
+    def _load_incremental_state(self) -> Dict[str, Tuple[date, Dict[date, int]]]:
+        """
+        Watermark and stored overlap values per keyword that can be fetched incrementally.
+        """
+        if not self.incremental:
+            return {}
+        window = self._timeframe_window()
+        if window is None:
+            logger.info(f"Timeframe {self.timeframe!r} is not daily; fetching the full window")
+            return {}
+        start, end = window
+        
+        state = {}
+        try:
+            with self.db_conn.cursor() as cursor:
+                watermarks = get_watermarks(cursor, WATERMARK_SOURCE)
+                for keyword in self.keywords:
+                    last_date = watermarks.get(self._watermark_key(keyword), (None, None))[0]
+                    if last_date is None or last_date - timedelta(days=self.overlap_days) <= start:
+                        continue
+                    cursor.execute(STORED_INTEREST_SQL, (
+                        keyword, self.geo or "", self.gprop or "", self.category or 0,
+                        last_date - timedelta(days=self.overlap_days), last_date
+                    ))
+                    state[keyword] = (last_date, dict(cursor.fetchall()))
+            self.db_conn.commit()
+        except Exception as e:
+            self.db_conn.rollback()
+            logger.warning(f"Could not read watermarks, fetching the full window: {e}")
+            return {}
+        
+        logger.info(f"{len(state)}/{len(self.keywords)} keywords fetched incrementally")
+        return state
+    
+    def _batch_timeframe(self, kw_list: List[str], incremental: Dict[str, Tuple[date, Dict[date, int]]]) -> str:
+        """Narrowed timeframe when every ingested keyword in the batch has a watermark."""
+        keywords = [kw for kw in kw_list if kw in self.keywords]
+        if not keywords or not all(kw in incremental for kw in keywords):
+            return self.timeframe
+        
+        start = min(incremental[kw][0] for kw in keywords) - timedelta(days=self.overlap_days)
+        end = self._timeframe_window()[1]
+        return f"{start:%Y-%m-%d} {end:%Y-%m-%d}"
+    
+    def _last_complete_date(self, df) -> Optional[date]:
+        """Latest date not flagged isPartial."""
+        index = df.index
+        if "isPartial" in df.columns:
+            index = index[~df["isPartial"].astype(bool).to_numpy()]
+        if len(index) == 0 or not isinstance(index, pd.DatetimeIndex):
+            return None
+        return index.max().date()
+    
+    def _align_to_stored(self, df, keyword: str, last_date: date, stored: Dict[date, int]):
+        """
+        Rescale a narrowed window onto the stored scale and drop days already stored.
+        
+        Each window is normalised to its own peak, so values are multiplied
+        by stored / fetched interest summed over the overlapping days.
+        """
+        values = df[keyword].dropna().astype(float)
+        dates = values.index.date
+        overlap = [d in stored for d in dates]
+        fetched_total = float(values[overlap].sum())
+        stored_total = float(sum(stored[d] for d in dates[overlap]))
+        
+        if fetched_total > 0 and stored_total > 0:
+            values = (values * (stored_total / fetched_total)).round()
+        else:
+            logger.warning(f"No overlapping interest stored for {keyword}; new days left unscaled")
+        
+        return values[dates > last_date].to_frame(keyword)
+    
+    def _iter_fetch_results(self, batches: List[List[str]], timeframes: Optional[List[str]] = None,
+                            ledger: Optional[RunLedger] = None) -> Iterator[Tuple[Any, Dict[str, Any]]]:
+        """
+        Fetch every payload on the worker pool.
+        
+        Yields (interest_df, related_topics) per batch, in batch order;
+        interest_df is None when the batch failed.
+        """
+        ledger = ledger or RunLedger()
+        # One pytrends client per concurrent payload; build_payload keeps state on it
+        self._clients = queue.SimpleQueue()
+        self._clients.put(self.pytrends)
+        
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="trends") as pool, \
+                ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="trends-related") as related_pool:
+            timeframes = timeframes or [self.timeframe] * len(batches)
+            futures = [
+                pool.submit(self._fetch_batch, kw_list, related_pool, timeframe)
+                for kw_list, timeframe in zip(batches, timeframes)
+            ]
+            try:
+                for future in futures:
+                    with ledger.stage("fetch"):
+                        result = future.result()
+                    yield result
+            finally:
+                # A caller that stops early (a failed load) does not wait for the rest
+                for future in futures:
+                    future.cancel()
+    
+    def _fetch_batch(self, kw_list: List[str], related_pool: ThreadPoolExecutor,
+                     timeframe: Optional[str] = None) -> Tuple[Any, Dict[str, Any]]:
+        """Fetch one payload, running its interest and related topics calls in parallel."""
+        timeframe = timeframe or self.timeframe
+        try:
+            cached = self._cached_batch(kw_list, timeframe)
+        except FetchCacheMiss as e:
+            logger.error(f"Error fetching data for keywords {', '.join(kw_list)}: {e}")
+            return None, {}
+        if cached is not None:
+            logger.info(f"Using cached data for keywords: {', '.join(kw_list)} ({timeframe})")
+            return cached
+        
+        logger.info(f"Fetching data for keywords: {', '.join(kw_list)} ({timeframe})")
+        related_future = None
+        related_topics = {}
+        related_ok = False
+        client = None
+        
+        try:
+            client = self._checkout_client()
+            self._call(
+                client.build_payload,
+                kw_list=kw_list,
+                cat=self.category,
+                timeframe=timeframe,
+                geo=self.geo,
+                gprop=self.gprop
+            )
+            
+            if self.fetch_related_topics:
+                related_future = related_pool.submit(self._call, client.related_topics)
+            interest_df = self._call(client.interest_over_time)
+        except Exception as e:
+            logger.error(f"Error fetching data for keywords {', '.join(kw_list)}: {e}")
+            interest_df = None
+        finally:
+            # The client is only reusable once its related topics call is done
+            if related_future is not None:
+                try:
+                    related_topics = related_future.result()
+                    related_ok = True
+                except Exception as e:
+                    logger.warning(f"Error fetching related topics for {', '.join(kw_list)}: {e}")
+            if client is not None:
+                self._clients.put(client)
+        
+        if self.cache is not None and interest_df is not None:
+            self.cache.put(self._cache_key("interest_over_time", kw_list, timeframe), interest_df)
+            if related_ok:
+                self.cache.put(self._cache_key("related_topics", kw_list, timeframe), related_topics)
+        
+        return interest_df, related_topics
+    
+    def _cache_key(self, kind: str, kw_list: List[str], timeframe: str) -> str:
+        """Fetch cache key of one pytrends response."""
+        return FetchCache.make_key(
+            f"google_trends.{kind}", kw_list, timeframe, self.geo, self.category, self.gprop, self.tz_offset_minutes
+        )
+    
+    def _cached_batch(self, kw_list: List[str], timeframe: str) -> Optional[Tuple[Any, Dict[str, Any]]]:
+        """Cached (interest_df, related_topics) of a payload, or None unless every part is cached."""
+        if self.cache is None:
+            return None
+        
+        interest_df = self.cache.get(self._cache_key("interest_over_time", kw_list, timeframe))
+        if interest_df is None:
+            return None
+        if not self.fetch_related_topics:
+            return interest_df, {}
+        
+        related_topics = self.cache.get(self._cache_key("related_topics", kw_list, timeframe))
+        if related_topics is None:
+            return None
+        return interest_df, related_topics
+    
+    def _checkout_client(self):
+        """Take an idle pytrends client, creating one when all are busy."""
+        try:
+            return self._clients.get_nowait()
+        except queue.Empty:
+            return self._call(TrendReq, tz=self.tz_offset_minutes)
+    
+    def _call(self, func, *args, **kwargs):
+        """Call Google Trends under the shared rate limit with backoff."""
+        return call_with_backoff(
+            func, *args,
+            limiter=self.rate_limiter,
+            max_retries=self.max_retries,
+            base_delay=self.backoff_base_seconds,
+            max_delay=self.backoff_max_seconds,
+            **kwargs
+        )
+    
+    def _anchor_keyword(self) -> Optional[str]:
+        """Keyword shared by every payload, or None when keywords are fetched one at a time."""
+        if self.keywords_per_payload <= 1 or len(self.keywords) <= 1:
+            return None
+        return self.anchor_keyword or self.keywords[0]
+    
+    def _anchor_total(self, interest_df, anchor: str) -> Optional[float]:
+        """
+        Anchor interest summed over a payload, or None if it cannot carry a scale.
+        
+        A missing, all-NaN or all-zero anchor series gives nothing to rescale
+        against, and a ratio to it would be infinite or NaN.
+        """
+        if anchor not in interest_df:
+            return None
+        total = float(interest_df[anchor].dropna().sum())
+        return total if math.isfinite(total) and total > 0 else None
+    
+    def _keyword_batches(self) -> List[List[str]]:
+        """Group keywords into payloads that each start with the anchor keyword."""
+        anchor = self._anchor_keyword()
+        if anchor is None:
+            return [[keyword] for keyword in self.keywords]
+        
+        others = [keyword for keyword in self.keywords if keyword != anchor]
+        step = self.keywords_per_payload - 1
+        return [[anchor] + others[i:i + step] for i in range(0, len(others), step)] or [[anchor]]
     
-    def _process_related_topics(self, related_dict, keyword: str) -> List[Dict[str, Any]]:
-        """Process related topics data."""
+    def _process_interest_data(self, df, keyword: str) -> List[InterestRow]:
+        """
+        Convert one keyword column of an interest over time DataFrame to rows.
+        
+        Works column-wise: only the keyword column is read (isPartial and the
+        other keywords are never touched) and missing values are dropped in
+        one pass.
+        """
+        if keyword not in df.columns:
+            return []
+        
+        values = df[keyword].dropna()
+        count = len(values)
+        if isinstance(values.index, pd.DatetimeIndex):
+            dates = values.index.date.tolist()
+        else:
+            dates = values.index.tolist()
+        
+        return list(map(InterestRow._make, zip(
+            repeat(keyword, count),
+            dates,
+            values.astype("int64").tolist(),
+            repeat(self.geo, count),
+            repeat(self.category, count),
+            repeat(self.gprop, count)
+        )))
+    
+    def _process_related_topics(self, related_dict, keyword: str) -> List[RelatedRow]:
+        """Convert the top and rising related topics DataFrames to rows."""
         data = []
         
-        # Process top related topics
-        if 'top' in related_dict and related_dict['top'] is not None:
-            for _, row in related_dict['top'].iterrows():
-                data.append({
-                    "keyword": keyword,
-                    "related_topic": row['topic_title'],
-                    "type": "top",
-                    "value": int(row['value']),
-                    "geo": self.geo
-                })
-        
-        # Process rising related topics
-        if 'rising' in related_dict and related_dict['rising'] is not None:
-            for _, row in related_dict['rising'].iterrows():
-                data.append({
-                    "keyword": keyword,
-                    "related_topic": row['topic_title'],
-                    "type": "rising",
-                    "value": int(row['value']),
-                    "geo": self.geo
-                })
+        for topic_type in ("top", "rising"):
+            df = related_dict.get(topic_type)
+            if df is None or df.empty:
+                continue
+            
+            titles = df["topic_title"].tolist()
+            values = df["value"].tolist()
+            count = len(titles)
+            rows = zip(repeat(keyword, count), titles, repeat(topic_type, count), values, repeat(self.geo, count))
+            if df["value"].dtype.kind == "i" and not df["topic_title"].hasnans:
+                data.extend(map(RelatedRow._make, rows))
+            else:
+                # Rare: drop missing entries and coerce float values
+                data.extend(
+                    RelatedRow(kw, title, kind, int(value), geo)
+                    for kw, title, kind, value, geo in rows
+                    if not pd.isna(title) and not pd.isna(value)
+                )
         
         return data
     
-    def ingest_data(self) -> Dict[str, int]:
-        """Ingest Google Trends data into database."""
-        data = self.fetch_data()
+    def ingest_data(self, ledger: Optional[RunLedger] = None) -> Dict[str, int]:
+        """
+        Ingest Google Trends data into database, payload by payload.
+        
+        Each payload's rows are committed batch by batch, then its
+        watermarks and ledger checkpoint are committed together, so a
+        resumed run skips it. Rows of a payload interrupted before its
+        checkpoint are stored again unchanged on resume.
+        """
+        ledger = ledger or RunLedger()
+        result = dict.fromkeys(RESULT_KEYS, 0)
+        
+        for batch in self._iter_fetched_batches(ledger):
+            with ledger.stage("load"):
+                interest_counts = self._upsert_batches(INTEREST_UPSERT_SQL, batch.interest, "gt_interest_over_time")
+                related_counts = self._upsert_batches(RELATED_UPSERT_SQL, batch.related, "gt_related_topics")
+            
+            counts = dict(zip(RESULT_KEYS, interest_counts + related_counts))
+            with ledger.stage("checkpoint"):
+                self._checkpoint(ledger, batch, counts)
+            for key, value in counts.items():
+                result[key] += value
         
-        interest_inserted = 0
-        interest_updated = 0
-        related_inserted = 0
-        related_updated = 0
+        result["failed_batches"] = self.failed_batches
+        logger.info(
+            f"Ingestion complete: {result['interest_inserted']} interest records inserted, "
+            f"{result['interest_updated']} updated, {result['interest_unchanged']} unchanged"
+        )
+        logger.info(
+            f"Related topics: {result['related_inserted']} inserted, {result['related_updated']} updated, "
+            f"{result['related_unchanged']} unchanged"
+        )
+        if self.failed_batches:
+            logger.warning(f"{self.failed_batches} keyword payloads failed; resume the run to retry them")
         
+        return result
+    
+    def _checkpoint(self, ledger: RunLedger, batch: FetchedBatch, counts: Dict[str, int]):
+        """Advance a committed payload's watermarks and mark it done in one transaction."""
         try:
             with self.db_conn.cursor() as cursor:
-                # Ingest interest over time data
-                for row in data["interest_over_time"]:
-                    result = self._upsert_interest_row(cursor, row)
-                    if result == "inserted":
-                        interest_inserted += 1
-                    else:
-                        interest_updated += 1
-                
-                # Ingest related topics data
-                for row in data["related_topics"]:
-                    result = self._upsert_related_row(cursor, row)
-                    if result == "inserted":
-                        related_inserted += 1
-                    else:
-                        related_updated += 1
-            
+                if self.incremental and batch.watermarks:
+                    set_watermarks(cursor, WATERMARK_SOURCE, [
+                        (self._watermark_key(keyword), last_date, None)
+                        for keyword, last_date in batch.watermarks.items()
+                    ])
+                state = {"reference_total": batch.reference_total} if batch.reference_total is not None else {}
+                ledger.mark_done(cursor, batch.unit, counts, **state)
             self.db_conn.commit()
-            logger.info(f"Ingestion complete: {interest_inserted} interest records inserted, {interest_updated} updated")
-            logger.info(f"Related topics: {related_inserted} inserted, {related_updated} updated")
-            
-        except Exception as e:
+        except Exception:
             self.db_conn.rollback()
-            logger.error(f"Error during ingestion: {e}")
             raise
-        
-        return {
-            "interest_inserted": interest_inserted,
-            "interest_updated": interest_updated,
-            "related_inserted": related_inserted,
-            "related_updated": related_updated
-        }
     
-    def _upsert_interest_row(self, cursor, row: Dict[str, Any]) -> str:
-        """Upsert interest over time row."""
-        query = """
-        INSERT INTO gt_interest_over_time 
-        (keyword, date, interest, geo, category, gprop)
-        VALUES (%s, %s, %s, %s, %s, %s)
-        ON CONFLICT (keyword, date, COALESCE(geo, ''), COALESCE(gprop, ''), COALESCE(category, 0))
-        DO UPDATE SET
-            interest = EXCLUDED.interest,
-            created_at = NOW()
-        RETURNING (xmax = 0) as is_insert
-        """
-        
-        cursor.execute(query, (
-            row["keyword"],
-            row["date"],
-            row["interest"],
-            row["geo"],
-            row["category"],
-            row["gprop"]
-        ))
-        
-        result = cursor.fetchone()
-        return "inserted" if result[0] else "updated"
-    
-    def _upsert_related_row(self, cursor, row: Dict[str, Any]) -> str:
-        """Upsert related topics row."""
-        query = """
-        INSERT INTO gt_related_topics 
-        (keyword, related_topic, type, value, geo)
-        VALUES (%s, %s, %s, %s, %s)
-        ON CONFLICT (keyword, related_topic, type, COALESCE(geo, ''))
-        DO UPDATE SET
-            value = EXCLUDED.value,
-            created_at = NOW()
-        RETURNING (xmax = 0) as is_insert
-        """
-        
-        cursor.execute(query, (
-            row["keyword"],
-            row["related_topic"],
-            row["type"],
-            row["value"],
-            row["geo"]
-        ))
-        
-        result = cursor.fetchone()
-        return "inserted" if result[0] else "updated"
+    def _upsert_batches(self, query: str, rows: List[Tuple], table: str) -> Tuple[int, int, int]:
+        """
+        Upsert rows with one pipelined executemany per batch.
+        
+        Each batch is committed on its own, so a failure keeps every batch
+        committed before it. Rows whose values did not change are left
+        untouched. Returns (inserted, updated, unchanged).
+        """
+        inserted = 0
+        updated = 0
+        unchanged = 0
+        
+        for start in range(0, len(rows), self.batch_size):
+            batch = rows[start:start + self.batch_size]
+            try:
+                with self.db_conn.cursor() as cursor:
+                    cursor.executemany(query, batch, returning=True)
+                    batch_inserted = 0
+                    batch_unchanged = 0
+                    while True:
+                        # No row back means the IS DISTINCT FROM guard skipped it
+                        result = cursor.fetchone()
+                        if result is None:
+                            batch_unchanged += 1
+                        elif result[0]:
+                            batch_inserted += 1
+                        if not cursor.nextset():
+                            break
+                    
+                    if batch_unchanged < len(batch):
+                        bump_data_versions(cursor, [table])
+                
+                self.db_conn.commit()
+            except Exception as e:
+                self.db_conn.rollback()
+                logger.error(
+                    f"Error during {table} ingestion at row {start}: {e} "
+                    f"({inserted + updated + unchanged} rows in earlier batches were committed)"
+                )
+                raise
+            
+            inserted += batch_inserted
+            unchanged += batch_unchanged
+            updated += len(batch) - batch_inserted - batch_unchanged
+            logger.debug(f"Committed {table} batch: {start + len(batch)}/{len(rows)} rows")
+        
+        return inserted, updated, unchanged
     
     def close(self):
-        """Close database connection."""
+        """Close database connection and fetch cache."""
         if self.db_conn and not self.db_conn.closed:
             self.db_conn.close()
+        if self.cache is not None:
+            self.cache.close()
 
 
 # Import pandas for DataFrame handling
@@ -0,0 +1,88 @@
+import logging
+import random
+import threading
+import time
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Tokens refill at `rate` per second up to `capacity`; every upstream call
+    takes one, so bursts are capped at `capacity` and the sustained rate at
+    `rate` no matter how many workers share the bucket.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Take one token, blocking until it is available. Returns the seconds waited.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            self._sleep(delay)
+            waited += delay
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    True for throttling (429) and server (5xx) errors carrying an HTTP response.
+    """
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    return status == 429 or (status is not None and 500 <= status < 600)
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """
+    Full-jitter exponential backoff: uniform in [0, min(cap, base * 2**attempt)].
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def call_with_backoff(func: Callable[..., Any], *args, limiter: Optional[TokenBucket] = None,
+                      max_retries: int = 5, base_delay: float = 1.0, max_delay: float = 60.0,
+                      sleep: Callable[[float], None] = time.sleep, **kwargs) -> Any:
+    """
+    Call func under the rate limiter, retrying 429/5xx errors with jittered backoff.
+
+    Every attempt takes a token. Other errors, and retryable ones after
+    max_retries, are raised to the caller.
+    """
+    attempt = 0
+    while True:
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            if not is_retryable(e) or attempt >= max_retries:
+                raise
+            delay = backoff_delay(attempt, base_delay, max_delay)
+            logger.warning(
+                f"{getattr(func, '__name__', 'call')} failed ({e}); "
+                f"retry {attempt + 1}/{max_retries} in {delay:.1f}s"
+            )
+            sleep(delay)
+            attempt += 1
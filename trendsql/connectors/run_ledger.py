@@ -0,0 +1,178 @@
+import hashlib
+import json
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+from psycopg.types.json import Jsonb
+
+logger = logging.getLogger(__name__)
+
+# ingest_runs (one row per run, reused when resumed) and ingest_run_units
+# (units of work whose rows a run has committed) are created by db/schema.sql
+SELECT_RESUMABLE_RUN_SQL = """
+SELECT run_id, state, stage_seconds
+FROM ingest_runs
+WHERE source = %s AND fingerprint = %s AND status <> 'succeeded'
+ORDER BY run_id DESC
+LIMIT 1
+"""
+
+INSERT_RUN_SQL = """
+INSERT INTO ingest_runs (source, fingerprint)
+VALUES (%s, %s)
+RETURNING run_id
+"""
+
+RESTART_RUN_SQL = """
+UPDATE ingest_runs
+SET status = 'running', error = NULL, finished_at = NULL
+WHERE run_id = %s
+"""
+
+SELECT_UNITS_SQL = """
+SELECT unit, counts FROM ingest_run_units WHERE run_id = %s
+"""
+
+INSERT_UNIT_SQL = """
+INSERT INTO ingest_run_units (run_id, unit, counts, completed_at)
+VALUES (%s, %s, %s, NOW())
+ON CONFLICT (run_id, unit)
+DO UPDATE SET counts = EXCLUDED.counts, completed_at = NOW()
+"""
+
+UPDATE_STATE_SQL = """
+UPDATE ingest_runs SET state = %s WHERE run_id = %s
+"""
+
+FINISH_RUN_SQL = """
+UPDATE ingest_runs
+SET status = %s, stage_seconds = %s, result = %s, error = %s, finished_at = NOW()
+WHERE run_id = %s
+"""
+
+
+def run_fingerprint(config: Dict[str, Any], **extra: Any) -> str:
+    """
+    Stable hash of a run's configuration (plus e.g. an input file hash).
+    
+    Only a run with the same fingerprint is resumed, so editing the config
+    or the input starts a fresh run.
+    """
+    payload = json.dumps({"config": config, **extra}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class RunLedger:
+    """
+    Checkpoints and per-stage timings of one ingestion run.
+    
+    Connectors split a run into units and call mark_done() in the
+    transaction that commits each unit's rows, so a resumed run skips
+    exactly the units whose data is stored. Without a connection the
+    ledger only keeps timings in memory.
+    """
+    
+    def __init__(self, conn=None, source: str = "", fingerprint: str = ""):
+        self.conn = conn
+        self.source = source
+        self.fingerprint = fingerprint
+        self.run_id: Optional[int] = None
+        self.resumed = False
+        self.completed: Dict[str, Dict[str, int]] = {}
+        self.state: Dict[str, Any] = {}
+        self.stage_seconds: Dict[str, float] = {}
+    
+    def start(self, resume: bool = False) -> "RunLedger":
+        """
+        Open a new run, or with resume=True the latest unfinished run with
+        the same source and fingerprint, loading the units it completed.
+        """
+        if self.conn is None:
+            return self
+        
+        try:
+            with self.conn.cursor() as cursor:
+                run = None
+                if resume:
+                    cursor.execute(SELECT_RESUMABLE_RUN_SQL, (self.source, self.fingerprint))
+                    run = cursor.fetchone()
+                
+                if run is not None:
+                    self.run_id, state, stage_seconds = run
+                    self.state = dict(state or {})
+                    self.stage_seconds = dict(stage_seconds or {})
+                    cursor.execute(SELECT_UNITS_SQL, (self.run_id,))
+                    self.completed = {unit: counts for unit, counts in cursor.fetchall()}
+                    cursor.execute(RESTART_RUN_SQL, (self.run_id,))
+                    self.resumed = True
+                else:
+                    cursor.execute(INSERT_RUN_SQL, (self.source, self.fingerprint))
+                    self.run_id = cursor.fetchone()[0]
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        
+        if self.resumed:
+            logger.info(f"Resuming {self.source} run {self.run_id}: {len(self.completed)} units already done")
+        elif resume:
+            logger.info(f"No unfinished {self.source} run to resume; started run {self.run_id}")
+        else:
+            logger.info(f"Started {self.source} run {self.run_id}")
+        return self
+    
+    def is_done(self, unit: str) -> bool:
+        return unit in self.completed
+    
+    def mark_done(self, cursor, unit: str, counts: Optional[Dict[str, int]] = None, **state: Any) -> None:
+        """
+        Record a unit as complete, and merge state into the run's state.
+        
+        Call with the cursor of the transaction committing the unit's rows,
+        before its commit, so the checkpoint and the data land together.
+        """
+        counts = dict(counts or {})
+        self.completed[unit] = counts
+        self.state.update(state)
+        if self.conn is None or self.run_id is None:
+            return
+        
+        cursor.execute(INSERT_UNIT_SQL, (self.run_id, unit, Jsonb(counts)))
+        if state:
+            cursor.execute(UPDATE_STATE_SQL, (Jsonb(self.state), self.run_id))
+    
+    @contextmanager
+    def stage(self, name: str):
+        """Add the wall time spent in the block to a stage's total."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_seconds[name] = self.stage_seconds.get(name, 0.0) + time.perf_counter() - start
+    
+    def finish(self, status: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None) -> None:
+        """
+        Record the run's outcome and stage timings.
+        
+        Runs finishing with any status but 'succeeded' stay resumable.
+        """
+        timings = ", ".join(f"{name} {seconds:.1f}s" for name, seconds in self.stage_seconds.items())
+        logger.info(f"{self.source} run {self.run_id} {status}; stage timings: {timings or 'none'}")
+        if self.conn is None or self.run_id is None:
+            return
+        
+        try:
+            with self.conn.cursor() as cursor:
+                cursor.execute(FINISH_RUN_SQL, (
+                    status,
+                    Jsonb({name: round(seconds, 3) for name, seconds in self.stage_seconds.items()}),
+                    Jsonb(result) if result is not None else None,
+                    error,
+                    self.run_id
+                ))
+            self.conn.commit()
+        except Exception as e:
+            self.conn.rollback()
+            logger.warning(f"Could not record the outcome of run {self.run_id}: {e}")
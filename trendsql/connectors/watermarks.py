@@ -0,0 +1,47 @@
+import logging
+from datetime import date
+from typing import Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Incremental ingestion state: the last complete day ingested per Google
+# Trends series, and the content hash of the last ingested Exploding Topics
+# file; the ingest_watermarks table is created by db/schema.sql
+SELECT_WATERMARKS_SQL = """
+SELECT watermark_key, last_date, content_hash
+FROM ingest_watermarks
+WHERE source = %s
+"""
+
+UPSERT_WATERMARK_SQL = """
+INSERT INTO ingest_watermarks (source, watermark_key, last_date, content_hash, updated_at)
+VALUES (%s, %s, %s, %s, NOW())
+ON CONFLICT (source, watermark_key)
+DO UPDATE SET
+    last_date = EXCLUDED.last_date,
+    content_hash = EXCLUDED.content_hash,
+    updated_at = NOW()
+"""
+
+
+def get_watermarks(cursor, source: str) -> Dict[str, Tuple[Optional[date], Optional[str]]]:
+    """
+    Return {watermark_key: (last_date, content_hash)} for a source.
+    """
+    cursor.execute(SELECT_WATERMARKS_SQL, (source,))
+    return {key: (last_date, content_hash) for key, last_date, content_hash in cursor.fetchall()}
+
+
+def set_watermarks(cursor, source: str, watermarks: Iterable[Tuple[str, Optional[date], Optional[str]]]) -> None:
+    """
+    Record (watermark_key, last_date, content_hash) entries for a source.
+
+    Call in the transaction that commits the data they describe, or after
+    it, so a failed run never advances a watermark past unsaved rows.
+    """
+    params = [(source, key, last_date, content_hash) for key, last_date, content_hash in watermarks]
+    if not params:
+        return
+
+    cursor.executemany(UPSERT_WATERMARK_SQL, params)
+    logger.debug(f"Advanced {len(params)} {source} watermarks")
@@ -51,6 +51,61 @@ CREATE TABLE IF NOT EXISTS gt_related_topics (
     created_at TIMESTAMPTZ DEFAULT NOW()
 );
 
+-- Data versions bumped by ingestion (result cache invalidation)
+CREATE TABLE IF NOT EXISTS data_versions (
+    table_name TEXT PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Incremental ingestion watermarks: last complete day per Google Trends
+-- series (keyword|geo|gprop|category), content hash per Exploding Topics file
+CREATE TABLE IF NOT EXISTS ingest_watermarks (
+    source TEXT NOT NULL,
+    watermark_key TEXT NOT NULL,
+    last_date DATE,
+    content_hash TEXT,
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (source, watermark_key)
+);
+
+-- Ingestion run ledger: one row per run, with per-stage timings
+CREATE TABLE IF NOT EXISTS ingest_runs (
+    run_id BIGSERIAL PRIMARY KEY,
+    source TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'running',
+    state JSONB NOT NULL DEFAULT '{}',
+    stage_seconds JSONB NOT NULL DEFAULT '{}',
+    result JSONB,
+    error TEXT,
+    started_at TIMESTAMPTZ DEFAULT NOW(),
+    finished_at TIMESTAMPTZ
+);
+
+-- Units (keyword payloads, CSV chunks) each run has committed
+CREATE TABLE IF NOT EXISTS ingest_run_units (
+    run_id BIGINT NOT NULL REFERENCES ingest_runs (run_id) ON DELETE CASCADE,
+    unit TEXT NOT NULL,
+    counts JSONB NOT NULL DEFAULT '{}',
+    completed_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (run_id, unit)
+);
+
+-- Generated SQL per normalized prompt, shared by all API workers (SQL cache)
+CREATE TABLE IF NOT EXISTS sql_cache (
+    cache_key TEXT PRIMARY KEY,
+    schema_version TEXT NOT NULL,
+    model TEXT NOT NULL,
+    prompt TEXT NOT NULL,
+    sql TEXT NOT NULL,
+    embedding_model TEXT,
+    embedding DOUBLE PRECISION[],  -- unit-length prompt embedding for similarity lookups
+    hits BIGINT NOT NULL DEFAULT 0,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    last_hit_at TIMESTAMPTZ
+);
+
 -- Indexes for better performance
 CREATE INDEX IF NOT EXISTS idx_exploding_topics_topic ON exploding_topics(topic);
 CREATE INDEX IF NOT EXISTS idx_exploding_topics_region ON exploding_topics(region);
@@ -76,6 +131,9 @@ CREATE INDEX IF NOT EXISTS idx_gt_related_topics_type ON gt_related_topics(type)
 CREATE INDEX IF NOT EXISTS idx_gt_related_topics_geo ON gt_related_topics(geo);
 CREATE INDEX IF NOT EXISTS idx_gt_related_topics_value ON gt_related_topics(value DESC);
 
+CREATE INDEX IF NOT EXISTS idx_sql_cache_schema_version ON sql_cache(schema_version, model);
+CREATE INDEX IF NOT EXISTS idx_sql_cache_created_at ON sql_cache(created_at);
+
 -- Unique constraints for upsert operations
 CREATE UNIQUE INDEX IF NOT EXISTS idx_exploding_topics_unique ON exploding_topics(topic, COALESCE(region, ''));
 CREATE UNIQUE INDEX IF NOT EXISTS idx_exploding_topic_history_unique ON exploding_topic_history(topic, date, COALESCE(region, ''));
@@ -87,6 +145,7 @@ COMMENT ON TABLE exploding_topics IS 'Exploding topics data from various sources
 COMMENT ON TABLE exploding_topic_history IS 'Historical time series data for exploding topics';
 COMMENT ON TABLE gt_interest_over_time IS 'Google Trends interest over time data';
 COMMENT ON TABLE gt_related_topics IS 'Google Trends related topics data';
+COMMENT ON TABLE sql_cache IS 'Generated SQL cached per prompt and schema version';
 
 COMMENT ON COLUMN exploding_topics.topic IS 'The trending topic name';
 COMMENT ON COLUMN exploding_topics.growth_score IS 'Growth score indicating trend velocity';
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+TrendSQL Parallel Ingestion CLI
+
+Runs every job listed in an orchestration config (see config/ingest_all.yml)
+concurrently on a process pool and prints one summary for all of them.
+
+Usage:
+    python -m ingestors.run_all --config config/ingest_all.yml
+    python -m ingestors.run_all --config config/ingest_all.yml --resume
+"""
+
+import argparse
+import logging
+import sys
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ingestors.run_ingest import load_config, run_exploding_ingest, run_google_trends_ingest
+
+logger = logging.getLogger(__name__)
+
+RUNNERS = {
+    "exploding": run_exploding_ingest,
+    "google": run_google_trends_ingest,
+}
+
+# Summary columns; Google Trends counts are summed over interest and related topics
+COUNT_COLUMNS = ["inserted", "updated", "unchanged"]
+
+
+def expand_jobs(orchestration: Dict[str, Any], base_dir: Path = Path(".")) -> List[Dict[str, Any]]:
+    """
+    Resolve the configured jobs into {name, provider, config} entries.
+    
+    Each job's YAML config is loaded once and merged with its overrides; a
+    job listing `geos` becomes one job per geo.
+    """
+    jobs = []
+    for entry in orchestration.get("jobs", []):
+        provider = entry.get("provider")
+        if provider not in RUNNERS:
+            raise ValueError(f"Unknown provider {provider!r}; expected one of {', '.join(RUNNERS)}")
+        
+        config_path = base_dir / entry["config"]
+        config = dict(load_config(str(config_path)), **entry.get("overrides", {}))
+        name = entry.get("name", config_path.stem)
+        
+        if "geos" in entry:
+            for geo in entry["geos"]:
+                jobs.append({"name": f"{name}-{geo or 'world'}", "provider": provider, "config": dict(config, geo=geo)})
+        else:
+            jobs.append({"name": name, "provider": provider, "config": config})
+    
+    names = Counter(job["name"] for job in jobs)
+    duplicates = [name for name, count in names.items() if count > 1]
+    if duplicates:
+        raise ValueError(f"Duplicate job names: {', '.join(duplicates)}; set a distinct name per job")
+    return jobs
+
+
+def run_job(job: Dict[str, Any], resume: bool = False) -> Dict[str, Any]:
+    """Run one job in a worker process and summarise it."""
+    start = time.perf_counter()
+    result = RUNNERS[job["provider"]](job["config"], resume)
+    return {
+        "name": job["name"],
+        "provider": job["provider"],
+        "success": result is not None,
+        "result": result or {},
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def run_jobs(jobs: List[Dict[str, Any]], max_processes: int, db_connections: int,
+             provider_limits: Dict[str, int], resume: bool = False,
+             runner: Callable[..., Dict[str, Any]] = run_job) -> List[Dict[str, Any]]:
+    """
+    Run jobs on a process pool within the concurrency limits.
+    
+    Every job holds one database connection for its whole run, so at most
+    db_connections jobs run at once, and at most provider_limits[provider]
+    of one provider. Jobs start in listed order as slots free up. Returns
+    the summaries in job order.
+    """
+    slots = max(1, min(max_processes, db_connections))
+    pending = list(jobs)
+    running = {}
+    active = Counter()
+    summaries = {}
+    
+    with ProcessPoolExecutor(max_workers=slots) as pool:
+        while pending or running:
+            for job in list(pending):
+                if len(running) >= slots:
+                    break
+                if active[job["provider"]] >= max(1, provider_limits.get(job["provider"], slots)):
+                    continue
+                pending.remove(job)
+                active[job["provider"]] += 1
+                running[pool.submit(runner, job, resume)] = job
+                logger.info(f"Started {job['name']} ({len(running)}/{slots} slots in use)")
+            
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = running.pop(future)
+                active[job["provider"]] -= 1
+                try:
+                    summary = future.result()
+                except Exception as e:
+                    logger.error(f"Job {job['name']} crashed: {e}")
+                    summary = {"name": job["name"], "provider": job["provider"], "success": False,
+                               "result": {}, "seconds": 0.0}
+                summaries[job["name"]] = summary
+                logger.info(f"Finished {job['name']} in {summary['seconds']:.1f}s "
+                            f"({'ok' if summary['success'] else 'failed'})")
+    
+    return [summaries[job["name"]] for job in jobs]
+
+
+def summary_counts(result: Dict[str, Any]) -> Dict[str, int]:
+    """Inserted/updated/unchanged totals of one job's result."""
+    return {
+        column: sum(value for key, value in result.items() if key == column or key.endswith(f"_{column}"))
+        for column in COUNT_COLUMNS
+    }
+
+
+def job_status(summary: Dict[str, Any]) -> str:
+    """ok, partial (some Google Trends payloads failed; resumable) or FAILED."""
+    if not summary["success"]:
+        return "FAILED"
+    return "partial" if summary["result"].get("failed_batches") else "ok"
+
+
+def format_summary(summaries: List[Dict[str, Any]], wall_seconds: float) -> str:
+    """Aggregated table of every job plus totals."""
+    lines = [f"{'job':<24} {'provider':<10} {'status':<7} {'seconds':>8} {'inserted':>9} {'updated':>9} {'unchanged':>9}"]
+    totals = Counter()
+    for summary in summaries:
+        counts = summary_counts(summary["result"])
+        totals.update(counts)
+        lines.append(
+            f"{summary['name']:<24} {summary['provider']:<10} {job_status(summary):<7} "
+            f"{summary['seconds']:>8.1f} {counts['inserted']:>9} {counts['updated']:>9} {counts['unchanged']:>9}"
+        )
+    
+    job_seconds = sum(summary["seconds"] for summary in summaries)
+    failed = sum(1 for summary in summaries if not summary["success"])
+    lines.append(
+        f"{'total':<24} {'':<10} {f'{failed} fail' if failed else 'ok':<7} {wall_seconds:>8.1f} "
+        f"{totals['inserted']:>9} {totals['updated']:>9} {totals['unchanged']:>9}"
+    )
+    lines.append(f"Wall clock {wall_seconds:.1f}s for {job_seconds:.1f}s of job time")
+    return "\n".join(lines)
+
+
+def main():
+    """Main CLI entry point."""
+    parser = argparse.ArgumentParser(
+        description="TrendSQL Parallel Ingestion CLI",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python -m ingestors.run_all --config config/ingest_all.yml
+  python -m ingestors.run_all --config config/ingest_all.yml --resume
+        """
+    )
+    
+    parser.add_argument(
+        "--config",
+        required=True,
+        help="Path to orchestration YAML file"
+    )
+    
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Resume each job's last unfinished run, skipping completed units"
+    )
+    
+    parser.add_argument(
+        "--verbose", "-v",
+        action="store_true",
+        help="Enable verbose logging"
+    )
+    
+    args = parser.parse_args()
+    
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+    
+    orchestration = load_config(args.config)
+    try:
+        # Job config paths are relative to the app directory, like run_ingest's
+        jobs = expand_jobs(orchestration)
+    except (ValueError, KeyError) as e:
+        logger.error(f"Invalid orchestration config: {e}")
+        sys.exit(1)
+    
+    max_processes = int(orchestration.get("max_processes", 4))
+    db_connections = int(orchestration.get("db_connections", max_processes))
+    provider_limits = {provider: int(limit) for provider, limit in orchestration.get("provider_concurrency", {}).items()}
+    logger.info(f"Running {len(jobs)} ingestion jobs on up to {min(max_processes, db_connections)} processes")
+    
+    start = time.perf_counter()
+    summaries = run_jobs(jobs, max_processes, db_connections, provider_limits, args.resume)
+    logger.info("Ingestion summary:\n" + format_summary(summaries, time.perf_counter() - start))
+    
+    if all(summary["success"] for summary in summaries):
+        logger.info("All ingestion jobs completed successfully")
+        sys.exit(0)
+    else:
+        logger.error("Some ingestion jobs failed; rerun with --resume to continue them")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
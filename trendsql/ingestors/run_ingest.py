@@ -5,6 +5,7 @@ TrendSQL Data Ingestion CLI
 Usage:
     python -m ingestors.run_ingest exploding --config config/exploding.yml
     python -m ingestors.run_ingest google --config config/google_trends.yml
+    python -m ingestors.run_ingest google --config config/google_trends.yml --resume
 """
 
 import argparse
@@ -12,13 +13,14 @@ import sys
 import yaml
 import logging
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from connectors.exploding import ExplodingTopicsConnector
 from connectors.google_trends import GoogleTrendsConnector
+from connectors.run_ledger import RunLedger
 
 # Configure logging
 logging.basicConfig(
@@ -43,46 +45,68 @@ def load_config(config_path: str) -> Dict[str, Any]:
         sys.exit(1)
 
 
-def run_exploding_ingest(config: Dict[str, Any]) -> bool:
-    """Run exploding topics ingestion."""
+def start_ledger(connector, source: str, resume: bool) -> RunLedger:
+    """Open the run ledger on the connector's database connection."""
+    return RunLedger(connector.db_conn, source, connector.run_fingerprint()).start(resume)
+
+
+def run_exploding_ingest(config: Dict[str, Any], resume: bool = False) -> Optional[Dict[str, Any]]:
+    """Run exploding topics ingestion. Returns the result counts, or None on failure."""
+    ledger = None
     try:
         logger.info("Starting exploding topics ingestion...")
         connector = ExplodingTopicsConnector(config)
+        ledger = start_ledger(connector, "exploding_topics", resume)
         
-        result = connector.ingest_data()
+        result = connector.ingest_data(ledger)
+        ledger.finish("succeeded", result)
         
-        logger.info(f"Exploding topics ingestion complete:")
+        logger.info(f"Exploding topics ingestion complete (run {ledger.run_id}):")
         logger.info(f"  - Inserted: {result['inserted']}")
         logger.info(f"  - Updated: {result['updated']}")
+        logger.info(f"  - Unchanged: {result['unchanged']}")
         
         connector.close()
-        return True
+        return dict(result, run_id=ledger.run_id)
         
     except Exception as e:
         logger.error(f"Error during exploding topics ingestion: {e}")
-        return False
+        if ledger is not None:
+            ledger.finish("failed", error=str(e))
+            logger.error(f"Resume with --resume to skip the chunks run {ledger.run_id} completed")
+        return None
 
 
-def run_google_trends_ingest(config: Dict[str, Any]) -> bool:
-    """Run Google Trends ingestion."""
+def run_google_trends_ingest(config: Dict[str, Any], resume: bool = False) -> Optional[Dict[str, Any]]:
+    """Run Google Trends ingestion. Returns the result counts, or None on failure."""
+    ledger = None
     try:
         logger.info("Starting Google Trends ingestion...")
         connector = GoogleTrendsConnector(config)
+        ledger = start_ledger(connector, "google_trends", resume)
         
-        result = connector.ingest_data()
+        result = connector.ingest_data(ledger)
+        # Failed payloads leave the run resumable so --resume retries only them
+        ledger.finish("incomplete" if result["failed_batches"] else "succeeded", result)
         
-        logger.info(f"Google Trends ingestion complete:")
+        logger.info(f"Google Trends ingestion complete (run {ledger.run_id}):")
         logger.info(f"  - Interest records inserted: {result['interest_inserted']}")
         logger.info(f"  - Interest records updated: {result['interest_updated']}")
+        logger.info(f"  - Interest records unchanged: {result['interest_unchanged']}")
         logger.info(f"  - Related topics inserted: {result['related_inserted']}")
         logger.info(f"  - Related topics updated: {result['related_updated']}")
+        logger.info(f"  - Related topics unchanged: {result['related_unchanged']}")
+        logger.info(f"  - Failed keyword payloads: {result['failed_batches']}")
         
         connector.close()
-        return True
+        return dict(result, run_id=ledger.run_id)
         
     except Exception as e:
         logger.error(f"Error during Google Trends ingestion: {e}")
-        return False
+        if ledger is not None:
+            ledger.finish("failed", error=str(e))
+            logger.error(f"Resume with --resume to skip the payloads run {ledger.run_id} completed")
+        return None
 
 
 def main():
@@ -94,6 +118,7 @@ def main():
 Examples:
   python -m ingestors.run_ingest exploding --config config/exploding.yml
   python -m ingestors.run_ingest google --config config/google_trends.yml
+  python -m ingestors.run_ingest google --config config/google_trends.yml --resume
         """
     )
     
@@ -109,6 +134,12 @@ Examples:
         help="Path to configuration YAML file"
     )
     
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue the last unfinished run with the same config, skipping completed units"
+    )
+    
     parser.add_argument(
         "--verbose", "-v",
         action="store_true",
@@ -125,17 +156,17 @@ Examples:
     config = load_config(args.config)
     
     # Run ingestion based on provider
-    success = False
+    result = None
     if args.provider == "exploding":
-        success = run_exploding_ingest(config)
+        result = run_exploding_ingest(config, args.resume)
     elif args.provider == "google":
-        success = run_google_trends_ingest(config)
+        result = run_google_trends_ingest(config, args.resume)
     else:
         logger.error(f"Unknown provider: {args.provider}")
         sys.exit(1)
     
     # Exit with appropriate code
-    if success:
+    if result is not None:
         logger.info("Ingestion completed successfully")
         sys.exit(0)
     else:
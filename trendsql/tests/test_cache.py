@@ -0,0 +1,94 @@
+import pytest
+from unittest.mock import Mock
+from app.cache import ResultCache
+from connectors.data_versions import bump_data_versions, BUMP_DATA_VERSIONS_SQL
+
+
+class TestResultCache:
+    def test_hit_and_miss(self):
+        """Test lookups count hits and misses."""
+        cache = ResultCache()
+        sql = "SELECT * FROM exploding_topics"
+        key = ResultCache.make_key(sql, 1, 50)
+        versions = {"exploding_topics": 1}
+        
+        assert cache.get(key, versions) is None
+        assert cache.put(key, sql, {"results": [{"topic": "AI"}]}, versions)
+        assert cache.get(key, versions) == {"results": [{"topic": "AI"}]}
+        
+        stats = cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["entries"] == 1
+    
+    def test_key_normalizes_whitespace(self):
+        """Test equivalent SQL maps to the same key but paging does not."""
+        key = ResultCache.make_key("SELECT *\n  FROM exploding_topics;", 1, 50)
+        assert key == ResultCache.make_key("SELECT * FROM exploding_topics", 1, 50)
+        assert key != ResultCache.make_key("SELECT * FROM exploding_topics", 2, 50)
+    
+    def test_version_bump_invalidates_touched_tables_only(self):
+        """Test a data version change only invalidates queries on that table."""
+        cache = ResultCache()
+        topics_sql = "SELECT * FROM exploding_topics"
+        trends_sql = "SELECT * FROM gt_interest_over_time"
+        versions = {"exploding_topics": 1, "gt_interest_over_time": 1}
+        cache.put("topics", topics_sql, [1], versions)
+        cache.put("trends", trends_sql, [2], versions)
+        
+        bumped = {"exploding_topics": 1, "gt_interest_over_time": 2}
+        assert cache.get("topics", bumped) == [1]
+        assert cache.get("trends", bumped) is None
+        assert cache.get_stats()["stale"] == 1
+    
+    def test_newly_versioned_table_invalidates(self):
+        """Test first ingestion into a table invalidates earlier entries."""
+        cache = ResultCache()
+        sql = "SELECT * FROM gt_related_topics"
+        cache.put("related", sql, [1], {})
+        
+        assert cache.get("related", {"gt_related_topics": 1}) is None
+    
+    def test_ttl_expiry(self):
+        """Test entries expire after the TTL."""
+        cache = ResultCache(ttl_seconds=0)
+        cache.put("k", "SELECT 1", [1], {})
+        
+        assert cache.get("k", {}) is None
+        assert cache.get_stats()["expired"] == 1
+    
+    def test_byte_limits(self):
+        """Test LRU eviction by total bytes and rejection of large entries."""
+        cache = ResultCache(max_bytes=100, max_entry_bytes=60)
+        
+        assert not cache.put("big", "SELECT 1", "x" * 100, {})
+        assert cache.put("a", "SELECT 1", "a" * 40, {})
+        assert cache.put("b", "SELECT 1", "b" * 40, {})
+        cache.get("a", {})
+        assert cache.put("c", "SELECT 1", "c" * 40, {})
+        
+        assert cache.get("b", {}) is None
+        assert cache.get("a", {}) is not None
+        assert cache.get_stats()["evictions"] == 1
+        assert cache.get_stats()["bytes"] <= 100
+    
+    def test_bypass_without_versions(self):
+        """Test the cache is bypassed when data versions are unavailable."""
+        cache = ResultCache()
+        
+        assert not cache.put("k", "SELECT 1", [1], None)
+        assert cache.get("k", None) is None
+        assert cache.get_stats()["bypassed"] == 1
+    
+    def test_bump_data_versions(self):
+        """Test ingestion bumps each written table once."""
+        cursor = Mock()
+        bump_data_versions(cursor, ["gt_related_topics", "gt_interest_over_time", "gt_related_topics"])
+        
+        assert cursor.execute.call_count == 1
+        assert cursor.execute.call_args[0][0] == BUMP_DATA_VERSIONS_SQL
+        assert cursor.execute.call_args[0][1] == (["gt_interest_over_time", "gt_related_topics"],)
+        
+        cursor = Mock()
+        bump_data_versions(cursor, [])
+        cursor.execute.assert_not_called()
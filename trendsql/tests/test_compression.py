@@ -0,0 +1,87 @@
+import gzip
+import pytest
+import zstandard
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse, HTMLResponse
+from fastapi.testclient import TestClient
+from app.compression import CompressionMiddleware, StreamCompressor, select_encoding
+
+HTML = "<table>" + "<tr><td>AI</td><td>85</td></tr>" * 200 + "</table>"
+
+
+def make_client() -> TestClient:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+    
+    @app.get("/html", response_class=HTMLResponse)
+    async def html():
+        return HTML
+    
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+    
+    @app.get("/csv")
+    async def csv():
+        def rows():
+            yield "keyword,interest\r\n"
+            for i in range(100):
+                yield f"AI,{i}\r\n"
+        return StreamingResponse(rows(), media_type="text/csv")
+    
+    @app.get("/arrow")
+    async def arrow():
+        return StreamingResponse(iter([b"x" * 2000]), media_type="application/vnd.apache.arrow.stream")
+    
+    return TestClient(app)
+
+
+class TestCompression:
+    def test_select_encoding(self):
+        """Test Accept-Encoding negotiation with q-values."""
+        assert select_encoding("gzip, deflate, br, zstd") == "zstd"
+        assert select_encoding("gzip") == "gzip"
+        assert select_encoding("zstd;q=0.5, gzip;q=0.9") == "gzip"
+        assert select_encoding("zstd;q=0, gzip;q=0") is None
+        assert select_encoding("*") == "zstd"
+        assert select_encoding("") is None
+        assert select_encoding("br") is None
+    
+    def test_stream_compressor_chunks_decode_incrementally(self):
+        """Test each flushed chunk is decodable before the stream ends."""
+        compressor = StreamCompressor("gzip")
+        decoder = gzip.zlib.decompressobj(31)
+        
+        assert decoder.decompress(compressor.compress(b"keyword,interest\r\n")) == b"keyword,interest\r\n"
+        assert decoder.decompress(compressor.compress(b"AI,85\r\n") + compressor.finish()) == b"AI,85\r\n"
+        
+        compressor = StreamCompressor("zstd")
+        data = compressor.compress(b"AI,85\r\n") + compressor.finish()
+        assert zstandard.ZstdDecompressor().decompressobj().decompress(data) == b"AI,85\r\n"
+    
+    def test_gzip_html(self):
+        """Test large responses are gzip encoded."""
+        response = make_client().get("/html", headers={"Accept-Encoding": "gzip"})
+        
+        assert response.headers["content-encoding"] == "gzip"
+        assert "accept-encoding" in response.headers["vary"].lower()
+        assert response.text == HTML
+    
+    def test_zstd_streaming_csv(self):
+        """Test streamed bodies are zstd encoded chunk by chunk."""
+        with make_client().stream("GET", "/csv", headers={"Accept-Encoding": "zstd"}) as response:
+            raw = b"".join(response.iter_raw())
+        
+        assert response.headers["content-encoding"] == "zstd"
+        assert "content-length" not in response.headers
+        body = zstandard.ZstdDecompressor().decompressobj().decompress(raw).decode()
+        assert body.startswith("keyword,interest\r\nAI,0\r\n")
+        assert body.endswith("AI,99\r\n")
+    
+    def test_passthrough(self):
+        """Test small, unnegotiated and already compressed responses are untouched."""
+        client = make_client()
+        
+        assert "content-encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+        assert "content-encoding" not in client.get("/html", headers={"Accept-Encoding": "identity"}).headers
+        assert "content-encoding" not in client.get("/arrow", headers={"Accept-Encoding": "gzip"}).headers
@@ -0,0 +1,197 @@
+import json
+import pickle
+import zlib
+from datetime import date
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from connectors.exploding import ExplodingTopicsConnector
+from connectors.fetch_cache import FetchCache, FetchCacheMiss, encode_value, fetch_cache_from_config, public_params
+from connectors.google_trends import GoogleTrendsConnector
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self):
+        return self.now
+
+
+class CountingTrendReq:
+    """Stub TrendReq counting upstream calls."""
+    
+    def __init__(self):
+        self.calls = 0
+    
+    def build_payload(self, kw_list, **kwargs):
+        self.calls += 1
+        self.kw_list = kw_list
+    
+    def interest_over_time(self):
+        self.calls += 1
+        index = pd.date_range("2024-01-01", periods=3, freq="D")
+        return pd.DataFrame({kw: [10, 20, 30] for kw in self.kw_list}, index=index)
+    
+    def related_topics(self):
+        self.calls += 1
+        return {kw: {"top": pd.DataFrame({"topic_title": ["Pets"], "value": [100]}), "rising": None}
+                for kw in self.kw_list}
+
+
+class OfflineTrendReq:
+    def __getattr__(self, name):
+        raise AssertionError(f"upstream call {name} while offline")
+
+
+class TestFetchCache:
+    def test_roundtrip_and_shared_blobs(self, tmp_path):
+        """Test values survive a reopen and identical payloads are stored once."""
+        path = str(tmp_path / "cache.sqlite")
+        frame = pd.DataFrame({"AI": [1, 2]}, index=pd.date_range("2024-01-01", periods=2))
+        cache = FetchCache(path)
+        cache.put("a", frame)
+        cache.put("b", frame)
+        cache.close()
+        
+        cache = FetchCache(path)
+        pd.testing.assert_frame_equal(cache.get("a"), frame)
+        assert cache.get("missing") is None
+        stats = cache.get_stats()
+        assert stats["entries"] == 2
+        assert stats["hits"] == 1 and stats["misses"] == 1
+        assert cache._conn.execute("SELECT COUNT(*) FROM blobs").fetchone()[0] == 1
+    
+    def test_values_are_stored_as_json(self, tmp_path):
+        """Test pytrends frames and API rows keep their types without pickle, and pickled blobs are never loaded."""
+        cache = FetchCache(str(tmp_path / "cache.sqlite"))
+        index = pd.date_range("2024-01-01", periods=2, name="date")
+        interest = pd.DataFrame({"AI": [1, 2], "isPartial": [False, True]}, index=index)
+        related = {"AI": {"top": pd.DataFrame({"topic_title": ["Pets"], "value": [100]}), "rising": None}}
+        rows = [{"topic": "AI", "first_seen_date": date(2024, 1, 15), "growth_score": 85.5}]
+        cache.put("interest", interest)
+        cache.put("related", related)
+        cache.put("rows", rows)
+        
+        pd.testing.assert_frame_equal(cache.get("interest"), interest)
+        pd.testing.assert_frame_equal(cache.get("related")["AI"]["top"], related["AI"]["top"])
+        assert cache.get("related")["AI"]["rising"] is None
+        assert cache.get("rows") == rows
+        blob = cache._conn.execute("SELECT data FROM blobs LIMIT 1").fetchone()[0]
+        json.loads(zlib.decompress(blob))
+        
+        pickled = zlib.compress(pickle.dumps(rows))
+        cache._conn.execute("INSERT INTO blobs (hash, data, size) VALUES ('p', ?, ?)", (pickled, len(pickled)))
+        cache._conn.execute("INSERT INTO entries (key, hash, stored_at, used_at) VALUES ('legacy', 'p', 1e12, 1e12)")
+        with patch("pickle.loads") as loads:
+            assert cache.get("legacy") is None
+        loads.assert_not_called()
+    
+    def test_ttl_expiry(self, tmp_path):
+        """Test entries older than the TTL are misses."""
+        clock = FakeClock()
+        cache = FetchCache(str(tmp_path / "cache.sqlite"), ttl_seconds=60, clock=clock)
+        cache.put("a", [1, 2, 3])
+        
+        clock.now += 59
+        assert cache.get("a") == [1, 2, 3]
+        clock.now += 2
+        assert cache.get("a") is None
+        assert cache.get_stats()["expired"] == 1
+    
+    def test_size_cap_evicts_least_recently_used(self, tmp_path):
+        """Test the cache stays under max_bytes by dropping the least recently used entries."""
+        clock = FakeClock()
+        values = {name: bytes(range(256)) * 4 + name.encode() for name in "abc"}
+        blob_size = len(encode_value(values["a"]))
+        cache = FetchCache(str(tmp_path / "cache.sqlite"), max_bytes=2 * blob_size + 10, clock=clock)
+        
+        cache.put("a", values["a"])
+        clock.now += 1
+        cache.put("b", values["b"])
+        clock.now += 1
+        cache.get("a")
+        clock.now += 1
+        cache.put("c", values["c"])
+        
+        assert cache.get("b") is None
+        assert cache.get("a") == values["a"]
+        assert cache.get("c") == values["c"]
+        assert cache.get_stats()["bytes"] <= cache.max_bytes
+    
+    def test_offline_raises_on_miss_and_never_writes(self, tmp_path):
+        """Test offline replay serves recorded (even expired) entries and rejects unknown requests."""
+        clock = FakeClock()
+        path = str(tmp_path / "cache.sqlite")
+        FetchCache(path, ttl_seconds=1, clock=clock).put("a", {"rows": 1})
+        clock.now += 100
+        
+        cache = FetchCache(path, ttl_seconds=1, offline=True, clock=clock)
+        assert cache.get("a") == {"rows": 1}
+        assert cache.put("b", 1) is False
+        with pytest.raises(FetchCacheMiss):
+            cache.get("b")
+    
+    def test_config_and_secret_params(self, tmp_path):
+        """Test the cache is off unless enabled, and credentials never enter keys."""
+        assert fetch_cache_from_config({}) is None
+        cache = fetch_cache_from_config({"cache": {"enabled": True, "path": str(tmp_path / "c.sqlite"), "ttl_hours": 1}})
+        assert cache.ttl_seconds == 3600
+        
+        params = {"base_url": "https://x", "api_key": "s3cret", "access_token": "t", "keywords": ["AI"]}
+        assert public_params(params) == {"base_url": "https://x", "keywords": ["AI"]}
+
+
+class TestConnectorCaching:
+    def _google(self, tmp_path, offline=False):
+        config = {"keywords": ["AI", "Pets"], "keywords_per_payload": 2, "geo": "US",
+                  "rate_limit": {"requests_per_second": 1000},
+                  "cache": {"enabled": True, "path": str(tmp_path / "trends.sqlite"), "offline": offline}}
+        with patch('connectors.google_trends.psycopg.connect'), \
+                patch('connectors.google_trends.TrendReq'):
+            return GoogleTrendsConnector(config)
+    
+    def test_rerun_costs_no_upstream_calls(self, tmp_path):
+        """Test a second fetch of the same payloads is served from the cache."""
+        connector = self._google(tmp_path)
+        connector.pytrends = CountingTrendReq()
+        first = connector.fetch_data()
+        calls = connector.pytrends.calls
+        assert calls == 3
+        
+        second = connector.fetch_data()
+        
+        assert connector.pytrends.calls == calls
+        assert second == first
+        assert len(second["related_topics"]) == 2
+    
+    def test_offline_replay_from_recorded_cache(self, tmp_path):
+        """Test a recorded cache replays without any network access."""
+        recorder = self._google(tmp_path)
+        recorder.pytrends = CountingTrendReq()
+        recorded = recorder.fetch_data()
+        recorder.close()
+        
+        connector = self._google(tmp_path, offline=True)
+        connector.pytrends = OfflineTrendReq()
+        
+        assert connector.fetch_data() == recorded
+        
+        connector.geo = "IN"
+        assert connector.fetch_data()["interest_over_time"] == []
+        assert connector.failed_batches == 1
+    
+    @patch('connectors.exploding.psycopg.connect')
+    def test_exploding_api_mode_is_cached(self, mock_connect, tmp_path):
+        """Test API mode reuses the cached response for the same request."""
+        config = {"fetch_mode": "api", "api": {"base_url": "https://x", "api_key": "a"},
+                  "cache": {"enabled": True, "path": str(tmp_path / "exploding.sqlite")}}
+        connector = ExplodingTopicsConnector(config)
+        
+        with patch.object(connector, "_fetch_from_api", return_value=[{"topic": "AI"}]) as fetch:
+            assert connector.fetch_data() == [{"topic": "AI"}]
+            assert connector.fetch_data() == [{"topic": "AI"}]
+        
+        assert fetch.call_count == 1
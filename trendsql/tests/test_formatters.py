@@ -0,0 +1,42 @@
+import pytest
+from datetime import datetime
+from app.formatters import csv_stream_batches
+from app.db import build_copy_csv_sql
+
+
+class TestCSVStreamBatches:
+    def test_one_chunk_per_batch(self):
+        """Test header and each batch are yielded as separate chunks."""
+        batches = [
+            [(1, "AI", None)],
+            [(2, "Pet care", datetime(2024, 1, 15, 9, 30))],
+        ]
+        chunks = list(csv_stream_batches(["id", "topic", "seen_at"], iter(batches)))
+        
+        assert chunks == [
+            "id,topic,seen_at\r\n",
+            "1,AI,\r\n",
+            "2,Pet care,2024-01-15 09:30:00\r\n",
+        ]
+    
+    def test_batches_pulled_lazily(self):
+        """Test the next batch is only fetched when the consumer asks for it."""
+        pulled = []
+        
+        def batches():
+            for i in range(3):
+                pulled.append(i)
+                yield [(i,)]
+        
+        stream = csv_stream_batches(["id"], batches())
+        next(stream)
+        next(stream)
+        
+        assert pulled == [0]
+
+
+class TestCopyExport:
+    def test_build_copy_csv_sql(self):
+        """Test the validated SELECT is wrapped for COPY TO STDOUT."""
+        sql = build_copy_csv_sql("SELECT topic FROM exploding_topics LIMIT 10; ")
+        assert sql == "COPY (SELECT topic FROM exploding_topics LIMIT 10) TO STDOUT WITH (FORMAT CSV, HEADER)"
@@ -1,4 +1,5 @@
 import pytest
+from datetime import date
 from unittest.mock import Mock, patch, MagicMock
 from connectors.exploding import ExplodingTopicsConnector
 from connectors.google_trends import GoogleTrendsConnector
@@ -50,6 +51,49 @@ class TestExplodingTopicsConnector:
             assert connector._parse_date("invalid") is None
             assert connector._parse_date("") is None
     
+    def _write_csv(self, path, dates):
+        lines = ["topic,category,source,first_seen_date,growth_score,popularity_score,region,url"]
+        for i, value in enumerate(dates):
+            region = "US" if i % 2 == 0 else "FR"
+            lines.append(f"Topic {i},Tech,exploding,{value},{50 + i},60,{region},https://example.com/{i}")
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        return str(path)
+    
+    def test_detect_date_format_is_cached(self, tmp_path):
+        """Test the date format is detected from a sample once per file."""
+        csv_path = self._write_csv(tmp_path / "topics.csv", ["01/02/2024", "25/12/2023", "03/04/2024"])
+        
+        with patch('connectors.exploding.psycopg.connect'):
+            connector = ExplodingTopicsConnector({"csv_path": csv_path})
+        
+        # 25/12 only parses day-first
+        assert connector._detect_date_format(csv_path) == "%d/%m/%Y"
+        with patch.object(ExplodingTopicsConnector, "_matches_date_format") as mock_matches:
+            assert connector._detect_date_format(csv_path) == "%d/%m/%Y"
+            assert not mock_matches.called
+        
+        assert connector._parse_date("01/02/2024", "%d/%m/%Y") == date(2024, 2, 1)
+        assert connector._parse_date("2024-02-01", "%Y-%m-%d") == date(2024, 2, 1)
+        # Falls back to the other formats when the detected one does not fit
+        assert connector._parse_date("2024-02-01", "%d/%m/%Y") == date(2024, 2, 1)
+    
+    def test_iter_chunks_streams_csv(self, tmp_path):
+        """Test CSV rows are mapped, filtered and yielded in fixed-size chunks."""
+        csv_path = self._write_csv(tmp_path / "topics.csv", [f"2024-01-{day:02d}" for day in range(1, 10)])
+        config = {"csv_path": csv_path, "chunk_size": 2, "filters": {"regions": ["US"]}}
+        
+        with patch('connectors.exploding.psycopg.connect'):
+            connector = ExplodingTopicsConnector(config)
+        
+        chunks = list(connector.iter_chunks())
+        
+        assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+        assert all(row["region"] == "US" for chunk in chunks for row in chunk)
+        assert chunks[0][0]["first_seen_date"] == date(2024, 1, 1)
+        assert connector.progress["rows_read"] == 9
+        assert connector.progress["rows_kept"] == 5
+        assert connector.progress["bytes_read"] == connector.progress["bytes_total"]
+    
     def test_parse_numeric(self):
         """Test numeric parsing functionality."""
         config = {}
@@ -159,59 +203,317 @@ class TestGoogleTrendsConnector:
             assert data["interest_over_time"] == []
             assert data["related_topics"] == []
     
-    @patch('connectors.google_trends.pd')
-    def test_process_interest_data(self, mock_pd):
+    def _interest_rows(self, count):
+        from connectors.google_trends import InterestRow
+        
+        return [InterestRow(f"kw{i}", f"2024-01-{i + 1:02d}", i, "US", 0, "") for i in range(count)]
+    
+    def _batch_cursor(self, results, fail_on_call=None):
+        """Cursor whose executemany yields one is_insert result set per row."""
+        cursor = MagicMock()
+        state = {"calls": 0, "pending": []}
+        
+        def executemany(query, params, returning=False):
+            state["calls"] += 1
+            if state["calls"] == fail_on_call:
+                raise RuntimeError("connection lost")
+            # None stands for an unchanged row: the upsert returns nothing
+            state["pending"] = [None if result is None else (result,) for result in results[:len(params)]]
+            del results[:len(params)]
+        
+        cursor.executemany.side_effect = executemany
+        cursor.fetchone.side_effect = lambda: state["pending"][0]
+        
+        def nextset():
+            state["pending"].pop(0)
+            return True if state["pending"] else None
+        
+        cursor.nextset.side_effect = nextset
+        return cursor
+    
+    def test_upsert_batches_commits_per_batch(self):
+        """Test rows are pipelined in batches with a commit after each."""
+        with patch('connectors.google_trends.psycopg.connect') as mock_connect, \
+                patch('connectors.google_trends.TrendReq'):
+            connector = GoogleTrendsConnector({"batch_size": 2})
+        
+        mock_conn = mock_connect.return_value
+        cursor = self._batch_cursor([True, False, True, True, False])
+        mock_conn.cursor.return_value.__enter__.return_value = cursor
+        
+        from connectors.google_trends import INTEREST_UPSERT_SQL
+        result = connector._upsert_batches(
+            INTEREST_UPSERT_SQL, self._interest_rows(5), "gt_interest_over_time"
+        )
+        
+        assert result == (3, 2, 0)
+        assert [len(call[0][1]) for call in cursor.executemany.call_args_list] == [2, 2, 1]
+        assert cursor.executemany.call_args_list[0][0][1][0] == ("kw0", "2024-01-01", 0, "US", 0, "")
+        assert mock_conn.commit.call_count == 3
+    
+    def test_upsert_batches_counts_unchanged_rows(self):
+        """Test rows skipped by the IS DISTINCT FROM guard count as unchanged."""
+        with patch('connectors.google_trends.psycopg.connect') as mock_connect, \
+                patch('connectors.google_trends.TrendReq'):
+            connector = GoogleTrendsConnector({"batch_size": 2})
+        
+        mock_conn = mock_connect.return_value
+        cursor = self._batch_cursor([None, None, True, None])
+        mock_conn.cursor.return_value.__enter__.return_value = cursor
+        
+        from connectors.google_trends import INTEREST_UPSERT_SQL
+        with patch('connectors.google_trends.bump_data_versions') as mock_bump:
+            result = connector._upsert_batches(INTEREST_UPSERT_SQL, self._interest_rows(4), "gt_interest_over_time")
+        
+        assert result == (1, 0, 3)
+        # Only the batch that changed something invalidates cached results
+        assert mock_bump.call_count == 1
+        assert "IS DISTINCT FROM" in INTEREST_UPSERT_SQL
+    
+    def test_upsert_batches_keeps_committed_batches(self):
+        """Test a failing batch is rolled back and earlier batches stay committed."""
+        with patch('connectors.google_trends.psycopg.connect') as mock_connect, \
+                patch('connectors.google_trends.TrendReq'):
+            connector = GoogleTrendsConnector({"batch_size": 2})
+        
+        mock_conn = mock_connect.return_value
+        cursor = self._batch_cursor([True] * 6, fail_on_call=2)
+        mock_conn.cursor.return_value.__enter__.return_value = cursor
+        
+        from connectors.google_trends import INTEREST_UPSERT_SQL
+        with pytest.raises(RuntimeError):
+            connector._upsert_batches(
+                INTEREST_UPSERT_SQL, self._interest_rows(6), "gt_interest_over_time"
+            )
+        
+        assert mock_conn.commit.call_count == 1
+        assert mock_conn.rollback.call_count == 1
+    
+    def test_process_interest_data(self):
         """Test interest data processing."""
-        config = {}
-        with patch('connectors.google_trends.psycopg.connect'):
+        import pandas as pd
+        
+        config = {"geo": "US"}
+        with patch('connectors.google_trends.psycopg.connect'), \
+                patch('connectors.google_trends.TrendReq'):
             connector = GoogleTrendsConnector(config)
             
-            # Mock DataFrame
-            mock_df = Mock()
-            mock_df.iterrows.return_value = [
-                ("2024-01-15", {"AI": 85}),
-                ("2024-01-16", {"AI": 87}),
-            ]
+            df = pd.DataFrame(
+                {"AI": [85, 87, None], "ML": [10, 11, 12], "isPartial": [False, False, True]},
+                index=pd.to_datetime(["2024-01-15", "2024-01-16", "2024-01-17"])
+            )
             
-            data = connector._process_interest_data(mock_df, "AI")
+            data = connector._process_interest_data(df, "AI")
             
             assert len(data) == 2
-            assert data[0]["keyword"] == "AI"
-            assert data[0]["interest"] == 85
-            assert data[1]["interest"] == 87
+            assert data[0].keyword == "AI"
+            assert data[0].interest == 85
+            assert data[1].interest == 87
+            assert data[0].date == date(2024, 1, 15)
+            assert data[0] == ("AI", date(2024, 1, 15), 85, "US", 0, "")
+            assert connector._process_interest_data(df, "missing") == []
     
     def test_process_related_topics(self):
         """Test related topics processing."""
+        import pandas as pd
+        
         config = {}
-        with patch('connectors.google_trends.psycopg.connect'):
+        with patch('connectors.google_trends.psycopg.connect'), \
+                patch('connectors.google_trends.TrendReq'):
             connector = GoogleTrendsConnector(config)
             
-            # Mock related topics data
             related_dict = {
-                'top': Mock(),
-                'rising': Mock()
+                'top': pd.DataFrame({
+                    "topic_title": ["Machine Learning", "Deep Learning", None],
+                    "topic_type": ["Field", "Field", "Topic"],
+                    "value": [95, 85, 80]
+                }),
+                'rising': pd.DataFrame({"topic_title": ["ChatGPT"], "value": [100]})
             }
             
-            # Mock top topics DataFrame
-            top_df = Mock()
-            top_df.iterrows.return_value = [
-                (0, {"topic_title": "Machine Learning", "value": 95}),
-                (1, {"topic_title": "Deep Learning", "value": 85}),
-            ]
-            related_dict['top'] = top_df
-            
-            # Mock rising topics DataFrame
-            rising_df = Mock()
-            rising_df.iterrows.return_value = [
-                (0, {"topic_title": "ChatGPT", "value": 100}),
-            ]
-            related_dict['rising'] = rising_df
-            
             data = connector._process_related_topics(related_dict, "AI")
             
             assert len(data) == 3
-            assert any(topic["type"] == "top" and topic["related_topic"] == "Machine Learning" for topic in data)
-            assert any(topic["type"] == "rising" and topic["related_topic"] == "ChatGPT" for topic in data)
+            assert any(topic.type == "top" and topic.related_topic == "Machine Learning" for topic in data)
+            assert any(topic.type == "rising" and topic.related_topic == "ChatGPT" for topic in data)
+            assert connector._process_related_topics({'top': None, 'rising': None}, "AI") == []
+
+
+class FakeTrendReq:
+    """Stub TrendReq that scales each payload to its own 0-100 peak like Google does."""
+    
+    def __init__(self, popularity):
+        self.popularity = popularity
+        self.payloads = []
+    
+    def build_payload(self, kw_list, **kwargs):
+        self.payloads.append(list(kw_list))
+    
+    def interest_over_time(self):
+        import pandas as pd
+        
+        kw_list = self.payloads[-1]
+        index = pd.date_range("2024-01-01", periods=3, freq="D")
+        raw = {kw: [self.popularity[kw] * (day + 1) for day in range(3)] for kw in kw_list}
+        peak = max(max(values) for values in raw.values())
+        frame = pd.DataFrame({kw: [round(v * 100 / peak) for v in values] for kw, values in raw.items()}, index=index)
+        frame["isPartial"] = False
+        return frame
+    
+    def related_topics(self):
+        return {}
+
+
+class TestKeywordBatching:
+    def _connector(self, config, popularity):
+        with patch('connectors.google_trends.psycopg.connect'), \
+                patch('connectors.google_trends.TrendReq'):
+            connector = GoogleTrendsConnector(config)
+        connector.pytrends = FakeTrendReq(popularity)
+        return connector
+    
+    def test_keyword_batches_share_anchor(self):
+        """Test keywords are grouped five per payload around the anchor."""
+        keywords = [f"kw{i}" for i in range(10)]
+        connector = self._connector({"keywords": keywords, "keywords_per_payload": 5}, {})
+        
+        batches = connector._keyword_batches()
+        
+        assert batches == [
+            ["kw0", "kw1", "kw2", "kw3", "kw4"],
+            ["kw0", "kw5", "kw6", "kw7", "kw8"],
+            ["kw0", "kw9"]
+        ]
+    
+    def test_single_keyword_payloads_by_default(self):
+        """Test keywords_per_payload defaults to one payload per keyword."""
+        connector = self._connector({"keywords": ["a", "b"]}, {})
+        
+        assert connector._keyword_batches() == [["a"], ["b"]]
+    
+    def test_fetch_rescales_batches_to_anchor(self):
+        """Test interest from later payloads is put on the first payload's scale."""
+        popularity = {"anchor": 10, "a": 5, "b": 2, "c": 1, "d": 4, "e": 50}
+        config = {"keywords": ["a", "b", "c", "d", "e"], "anchor_keyword": "anchor", "keywords_per_payload": 5,
+                  "fetch_related_topics": False, "geo": "US", "rate_limit": {"requests_per_second": 1000}}
+        connector = self._connector(config, popularity)
+        
+        data = connector.fetch_data()
+        
+        assert connector.pytrends.payloads == [["anchor", "a", "b", "c", "d"], ["anchor", "e"]]
+        
+        last_day = {row.keyword: row.interest for row in data["interest_over_time"] if row.date.day == 3}
+        # Anchor itself is not a configured keyword, so it is not ingested
+        assert set(last_day) == {"a", "b", "c", "d", "e"}
+        # First payload peaks at the anchor (100); "e" is 5x the anchor
+        assert last_day["a"] == 50
+        assert last_day["e"] == 500
+        assert all("isPartial" != row.keyword for row in data["interest_over_time"])
+
+
+    def test_degenerate_anchor_skips_rescaling(self, caplog):
+        """Test a zero or all-NaN anchor neither sets nor follows the scale."""
+        popularity = {"anchor": 0, "a": 5, "b": 50}
+        config = {"keywords": ["a", "b"], "anchor_keyword": "anchor", "keywords_per_payload": 2,
+                  "fetch_related_topics": False, "rate_limit": {"requests_per_second": 1000}}
+        connector = self._connector(config, popularity)
+        interest_over_time = connector.pytrends.interest_over_time
+        
+        def nan_anchor_after_first():
+            frame = interest_over_time()
+            if len(connector.pytrends.payloads) > 1:
+                frame["anchor"] = float("nan")
+            return frame
+        
+        connector.pytrends.interest_over_time = nan_anchor_after_first
+        
+        with caplog.at_level("WARNING"):
+            batches = list(connector._iter_fetched_batches())
+        
+        # Each payload stays on its own 0-100 scale and no reference is recorded
+        last_day = {row.keyword: row.interest for batch in batches for row in batch.interest if row.date.day == 3}
+        assert last_day == {"a": 100, "b": 100}
+        assert [batch.reference_total for batch in batches] == [None, None]
+        assert sum("has no interest" in message for message in caplog.messages) == 2
+
+
+class WindowTrendReq:
+    """Stub TrendReq returning a flat daily series for the requested timeframe."""
+    
+    def __init__(self, value):
+        self.value = value
+        self.timeframes = []
+    
+    def build_payload(self, kw_list, timeframe, **kwargs):
+        self.kw_list = kw_list
+        self.timeframes.append(timeframe)
+    
+    def interest_over_time(self):
+        import pandas as pd
+        
+        start, end = self.timeframes[-1].split()
+        index = pd.date_range(start, end, freq="D")
+        frame = pd.DataFrame({kw: [self.value] * len(index) for kw in self.kw_list}, index=index)
+        frame["isPartial"] = [False] * (len(index) - 1) + [True]
+        return frame
+
+
+class TestIncrementalFetch:
+    def _connector(self, config):
+        with patch('connectors.google_trends.psycopg.connect'), \
+                patch('connectors.google_trends.TrendReq'):
+            connector = GoogleTrendsConnector(config)
+        return connector
+    
+    def test_timeframe_window(self):
+        """Test only daily-granularity timeframes can be narrowed."""
+        connector = self._connector({"timeframe": "today 3-m"})
+        assert connector._timeframe_window(date(2024, 6, 30)) == (date(2024, 3, 30), date(2024, 6, 30))
+        
+        connector.timeframe = "2024-01-01 2024-03-31"
+        assert connector._timeframe_window() == (date(2024, 1, 1), date(2024, 3, 31))
+        
+        for timeframe in ("today 5-y", "now 7-d", "all", "today 12-m"):
+            connector.timeframe = timeframe
+            assert connector._timeframe_window() is None
+    
+    def test_fetches_new_window_on_stored_scale(self):
+        """Test a watermarked keyword fetches from the overlap and is rescaled to stored values."""
+        config = {"keywords": ["a"], "timeframe": "2024-01-01 2024-03-31", "geo": "US",
+                  "incremental": True, "overlap_days": 7, "fetch_related_topics": False,
+                  "rate_limit": {"requests_per_second": 1000}}
+        connector = self._connector(config)
+        connector.pytrends = WindowTrendReq(value=100)
+        
+        cursor = connector.db_conn.cursor.return_value.__enter__.return_value
+        # Stored values for the overlap are on half the fetched window's scale
+        cursor.fetchall.return_value = [(date(2024, 3, day), 50) for day in range(13, 21)]
+        watermarks = {"a|US||0": (date(2024, 3, 20), None)}
+        
+        with patch('connectors.google_trends.get_watermarks', return_value=watermarks):
+            data = connector.fetch_data()
+        
+        assert connector.pytrends.timeframes == ["2024-03-13 2024-03-31"]
+        rows = data["interest_over_time"]
+        assert [row.date for row in rows] == [date(2024, 3, day) for day in range(21, 32)]
+        assert {row.interest for row in rows} == {50}
+        # The partial last day is fetched again next run
+        assert connector._new_watermarks == {"a": date(2024, 3, 30)}
+    
+    def test_keyword_without_watermark_fetches_full_window(self):
+        """Test a batch with any unwatermarked keyword keeps the configured timeframe."""
+        config = {"keywords": ["a", "b"], "timeframe": "2024-01-01 2024-03-31", "keywords_per_payload": 2,
+                  "incremental": True, "fetch_related_topics": False,
+                  "rate_limit": {"requests_per_second": 1000}}
+        connector = self._connector(config)
+        connector.pytrends = WindowTrendReq(value=10)
+        connector.db_conn.cursor.return_value.__enter__.return_value.fetchall.return_value = []
+        
+        with patch('connectors.google_trends.get_watermarks', return_value={"a|||0": (date(2024, 3, 20), None)}):
+            data = connector.fetch_data()
+        
+        assert connector.pytrends.timeframes == ["2024-01-01 2024-03-31"]
+        assert len(data["interest_over_time"]) == 2 * 91
 
 
 class TestIngestionIntegration:
@@ -243,6 +545,94 @@ class TestIngestionIntegration:
         assert mock_cursor.execute.called
         assert mock_conn.commit.called
     
+    @patch('connectors.exploding.psycopg.connect')
+    def test_exploding_bulk_ingestion_flow(self, mock_connect):
+        """Test bulk mode COPYs into staging and merges once."""
+        config = {
+            "fetch_mode": "csv",
+            "csv_path": "./nonexistent.csv",  # Will use sample data
+            "upsert": True,
+            "bulk_load": True
+        }
+        
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_copy = mock_cursor.copy.return_value.__enter__.return_value
+        mock_cursor.fetchone.return_value = (2, 1, 0)
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_connect.return_value = mock_conn
+        
+        connector = ExplodingTopicsConnector(config)
+        result = connector.ingest_data()
+        
+        assert result == {"inserted": 2, "updated": 1, "unchanged": 0}
+        assert "exploding_topics_staging" in mock_cursor.copy.call_args[0][0]
+        assert mock_copy.write_row.call_count == 3
+        assert mock_copy.write_row.call_args_list[0][0][0][0] == "AI-powered pet care"
+        
+        statements = [call[0][0] for call in mock_cursor.execute.call_args_list]
+        merges = [sql for sql in statements if "ON CONFLICT (topic, COALESCE(region, ''))" in sql]
+        assert len(merges) == 1
+        assert "FROM exploding_topics_staging" in merges[0]
+        assert mock_conn.commit.called
+    
+    @patch('connectors.exploding.psycopg.connect')
+    def test_exploding_bulk_ingestion_streams_csv(self, mock_connect, tmp_path):
+        """Test each streamed chunk is merged and committed on its own."""
+        csv_path = tmp_path / "topics.csv"
+        rows = [f"Topic {i},Tech,exploding,2024-01-01,{i},1,US," for i in range(7)]
+        csv_path.write_text(
+            "topic,category,source,first_seen_date,growth_score,popularity_score,region,url\n"
+            + "\n".join(rows) + "\n",
+            encoding="utf-8"
+        )
+        config = {"csv_path": str(csv_path), "bulk_load": True, "chunk_size": 3, "filters": {}}
+        
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_copy = mock_cursor.copy.return_value.__enter__.return_value
+        mock_cursor.fetchone.side_effect = [(3, 0, 0), (2, 1, 0), (0, 0, 1)]
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_connect.return_value = mock_conn
+        
+        connector = ExplodingTopicsConnector(config)
+        result = connector.ingest_data()
+        
+        assert result == {"inserted": 5, "updated": 1, "unchanged": 1}
+        assert mock_cursor.copy.call_count == 3
+        assert mock_conn.commit.call_count == 3
+        assert mock_copy.write_row.call_count == 7
+        assert connector.progress["rows_read"] == 7
+    
+    @patch('connectors.exploding.psycopg.connect')
+    def test_exploding_skips_unchanged_file(self, mock_connect, tmp_path):
+        """Test a file whose hash matches its watermark is not ingested again."""
+        csv_path = tmp_path / "topics.csv"
+        csv_path.write_text("topic,region\nAI,US\n", encoding="utf-8")
+        config = {"csv_path": str(csv_path), "bulk_load": True, "incremental": True}
+        
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.fetchone.return_value = (1, 0, 0)
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_connect.return_value = mock_conn
+        
+        connector = ExplodingTopicsConnector(config)
+        key = connector._watermark_key()
+        
+        with patch('connectors.exploding.get_watermarks', return_value={}), \
+                patch('connectors.exploding.set_watermarks') as mock_set:
+            assert connector.ingest_data()["inserted"] == 1
+        content_hash = mock_set.call_args[0][2][0][2]
+        assert mock_set.call_args[0][2] == [(key, None, connector._file_hash())]
+        
+        mock_cursor.reset_mock()
+        with patch('connectors.exploding.get_watermarks', return_value={key: (None, content_hash)}):
+            result = connector.ingest_data()
+        
+        assert result == {"inserted": 0, "updated": 0, "unchanged": 0}
+        assert not mock_cursor.copy.called
+    
     @patch('connectors.google_trends.psycopg.connect')
     @patch('connectors.google_trends.TrendReq')
     def test_google_trends_ingestion_flow(self, mock_trendreq, mock_connect):
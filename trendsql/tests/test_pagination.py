@@ -0,0 +1,157 @@
+import pytest
+from datetime import date
+from decimal import Decimal
+from unittest.mock import Mock
+from app.pagination import (
+    add_pagination, parse_order_by, encode_cursor, decode_cursor, add_keyset_pagination,
+    create_estimate_query, parse_plan_rows, get_total_rows, keyset_table, supports_keyset, KEYSET_KEYS_SQL
+)
+
+
+class TestPagination:
+    def test_add_pagination(self):
+        """Test LIMIT/OFFSET pagination."""
+        sql = add_pagination("SELECT * FROM exploding_topics", 3, 20)
+        assert sql == "SELECT * FROM exploding_topics LIMIT 20 OFFSET 40"
+    
+    def test_parse_order_by(self):
+        """Test ORDER BY parsing for keyset pagination."""
+        sql = "SELECT keyword, date FROM gt_interest_over_time g ORDER BY g.keyword, date DESC LIMIT 10"
+        assert parse_order_by(sql) == [("keyword", "ASC"), ("date", "DESC")]
+        
+        # No usable ordering
+        assert parse_order_by("SELECT * FROM exploding_topics") is None
+        assert parse_order_by("SELECT * FROM (SELECT topic FROM exploding_topics ORDER BY topic) t") is None
+        assert parse_order_by("SELECT topic FROM exploding_topics ORDER BY lower(topic)") is None
+        assert parse_order_by("SELECT topic FROM exploding_topics ORDER BY topic NULLS LAST") is None
+    
+    def test_cursor_round_trip(self):
+        """Test cursor tokens carry typed key values."""
+        sql = "SELECT keyword, date, interest FROM gt_interest_over_time ORDER BY keyword, date"
+        order_keys = parse_order_by(sql)
+        last_row = {"keyword": "AI", "date": date(2024, 1, 15), "interest": Decimal("85")}
+        
+        cursor = encode_cursor(sql, order_keys, last_row)
+        
+        assert cursor is not None
+        assert decode_cursor(sql, order_keys, cursor) == ["AI", date(2024, 1, 15)]
+    
+    def test_cursor_rejects_other_query(self):
+        """Test a cursor cannot be replayed against a different query."""
+        sql = "SELECT keyword, date FROM gt_interest_over_time ORDER BY keyword, date"
+        other_sql = "SELECT keyword, date FROM gt_interest_over_time WHERE geo = 'US' ORDER BY keyword, date"
+        order_keys = parse_order_by(sql)
+        cursor = encode_cursor(sql, order_keys, {"keyword": "AI", "date": date(2024, 1, 15)})
+        
+        with pytest.raises(ValueError):
+            decode_cursor(other_sql, order_keys, cursor)
+        with pytest.raises(ValueError):
+            decode_cursor(sql, order_keys, "not-a-cursor")
+    
+    def test_no_cursor_for_missing_key(self):
+        """Test no cursor is issued when a key is missing or NULL."""
+        sql = "SELECT keyword FROM gt_interest_over_time ORDER BY keyword, date"
+        order_keys = parse_order_by(sql)
+        assert encode_cursor(sql, order_keys, {"keyword": "AI"}) is None
+        assert encode_cursor(sql, order_keys, {"keyword": "AI", "date": None}) is None
+    
+    def test_keyset_table(self):
+        """Test cursors are only considered for plain projections of one table."""
+        assert keyset_table("SELECT * FROM gt_interest_over_time g WHERE g.geo = 'US' ORDER BY id") == "gt_interest_over_time"
+        assert keyset_table('SELECT keyword, "date" FROM public.gt_interest_over_time ORDER BY id LIMIT 5') == "public.gt_interest_over_time"
+        assert keyset_table("SELECT keyword, COUNT(*) AS n FROM gt_interest_over_time GROUP BY keyword ORDER BY n") is None
+        assert keyset_table("SELECT DISTINCT keyword FROM gt_interest_over_time ORDER BY keyword") is None
+        assert keyset_table("SELECT interest AS id FROM gt_interest_over_time ORDER BY id") is None
+        assert keyset_table("SELECT t.id FROM exploding_topics t JOIN exploding_topic_history h ON h.topic = t.topic ORDER BY id") is None
+    
+    def test_no_cursor_for_tied_keys(self):
+        """Test a non-unique ordering gets no cursor, and a unique tiebreaker pages across ties."""
+        rows = [
+            {"id": 5, "date": date(2024, 1, 15)},
+            {"id": 4, "date": date(2024, 1, 15)},
+            {"id": 3, "date": date(2024, 1, 15)},
+            {"id": 2, "date": date(2024, 1, 14)},
+        ]
+        cursor = Mock()
+        
+        # date alone is not unique: the tied row 3 would be skipped by a cursor
+        sql = "SELECT id, date FROM gt_interest_over_time ORDER BY date DESC"
+        cursor.fetchone.return_value = (False, True)
+        assert not supports_keyset(cursor, sql, parse_order_by(sql))
+        assert cursor.execute.call_args[0] == (KEYSET_KEYS_SQL, {"table": "gt_interest_over_time", "columns": ["date"]})
+        
+        # With the primary key as tiebreaker the next page starts at row 3
+        sql = "SELECT id, date FROM gt_interest_over_time ORDER BY date DESC, id DESC"
+        order_keys = parse_order_by(sql)
+        cursor.fetchone.return_value = (True, True)
+        assert supports_keyset(cursor, sql, order_keys)
+        last = decode_cursor(sql, order_keys, encode_cursor(sql, order_keys, rows[1]))
+        next_page = [row for row in rows if (row["date"], row["id"]) < tuple(last)]
+        assert next_page == rows[2:]
+    
+    def test_no_cursor_for_nullable_keys(self):
+        """Test an ordering on a nullable column gets no cursor."""
+        sql = "SELECT id, geo FROM gt_interest_over_time ORDER BY geo, id"
+        cursor = Mock()
+        cursor.fetchone.return_value = (True, False)
+        assert not supports_keyset(cursor, sql, parse_order_by(sql))
+        assert not supports_keyset(cursor, "SELECT 1 AS id ORDER BY id", parse_order_by("SELECT 1 AS id ORDER BY id"))
+        assert cursor.execute.call_count == 1
+    
+    def test_add_keyset_pagination(self):
+        """Test keyset rewrite uses a row comparison for uniform ordering."""
+        sql = "SELECT keyword, date FROM gt_interest_over_time WHERE keyword LIKE '%ai%' ORDER BY keyword, date LIMIT 10"
+        order_keys = parse_order_by(sql)
+        
+        keyset_sql, params = add_keyset_pagination(sql, order_keys, ["AI", date(2024, 1, 15)], 50)
+        
+        assert "LIKE '%%ai%%'" in keyset_sql
+        assert '("keyword", "date") > (%s, %s)' in keyset_sql
+        assert keyset_sql.endswith('ORDER BY "keyword" ASC, "date" ASC LIMIT 50')
+        assert params == ["AI", date(2024, 1, 15)]
+    
+    def test_add_keyset_pagination_mixed_directions(self):
+        """Test keyset rewrite expands mixed ASC/DESC orderings."""
+        sql = "SELECT keyword, interest FROM gt_interest_over_time ORDER BY interest DESC, keyword"
+        order_keys = parse_order_by(sql)
+        
+        keyset_sql, params = add_keyset_pagination(sql, order_keys, [90, "AI"], 10)
+        
+        assert '("interest" < %s) OR ("interest" = %s AND "keyword" > %s)' in keyset_sql
+        assert params == [90, 90, "AI"]
+    
+    def test_create_estimate_query(self):
+        """Test planner estimate query drops LIMIT/OFFSET."""
+        sql = create_estimate_query("SELECT * FROM exploding_topics ORDER BY topic LIMIT 10 OFFSET 20")
+        assert sql == "EXPLAIN (FORMAT JSON) SELECT * FROM exploding_topics ORDER BY topic"
+        
+        plan = [{"Plan": {"Node Type": "Seq Scan", "Plan Rows": 1234}}]
+        assert parse_plan_rows(plan) == 1234
+        assert parse_plan_rows('[{"Plan": {"Plan Rows": 7}}]') == 7
+    
+    def test_get_total_rows_modes(self):
+        """Test exact, estimate and auto count modes."""
+        sql = "SELECT * FROM exploding_topics"
+        plan = [{"Plan": {"Plan Rows": 5000}}]
+        
+        cursor = Mock()
+        cursor.fetchone.side_effect = [(42,)]
+        assert get_total_rows(cursor, sql, "exact") == (42, "exact")
+        
+        cursor = Mock()
+        cursor.fetchone.side_effect = [(plan,)]
+        assert get_total_rows(cursor, sql, "estimate") == (5000, "estimate")
+        
+        # Small estimate -> exact count
+        cursor = Mock()
+        cursor.fetchone.side_effect = [(plan,), (4990,)]
+        assert get_total_rows(cursor, sql, "auto", auto_threshold=10000) == (4990, "exact")
+        
+        # Large estimate -> keep the estimate
+        cursor = Mock()
+        cursor.fetchone.side_effect = [(plan,)]
+        assert get_total_rows(cursor, sql, "auto", auto_threshold=1000) == (5000, "estimate")
+        assert cursor.execute.call_count == 1
+        
+        with pytest.raises(ValueError):
+            get_total_rows(Mock(), sql, "guess")
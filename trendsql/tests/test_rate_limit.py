@@ -0,0 +1,261 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import Mock, patch
+from urllib.parse import urlparse, parse_qs
+
+import pytest
+import pytrends.request
+
+from connectors.rate_limit import TokenBucket, call_with_backoff, is_retryable, backoff_delay
+from connectors.google_trends import GoogleTrendsConnector
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+    
+    def time(self):
+        return self.now
+    
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def http_error(status):
+    error = Exception(f"status {status}")
+    error.response = Mock(status_code=status)
+    return error
+
+
+class TestTokenBucket:
+    def test_burst_then_sustained_rate(self):
+        """Test capacity calls pass at once, later ones wait 1/rate."""
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2.0, capacity=2, clock=clock.time, sleep=clock.sleep)
+        
+        waits = [bucket.acquire() for _ in range(4)]
+        
+        assert waits[:2] == [0.0, 0.0]
+        assert waits[2] == pytest.approx(0.5)
+        assert waits[3] == pytest.approx(0.5)
+        assert clock.now == pytest.approx(1.0)
+    
+    def test_refills_while_idle(self):
+        """Test tokens accumulate up to capacity between calls."""
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1.0, capacity=3, clock=clock.time, sleep=clock.sleep)
+        for _ in range(3):
+            bucket.acquire()
+        
+        clock.now += 10
+        
+        assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+        assert bucket.acquire() == pytest.approx(1.0)
+    
+    def test_invalid_rate(self):
+        """Test a non-positive rate is rejected."""
+        with pytest.raises(ValueError):
+            TokenBucket(rate=0)
+
+
+class TestBackoff:
+    def test_is_retryable(self):
+        """Test only 429 and 5xx responses are retried."""
+        assert is_retryable(http_error(429))
+        assert is_retryable(http_error(503))
+        assert not is_retryable(http_error(400))
+        assert not is_retryable(ValueError("no response"))
+    
+    def test_backoff_delay_is_capped_full_jitter(self):
+        """Test delays stay within [0, min(cap, base * 2**attempt)]."""
+        for attempt in range(10):
+            delay = backoff_delay(attempt, base=1.0, cap=8.0)
+            assert 0 <= delay <= min(8.0, 2 ** attempt)
+    
+    def test_retries_until_success(self):
+        """Test throttled calls are retried and every attempt takes a token."""
+        func = Mock(side_effect=[http_error(429), http_error(502), "ok"])
+        limiter = Mock()
+        sleeps = []
+        
+        result = call_with_backoff(func, "x", limiter=limiter, base_delay=0.5, sleep=sleeps.append)
+        
+        assert result == "ok"
+        assert func.call_count == 3
+        assert limiter.acquire.call_count == 3
+        assert len(sleeps) == 2
+        assert 0 <= sleeps[1] <= 1.0
+    
+    def test_gives_up_after_max_retries(self):
+        """Test the last throttling error is raised once retries run out."""
+        func = Mock(side_effect=http_error(429))
+        
+        with pytest.raises(Exception, match="status 429"):
+            call_with_backoff(func, max_retries=2, sleep=lambda seconds: None)
+        
+        assert func.call_count == 3
+    
+    def test_other_errors_not_retried(self):
+        """Test non-HTTP errors are raised immediately."""
+        func = Mock(side_effect=KeyError("widgets"))
+        
+        with pytest.raises(KeyError):
+            call_with_backoff(func, sleep=lambda seconds: None)
+        
+        assert func.call_count == 1
+
+
+class FakeTrendsHandler(BaseHTTPRequestHandler):
+    """Minimal Google Trends API that throttles the first call per keyword and endpoint."""
+    
+    def log_message(self, *args):
+        pass
+    
+    def do_GET(self):
+        self._handle()
+    
+    def do_POST(self):
+        self._handle()
+    
+    def _handle(self):
+        server = self.server
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        
+        with server.lock:
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            time.sleep(0.05)
+            if url.path.endswith("/api/explore"):
+                request = json.loads(params["req"])
+                keywords = [item["keyword"] for item in request["comparisonItem"]]
+                self._reply(")]}'", {"widgets": [
+                    {"id": "TIMESERIES", "token": "t", "request": {"keywords": keywords}}
+                ] + [
+                    {"id": f"RELATED_TOPICS_{i}", "token": "r", "request": {
+                        "restriction": {"complexKeywordsRestriction": {"keyword": [{"value": kw}]}}
+                    }}
+                    for i, kw in enumerate(keywords)
+                ]})
+            elif url.path.endswith("/api/widgetdata/multiline"):
+                keywords = json.loads(params["req"])["keywords"]
+                if self._throttle("multiline", keywords[0], 429):
+                    return
+                self._reply(")]}',", {"default": {"timelineData": [
+                    {"time": str(1704067200 + day * 86400), "value": [10 * (day + 1)] * len(keywords)}
+                    for day in range(3)
+                ]}})
+            elif url.path.endswith("/api/widgetdata/relatedsearches"):
+                keyword = json.loads(params["req"])["restriction"]["complexKeywordsRestriction"]["keyword"][0]["value"]
+                if self._throttle("related", keyword, 503):
+                    return
+                self._reply(")]}',", {"default": {"rankedList": [
+                    {"rankedKeyword": [{"topic": {"title": f"{keyword} topic"}, "value": 100}]},
+                    {"rankedKeyword": [{"topic": {"title": f"{keyword} rising"}, "value": 250}]}
+                ]}})
+            else:
+                self._reply("", {})
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+    
+    def _throttle(self, endpoint, keyword, status):
+        with self.server.lock:
+            key = (endpoint, keyword)
+            if key in self.server.throttled:
+                return False
+            self.server.throttled.add(key)
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html")
+        self.end_headers()
+        return True
+    
+    def _reply(self, prefix, payload):
+        body = (prefix + json.dumps(payload)).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def fake_trends(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeTrendsHandler)
+    server.lock = threading.Lock()
+    server.throttled = set()
+    server.in_flight = 0
+    server.max_in_flight = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    
+    base = f"http://127.0.0.1:{server.server_address[1]}/trends"
+    monkeypatch.setenv("NO_PROXY", "127.0.0.1")
+    monkeypatch.setattr(pytrends.request, "BASE_TRENDS_URL", base)
+    monkeypatch.setattr(pytrends.request.TrendReq, "GENERAL_URL", f"{base}/api/explore")
+    monkeypatch.setattr(pytrends.request.TrendReq, "INTEREST_OVER_TIME_URL", f"{base}/api/widgetdata/multiline")
+    monkeypatch.setattr(pytrends.request.TrendReq, "RELATED_QUERIES_URL", f"{base}/api/widgetdata/relatedsearches")
+    
+    yield server
+    
+    server.shutdown()
+    server.server_close()
+
+
+class TestConcurrentFetch:
+    def test_fetch_against_throttling_endpoint(self, fake_trends):
+        """Test workers recover from injected 429/503s and fetch every keyword."""
+        keywords = ["AI", "Dog food", "Ayurveda pets", "Pet insurance"]
+        config = {
+            "keywords": keywords,
+            "geo": "US",
+            "fetch_related_topics": True,
+            "rate_limit": {
+                "workers": 4,
+                "requests_per_second": 200,
+                "burst": 8,
+                "max_retries": 3,
+                "backoff_base_seconds": 0.01,
+                "backoff_max_seconds": 0.05
+            }
+        }
+        
+        with patch('connectors.google_trends.psycopg.connect'):
+            connector = GoogleTrendsConnector(config)
+        data = connector.fetch_data()
+        
+        assert {row.keyword for row in data["interest_over_time"]} == set(keywords)
+        assert len(data["interest_over_time"]) == 3 * len(keywords)
+        assert {(row.keyword, row.type) for row in data["related_topics"]} == {
+            (kw, kind) for kw in keywords for kind in ("top", "rising")
+        }
+        # Every keyword was throttled once on each endpoint and retried
+        assert len(fake_trends.throttled) == 2 * len(keywords)
+        assert fake_trends.max_in_flight > 1
+    
+    def test_rate_limit_bounds_request_rate(self, fake_trends):
+        """Test the shared bucket caps upstream calls however many workers run."""
+        keywords = ["a", "b", "c", "d"]
+        config = {
+            "keywords": keywords,
+            "fetch_related_topics": False,
+            "rate_limit": {"workers": 4, "requests_per_second": 20, "burst": 1,
+                           "max_retries": 3, "backoff_base_seconds": 0.01}
+        }
+        
+        with patch('connectors.google_trends.psycopg.connect'):
+            connector = GoogleTrendsConnector(config)
+        fake_trends.throttled.update(("multiline", kw) for kw in keywords)
+        
+        start = time.monotonic()
+        data = connector.fetch_data()
+        elapsed = time.monotonic() - start
+        
+        assert len(data["interest_over_time"]) == 3 * len(keywords)
+        # build_payload + interest_over_time per keyword (client setup not counted)
+        assert elapsed >= (2 * len(keywords) - 1) / 20
@@ -0,0 +1,81 @@
+import time
+from unittest.mock import patch
+
+import pytest
+
+from ingestors.run_all import expand_jobs, format_summary, run_jobs, summary_counts
+
+
+def sleepy_job(job, resume=False):
+    """Stand-in for run_job recording when it ran."""
+    start = time.time()
+    time.sleep(0.3)
+    return {"name": job["name"], "provider": job["provider"], "success": True,
+            "result": {"inserted": 1}, "seconds": 0.3, "start": start, "end": time.time()}
+
+
+def max_overlap(summaries):
+    """Largest number of jobs running at the same instant."""
+    events = sorted([(s["start"], 1) for s in summaries] + [(s["end"], -1) for s in summaries])
+    running = peak = 0
+    for _, delta in events:
+        running += delta
+        peak = max(peak, running)
+    return peak
+
+
+class TestExpandJobs:
+    def test_geo_variants_and_overrides(self):
+        """Test geos become one job each and overrides replace config keys."""
+        configs = {"config/google_trends.yml": {"keywords": ["AI"], "geo": "IN", "timeframe": "today 3-m"}}
+        orchestration = {"jobs": [
+            {"provider": "google", "config": "config/google_trends.yml", "name": "gt",
+             "geos": ["US", ""], "overrides": {"timeframe": "today 1-m"}},
+            {"provider": "google", "config": "config/google_trends.yml"},
+        ]}
+        
+        with patch("ingestors.run_all.load_config", side_effect=lambda path: dict(configs[path])):
+            jobs = expand_jobs(orchestration)
+        
+        assert [job["name"] for job in jobs] == ["gt-US", "gt-world", "google_trends"]
+        assert [job["config"]["geo"] for job in jobs] == ["US", "", "IN"]
+        assert jobs[0]["config"]["timeframe"] == "today 1-m"
+        assert jobs[2]["config"]["timeframe"] == "today 3-m"
+    
+    def test_rejects_unknown_provider_and_duplicate_names(self):
+        """Test misconfigured jobs fail before anything runs."""
+        with pytest.raises(ValueError, match="Unknown provider"):
+            expand_jobs({"jobs": [{"provider": "bing", "config": "x.yml"}]})
+        
+        with patch("ingestors.run_all.load_config", return_value={}):
+            with pytest.raises(ValueError, match="Duplicate job names"):
+                expand_jobs({"jobs": [{"provider": "google", "config": "a.yml"}] * 2})
+
+
+class TestRunJobs:
+    def test_respects_provider_and_connection_limits(self):
+        """Test jobs overlap up to the connection budget but never beyond a provider's limit."""
+        jobs = [{"name": f"google-{i}", "provider": "google", "config": {}} for i in range(4)]
+        jobs.append({"name": "exploding", "provider": "exploding", "config": {}})
+        
+        summaries = run_jobs(jobs, max_processes=4, db_connections=3,
+                             provider_limits={"google": 2}, runner=sleepy_job)
+        
+        assert [s["name"] for s in summaries] == [job["name"] for job in jobs]
+        assert max_overlap([s for s in summaries if s["provider"] == "google"]) <= 2
+        assert max_overlap(summaries) == 3
+    
+    def test_summary_aggregates_counts(self):
+        """Test Google Trends interest and related counts are summed per job and in total."""
+        google = {"interest_inserted": 5, "related_inserted": 2, "interest_updated": 1,
+                  "related_unchanged": 4, "failed_batches": 1, "run_id": 9}
+        summaries = [
+            {"name": "gt-US", "provider": "google", "success": True, "result": google, "seconds": 10.0},
+            {"name": "exploding", "provider": "exploding", "success": False, "result": {}, "seconds": 2.0},
+        ]
+        
+        assert summary_counts(google) == {"inserted": 7, "updated": 1, "unchanged": 4}
+        table = format_summary(summaries, wall_seconds=10.5)
+        assert "partial" in table and "FAILED" in table
+        assert "1 fail" in table.splitlines()[-2]
+        assert table.splitlines()[-1] == "Wall clock 10.5s for 12.0s of job time"
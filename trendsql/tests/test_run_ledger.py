@@ -0,0 +1,173 @@
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+
+from connectors.exploding import ExplodingTopicsConnector
+from connectors.google_trends import GoogleTrendsConnector
+from connectors.run_ledger import RunLedger, run_fingerprint
+
+
+def mock_conn():
+    conn = MagicMock()
+    cursor = conn.cursor.return_value.__enter__.return_value
+    return conn, cursor
+
+
+def executed(cursor):
+    return [call[0][0] for call in cursor.execute.call_args_list]
+
+
+class ScaledTrendReq:
+    """Stub TrendReq scaling each payload to its own 0-100 peak."""
+    
+    def __init__(self, popularity):
+        self.popularity = popularity
+        self.payloads = []
+    
+    def build_payload(self, kw_list, **kwargs):
+        self.payloads.append(list(kw_list))
+    
+    def interest_over_time(self):
+        kw_list = self.payloads[-1]
+        peak = max(self.popularity[kw] for kw in kw_list)
+        index = pd.date_range("2024-01-01", periods=2, freq="D")
+        return pd.DataFrame({kw: [round(self.popularity[kw] * 100 / peak)] * 2 for kw in kw_list}, index=index)
+
+
+class TestRunLedger:
+    def test_fingerprint_tracks_config_and_input(self):
+        """Test the fingerprint changes with the config or the input file hash."""
+        config = {"keywords": ["a", "b"], "geo": "US"}
+        
+        assert run_fingerprint(config) == run_fingerprint({"geo": "US", "keywords": ["a", "b"]})
+        assert run_fingerprint(config) != run_fingerprint(dict(config, geo="IN"))
+        assert run_fingerprint(config, file_hash="x") != run_fingerprint(config, file_hash="y")
+    
+    def test_new_run_records_units_and_timings(self):
+        """Test a fresh run is inserted, units are checkpointed and the outcome is recorded."""
+        conn, cursor = mock_conn()
+        cursor.fetchone.return_value = (7,)
+        
+        ledger = RunLedger(conn, "google_trends", "abc").start(resume=False)
+        with ledger.stage("load"):
+            pass
+        ledger.mark_done(cursor, "keywords:a", {"interest_inserted": 3}, reference_total=120.0)
+        ledger.finish("succeeded", {"interest_inserted": 3})
+        
+        assert ledger.run_id == 7
+        assert not ledger.resumed
+        assert ledger.is_done("keywords:a")
+        assert ledger.state == {"reference_total": 120.0}
+        assert "load" in ledger.stage_seconds
+        statements = executed(cursor)
+        assert any("INSERT INTO ingest_runs" in sql for sql in statements)
+        assert any("INSERT INTO ingest_run_units" in sql for sql in statements)
+        assert "SET status = %s" in statements[-1]
+        assert cursor.execute.call_args_list[-1][0][1][0] == "succeeded"
+    
+    def test_resume_loads_completed_units(self):
+        """Test --resume reopens the last unfinished run and its completed units."""
+        conn, cursor = mock_conn()
+        cursor.fetchone.return_value = (3, {"reference_total": 80.0}, {"fetch": 12.5})
+        cursor.fetchall.return_value = [("chunk:0", {"inserted": 10}), ("chunk:1", {"inserted": 10})]
+        
+        ledger = RunLedger(conn, "exploding_topics", "abc").start(resume=True)
+        
+        assert ledger.run_id == 3
+        assert ledger.resumed
+        assert ledger.is_done("chunk:1")
+        assert not ledger.is_done("chunk:2")
+        assert ledger.state == {"reference_total": 80.0}
+        assert ledger.stage_seconds == {"fetch": 12.5}
+        assert any("status = 'running'" in sql for sql in executed(cursor))
+    
+    def test_without_connection_only_times(self):
+        """Test a ledger without a connection never touches the database."""
+        cursor = MagicMock()
+        ledger = RunLedger().start(resume=True)
+        ledger.mark_done(cursor, "chunk:0", {"inserted": 1})
+        ledger.finish("succeeded")
+        
+        assert ledger.is_done("chunk:0")
+        assert not cursor.execute.called
+
+
+class TestResume:
+    @patch('connectors.exploding.psycopg.connect')
+    def test_exploding_skips_completed_chunks(self, mock_connect, tmp_path):
+        """Test a resumed CSV ingestion only loads the chunks not yet checkpointed."""
+        csv_path = tmp_path / "topics.csv"
+        rows = [f"Topic {i},Tech,exploding,2024-01-01,{i},1,US," for i in range(7)]
+        csv_path.write_text(
+            "topic,category,source,first_seen_date,growth_score,popularity_score,region,url\n"
+            + "\n".join(rows) + "\n",
+            encoding="utf-8"
+        )
+        conn, cursor = mock_conn()
+        cursor.fetchone.return_value = (1, 0, 0)
+        mock_connect.return_value = conn
+        connector = ExplodingTopicsConnector({"csv_path": str(csv_path), "bulk_load": True, "chunk_size": 3})
+        
+        ledger = RunLedger()
+        ledger.completed = {"chunk:0": {"inserted": 3}, "chunk:1": {"inserted": 3}}
+        result = connector.ingest_data(ledger)
+        
+        copy = cursor.copy.return_value.__enter__.return_value
+        assert cursor.copy.call_count == 1
+        assert copy.write_row.call_args[0][0][0] == "Topic 6"
+        assert result == {"inserted": 1, "updated": 0, "unchanged": 0}
+        assert ledger.is_done("chunk:2")
+        assert set(ledger.stage_seconds) == {"read", "load"}
+    
+    def test_exploding_fingerprint_follows_file(self, tmp_path):
+        """Test editing the CSV file changes the run fingerprint."""
+        csv_path = tmp_path / "topics.csv"
+        csv_path.write_text("topic\nAI\n", encoding="utf-8")
+        with patch('connectors.exploding.psycopg.connect'):
+            connector = ExplodingTopicsConnector({"csv_path": str(csv_path)})
+        before = connector.run_fingerprint()
+        
+        csv_path.write_text("topic\nAI\nML\n", encoding="utf-8")
+        
+        assert connector.run_fingerprint() != before
+    
+    def test_google_resume_keeps_first_payload_scale(self):
+        """Test a resumed run fetches only pending payloads, on the first payload's scale."""
+        popularity = {"anchor": 10, "a": 5, "b": 20, "c": 40}
+        config = {"keywords": ["a", "b", "c"], "anchor_keyword": "anchor", "keywords_per_payload": 3,
+                  "fetch_related_topics": False, "rate_limit": {"requests_per_second": 1000}}
+        with patch('connectors.google_trends.psycopg.connect'), \
+                patch('connectors.google_trends.TrendReq'):
+            connector = GoogleTrendsConnector(config)
+        
+        connector.pytrends = ScaledTrendReq(popularity)
+        full = {row.keyword: row.interest for row in connector.fetch_data()["interest_over_time"]}
+        
+        connector.pytrends = ScaledTrendReq(popularity)
+        ledger = RunLedger()
+        first = next(connector._iter_fetched_batches(ledger))
+        ledger.mark_done(MagicMock(), first.unit, {}, reference_total=first.reference_total)
+        
+        connector.pytrends = ScaledTrendReq(popularity)
+        batches = list(connector._iter_fetched_batches(ledger))
+        
+        assert connector.pytrends.payloads == [["anchor", "c"]]
+        assert {row.keyword: row.interest for row in batches[0].interest} == {"c": full["c"]}
+    
+    def test_google_failed_payload_is_not_checkpointed(self):
+        """Test a payload that fails to fetch stays pending for --resume."""
+        config = {"keywords": ["a", "b"], "fetch_related_topics": False,
+                  "rate_limit": {"requests_per_second": 1000, "max_retries": 0}}
+        with patch('connectors.google_trends.psycopg.connect'), \
+                patch('connectors.google_trends.TrendReq'):
+            connector = GoogleTrendsConnector(config)
+        connector.pytrends = ScaledTrendReq({"a": 1})
+        
+        ledger = RunLedger()
+        with patch.object(connector, "_upsert_batches", return_value=(2, 0, 0)):
+            result = connector.ingest_data(ledger)
+        
+        assert result["failed_batches"] == 1
+        assert result["interest_inserted"] == 2
+        assert ledger.is_done("keywords:a")
+        assert not ledger.is_done("keywords:b")
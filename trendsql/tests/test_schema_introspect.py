@@ -1,7 +1,7 @@
 import pytest
 import psycopg
-from unittest.mock import Mock, patch
-from app.schema_introspect import get_schema_summary, format_schema_for_llm
+from unittest.mock import Mock, MagicMock, patch
+from app.schema_introspect import get_schema_summary, format_schema_for_llm, get_cached_schema_summary, SchemaCache
 
 
 class TestSchemaIntrospect:
@@ -135,3 +135,42 @@ class TestSchemaIntrospect:
         assert "public" in result
         assert "private" in result
         assert "system" not in result  # Should be filtered out
+
+
+class TestSchemaCache:
+    def _conn(self, fingerprints, rows):
+        """Mock connection answering fingerprint queries and introspection queries in turn."""
+        cursor = MagicMock()
+        cursor.fetchone.side_effect = [(fingerprint,) for fingerprint in fingerprints]
+        cursor.fetchall.return_value = rows
+        conn = MagicMock()
+        conn.cursor.return_value.__enter__.return_value = cursor
+        return conn, cursor
+    
+    def test_cached_summary_keyed_by_schema_list(self):
+        """Test each schema list gets its own entry and DDL forces a reload."""
+        rows = [("public", "users", "id", "integer", "NO", None)]
+        conn, cursor = self._conn(["v1", "v1", "v1", "v2"], rows)
+        
+        with patch("app.schema_introspect.schema_cache", SchemaCache(check_interval=0)):
+            first = get_cached_schema_summary(conn, ["public"])
+            assert cursor.fetchall.call_count == 1
+            
+            assert get_cached_schema_summary(conn, ["public"]) is first
+            assert cursor.fetchall.call_count == 1
+            
+            get_cached_schema_summary(conn, ["public", "private"])
+            assert cursor.fetchall.call_count == 2
+            
+            get_cached_schema_summary(conn, ["public"])
+            assert cursor.fetchall.call_count == 3
+    
+    def test_check_interval_skips_fingerprint(self):
+        """Test a recently validated entry is served without any query."""
+        conn, cursor = self._conn(["v1"], [("public", "users", "id", "integer", "NO", None)])
+        
+        with patch("app.schema_introspect.schema_cache", SchemaCache(check_interval=60)):
+            first = get_cached_schema_summary(conn, ["public"])
+            assert get_cached_schema_summary(conn, ["public"]) is first
+        
+        assert cursor.execute.call_count == 2
@@ -0,0 +1,50 @@
+from app.schema_introspect import format_schema_for_llm
+from app.schema_prompt import SchemaPrompt, estimate_tokens
+
+
+def make_summary(filler_tables=100):
+    """Trend tables plus unrelated filler tables."""
+    tables = {
+        "exploding_topics": [
+            {"column": "topic", "type": "text", "nullable": False, "default": None},
+            {"column": "growth_score", "type": "numeric", "nullable": True, "default": None},
+        ],
+        "gt_interest_over_time": [
+            {"column": "keyword", "type": "text", "nullable": False, "default": None},
+            {"column": "interest", "type": "integer", "nullable": False, "default": "0"},
+        ],
+    }
+    for i in range(filler_tables):
+        tables[f"ledger_{i}"] = [{"column": f"field_{j}", "type": "text", "nullable": True} for j in range(12)]
+    return {"public": tables}
+
+
+class TestSchemaPrompt:
+    def test_full_text_matches_format(self):
+        """Test the unpruned text is the classic schema format."""
+        text = format_schema_for_llm(make_summary(0))
+        
+        assert text == (
+            "Database Schema:\n\nSchema: public\n"
+            "  Table: exploding_topics\n    topic: text NOT NULL\n    growth_score: numeric NULL\n"
+            "  Table: gt_interest_over_time\n    keyword: text NOT NULL\n    interest: integer NOT NULL DEFAULT 0"
+        )
+        assert SchemaPrompt(make_summary(0)).render("anything", 4000) == text
+    
+    def test_pruned_to_relevant_tables(self):
+        """Test only tables matching the prompt are sent once the schema exceeds the budget."""
+        schema_prompt = SchemaPrompt(make_summary())
+        
+        text = schema_prompt.render("keywords with the highest interest", 200)
+        
+        assert estimate_tokens(text) <= 200
+        assert "  Table: gt_interest_over_time" in text
+        assert "  Table: ledger_0" not in text
+        assert text.startswith("Database Schema:\n\nSchema: public\n")
+    
+    def test_no_match_keeps_schema_order(self):
+        """Test a prompt matching nothing falls back to the first tables that fit."""
+        text = SchemaPrompt(make_summary()).render("zzz", 200)
+        
+        assert "  Table: exploding_topics" in text
+        assert "Other tables: " in text
@@ -0,0 +1,119 @@
+import os
+import psycopg
+from unittest.mock import MagicMock, patch
+from app.sql_cache import SQLCache, normalize_prompt, prompt_literals, SQL_CACHE_SIMILAR_SQL
+from app.llm_sql import LLMSQLGenerator
+
+
+def shared_connection(fetchone=None, fetchall=None):
+    """Patch the pool with a connection whose cursor returns the given rows."""
+    conn = MagicMock()
+    cursor = conn.cursor.return_value.__enter__.return_value
+    cursor.fetchone.return_value = fetchone
+    cursor.fetchall.return_value = fetchall or []
+    pooled = patch("app.sql_cache.pooled_connection")
+    pooled.start().return_value.__enter__.return_value = conn
+    return pooled, cursor
+
+
+class TestSQLCache:
+    def test_prompt_normalization(self):
+        """Test prompts differing in case, spacing and trailing punctuation share a key."""
+        assert normalize_prompt("  Top 10 topics\n in  AI? ") == "top 10 topics in ai"
+        key = SQLCache.make_key("Top 10 topics in AI?", "v1", "gpt-4o-mini")
+        assert key == SQLCache.make_key("top 10 topics   in ai", "v1", "gpt-4o-mini")
+        assert key != SQLCache.make_key("top 10 topics in ai", "v2", "gpt-4o-mini")
+        assert key != SQLCache.make_key("top 10 topics in ai", "v1", "gpt-4o")
+
+    def test_local_tier(self):
+        """Test stored SQL is served in process without touching the database."""
+        cache = SQLCache(shared=False)
+        assert cache.get("top topics", "v1", "m") is None
+        cache.put("top topics", "v1", "m", "SELECT topic FROM exploding_topics")
+
+        assert cache.get("Top topics.", "v1", "m") == "SELECT topic FROM exploding_topics"
+        assert cache.get("top topics", "v2", "m") is None
+        stats = cache.get_stats()
+        assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 2, 1)
+
+    def test_lru_eviction(self):
+        """Test the least recently used prompt is evicted first."""
+        cache = SQLCache(max_entries=2, shared=False)
+        cache.put("a", "v1", "m", "SELECT 1")
+        cache.put("b", "v1", "m", "SELECT 2")
+        cache.get("a", "v1", "m")
+        cache.put("c", "v1", "m", "SELECT 3")
+
+        assert cache.get("b", "v1", "m") is None
+        assert cache.get("a", "v1", "m") == "SELECT 1"
+
+    def test_shared_exact_hit(self):
+        """Test a miss in process is answered by the shared table and then kept locally."""
+        cache = SQLCache()
+        pooled, cursor = shared_connection(fetchone=("SELECT 1",))
+        try:
+            assert cache.get("top topics", "v1", "m") == "SELECT 1"
+        finally:
+            pooled.stop()
+
+        assert cache.get("top topics", "v1", "m") == "SELECT 1"
+        assert cursor.execute.call_count == 1
+        assert cache.get_stats()["shared_hits"] == 1
+
+    def test_similar_prompt_needs_same_literals(self):
+        """Test similar prompts are reused only when they pin the same values."""
+        cache = SQLCache(similarity_threshold=0.9)
+        rows = [("Top 20 topics in IN", "SELECT 20", 0.98), ("Top 10 topics in US", "SELECT 10", 0.95)]
+        pooled, cursor = shared_connection(fetchall=rows)
+        try:
+            sql = cache.get("show the top 10 topics in US", "v1", "m", [1.0, 0.0], "embed")
+        finally:
+            pooled.stop()
+
+        assert sql == "SELECT 10"
+        assert cursor.execute.call_args[0][0] == SQL_CACHE_SIMILAR_SQL
+        assert cursor.execute.call_args[0][1]["threshold"] == 0.9
+        assert prompt_literals("Top 10 topics in 'AI'") == ["'AI'", "10"]
+
+    def test_missing_table_disables_shared_tier(self):
+        """Test a missing sql_cache table falls back to the in-process tier."""
+        cache = SQLCache()
+        pooled, cursor = shared_connection()
+        cursor.execute.side_effect = psycopg.errors.UndefinedTable("relation \"sql_cache\" does not exist")
+        try:
+            assert cache.get("top topics", "v1", "m") is None
+        finally:
+            pooled.stop()
+
+        assert not cache.shared
+        cache.put("top topics", "v1", "m", "SELECT 1")
+        assert cache.get("top topics", "v1", "m") == "SELECT 1"
+
+
+class TestCachedGeneration:
+    def setup_method(self):
+        """Create a generator with a mocked OpenAI client and an in-process SQL cache."""
+        with patch("app.llm_sql.OpenAI"):
+            self.llm = LLMSQLGenerator()
+        self.llm.sql_cache = SQLCache(shared=False)
+        response = MagicMock()
+        response.choices[0].message.content = "```sql\nSELECT topic FROM exploding_topics LIMIT 10\n```"
+        self.llm.client.chat.completions.create.return_value = response
+
+    def test_hit_skips_llm(self):
+        """Test the second identical prompt is answered from the cache."""
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "sk-test"}):
+            first = self.llm.generate_sql("Top 10 topics", "Database Schema:", "v1")
+            second = self.llm.generate_sql("top 10 topics", "Database Schema:", "v1")
+
+        assert first == ("SELECT topic FROM exploding_topics LIMIT 10", False)
+        assert second == ("SELECT topic FROM exploding_topics LIMIT 10", True)
+        assert self.llm.client.chat.completions.create.call_count == 1
+
+    def test_no_schema_version_bypasses_cache(self):
+        """Test callers without a schema version always reach the LLM."""
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "sk-test"}):
+            self.llm.generate_sql("Top 10 topics", "Database Schema:")
+            assert self.llm.generate_sql("Top 10 topics", "Database Schema:")[1] is False
+
+        assert self.llm.client.chat.completions.create.call_count == 2
@@ -6,25 +6,31 @@ Provides Text-to-SQL and Agentic RAG endpoints
 import os
 import time
 import logging
+from contextlib import AsyncExitStack
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 
 from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks
 from fastapi.responses import StreamingResponse, HTMLResponse
 from fastapi.middleware.cors import CORSMiddleware
-import psycopg
-from psycopg.rows import dict_row
-
+from starlette.concurrency import run_in_threadpool
 from .models import (
-    SQLRequest, SQLResponse, HTMLRequest, CSVRequest, RAGRequest, RAGAnswer,
+    SQLRequest, SQLResponse, HTMLRequest, CSVRequest, ExportRequest, RAGRequest, RAGAnswer,
     HealthResponse, SchemaResponse, KGSubgraphRequest, KGSubgraphResponse,
     IngestRequest, IngestResponse, KGBuildRequest, KGBuildResponse
 )
 from .sql_safety import is_safe_sql, sanitize_sql
 from .schema_introspect import SchemaIntrospector
-from .llm_sql import init_llm_sql_generator, generate_sql, validate_sql, improve_sql
-from .pagination import init_pagination_helper, execute_paginated_query, validate_pagination_params
-from .formatters import format_html_table, format_csv, stream_csv, get_csv_filename
+from .llm_sql import init_llm_sql_generator, generate_sql, validate_sql, improve_sql, remember_sql
+from .pagination import init_pagination_helper, execute_paginated_query_async, validate_pagination_params
+from .database import init_database, get_database
+from .cache import init_result_cache, get_result_cache
+from .sql_cache import init_sql_cache, get_sql_cache
+from .compression import CompressionMiddleware, get_compression_settings
+from .formatters import (
+    format_html_table, format_csv_chunk, get_csv_filename,
+    open_columnar_writer, COLUMNAR_MEDIA_TYPES
+)
 from .hints import format_error_response
 
 # Import RAG modules (to be implemented)
@@ -62,6 +68,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Negotiated gzip/zstd compression, applied chunk by chunk to streamed bodies
+app.add_middleware(CompressionMiddleware, **get_compression_settings())
+
 # Global variables for initialized components
 schema_introspector = None
 pagination_helper = None
@@ -89,6 +98,35 @@ def get_openai_config() -> Dict[str, str]:
     }
 
 
+def get_export_batch_size() -> int:
+    """Get rows per server-side cursor fetch for streamed exports"""
+    return int(os.getenv("EXPORT_BATCH_SIZE", "5000"))
+
+
+def get_schema_prompt_settings(embedding_model: str) -> Dict[str, Any]:
+    """Get schema prompt token budget and ranking embedding model from environment"""
+    max_tokens = int(os.getenv("SCHEMA_PROMPT_MAX_TOKENS", "4000"))
+    use_embeddings = os.getenv("SCHEMA_PROMPT_EMBEDDINGS", "false").lower() in ("1", "true", "yes")
+    return {
+        "schema_max_tokens": max_tokens if max_tokens > 0 else None,
+        "embedding_model": embedding_model if use_embeddings else None
+    }
+
+
+def get_schema_cache_check_interval() -> float:
+    """Get seconds a cached schema is served before checking the catalog for DDL"""
+    return float(os.getenv("SCHEMA_CACHE_CHECK_INTERVAL", "30"))
+
+
+def get_column_profile_settings() -> Dict[str, Any]:
+    """Get column profile refresh interval and values per column from environment"""
+    ttl = float(os.getenv("COLUMN_PROFILE_TTL", "3600"))
+    return {
+        "profile_ttl": ttl if ttl > 0 else None,
+        "profile_top_k": int(os.getenv("COLUMN_PROFILE_TOP_K", "8"))
+    }
+
+
 def initialize_components():
     """Initialize all application components"""
     global schema_introspector, pagination_helper
@@ -97,15 +135,24 @@ def initialize_components():
     db_connection_string = get_db_connection_string()
     openai_config = get_openai_config()
     
+    # Initialize async database pool (opened on startup)
+    database = init_database(db_connection_string)
+    
     # Initialize schema introspector
-    schema_introspector = SchemaIntrospector(db_connection_string)
+    schema_introspector = SchemaIntrospector(
+        db_connection_string, database, get_schema_cache_check_interval(), **get_column_profile_settings()
+    )
     
-    # Initialize pagination helper
-    pagination_helper = init_pagination_helper(db_connection_string)
+    # Initialize pagination helper with the result page cache
+    pagination_helper = init_pagination_helper(db_connection_string, database, init_result_cache())
     
     # Initialize LLM SQL generator
     if openai_config["api_key"]:
-        init_llm_sql_generator(openai_config["api_key"], openai_config["model"])
+        init_llm_sql_generator(
+            openai_config["api_key"], openai_config["model"],
+            **get_schema_prompt_settings(openai_config["embedding_model"]),
+            sql_cache=init_sql_cache(db_connection_string, openai_config["embedding_model"])
+        )
     else:
         logger.warning("OpenAI API key not found. LLM features will be disabled.")
     
@@ -122,6 +169,16 @@ def initialize_components():
 async def startup_event():
     """Initialize components on startup"""
     initialize_components()
+    await get_database().open()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release resources on shutdown"""
+    await get_database().close()
+    sql_cache = get_sql_cache()
+    if sql_cache is not None:
+        await run_in_threadpool(sql_cache.close)
 
 
 @app.get("/health", response_model=HealthResponse)
@@ -135,11 +192,7 @@ async def health_check():
     
     # Check database connection
     try:
-        db_connection_string = get_db_connection_string()
-        with psycopg.connect(db_connection_string) as conn:
-            with conn.cursor() as cur:
-                cur.execute("SELECT 1")
-                services["database"] = True
+        services["database"] = await get_database().ping()
     except Exception as e:
         logger.error(f"Database health check failed: {e}")
     
@@ -171,7 +224,7 @@ async def get_schema(schemas: str = "public"):
     
     try:
         schema_list = [s.strip() for s in schemas.split(",")]
-        schema_info = schema_introspector.get_schema_json(schema_list)
+        schema_info = await schema_introspector.get_schema_json_async(schema_list)
         
         return SchemaResponse(
             schemas=schema_info,
@@ -187,10 +240,16 @@ async def generate_sql_endpoint(request: SQLRequest):
     """Generate SQL from natural language prompt"""
     try:
         # Get schema information
-        schema_info = schema_introspector.get_schema_json()
+        schema_info = await schema_introspector.get_schema_json_async()
+        
+        # Column value profiles are computed in the background; until then the schema goes alone
+        column_profiles = schema_introspector.get_column_profiles()
         
-        # Generate SQL
-        sql, error = generate_sql(request.prompt, schema_info)
+        # Generate SQL; the LLM, embedding and shared cache calls block, so they run off the event loop
+        sql, error, cache_hit = await run_in_threadpool(
+            generate_sql, request.prompt, schema_info, column_profiles=column_profiles
+        )
+        generated_sql = sql
         if error:
             raise HTTPException(status_code=400, detail=f"SQL generation failed: {error}")
         
@@ -202,39 +261,52 @@ async def generate_sql_endpoint(request: SQLRequest):
         # Execute if requested
         results = None
         total_rows = None
+        metadata = {}
         execution_time = None
         execution_error = None
         
         if request.execute:
             start_time = time.time()
             try:
-                results, total_rows, metadata = execute_paginated_query(
-                    sql, request.page, request.page_size
+                results, total_rows, metadata = await execute_paginated_query_async(
+                    sql, request.page, request.page_size, request.cursor, request.count_mode.value
                 )
                 execution_time = time.time() - start_time
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=f"Invalid pagination request: {str(e)}")
             except Exception as e:
                 execution_error = str(e)
                 # Try to improve SQL
-                improved_sql, improve_error = improve_sql(sql, execution_error, schema_info)
-                if not improve_error:
+                improved_sql, improve_error = await run_in_threadpool(improve_sql, sql, execution_error, schema_info)
+                if not improve_error and is_safe_sql(improved_sql)[0]:
                     sql = improved_sql
                     # Try again with improved SQL
                     try:
-                        results, total_rows, metadata = execute_paginated_query(
-                            sql, request.page, request.page_size
+                        results, total_rows, metadata = await execute_paginated_query_async(
+                            sql, request.page, request.page_size, request.cursor, request.count_mode.value
                         )
                         execution_time = time.time() - start_time
                         execution_error = None
                     except Exception as e2:
                         execution_error = str(e2)
+            
+            # generate_sql stored the SQL it returned; drop it if it failed, or replace it with the improved SQL
+            if execution_error is not None or sql != generated_sql:
+                await run_in_threadpool(
+                    remember_sql, request.prompt, schema_info,
+                    sql if execution_error is None else None, column_profiles
+                )
         
         return SQLResponse(
             sql=sql,
+            cache_hit=cache_hit,
             executed=request.execute and execution_error is None,
             results=results,
             total_rows=total_rows,
+            count_mode=metadata.get('count_mode'),
             page=request.page,
             page_size=request.page_size,
+            next_cursor=metadata.get('next_cursor'),
             execution_time=execution_time,
             error=execution_error
         )
@@ -256,8 +328,8 @@ async def generate_html_endpoint(request: HTMLRequest):
             raise HTTPException(status_code=400, detail=f"SQL safety check failed: {safety_error}")
         
         # Execute query
-        results, total_rows, metadata = execute_paginated_query(
-            request.sql, request.page, request.page_size
+        results, total_rows, metadata = await execute_paginated_query_async(
+            request.sql, request.page, request.page_size, count_mode=request.count_mode.value
         )
         
         # Add execution metadata
@@ -275,6 +347,16 @@ async def generate_html_endpoint(request: HTMLRequest):
         raise HTTPException(status_code=500, detail=f"HTML generation failed: {str(e)}")
 
 
+@app.get("/cache/stats")
+async def cache_stats():
+    """Get result cache and SQL cache hit/miss counters"""
+    cache = get_result_cache()
+    sql_cache = get_sql_cache()
+    stats = {"enabled": False} if cache is None else {"enabled": True, **cache.get_stats()}
+    stats["sql_cache"] = {"enabled": False} if sql_cache is None else {"enabled": True, **sql_cache.get_stats()}
+    return stats
+
+
 @app.post("/download-csv")
 async def download_csv_endpoint(request: CSVRequest):
     """Download CSV from SQL query"""
@@ -284,24 +366,57 @@ async def download_csv_endpoint(request: CSVRequest):
         if not is_safe:
             raise HTTPException(status_code=400, detail=f"SQL safety check failed: {safety_error}")
         
-        # Execute query (get all results for CSV)
-        db_connection_string = get_db_connection_string()
-        with psycopg.connect(db_connection_string) as conn:
-            with conn.cursor(row_factory=dict_row) as cur:
-                cur.execute(request.sql)
-                results = cur.fetchall()
-        
-        # Generate CSV
-        csv_content = format_csv(results)
-        
         # Generate filename
         filename = request.filename or get_csv_filename("export")
+        headers = {"Content-Disposition": f"attachment; filename={filename}"}
         
-        return StreamingResponse(
-            iter([csv_content]),
-            media_type="text/csv",
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
-        )
+        if request.fast:
+            # Relay COPY output as-is; the first chunk is read up front so
+            # query errors are reported before the response starts
+            chunks = get_database().iter_copy_csv(request.sql)
+            try:
+                first_chunk = await chunks.__anext__()
+            except StopAsyncIteration:
+                first_chunk = b""
+            
+            async def relay_copy():
+                try:
+                    yield first_chunk
+                    async for chunk in chunks:
+                        yield chunk
+                except Exception as e:
+                    # The status is already sent; abort so the export is not mistaken for complete
+                    logger.error(f"CSV export failed mid-stream: {e}")
+                    raise
+                finally:
+                    await chunks.aclose()
+            
+            return StreamingResponse(relay_copy(), media_type="text/csv", headers=headers)
+        
+        # Stream from a server-side cursor; fetch the first batch up front so
+        # query errors are reported before the response starts
+        batches = get_database().iter_batches(request.sql, batch_size=get_export_batch_size())
+        try:
+            first_batch = await batches.__anext__()
+        except StopAsyncIteration:
+            first_batch = []
+        
+        async def generate_csv():
+            try:
+                if not first_batch:
+                    return
+                columns = list(first_batch[0].keys())
+                yield format_csv_chunk(first_batch, columns, include_header=True)
+                async for batch in batches:
+                    yield format_csv_chunk(batch, columns)
+            except Exception as e:
+                # The status is already sent; abort so the export is not mistaken for complete
+                logger.error(f"CSV export failed mid-stream: {e}")
+                raise
+            finally:
+                await batches.aclose()
+        
+        return StreamingResponse(generate_csv(), media_type="text/csv", headers=headers)
         
     except HTTPException:
         raise
@@ -310,6 +425,59 @@ async def download_csv_endpoint(request: CSVRequest):
         raise HTTPException(status_code=500, detail=f"CSV download failed: {str(e)}")
 
 
+@app.post("/export")
+async def export_endpoint(request: ExportRequest):
+    """Export SQL query results as an Arrow IPC stream or Parquet file"""
+    try:
+        # Validate SQL safety
+        is_safe, safety_error = is_safe_sql(request.sql)
+        if not is_safe:
+            raise HTTPException(status_code=400, detail=f"SQL safety check failed: {safety_error}")
+        
+        export_format = request.format.value
+        media_type, extension = COLUMNAR_MEDIA_TYPES[export_format]
+        base_name = request.filename or f"export_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        batch_size = get_export_batch_size()
+        
+        # Execute before responding so query errors produce an error status;
+        # the schema comes from the cursor description
+        stack = AsyncExitStack()
+        try:
+            cur = await stack.enter_async_context(
+                get_database().server_cursor(request.sql, batch_size=batch_size)
+            )
+            writer = open_columnar_writer(cur.description, export_format)
+        except BaseException:
+            await stack.aclose()
+            raise
+        
+        async def generate_export():
+            try:
+                while True:
+                    rows = await cur.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    # Arrow conversion is CPU-bound, keep it off the event loop
+                    chunk = await run_in_threadpool(writer.write, rows)
+                    if chunk:
+                        yield chunk
+                yield writer.close()
+            finally:
+                await stack.aclose()
+        
+        return StreamingResponse(
+            generate_export(),
+            media_type=media_type,
+            headers={"Content-Disposition": f"attachment; filename={base_name}.{extension}"}
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Export failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
+
+
 @app.post("/rag/answer", response_model=RAGAnswer)
 async def rag_answer_endpoint(request: RAGRequest):
     """Agentic RAG endpoint for answering questions"""
@@ -458,6 +626,8 @@ async def root():
             "generate_sql": "/generate-sql",
             "generate_html": "/generate-html",
             "download_csv": "/download-csv",
+            "export": "/export",
+            "cache_stats": "/cache/stats",
             "rag_answer": "/rag/answer",
             "kg_ingest": "/kg/ingest",
             "kg_build": "/kg/build",
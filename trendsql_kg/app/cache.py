@@ -0,0 +1,224 @@
+"""
+Result Cache Module for TrendsQL-KG
+In-process LRU + TTL cache of paginated query results, invalidated by the
+per-table data versions bumped by ingestion
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+import psycopg
+
+logger = logging.getLogger(__name__)
+
+# Versions are bumped by the ingestion connectors when they commit
+DATA_VERSIONS_SQL = "SELECT table_name, version FROM data_versions"
+
+IDENTIFIER_PATTERN = re.compile(r'[a-z_][a-z0-9_$]*')
+
+
+class ResultCache:
+    """LRU + TTL cache of result pages bounded by size in bytes"""
+    
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024,
+                 max_entry_bytes: int = 4 * 1024 * 1024,
+                 ttl_seconds: float = 300.0):
+        """
+        Initialize result cache
+        
+        Args:
+            max_bytes: Total size budget for cached values
+            max_entry_bytes: Values larger than this are not cached
+            ttl_seconds: Lifetime of an entry
+        """
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._counters = {'hits': 0, 'misses': 0, 'stale': 0, 'expired': 0, 'evictions': 0, 'bypassed': 0}
+    
+    @staticmethod
+    def make_key(sql: str, *parts: Any) -> str:
+        """
+        Build a cache key from sanitized SQL and paging parameters
+        
+        Args:
+            sql: Sanitized SQL query
+            parts: Page, page size and other result-shaping parameters
+        
+        Returns:
+            Hex digest key
+        """
+        normalized = re.sub(r'\s+', ' ', sql).strip().rstrip(';')
+        raw = json.dumps([normalized, parts], default=str)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+    
+    def get(self, key: str, versions: Optional[Dict[str, int]]) -> Optional[Any]:
+        """
+        Look up a cached value
+        
+        An entry is stale when any versioned table its SQL mentions has a
+        different version than when it was stored.
+        
+        Args:
+            key: Cache key
+            versions: Current data_versions snapshot (None bypasses the cache)
+        
+        Returns:
+            Cached value or None on a miss
+        """
+        with self._lock:
+            if versions is None:
+                self._counters['bypassed'] += 1
+                return None
+            
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters['misses'] += 1
+                return None
+            
+            if entry['expires_at'] <= time.monotonic():
+                self._remove(key)
+                self._counters['expired'] += 1
+                self._counters['misses'] += 1
+                return None
+            
+            if self._is_stale(entry, versions):
+                self._remove(key)
+                self._counters['stale'] += 1
+                self._counters['misses'] += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self._counters['hits'] += 1
+            return entry['value']
+    
+    def put(self, key: str, sql: str, value: Any, versions: Optional[Dict[str, int]]) -> bool:
+        """
+        Store a value computed against a data_versions snapshot
+        
+        Args:
+            key: Cache key
+            sql: SQL the value was computed from
+            value: JSON-serializable value
+            versions: data_versions snapshot read before the query ran
+        
+        Returns:
+            True if the value was cached
+        """
+        if versions is None:
+            return False
+        
+        size = len(json.dumps(value, default=str).encode('utf-8'))
+        if size > self.max_entry_bytes or size > self.max_bytes:
+            return False
+        
+        tables = set(IDENTIFIER_PATTERN.findall(sql.lower()))
+        entry = {
+            'value': value,
+            'size': size,
+            'expires_at': time.monotonic() + self.ttl_seconds,
+            'tables': tables,
+            'versions': {t: v for t, v in versions.items() if t in tables}
+        }
+        
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._bytes += size
+            
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._counters['evictions'] += 1
+        
+        return True
+    
+    def clear(self) -> None:
+        """Drop all entries, keeping counters"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and current size"""
+        with self._lock:
+            lookups = self._counters['hits'] + self._counters['misses']
+            return {
+                **self._counters,
+                'hit_ratio': self._counters['hits'] / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl_seconds
+            }
+    
+    def _remove(self, key: str) -> None:
+        """Remove an entry (lock must be held)"""
+        entry = self._entries.pop(key)
+        self._bytes -= entry['size']
+    
+    def _is_stale(self, entry: Dict[str, Any], versions: Dict[str, int]) -> bool:
+        """Check entry versions; tables versioned after it was stored count as 0"""
+        for table, version in versions.items():
+            if table in entry['tables'] and entry['versions'].get(table, 0) != version:
+                return True
+        return False
+
+
+def get_data_versions(conn: psycopg.Connection) -> Optional[Dict[str, int]]:
+    """Read data_versions in a savepoint, or None if it cannot be read"""
+    try:
+        with conn.transaction():
+            with conn.cursor() as cur:
+                cur.execute(DATA_VERSIONS_SQL)
+                return {row[0]: row[1] for row in cur.fetchall()}
+    except psycopg.Error as e:
+        logger.warning(f"Result cache bypassed, data versions unavailable: {e}")
+        return None
+
+
+async def get_data_versions_async(conn: psycopg.AsyncConnection) -> Optional[Dict[str, int]]:
+    """Read data_versions in a savepoint on an async connection"""
+    try:
+        async with conn.transaction():
+            async with conn.cursor() as cur:
+                await cur.execute(DATA_VERSIONS_SQL)
+                return {row[0]: row[1] for row in await cur.fetchall()}
+    except psycopg.Error as e:
+        logger.warning(f"Result cache bypassed, data versions unavailable: {e}")
+        return None
+
+
+def get_cache_settings() -> Dict[str, Any]:
+    """Get result cache limits from environment"""
+    return {
+        'max_bytes': int(os.getenv("RESULT_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+        'max_entry_bytes': int(os.getenv("RESULT_CACHE_MAX_ENTRY_BYTES", str(4 * 1024 * 1024))),
+        'ttl_seconds': float(os.getenv("RESULT_CACHE_TTL", "300"))
+    }
+
+
+# Global instance
+result_cache = None
+
+
+def init_result_cache() -> Optional[ResultCache]:
+    """Initialize global result cache (disabled when RESULT_CACHE_MAX_BYTES=0)"""
+    global result_cache
+    settings = get_cache_settings()
+    result_cache = ResultCache(**settings) if settings['max_bytes'] > 0 else None
+    return result_cache
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """Get global result cache"""
+    return result_cache
@@ -0,0 +1,162 @@
+"""
+Column Profiles Module for TrendsQL-KG
+Per-column value statistics (frequent values, ranges, null fraction) read
+from pg_stats, or from a row sample for tables never analyzed, so generated
+SQL can use literal values that exist in the data
+"""
+
+import logging
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+import psycopg
+from psycopg import sql
+
+logger = logging.getLogger(__name__)
+
+# Planner statistics for every column of the schemas (parent stats first for partitioned tables)
+COLUMN_STATS_SQL = """
+    SELECT DISTINCT ON (schemaname, tablename, attname)
+        schemaname,
+        tablename,
+        attname,
+        null_frac,
+        n_distinct,
+        most_common_vals::text::text[] AS most_common_vals,
+        most_common_freqs,
+        histogram_bounds::text::text[] AS histogram_bounds
+    FROM pg_stats
+    WHERE schemaname = ANY(%(schemas)s)
+    ORDER BY schemaname, tablename, attname, inherited DESC
+"""
+
+# Columns with at most this many distinct values get their values listed
+LOW_CARDINALITY = 50
+
+# Or when the most common values cover this share of the rows
+VALUE_COVERAGE = 0.95
+
+MAX_VALUE_LENGTH = 40
+
+TEXT_TYPES = {'text', 'character varying', 'character', 'USER-DEFINED', 'citext'}
+RANGE_TYPES = {
+    'date', 'timestamp without time zone', 'timestamp with time zone',
+    'smallint', 'integer', 'bigint', 'numeric', 'real', 'double precision'
+}
+NUMERIC_TYPES = {'smallint', 'integer', 'bigint', 'numeric', 'real', 'double precision'}
+
+
+def profile_schema(conn: psycopg.Connection, schema_info: Dict[str, Any], schemas: List[str],
+                   top_k: int = 8, sample_rows: int = 1000) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """
+    Profile the columns of every table in a schema JSON
+    
+    Args:
+        conn: Database connection
+        schema_info: Schema JSON from SchemaIntrospector.get_schema_json
+        schemas: Schemas the schema JSON covers
+        top_k: Values listed per low-cardinality column
+        sample_rows: Rows read from tables without planner statistics
+    
+    Returns:
+        Profiles by qualified table name, then column name
+    """
+    with conn.cursor() as cur:
+        cur.execute(COLUMN_STATS_SQL, {'schemas': list(schemas)})
+        stats = {(row[0], row[1], row[2]): row[3:] for row in cur.fetchall()}
+    
+    profiles = {}
+    for table in schema_info.get('tables', []):
+        columns = {col['column_name']: col['data_type'] for col in table.get('columns', [])}
+        if any((table['schema'], table['name'], column) in stats for column in columns):
+            table_profiles = {
+                column: _profile_from_stats(data_type, *stats[(table['schema'], table['name'], column)], top_k)
+                for column, data_type in columns.items() if (table['schema'], table['name'], column) in stats
+            }
+        else:
+            table_profiles = _profile_from_sample(conn, table['schema'], table['name'], columns, top_k, sample_rows)
+        
+        table_profiles = {column: profile for column, profile in table_profiles.items() if profile}
+        if table_profiles:
+            profiles[f"{table['schema']}.{table['name']}"] = table_profiles
+    return profiles
+
+
+def format_profile(profile: Dict[str, Any]) -> str:
+    """Compact prompt text of a column profile, e.g. values: 'US', 'IN'; 12% null"""
+    parts = []
+    if profile.get('values'):
+        parts.append("values: " + ", ".join(f"'{value}'" for value in profile['values']))
+    if profile.get('min') is not None:
+        parts.append(f"range {profile['min']} .. {profile['max']}")
+    if profile.get('null_frac', 0) >= 0.01:
+        parts.append(f"{profile['null_frac']:.0%} null")
+    return "; ".join(parts)
+
+
+def _profile_from_stats(data_type: str, null_frac: Optional[float], n_distinct: Optional[float],
+                        values: Optional[List[str]], freqs: Optional[List[float]],
+                        bounds: Optional[List[str]], top_k: int) -> Dict[str, Any]:
+    # n_distinct < 0 is minus the distinct share of the rows
+    null_frac = null_frac or 0.0
+    values = values or []
+    coverage = sum(freqs or []) + null_frac
+    listed = data_type in TEXT_TYPES or data_type in NUMERIC_TYPES
+    low_cardinality = (n_distinct is not None and 0 < n_distinct <= LOW_CARDINALITY) or coverage >= VALUE_COVERAGE
+    
+    profile: Dict[str, Any] = {'null_frac': null_frac}
+    if listed and low_cardinality and values:
+        profile['values'] = [_shorten(value) for value in values[:top_k]]
+    elif data_type in RANGE_TYPES:
+        candidates = bounds or values
+        if candidates:
+            if bounds:
+                profile['min'], profile['max'] = bounds[0], bounds[-1]
+            else:
+                ordered = sorted(candidates, key=float) if data_type in NUMERIC_TYPES else sorted(candidates)
+                profile['min'], profile['max'] = ordered[0], ordered[-1]
+    return profile if len(profile) > 1 or null_frac >= 0.01 else {}
+
+
+def _profile_from_sample(conn: psycopg.Connection, schema: str, table: str, columns: Dict[str, str],
+                         top_k: int, sample_rows: int) -> Dict[str, Dict[str, Any]]:
+    # Tables never analyzed have no pg_stats rows; read a bounded sample instead
+    profiled = [column for column, data_type in columns.items() if data_type in TEXT_TYPES or data_type in RANGE_TYPES]
+    if not profiled:
+        return {}
+    
+    query = sql.SQL("SELECT {} FROM {} LIMIT %s").format(
+        sql.SQL(", ").join(sql.Identifier(column) for column in profiled),
+        sql.Identifier(schema, table)
+    )
+    try:
+        with conn.transaction():
+            with conn.cursor() as cur:
+                cur.execute(query, (sample_rows,))
+                rows = cur.fetchall()
+    except psycopg.Error as e:
+        logger.warning(f"Could not sample {schema}.{table} for column profiles: {e}")
+        return {}
+    
+    if not rows:
+        return {}
+    
+    profiles = {}
+    for position, column in enumerate(profiled):
+        data_type = columns[column]
+        present = [row[position] for row in rows if row[position] is not None]
+        null_frac = 1 - len(present) / len(rows)
+        counts = Counter(str(value) for value in present)
+        profile: Dict[str, Any] = {'null_frac': null_frac}
+        if counts and len(counts) <= LOW_CARDINALITY and (data_type in TEXT_TYPES or data_type in NUMERIC_TYPES):
+            profile['values'] = [_shorten(value) for value, _ in counts.most_common(top_k)]
+        elif present and data_type in RANGE_TYPES:
+            profile['min'], profile['max'] = str(min(present)), str(max(present))
+        if len(profile) > 1 or null_frac >= 0.01:
+            profiles[column] = profile
+    return profiles
+
+
+def _shorten(value: str) -> str:
+    value = value.replace("'", "''")
+    return value if len(value) <= MAX_VALUE_LENGTH else value[:MAX_VALUE_LENGTH - 3] + "..."
@@ -0,0 +1,224 @@
+"""
+Async Database Module for TrendsQL-KG
+Provides a pooled psycopg AsyncConnection execution layer for the API
+"""
+
+import os
+import uuid
+import logging
+from contextlib import asynccontextmanager
+from typing import Dict, List, Any, Optional, Sequence, AsyncIterator
+import psycopg
+from psycopg.rows import dict_row, tuple_row
+from psycopg_pool import AsyncConnectionPool
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncDatabase:
+    """Async connection pool wrapper for TrendsQL-KG"""
+    
+    def __init__(self, db_connection_string: str,
+                 min_size: int = 2,
+                 max_size: int = 10,
+                 timeout: float = 10.0):
+        """
+        Initialize async database
+        
+        Args:
+            db_connection_string: PostgreSQL connection string
+            min_size: Minimum number of pooled connections
+            max_size: Maximum number of pooled connections
+            timeout: Seconds to wait for a free connection
+        """
+        self.db_connection_string = db_connection_string
+        self.pool = AsyncConnectionPool(
+            conninfo=db_connection_string,
+            min_size=min_size,
+            max_size=max(min_size, max_size),
+            timeout=timeout,
+            check=AsyncConnectionPool.check_connection,
+            name="trendsql_kg",
+            open=False
+        )
+    
+    async def open(self) -> None:
+        """Open the connection pool without waiting for the first connection"""
+        await self.pool.open(wait=False)
+        logger.info(f"Async database pool opened (max_size={self.pool.max_size})")
+    
+    async def close(self) -> None:
+        """Close the connection pool"""
+        await self.pool.close()
+        logger.info("Async database pool closed")
+    
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[psycopg.AsyncConnection]:
+        """
+        Check out a pooled connection
+        
+        The transaction is committed when the block exits cleanly and rolled
+        back on error before the connection is returned to the pool.
+        """
+        async with self.pool.connection() as conn:
+            yield conn
+    
+    async def fetch_all(self, sql: str, params: Optional[Sequence[Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Execute a query and return all rows as dicts
+        
+        Args:
+            sql: SQL query to execute
+            params: Optional query parameters
+        
+        Returns:
+            List of result rows
+        """
+        async with self.connection() as conn:
+            async with conn.cursor(row_factory=dict_row) as cur:
+                await cur.execute(sql, params)
+                return await cur.fetchall()
+    
+    async def fetch_one(self, sql: str, params: Optional[Sequence[Any]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Execute a query and return the first row as a dict
+        
+        Args:
+            sql: SQL query to execute
+            params: Optional query parameters
+        
+        Returns:
+            First result row or None
+        """
+        async with self.connection() as conn:
+            async with conn.cursor(row_factory=dict_row) as cur:
+                await cur.execute(sql, params)
+                return await cur.fetchone()
+    
+    async def fetch_value(self, sql: str, params: Optional[Sequence[Any]] = None) -> Any:
+        """
+        Execute a query and return the first column of the first row
+        
+        Args:
+            sql: SQL query to execute
+            params: Optional query parameters
+        
+        Returns:
+            Scalar value or None
+        """
+        async with self.connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(sql, params)
+                row = await cur.fetchone()
+                return row[0] if row else None
+    
+    async def iter_batches(self, sql: str, params: Optional[Sequence[Any]] = None,
+                           batch_size: int = 5000) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Stream a query through a named server-side cursor in fixed-size batches
+        
+        The connection stays checked out until the iterator is exhausted or
+        closed; the next batch is only fetched when the consumer asks for it,
+        so memory is bounded by one batch regardless of the result size.
+        
+        Args:
+            sql: SQL query to execute
+            params: Optional query parameters
+            batch_size: Rows fetched per round trip
+        
+        Yields:
+            Lists of result rows
+        """
+        async with self.server_cursor(sql, params, batch_size, row_factory=dict_row) as cur:
+            while True:
+                rows = await cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+    
+    @asynccontextmanager
+    async def server_cursor(self, sql: str, params: Optional[Sequence[Any]] = None,
+                            batch_size: int = 5000, row_factory=tuple_row) -> AsyncIterator[psycopg.AsyncServerCursor]:
+        """
+        Execute a query on a named server-side cursor
+        
+        Args:
+            sql: SQL query to execute
+            params: Optional query parameters
+            batch_size: Rows fetched per round trip when iterating
+            row_factory: Row factory for the cursor (tuples by default)
+        
+        Yields:
+            Executed cursor; description is available before any fetch
+        """
+        async with self.connection() as conn:
+            cursor_name = f"stream_{uuid.uuid4().hex[:12]}"
+            async with conn.cursor(name=cursor_name, row_factory=row_factory) as cur:
+                cur.itersize = batch_size
+                await cur.execute(sql, params)
+                yield cur
+    
+    async def iter_copy_csv(self, sql: str) -> AsyncIterator[bytes]:
+        """
+        Stream a query as CSV produced by the server with COPY TO STDOUT
+        
+        Rows are formatted by PostgreSQL and relayed as raw chunks, skipping
+        per-cell Python formatting. The SQL must already be safety checked.
+        
+        Args:
+            sql: SELECT query to export
+        
+        Yields:
+            CSV chunks (header first)
+        """
+        async with self.connection() as conn:
+            async with conn.cursor() as cur:
+                async with cur.copy(build_copy_csv_sql(sql)) as copy:
+                    async for data in copy:
+                        yield bytes(data)
+    
+    async def ping(self) -> bool:
+        """Check that a pooled connection can run a trivial query"""
+        try:
+            return await self.fetch_value("SELECT 1") == 1
+        except Exception as e:
+            logger.error(f"Database ping failed: {e}")
+            return False
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool usage counters"""
+        return self.pool.get_stats()
+
+
+def build_copy_csv_sql(sql: str) -> str:
+    """Wrap a SELECT in COPY (...) TO STDOUT WITH CSV HEADER"""
+    query = sql.strip().rstrip(';').rstrip()
+    return f"COPY ({query}) TO STDOUT WITH (FORMAT CSV, HEADER)"
+
+
+def get_pool_settings() -> Dict[str, Any]:
+    """Get async pool sizing from environment"""
+    return {
+        "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+        "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+        "timeout": float(os.getenv("DB_POOL_TIMEOUT", "10"))
+    }
+
+
+# Global instance
+database = None
+
+
+def init_database(db_connection_string: str) -> AsyncDatabase:
+    """Initialize global async database"""
+    global database
+    database = AsyncDatabase(db_connection_string, **get_pool_settings())
+    return database
+
+
+def get_database() -> AsyncDatabase:
+    """Get global async database"""
+    if database is None:
+        raise RuntimeError("Async database not initialized")
+    
+    return database
@@ -1,14 +1,17 @@
 """
 Formatters Module for TrendsQL-KG
-Handles HTML table generation and CSV streaming
+Handles HTML table generation, CSV streaming and columnar (Arrow/Parquet) export
 """
 
 import csv
 import io
 import logging
-from typing import Dict, List, Any, Optional, Generator
+from typing import Dict, List, Any, Optional, Generator, Sequence, Callable, Tuple
 from datetime import datetime, date
 import json
+import pyarrow as pa
+import pyarrow.ipc
+import pyarrow.parquet as pq
 
 logger = logging.getLogger(__name__)
 
@@ -300,6 +303,30 @@ class CSVFormatter:
             output.seek(0)
             output.truncate()
     
+    def format_csv_chunk(self, rows: List[Dict[str, Any]], headers: List[str],
+                         include_header: bool = False) -> str:
+        """
+        Format one batch of rows as CSV
+        
+        Args:
+            rows: Batch of result rows
+            headers: Column order shared by all batches
+            include_header: Write the header row first
+            
+        Returns:
+            CSV chunk
+        """
+        output = io.StringIO()
+        writer = csv.writer(output, dialect=self.dialect)
+        
+        if include_header:
+            writer.writerow(headers)
+        
+        for row in rows:
+            writer.writerow([self._format_csv_value(row.get(header)) for header in headers])
+        
+        return output.getvalue()
+    
     def _format_csv_value(self, value: Any) -> str:
         """Format a value for CSV output"""
         if value is None:
@@ -353,10 +380,242 @@ class JSONFormatter:
         raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
 
 
+# PostgreSQL type OIDs with a native Arrow type
+PG_ARROW_TYPES = {
+    16: pa.bool_(),                      # bool
+    17: pa.binary(),                     # bytea
+    20: pa.int64(),                      # int8
+    21: pa.int16(),                      # int2
+    23: pa.int32(),                      # int4
+    25: pa.string(),                     # text
+    700: pa.float32(),                   # float4
+    701: pa.float64(),                   # float8
+    1042: pa.string(),                   # bpchar
+    1043: pa.string(),                   # varchar
+    1082: pa.date32(),                   # date
+    1083: pa.time64('us'),               # time
+    1114: pa.timestamp('us'),            # timestamp
+    1184: pa.timestamp('us', tz='UTC'),  # timestamptz
+}
+
+NUMERIC_OID = 1700
+JSON_OIDS = (114, 3802)
+
+# Content types and file extensions of the columnar export formats
+COLUMNAR_MEDIA_TYPES = {
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet')
+}
+
+
+class ArrowFormatter:
+    """Arrow IPC / Parquet formatter for SQL results"""
+    
+    def __init__(self, ipc_compression: Optional[str] = 'zstd', parquet_compression: str = 'zstd',
+                 parquet_row_group_size: int = 100000):
+        """
+        Initialize Arrow formatter
+        
+        Args:
+            ipc_compression: Arrow IPC buffer compression (None for readers
+                without compression support)
+            parquet_compression: Parquet column compression codec
+            parquet_row_group_size: Rows buffered per Parquet row group
+        """
+        self.ipc_compression = ipc_compression
+        self.parquet_compression = parquet_compression
+        self.parquet_row_group_size = parquet_row_group_size
+    
+    def build_schema(self, description: Sequence[Any]) -> Tuple[pa.Schema, List[Optional[Callable[[Any], Any]]]]:
+        """
+        Map cursor column descriptions to an Arrow schema
+        
+        NUMERIC with declared precision/scale becomes decimal128; unconstrained
+        NUMERIC becomes float64 since its scale varies per value. JSON is kept
+        as JSON text and other types without a mapping are exported as text.
+        
+        Args:
+            description: cursor.description (name, type_code, precision, scale)
+            
+        Returns:
+            Tuple of (schema, per-column value converters or None)
+        """
+        fields = []
+        converters = []
+        for column in description:
+            arrow_type, converter = self._map_type(column)
+            fields.append(pa.field(column.name, arrow_type))
+            converters.append(converter)
+        
+        return pa.schema(fields), converters
+    
+    def to_record_batch(self, rows: Sequence[Sequence[Any]], schema: pa.Schema,
+                        converters: List[Optional[Callable[[Any], Any]]]) -> pa.RecordBatch:
+        """
+        Convert tuple rows to an Arrow record batch
+        
+        Args:
+            rows: Result rows as tuples in schema column order
+            schema: Schema from build_schema
+            converters: Converters from build_schema
+            
+        Returns:
+            Record batch
+        """
+        arrays = []
+        for index, field in enumerate(schema):
+            values = [row[index] for row in rows]
+            converter = converters[index]
+            if converter is not None:
+                values = [None if value is None else converter(value) for value in values]
+            arrays.append(pa.array(values, type=field.type))
+        
+        return pa.RecordBatch.from_arrays(arrays, schema=schema)
+    
+    def open_writer(self, description: Sequence[Any], export_format: str) -> 'ColumnarWriter':
+        """
+        Start an incremental Arrow IPC stream or Parquet file
+        
+        Args:
+            description: cursor.description of the exported query
+            export_format: 'arrow' or 'parquet'
+            
+        Returns:
+            Writer turning row batches into output chunks
+        """
+        if export_format not in COLUMNAR_MEDIA_TYPES:
+            raise ValueError(f"Unsupported export format: {export_format}")
+        
+        schema, converters = self.build_schema(description)
+        return ColumnarWriter(self, schema, converters, export_format)
+    
+    def _map_type(self, column: Any) -> Tuple[pa.DataType, Optional[Callable[[Any], Any]]]:
+        """Get the Arrow type and value converter for one column"""
+        type_code = column.type_code
+        
+        if type_code in PG_ARROW_TYPES:
+            return PG_ARROW_TYPES[type_code], None
+        
+        if type_code == NUMERIC_OID:
+            precision, scale = getattr(column, 'precision', None), getattr(column, 'scale', None)
+            if precision and precision <= 38:
+                return pa.decimal128(precision, scale or 0), None
+            return pa.float64(), float
+        
+        if type_code in JSON_OIDS:
+            return pa.string(), lambda value: json.dumps(value, default=str)
+        
+        return pa.string(), str
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only sink that hands out its bytes in chunks but keeps tell() absolute"""
+    
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+        self._position = 0
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+    
+    def tell(self) -> int:
+        # Parquet footers record absolute offsets, so this must not reset on drain
+        return self._position
+    
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class ColumnarWriter:
+    """Incremental writer returning encoded bytes after each batch"""
+    
+    def __init__(self, formatter: ArrowFormatter, schema: pa.Schema,
+                 converters: List[Optional[Callable[[Any], Any]]], export_format: str):
+        """
+        Initialize columnar writer
+        
+        Args:
+            formatter: Arrow formatter providing conversion and Parquet settings
+            schema: Arrow schema of the export
+            converters: Per-column value converters
+            export_format: 'arrow' or 'parquet'
+        """
+        self.formatter = formatter
+        self.schema = schema
+        self.converters = converters
+        self.export_format = export_format
+        self._sink = _ChunkSink()
+        self._pending: List[pa.RecordBatch] = []
+        self._pending_rows = 0
+        
+        if export_format == 'parquet':
+            self._writer = pq.ParquetWriter(self._sink, schema, compression=formatter.parquet_compression)
+        else:
+            options = pa.ipc.IpcWriteOptions(compression=formatter.ipc_compression)
+            self._writer = pa.ipc.new_stream(self._sink, schema, options=options)
+    
+    def write(self, rows: Sequence[Sequence[Any]]) -> bytes:
+        """
+        Encode a batch of rows
+        
+        Arrow IPC emits one record batch per call. Parquet buffers batches
+        until a row group is full, so some calls return no bytes.
+        
+        Args:
+            rows: Result rows as tuples
+            
+        Returns:
+            Encoded bytes ready to send (possibly empty)
+        """
+        if rows:
+            batch = self.formatter.to_record_batch(rows, self.schema, self.converters)
+            if self.export_format == 'parquet':
+                self._pending.append(batch)
+                self._pending_rows += batch.num_rows
+                if self._pending_rows >= self.formatter.parquet_row_group_size:
+                    self._flush_row_group()
+            else:
+                self._writer.write_batch(batch)
+        
+        return self._drain()
+    
+    def close(self) -> bytes:
+        """
+        Finish the stream (Parquet footer / IPC end-of-stream marker)
+        
+        Returns:
+            Remaining encoded bytes
+        """
+        if self._pending:
+            self._flush_row_group()
+        self._writer.close()
+        return self._drain()
+    
+    def _flush_row_group(self) -> None:
+        """Write buffered batches as one Parquet row group"""
+        table = pa.Table.from_batches(self._pending, schema=self.schema)
+        self._writer.write_table(table, row_group_size=table.num_rows)
+        self._pending = []
+        self._pending_rows = 0
+    
+    def _drain(self) -> bytes:
+        """Take the bytes written to the sink since the last drain"""
+        return self._sink.drain()
+
+
 # Global instances
 html_formatter = HTMLFormatter()
 csv_formatter = CSVFormatter()
 json_formatter = JSONFormatter()
+arrow_formatter = ArrowFormatter()
 
 
 def format_html_table(results: List[Dict[str, Any]], 
@@ -378,6 +637,12 @@ def stream_csv(results: List[Dict[str, Any]],
     return csv_formatter.stream_csv(results, metadata)
 
 
+def format_csv_chunk(rows: List[Dict[str, Any]], headers: List[str],
+                     include_header: bool = False) -> str:
+    """Format one batch of rows as CSV using global formatter"""
+    return csv_formatter.format_csv_chunk(rows, headers, include_header)
+
+
 def format_json(results: List[Dict[str, Any]], 
                metadata: Optional[Dict[str, Any]] = None,
                pretty: bool = True) -> str:
@@ -388,3 +653,8 @@ def format_json(results: List[Dict[str, Any]],
 def get_csv_filename(base_name: str = "export") -> str:
     """Get CSV filename using global formatter"""
     return csv_formatter.get_csv_filename(base_name)
+
+
+def open_columnar_writer(description: Sequence[Any], export_format: str) -> ColumnarWriter:
+    """Start an Arrow IPC / Parquet export using global formatter"""
+    return arrow_formatter.open_writer(description, export_format)
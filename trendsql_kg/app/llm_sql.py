@@ -9,22 +9,32 @@ from typing import Dict, List, Any, Optional, Tuple
 import openai
 from openai import OpenAI
 
+from .schema_prompt import get_schema_prompt
+from .sql_cache import SQLCache, normalize_prompt
+
 logger = logging.getLogger(__name__)
 
 
 class LLMSQLGenerator:
     """LLM-based SQL generator for TrendsQL-KG"""
     
-    def __init__(self, api_key: str, model: str = "gpt-4o-mini"):
+    def __init__(self, api_key: str, model: str = "gpt-4o-mini", schema_max_tokens: Optional[int] = None,
+                 embedding_model: Optional[str] = None, sql_cache: Optional[SQLCache] = None):
         """
         Initialize LLM SQL generator
         
         Args:
             api_key: OpenAI API key
             model: OpenAI model to use
+            schema_max_tokens: Token budget of the schema in each prompt (None: whole schema)
+            embedding_model: Embedding model used to rank tables by relevance (None: lexical ranking only)
+            sql_cache: Optional cache of generated SQL per prompt and schema version
         """
         self.client = OpenAI(api_key=api_key)
         self.model = model
+        self.schema_max_tokens = schema_max_tokens
+        self.embedding_model = embedding_model
+        self.sql_cache = sql_cache
         
         # System prompt for SQL generation
         self.system_prompt = """You are a SQL expert for a trend analysis database. 
@@ -46,25 +56,38 @@ Key rules:
 6. Use proper JOIN syntax when combining tables
 7. Include ORDER BY for ranking queries
 8. Use window functions for ranking when needed
+9. Filter on the exact spellings in a column's [values: ...] list and stay within its listed range
 
 Return only the SQL query, no explanations."""
     
     def generate_sql(self, prompt: str, schema_info: Dict[str, Any], 
-                    sample_data: Optional[Dict[str, List[Dict[str, Any]]]] = None) -> Tuple[str, Optional[str]]:
+                    sample_data: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+                    column_profiles: Optional[Dict[str, Dict[str, Dict[str, Any]]]] = None) -> Tuple[str, Optional[str], bool]:
         """
         Generate SQL from natural language prompt
         
+        The SQL cache is consulted first; a hit skips the LLM call.
+        
         Args:
             prompt: Natural language prompt
             schema_info: Database schema information
             sample_data: Optional sample data for context
+            column_profiles: Optional column value profiles shown next to the schema columns
             
         Returns:
-            Tuple of (sql_query, error_message)
+            Tuple of (sql_query, error_message, cache_hit)
         """
+        embedding = None
+        if self.sql_cache is not None:
+            schema_version = get_schema_prompt(schema_info, column_profiles).version
+            embedding = self._cache_embedding(prompt) if self.sql_cache.semantic else None
+            cached_sql = self.sql_cache.get(prompt, schema_version, self.model, embedding)
+            if cached_sql:
+                return cached_sql, None, True
+        
         try:
             # Build the user prompt
-            user_prompt = self._build_user_prompt(prompt, schema_info, sample_data)
+            user_prompt = self._build_user_prompt(prompt, schema_info, sample_data, column_profiles)
             
             # Call OpenAI API
             response = self.client.chat.completions.create(
@@ -84,40 +107,45 @@ Return only the SQL query, no explanations."""
             # Clean up SQL
             sql = self._clean_sql(sql)
             
-            return sql, None
+            # Cached as generated; callers safety-check every SQL, cached or not
+            if self.sql_cache is not None:
+                self.sql_cache.put(prompt, schema_version, self.model, sql, embedding)
+            
+            return sql, None, False
             
         except Exception as e:
             logger.error(f"SQL generation failed: {e}")
-            return "", str(e)
+            return "", str(e), False
     
-    def _build_user_prompt(self, prompt: str, schema_info: Dict[str, Any], 
-                          sample_data: Optional[Dict[str, List[Dict[str, Any]]]] = None) -> str:
-        """Build the user prompt for SQL generation"""
-        lines = []
+    def remember_sql(self, prompt: str, schema_info: Dict[str, Any], sql: Optional[str],
+                     column_profiles: Optional[Dict[str, Dict[str, Dict[str, Any]]]] = None) -> None:
+        """
+        Replace the cached SQL of a prompt after execution
         
-        # Add schema information
-        lines.append("Database Schema:")
-        lines.append("=" * 50)
+        Args:
+            prompt: Natural language prompt
+            schema_info: Database schema information the SQL was generated against
+            sql: Corrected SQL that executed, or None to drop SQL that failed
+            column_profiles: Column value profiles passed to generate_sql
+        """
+        if self.sql_cache is None:
+            return
         
-        for table in schema_info.get('tables', []):
-            lines.append(f"\nTable: {table['schema']}.{table['name']}")
-            if table.get('comment'):
-                lines.append(f"Description: {table['comment']}")
-            
-            lines.append("Columns:")
-            for col in table.get('columns', []):
-                nullable = "NULL" if col['is_nullable'] == 'YES' else "NOT NULL"
-                default = f" DEFAULT {col['column_default']}" if col['column_default'] else ""
-                comment = f" -- {col['comment']}" if col['comment'] else ""
-                lines.append(f"  {col['column_name']}: {col['data_type']} {nullable}{default}{comment}")
-            
-            if table.get('primary_key'):
-                lines.append(f"Primary Key: {', '.join(table['primary_key'])}")
-            
-            if table.get('foreign_keys'):
-                lines.append("Foreign Keys:")
-                for fk in table['foreign_keys']:
-                    lines.append(f"  {fk['column_name']} -> {fk['foreign_table_schema']}.{fk['foreign_table_name']}.{fk['foreign_column_name']}")
+        schema_version = get_schema_prompt(schema_info, column_profiles).version
+        if sql is None:
+            self.sql_cache.forget(prompt, schema_version, self.model)
+        else:
+            embedding = self._cache_embedding(prompt) if self.sql_cache.semantic else None
+            self.sql_cache.put(prompt, schema_version, self.model, sql, embedding)
+    
+    def _build_user_prompt(self, prompt: str, schema_info: Dict[str, Any], 
+                          sample_data: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+                          column_profiles: Optional[Dict[str, Dict[str, Dict[str, Any]]]] = None) -> str:
+        """Build the user prompt for SQL generation"""
+        # Add schema information with column value profiles, pruned to the tables relevant to the prompt
+        embed = self.embed_texts if self.embedding_model else None
+        schema_prompt = get_schema_prompt(schema_info, column_profiles)
+        lines = [schema_prompt.render(prompt, self.schema_max_tokens, embed)]
         
         # Add sample data if provided
         if sample_data:
@@ -135,6 +163,19 @@ Return only the SQL query, no explanations."""
         
         return "\n".join(lines)
     
+    def embed_texts(self, texts: List[str], model: Optional[str] = None) -> List[List[float]]:
+        """Embed texts with the given or the configured embedding model"""
+        response = self.client.embeddings.create(model=model or self.embedding_model, input=texts)
+        return [item.embedding for item in response.data]
+    
+    def _cache_embedding(self, prompt: str) -> Optional[List[float]]:
+        """Embed a prompt for the SQL cache similarity tier (None on failure: exact matches only)"""
+        try:
+            return self.embed_texts([normalize_prompt(prompt)], self.sql_cache.embedding_model)[0]
+        except Exception as e:
+            logger.warning(f"Prompt embedding failed, SQL cache limited to exact matches: {e}")
+            return None
+    
     def _clean_sql(self, sql: str) -> str:
         """Clean and normalize generated SQL"""
         # Remove markdown code blocks
@@ -273,19 +314,30 @@ Explain what this query does, what tables it uses, and what results it will retu
 llm_sql_generator = None
 
 
-def init_llm_sql_generator(api_key: str, model: str = "gpt-4o-mini") -> None:
+def init_llm_sql_generator(api_key: str, model: str = "gpt-4o-mini", schema_max_tokens: Optional[int] = None,
+                           embedding_model: Optional[str] = None, sql_cache: Optional[SQLCache] = None) -> None:
     """Initialize global LLM SQL generator"""
     global llm_sql_generator
-    llm_sql_generator = LLMSQLGenerator(api_key, model)
+    llm_sql_generator = LLMSQLGenerator(api_key, model, schema_max_tokens, embedding_model, sql_cache)
 
 
 def generate_sql(prompt: str, schema_info: Dict[str, Any], 
-                sample_data: Optional[Dict[str, List[Dict[str, Any]]]] = None) -> Tuple[str, Optional[str]]:
+                sample_data: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+                column_profiles: Optional[Dict[str, Dict[str, Dict[str, Any]]]] = None) -> Tuple[str, Optional[str], bool]:
     """Generate SQL using global LLM SQL generator"""
     if llm_sql_generator is None:
         raise RuntimeError("LLM SQL generator not initialized")
     
-    return llm_sql_generator.generate_sql(prompt, schema_info, sample_data)
+    return llm_sql_generator.generate_sql(prompt, schema_info, sample_data, column_profiles)
+
+
+def remember_sql(prompt: str, schema_info: Dict[str, Any], sql: Optional[str],
+                 column_profiles: Optional[Dict[str, Dict[str, Dict[str, Any]]]] = None) -> None:
+    """Update the cached SQL of a prompt using global LLM SQL generator"""
+    if llm_sql_generator is None:
+        raise RuntimeError("LLM SQL generator not initialized")
+    
+    llm_sql_generator.remember_sql(prompt, schema_info, sql, column_profiles)
 
 
 def validate_sql(sql: str) -> Tuple[bool, Optional[str]]:
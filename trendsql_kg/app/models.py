@@ -25,6 +25,13 @@ class CitationType(str, Enum):
     URL = "url"
 
 
+class CountMode(str, Enum):
+    """How paginated totals are computed"""
+    EXACT = "exact"
+    ESTIMATE = "estimate"
+    AUTO = "auto"
+
+
 class Citation(BaseModel):
     """Citation model for answer provenance"""
     type: CitationType
@@ -68,16 +75,21 @@ class SQLRequest(BaseModel):
     execute: bool = Field(False, description="Execute the generated SQL")
     page: int = Field(1, ge=1, description="Page number")
     page_size: int = Field(50, ge=1, le=1000, description="Page size")
+    cursor: Optional[str] = Field(None, description="next_cursor from a previous page (overrides page)")
+    count_mode: CountMode = Field(CountMode.EXACT, description="How total_rows is computed")
 
 
 class SQLResponse(BaseModel):
     """SQL generation response"""
     sql: str
+    cache_hit: bool = False
     executed: bool
     results: Optional[List[Dict[str, Any]]] = None
     total_rows: Optional[int] = None
+    count_mode: Optional[CountMode] = None
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
     execution_time: Optional[float] = None
     error: Optional[str] = None
 
@@ -88,12 +100,27 @@ class HTMLRequest(BaseModel):
     page: int = Field(1, ge=1, description="Page number")
     page_size: int = Field(50, ge=1, le=1000, description="Page size")
     include_metadata: bool = Field(True, description="Include metadata in HTML")
+    count_mode: CountMode = Field(CountMode.EXACT, description="How the total row count is computed")
 
 
 class CSVRequest(BaseModel):
     """CSV download request"""
     sql: str = Field(..., description="SQL query to execute")
     filename: Optional[str] = Field(None, description="CSV filename")
+    fast: bool = Field(False, description="Let PostgreSQL format the CSV (COPY TO STDOUT); values use PostgreSQL text output")
+
+
+class ExportFormat(str, Enum):
+    """Columnar export formats"""
+    ARROW = "arrow"
+    PARQUET = "parquet"
+
+
+class ExportRequest(BaseModel):
+    """Columnar export request"""
+    sql: str = Field(..., description="SQL query to execute")
+    format: ExportFormat = Field(ExportFormat.ARROW, description="Arrow IPC stream or Parquet file")
+    filename: Optional[str] = Field(None, description="Base filename (extension added)")
 
 
 class HealthResponse(BaseModel):
@@ -3,25 +3,95 @@ Pagination Module for TrendsQL-KG
 Handles LIMIT/OFFSET pagination and row counting
 """
 
+import os
+import re
+import json
+import base64
+import hashlib
 import logging
+from datetime import date, datetime
+from decimal import Decimal
 from typing import Dict, List, Any, Optional, Tuple
 import psycopg
 from psycopg.rows import dict_row
 
+from .database import AsyncDatabase
+from .cache import ResultCache, get_data_versions, get_data_versions_async
+
 logger = logging.getLogger(__name__)
 
+# Column carrying COUNT(*) OVER () in single round-trip pagination
+TOTAL_COUNT_COLUMN = "__total_count"
+
+# How totals are produced: exact COUNT(*), planner estimate, or estimate
+# first falling back to an exact count below the auto threshold
+COUNT_MODES = ('exact', 'estimate', 'auto')
+
+# A plain (optionally qualified) output column with an optional direction
+ORDER_TERM_PATTERN = re.compile(
+    r'^(?:(?:[A-Za-z_]\w*|"[^"]+")\.)?([A-Za-z_]\w*|"[^"]+")(?:\s+(ASC|DESC))?$',
+    re.IGNORECASE
+)
+
+# A plain (optionally qualified) column or star in a SELECT list
+SELECT_TERM_PATTERN = re.compile(r'^(?:(?:[A-Za-z_]\w*|"[^"]+")\.)?(?:[A-Za-z_]\w*|"[^"]+"|\*)$')
+
+# A single (optionally schema-qualified and aliased) table in FROM
+FROM_TABLE_PATTERN = re.compile(
+    r'^((?:[A-Za-z_]\w*|"[^"]+")(?:\.(?:[A-Za-z_]\w*|"[^"]+"))?)(?:\s+(?:AS\s+)?[A-Za-z_]\w*)?$',
+    re.IGNORECASE
+)
+
+# Whether the given columns cover every key column of a unique, non-partial,
+# non-expression index of the table, and whether all of them are NOT NULL
+KEYSET_KEYS_SQL = """
+SELECT
+    EXISTS (
+        SELECT 1
+        FROM pg_index i
+        WHERE i.indrelid = t.oid
+          AND i.indisunique
+          AND i.indpred IS NULL
+          AND i.indexprs IS NULL
+          AND NOT EXISTS (
+              SELECT 1
+              FROM unnest(i.indkey::int2[]) WITH ORDINALITY AS k(attnum, ord)
+              JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = k.attnum
+              WHERE k.ord <= i.indnkeyatts AND a.attname <> ALL(%(columns)s::name[])
+          )
+    ) AS unique_key,
+    (
+        SELECT count(*)
+        FROM pg_attribute a
+        WHERE a.attrelid = t.oid AND a.attnum > 0 AND NOT a.attisdropped
+          AND a.attnotnull AND a.attname = ANY(%(columns)s::name[])
+    ) = cardinality(%(columns)s::name[]) AS not_null
+FROM (SELECT to_regclass(%(table)s) AS oid) AS t
+"""
+
 
 class PaginationHelper:
     """Pagination helper for SQL queries"""
     
-    def __init__(self, db_connection_string: str):
+    def __init__(self, db_connection_string: str, database: Optional[AsyncDatabase] = None,
+                 single_round_trip: bool = True, auto_count_threshold: int = 100000,
+                 result_cache: Optional[ResultCache] = None):
         """
         Initialize pagination helper
         
         Args:
             db_connection_string: PostgreSQL connection string
+            database: Optional async database for the non-blocking execution path
+            single_round_trip: Return rows and total from one windowed statement
+            auto_count_threshold: In auto count mode, planner estimates below
+                this are replaced by an exact count
+            result_cache: Optional cache of result pages
         """
         self.db_connection_string = db_connection_string
+        self.database = database
+        self.single_round_trip = single_round_trip
+        self.auto_count_threshold = auto_count_threshold
+        self.result_cache = result_cache
     
     def add_pagination(self, sql: str, page: int = 1, page_size: int = 50) -> str:
         """
@@ -77,39 +147,613 @@ class PaginationHelper:
             logger.error(f"Failed to get total count: {e}")
             return 0
     
-    def execute_paginated_query(self, sql: str, page: int = 1, page_size: int = 50) -> Tuple[List[Dict[str, Any]], int, Dict[str, Any]]:
+    def execute_paginated_query(self, sql: str, page: int = 1, page_size: int = 50,
+                                cursor: Optional[str] = None,
+                                count_mode: str = 'exact') -> Tuple[List[Dict[str, Any]], Optional[int], Dict[str, Any]]:
         """
         Execute a paginated query and return results with metadata
         
+        Uses a single windowed statement when the SQL allows it, otherwise
+        runs the COUNT and page queries on one connection. With a cursor the
+        page after it is fetched by key and no total is computed.
+        
         Args:
             sql: SQL query to execute
             page: Page number (1-based)
             page_size: Number of rows per page
+            cursor: Optional next_cursor from a previous page
+            count_mode: 'exact', 'estimate' (planner rows) or 'auto'
             
         Returns:
-            Tuple of (results, total_count, metadata)
+            Tuple of (results, total_count, metadata); metadata['count_mode']
+            says whether the total is exact or an estimate
+            
+        Raises:
+            ValueError: If the cursor or count mode is invalid
+            psycopg.Error: If the query fails to execute, so callers can tell
+                a failed query from an empty result
         """
+        self._validate_count_mode(count_mode)
+        order_keys = self.parse_order_by(sql)
+        cursor_values = self.decode_cursor(sql, order_keys, cursor) if cursor else None
+        
+        cache_key = ResultCache.make_key(sql, page, page_size, cursor, count_mode)
+        
         try:
-            # Get total count first
-            total_count = self.get_total_count(sql)
-            
-            # Add pagination to query
-            paginated_sql = self.add_pagination(sql, page, page_size)
-            
-            # Execute paginated query
             with psycopg.connect(self.db_connection_string) as conn:
+                versions = get_data_versions(conn) if self.result_cache else None
+                cached = self.result_cache.get(cache_key, versions) if self.result_cache else None
+                if cached is not None:
+                    return self._from_cached(cached)
+                
                 with conn.cursor(row_factory=dict_row) as cur:
-                    cur.execute(paginated_sql)
-                    results = cur.fetchall()
+                    estimate = None
+                    if cursor_values is None and count_mode != 'exact':
+                        estimate = self._accept_estimate(count_mode, self._estimate_with_cursor(cur, sql))
+                    
+                    if cursor_values is not None:
+                        cur.execute(*self.add_keyset_pagination(sql, order_keys, cursor_values, page_size))
+                        results = cur.fetchall()
+                        total_count = None
+                    elif estimate is not None:
+                        total_count = estimate
+                        cur.execute(self.add_pagination(sql, page, page_size))
+                        results = cur.fetchall()
+                    elif self._use_window_count(sql):
+                        cur.execute(self._create_windowed_query(sql, page, page_size))
+                        results, total_count = self._split_window_count(cur.fetchall())
+                        
+                        # An empty page past the end carries no count
+                        if total_count is None:
+                            total_count = 0 if page <= 1 else self._count_with_cursor(cur, sql)
+                    else:
+                        total_count = self._count_with_cursor(cur, sql)
+                        cur.execute(self.add_pagination(sql, page, page_size))
+                        results = cur.fetchall()
+                    
+                    next_cursor = self._next_cursor(cur, sql, order_keys, results, page_size)
             
             # Calculate metadata
             metadata = self._calculate_pagination_metadata(page, page_size, total_count, len(results))
+            metadata['count_mode'] = self._result_count_mode(total_count, estimate)
+            metadata['next_cursor'] = next_cursor
+            
+            if self.result_cache:
+                self.result_cache.put(cache_key, sql, [results, total_count, metadata], versions)
+            
+            return results, total_count, dict(metadata)
+            
+        except Exception as e:
+            logger.error(f"Failed to execute paginated query: {e}")
+            raise
+    
+    async def get_total_count_async(self, sql: str) -> int:
+        """
+        Get total count of rows for a query without blocking the event loop
+        
+        Args:
+            sql: SQL query to count
+            
+        Returns:
+            Total number of rows
+        """
+        try:
+            count_sql = self._create_count_query(sql)
+            total = await self._get_database().fetch_value(count_sql)
+            return total or 0
+            
+        except Exception as e:
+            logger.error(f"Failed to get total count: {e}")
+            return 0
+    
+    async def execute_paginated_query_async(self, sql: str, page: int = 1, page_size: int = 50,
+                                            cursor: Optional[str] = None,
+                                            count_mode: str = 'exact') -> Tuple[List[Dict[str, Any]], Optional[int], Dict[str, Any]]:
+        """
+        Execute a paginated query on the async connection pool
+        
+        Args:
+            sql: SQL query to execute
+            page: Page number (1-based)
+            page_size: Number of rows per page
+            cursor: Optional next_cursor from a previous page
+            count_mode: 'exact', 'estimate' (planner rows) or 'auto'
+            
+        Returns:
+            Tuple of (results, total_count, metadata)
+            
+        Raises:
+            ValueError: If the cursor or count mode is invalid
+            psycopg.Error: If the query fails to execute, so callers can tell
+                a failed query from an empty result
+        """
+        self._validate_count_mode(count_mode)
+        order_keys = self.parse_order_by(sql)
+        cursor_values = self.decode_cursor(sql, order_keys, cursor) if cursor else None
+        
+        cache_key = ResultCache.make_key(sql, page, page_size, cursor, count_mode)
+        
+        try:
+            async with self._get_database().connection() as conn:
+                versions = await get_data_versions_async(conn) if self.result_cache else None
+                cached = self.result_cache.get(cache_key, versions) if self.result_cache else None
+                if cached is not None:
+                    return self._from_cached(cached)
+                
+                async with conn.cursor(row_factory=dict_row) as cur:
+                    estimate = None
+                    if cursor_values is None and count_mode != 'exact':
+                        estimate = self._accept_estimate(count_mode, await self._estimate_with_cursor_async(cur, sql))
+                    
+                    if cursor_values is not None:
+                        await cur.execute(*self.add_keyset_pagination(sql, order_keys, cursor_values, page_size))
+                        results = await cur.fetchall()
+                        total_count = None
+                    elif estimate is not None:
+                        total_count = estimate
+                        await cur.execute(self.add_pagination(sql, page, page_size))
+                        results = await cur.fetchall()
+                    elif self._use_window_count(sql):
+                        await cur.execute(self._create_windowed_query(sql, page, page_size))
+                        results, total_count = self._split_window_count(await cur.fetchall())
+                        
+                        # An empty page past the end carries no count
+                        if total_count is None:
+                            total_count = 0 if page <= 1 else await self._count_with_cursor_async(cur, sql)
+                    else:
+                        total_count = await self._count_with_cursor_async(cur, sql)
+                        await cur.execute(self.add_pagination(sql, page, page_size))
+                        results = await cur.fetchall()
+                    
+                    next_cursor = await self._next_cursor_async(cur, sql, order_keys, results, page_size)
+            
+            metadata = self._calculate_pagination_metadata(page, page_size, total_count, len(results))
+            metadata['count_mode'] = self._result_count_mode(total_count, estimate)
+            metadata['next_cursor'] = next_cursor
+            
+            if self.result_cache:
+                self.result_cache.put(cache_key, sql, [results, total_count, metadata], versions)
             
-            return results, total_count, metadata
+            return results, total_count, dict(metadata)
             
         except Exception as e:
             logger.error(f"Failed to execute paginated query: {e}")
-            return [], 0, {}
+            raise
+    
+    def parse_order_by(self, sql: str) -> Optional[List[Tuple[str, str]]]:
+        """
+        Parse the top-level ORDER BY into (output column, direction) pairs
+        
+        Args:
+            sql: SQL query
+            
+        Returns:
+            Ordering keys, or None when the ordering cannot drive keyset
+            pagination (no ORDER BY, expressions, ordinals, NULLS FIRST/LAST)
+        """
+        base_sql = self._strip_limit_offset(sql)
+        order_pos = self._find_top_level_keyword(base_sql, 'ORDER BY')
+        if order_pos == -1:
+            return None
+        
+        clause = re.sub(r'^ORDER\s+BY\s+', '', base_sql[order_pos:], flags=re.IGNORECASE)
+        keys = []
+        for term in self._split_top_level(clause):
+            match = ORDER_TERM_PATTERN.match(term.strip())
+            if not match:
+                return None
+            column, direction = match.group(1), (match.group(2) or 'ASC').upper()
+            column = column[1:-1] if column.startswith('"') else column.lower()
+            keys.append((column, direction))
+        
+        return keys or None
+    
+    def encode_cursor(self, sql: str, order_keys: Optional[List[Tuple[str, str]]], last_row: Dict[str, Any]) -> Optional[str]:
+        """
+        Build an opaque cursor token from the last row of a page
+        
+        Args:
+            sql: SQL query the page came from
+            order_keys: Ordering keys from parse_order_by
+            last_row: Last row of the page
+            
+        Returns:
+            Cursor token, or None if a key column is missing or NULL
+        """
+        if not order_keys or not last_row:
+            return None
+        
+        values = []
+        for column, _ in order_keys:
+            if column not in last_row or last_row[column] is None:
+                return None
+            values.append(self._encode_cursor_value(last_row[column]))
+        
+        payload = {'s': self._query_signature(sql, order_keys), 'k': values}
+        raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+    
+    def decode_cursor(self, sql: str, order_keys: Optional[List[Tuple[str, str]]], cursor: str) -> List[Any]:
+        """
+        Decode a cursor token into ordering key values
+        
+        Args:
+            sql: SQL query being paged
+            order_keys: Ordering keys from parse_order_by
+            cursor: Cursor token
+            
+        Returns:
+            Key values of the last row of the previous page
+            
+        Raises:
+            ValueError: If the token is malformed or belongs to another query
+        """
+        if not order_keys or self._keyset_table(sql) is None:
+            raise ValueError("Cursor pagination requires an ORDER BY on columns of one table")
+        
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            values = [self._decode_cursor_value(v) for v in payload['k']]
+            signature = payload['s']
+        except Exception:
+            raise ValueError("Invalid pagination cursor")
+        
+        if signature != self._query_signature(sql, order_keys) or len(values) != len(order_keys):
+            raise ValueError("Pagination cursor does not match this query")
+        
+        return values
+    
+    def add_keyset_pagination(self, sql: str, order_keys: List[Tuple[str, str]], cursor_values: List[Any],
+                              page_size: int = 50) -> Tuple[str, List[Any]]:
+        """
+        Rewrite SQL to fetch the page after a cursor
+        
+        The predicate is pushed into the subquery by the planner, so an index
+        on the ordering columns serves any page depth in constant time.
+        
+        Args:
+            sql: Original SQL query
+            order_keys: Ordering keys from parse_order_by
+            cursor_values: Decoded cursor values
+            page_size: Number of rows per page
+            
+        Returns:
+            Tuple of (sql, params); literal % signs in the SQL are escaped
+        """
+        if page_size < 1:
+            page_size = 50
+        
+        base_sql = self._strip_limit_offset(sql)
+        order_pos = self._find_top_level_keyword(base_sql, 'ORDER BY')
+        if order_pos != -1:
+            base_sql = base_sql[:order_pos].rstrip()
+        
+        base_sql = base_sql.replace('%', '%%')
+        columns = [f'"{column}"' for column, _ in order_keys]
+        order_clause = ", ".join(f'{col} {direction}' for col, (_, direction) in zip(columns, order_keys))
+        directions = {direction for _, direction in order_keys}
+        
+        if len(directions) == 1:
+            # Uniform direction: a row comparison matches a composite index
+            op = '>' if directions == {'ASC'} else '<'
+            predicate = f"({', '.join(columns)}) {op} ({', '.join(['%s'] * len(columns))})"
+            params = list(cursor_values)
+        else:
+            # Mixed directions: (k1 > v1) OR (k1 = v1 AND k2 < v2) ...
+            clauses = []
+            params = []
+            for i, (_, direction) in enumerate(order_keys):
+                op = '>' if direction == 'ASC' else '<'
+                parts = [f"{columns[j]} = %s" for j in range(i)] + [f"{columns[i]} {op} %s"]
+                clauses.append("(" + " AND ".join(parts) + ")")
+                params.extend(cursor_values[:i + 1])
+            predicate = "(" + " OR ".join(clauses) + ")"
+        
+        keyset_sql = (
+            f"SELECT * FROM ({base_sql}) AS keyset_page "
+            f"WHERE {predicate} ORDER BY {order_clause} LIMIT {page_size}"
+        )
+        return keyset_sql, params
+    
+    def _next_cursor(self, cur, sql: str, order_keys: Optional[List[Tuple[str, str]]],
+                     results: List[Dict[str, Any]], page_size: int) -> Optional[str]:
+        """Issue a cursor only when a full page suggests more rows follow and keys cannot skip rows"""
+        params = self._keyset_check_params(sql, order_keys, results, page_size)
+        if params is None:
+            return None
+        cur.execute(KEYSET_KEYS_SQL, params)
+        if not self._keyset_supported(cur.fetchone()):
+            return None
+        return self.encode_cursor(sql, order_keys, results[-1])
+    
+    async def _next_cursor_async(self, cur, sql: str, order_keys: Optional[List[Tuple[str, str]]],
+                                 results: List[Dict[str, Any]], page_size: int) -> Optional[str]:
+        """Issue a cursor on an already open async cursor, see _next_cursor"""
+        params = self._keyset_check_params(sql, order_keys, results, page_size)
+        if params is None:
+            return None
+        await cur.execute(KEYSET_KEYS_SQL, params)
+        if not self._keyset_supported(await cur.fetchone()):
+            return None
+        return self.encode_cursor(sql, order_keys, results[-1])
+    
+    def _keyset_check_params(self, sql: str, order_keys: Optional[List[Tuple[str, str]]],
+                             results: List[Dict[str, Any]], page_size: int) -> Optional[Dict[str, Any]]:
+        """
+        Parameters of the catalog check run before issuing a cursor
+        
+        Returns None when no cursor can be issued without asking the
+        database: a short page, no usable ORDER BY or not a plain
+        single-table query.
+        """
+        if not results or len(results) < page_size or not order_keys:
+            return None
+        table = self._keyset_table(sql)
+        if table is None:
+            return None
+        return {'table': table, 'columns': list(dict.fromkeys(column for column, _ in order_keys))}
+    
+    def _keyset_supported(self, row: Any) -> bool:
+        """
+        Check the catalog answer for a keyset ordering
+        
+        The ORDER BY must include every column of a unique index and only NOT
+        NULL columns: rows tied with the last row of a page fail the strict
+        row comparison, and NULL keys never satisfy it, so either would make
+        a cursor silently skip rows.
+        """
+        if not row:
+            return False
+        values = list(row.values()) if isinstance(row, dict) else row
+        return bool(values[0] and values[1])
+    
+    def _keyset_table(self, sql: str) -> Optional[str]:
+        """
+        Find the table a keyset cursor would page through
+        
+        Args:
+            sql: SQL query
+            
+        Returns:
+            Table name for a plain projection of one table, whose output
+            columns keep the table's unique and NOT NULL constraints; None for
+            joins, grouping, DISTINCT, set operations, CTEs and computed or
+            renamed columns
+        """
+        base_sql = self._strip_limit_offset(sql)
+        order_pos = self._find_top_level_keyword(base_sql, 'ORDER BY')
+        if order_pos != -1:
+            base_sql = base_sql[:order_pos].rstrip()
+        
+        if not re.match(r'^SELECT\s', base_sql, re.IGNORECASE):
+            return None
+        for keyword in ('GROUP BY', 'HAVING', 'WINDOW', 'UNION', 'INTERSECT', 'EXCEPT'):
+            if self._find_top_level_keyword(base_sql, keyword) != -1:
+                return None
+        
+        from_pos = self._find_top_level_keyword(base_sql, 'FROM')
+        if from_pos == -1:
+            return None
+        select_list = re.sub(r'^SELECT\s+', '', base_sql[:from_pos], flags=re.IGNORECASE)
+        if not all(SELECT_TERM_PATTERN.match(term) for term in self._split_top_level(select_list)):
+            return None
+        
+        from_clause = re.sub(r'^FROM\s+', '', base_sql[from_pos:], flags=re.IGNORECASE)
+        where_pos = self._find_top_level_keyword(from_clause, 'WHERE')
+        if where_pos != -1:
+            from_clause = from_clause[:where_pos]
+        match = FROM_TABLE_PATTERN.match(from_clause.strip())
+        return match.group(1) if match else None
+    
+    def _query_signature(self, sql: str, order_keys: List[Tuple[str, str]]) -> str:
+        """Fingerprint the query a cursor belongs to"""
+        normalized = re.sub(r'\s+', ' ', self._strip_limit_offset(sql)).strip().lower()
+        normalized += '|' + ','.join(f'{col} {direction}' for col, direction in order_keys)
+        return hashlib.sha1(normalized.encode('utf-8')).hexdigest()[:16]
+    
+    def _encode_cursor_value(self, value: Any) -> Any:
+        """Encode a key value as JSON, tagging types JSON cannot carry"""
+        if isinstance(value, datetime):
+            return {'t': 'datetime', 'v': value.isoformat()}
+        if isinstance(value, date):
+            return {'t': 'date', 'v': value.isoformat()}
+        if isinstance(value, Decimal):
+            return {'t': 'decimal', 'v': str(value)}
+        return value
+    
+    def _decode_cursor_value(self, value: Any) -> Any:
+        """Decode a key value encoded by _encode_cursor_value"""
+        if isinstance(value, dict):
+            kind, raw = value.get('t'), value.get('v')
+            if kind == 'datetime':
+                return datetime.fromisoformat(raw)
+            if kind == 'date':
+                return date.fromisoformat(raw)
+            if kind == 'decimal':
+                return Decimal(raw)
+            raise ValueError(f"Unknown cursor value type: {kind}")
+        return value
+    
+    def _find_top_level_keyword(self, sql: str, keyword: str) -> int:
+        """Find the last occurrence of a keyword outside parentheses and quotes"""
+        pattern = re.compile(r'\b' + keyword.replace(' ', r'\s+') + r'\b', re.IGNORECASE)
+        top_level = set()
+        depth = 0
+        in_quote = None
+        for i, ch in enumerate(sql):
+            if in_quote:
+                if ch == in_quote:
+                    in_quote = None
+            elif ch in ("'", '"'):
+                in_quote = ch
+            elif ch == '(':
+                depth += 1
+            elif ch == ')':
+                depth -= 1
+            elif depth == 0:
+                top_level.add(i)
+        
+        position = -1
+        for match in pattern.finditer(sql):
+            if match.start() in top_level:
+                position = match.start()
+        return position
+    
+    def _split_top_level(self, text: str, separator: str = ',') -> List[str]:
+        """Split text on a separator that is not inside parentheses or quotes"""
+        parts = []
+        current = []
+        depth = 0
+        in_quote = None
+        for ch in text:
+            if in_quote:
+                if ch == in_quote:
+                    in_quote = None
+            elif ch in ("'", '"'):
+                in_quote = ch
+            elif ch == '(':
+                depth += 1
+            elif ch == ')':
+                depth -= 1
+            elif ch == separator and depth == 0:
+                parts.append(''.join(current).strip())
+                current = []
+                continue
+            current.append(ch)
+        parts.append(''.join(current).strip())
+        return parts
+    
+    def _strip_limit_offset(self, sql: str) -> str:
+        """Remove a trailing top-level LIMIT/OFFSET clause"""
+        sql = sql.strip().rstrip(';').rstrip()
+        for keyword in ('LIMIT', 'OFFSET'):
+            pos = self._find_top_level_keyword(sql, keyword)
+            if pos != -1:
+                sql = sql[:pos].rstrip()
+        return sql
+    
+    def _get_database(self) -> AsyncDatabase:
+        """Get the async database, failing loudly if it was not configured"""
+        if self.database is None:
+            raise RuntimeError("Async database not configured for pagination helper")
+        return self.database
+    
+    def _use_window_count(self, sql: str) -> bool:
+        """
+        Check whether the query can be paged with a single windowed statement
+        
+        The query must be a plain SELECT/WITH that can be wrapped as a
+        subquery and must not already produce the total-count column.
+        """
+        if not self.single_round_trip:
+            return False
+        
+        sql_upper = sql.upper().strip()
+        if not sql_upper.startswith(('SELECT', 'WITH')):
+            return False
+        
+        if TOTAL_COUNT_COLUMN.upper() in sql_upper:
+            return False
+        
+        return True
+    
+    def _create_windowed_query(self, sql: str, page: int = 1, page_size: int = 50) -> str:
+        """
+        Wrap a query so one statement returns the page rows and the total
+        
+        COUNT(*) OVER () is evaluated over the whole subquery before
+        LIMIT/OFFSET apply, so every returned row carries the full total. An
+        empty window needs no sort, so the subquery's ORDER BY is preserved.
+        """
+        if page < 1:
+            page = 1
+        if page_size < 1:
+            page_size = 50
+        
+        offset = (page - 1) * page_size
+        base_sql = self._remove_existing_pagination(sql)
+        
+        return (
+            f"SELECT paginated_subquery.*, COUNT(*) OVER () AS {TOTAL_COUNT_COLUMN} "
+            f"FROM ({base_sql}) AS paginated_subquery "
+            f"LIMIT {page_size} OFFSET {offset}"
+        )
+    
+    def _split_window_count(self, rows: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """Strip the total-count column from windowed rows and return the total"""
+        if not rows:
+            return rows, None
+        
+        total_count = rows[0][TOTAL_COUNT_COLUMN]
+        for row in rows:
+            del row[TOTAL_COUNT_COLUMN]
+        
+        return rows, total_count
+    
+    def _count_with_cursor(self, cur, sql: str) -> int:
+        """Run the COUNT query on an already open cursor"""
+        cur.execute(self._create_count_query(sql))
+        row = cur.fetchone()
+        if not row:
+            return 0
+        return next(iter(row.values())) if isinstance(row, dict) else row[0]
+    
+    async def _count_with_cursor_async(self, cur, sql: str) -> int:
+        """Run the COUNT query on an already open async cursor"""
+        await cur.execute(self._create_count_query(sql))
+        row = await cur.fetchone()
+        if not row:
+            return 0
+        return next(iter(row.values())) if isinstance(row, dict) else row[0]
+    
+    def _from_cached(self, cached: List[Any]) -> Tuple[List[Dict[str, Any]], Optional[int], Dict[str, Any]]:
+        """Unpack a cached page; metadata is copied since callers annotate it"""
+        results, total_count, metadata = cached
+        return results, total_count, dict(metadata)
+    
+    def _validate_count_mode(self, count_mode: str) -> None:
+        """Reject unknown count modes before touching the database"""
+        if count_mode not in COUNT_MODES:
+            raise ValueError(f"Unknown count mode: {count_mode}")
+    
+    def _create_estimate_query(self, sql: str) -> str:
+        """Create an EXPLAIN query whose top plan node carries the row estimate"""
+        return f"EXPLAIN (FORMAT JSON) {self._strip_limit_offset(sql)}"
+    
+    def _parse_plan_rows(self, row: Any) -> int:
+        """Extract 'Plan Rows' from an EXPLAIN (FORMAT JSON) result row"""
+        plan = next(iter(row.values())) if isinstance(row, dict) else row[0]
+        if isinstance(plan, (str, bytes)):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+    
+    def _estimate_with_cursor(self, cur, sql: str) -> int:
+        """Get the planner row estimate on an already open cursor"""
+        cur.execute(self._create_estimate_query(sql))
+        return self._parse_plan_rows(cur.fetchone())
+    
+    async def _estimate_with_cursor_async(self, cur, sql: str) -> int:
+        """Get the planner row estimate on an already open async cursor"""
+        await cur.execute(self._create_estimate_query(sql))
+        return self._parse_plan_rows(await cur.fetchone())
+    
+    def _accept_estimate(self, count_mode: str, estimate: int) -> Optional[int]:
+        """
+        Decide whether a planner estimate is reported as the total
+        
+        Returns the estimate, or None when an exact count should be run
+        instead (auto mode with an estimate below the threshold).
+        """
+        if count_mode == 'auto' and estimate < self.auto_count_threshold:
+            return None
+        return estimate
+    
+    def _result_count_mode(self, total_count: Optional[int], estimate: Optional[int]) -> Optional[str]:
+        """Name the method that produced total_count"""
+        if total_count is None:
+            return None
+        return 'estimate' if estimate is not None else 'exact'
     
     def _remove_existing_pagination(self, sql: str) -> str:
         """Remove existing LIMIT/OFFSET from SQL query"""
@@ -155,8 +799,18 @@ class PaginationHelper:
         
         return count_sql.strip()
     
-    def _calculate_pagination_metadata(self, page: int, page_size: int, total_count: int, result_count: int) -> Dict[str, Any]:
+    def _calculate_pagination_metadata(self, page: int, page_size: int, total_count: Optional[int], result_count: int) -> Dict[str, Any]:
         """Calculate pagination metadata"""
+        if total_count is None:
+            # Cursor pages: the total is not computed
+            return {
+                'page': None,
+                'page_size': page_size,
+                'total_count': None,
+                'result_count': result_count,
+                'has_next': result_count >= page_size
+            }
+        
         total_pages = (total_count + page_size - 1) // page_size if total_count > 0 else 0
         
         return {
@@ -235,10 +889,15 @@ class PaginatedResponse:
 pagination_helper = None
 
 
-def init_pagination_helper(db_connection_string: str) -> None:
+def init_pagination_helper(db_connection_string: str, database: Optional[AsyncDatabase] = None,
+                           result_cache: Optional[ResultCache] = None) -> None:
     """Initialize global pagination helper"""
     global pagination_helper
-    pagination_helper = PaginationHelper(db_connection_string)
+    pagination_helper = PaginationHelper(
+        db_connection_string, database,
+        auto_count_threshold=int(os.getenv("COUNT_AUTO_THRESHOLD", "100000")),
+        result_cache=result_cache
+    )
 
 
 def add_pagination(sql: str, page: int = 1, page_size: int = 50) -> str:
@@ -257,12 +916,24 @@ def get_total_count(sql: str) -> int:
     return pagination_helper.get_total_count(sql)
 
 
-def execute_paginated_query(sql: str, page: int = 1, page_size: int = 50) -> Tuple[List[Dict[str, Any]], int, Dict[str, Any]]:
+def execute_paginated_query(sql: str, page: int = 1, page_size: int = 50,
+                            cursor: Optional[str] = None,
+                            count_mode: str = 'exact') -> Tuple[List[Dict[str, Any]], Optional[int], Dict[str, Any]]:
     """Execute paginated query using global helper"""
     if pagination_helper is None:
         raise RuntimeError("Pagination helper not initialized")
     
-    return pagination_helper.execute_paginated_query(sql, page, page_size)
+    return pagination_helper.execute_paginated_query(sql, page, page_size, cursor, count_mode)
+
+
+async def execute_paginated_query_async(sql: str, page: int = 1, page_size: int = 50,
+                                        cursor: Optional[str] = None,
+                                        count_mode: str = 'exact') -> Tuple[List[Dict[str, Any]], Optional[int], Dict[str, Any]]:
+    """Execute paginated query on the async pool using global helper"""
+    if pagination_helper is None:
+        raise RuntimeError("Pagination helper not initialized")
+    
+    return await pagination_helper.execute_paginated_query_async(sql, page, page_size, cursor, count_mode)
 
 
 def validate_pagination_params(page: int, page_size: int, max_page_size: int = 1000) -> Tuple[int, int]:
@@ -4,28 +4,377 @@ Provides database schema information for LLM SQL generation
 """
 
 import json
+import time
 import logging
-from typing import Dict, List, Any, Optional
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple
 import psycopg
 from psycopg.rows import dict_row
 
+from .database import AsyncDatabase
+from .schema_prompt import get_schema_prompt
+from .column_profiles import profile_schema
+
 logger = logging.getLogger(__name__)
 
 
+# Introspection queries shared by the sync and async code paths. Each one
+# reads pg_catalog once for every requested schema (optionally one table),
+# so a cold load costs four round trips however many tables there are;
+# rows are joined into the schema structure in Python by table oid.
+CATALOG_TABLE_FILTER = """
+    n.nspname = ANY(%(schemas)s)
+    AND (%(table)s::text IS NULL OR c.relname = %(table)s)
+"""
+
+# Same visibility rule as information_schema.tables
+TABLES_SQL = f"""
+    SELECT 
+        c.oid AS table_oid,
+        n.nspname AS table_schema,
+        c.relname AS table_name,
+        'BASE TABLE' AS table_type,
+        obj_description(c.oid, 'pg_class') AS comment
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE c.relkind IN ('r', 'p')
+    AND {CATALOG_TABLE_FILTER}
+    AND (
+        pg_has_role(c.relowner, 'USAGE')
+        OR has_table_privilege(c.oid, 'SELECT, INSERT, UPDATE, DELETE, TRUNCATE, REFERENCES, TRIGGER')
+        OR has_any_column_privilege(c.oid, 'SELECT, INSERT, UPDATE, REFERENCES')
+    )
+    ORDER BY array_position(%(schemas)s, n.nspname::text), c.relname
+"""
+
+# Type names, lengths and precisions as information_schema.columns reports them
+COLUMNS_SQL = f"""
+    SELECT 
+        a.attrelid AS table_oid,
+        a.attname AS column_name,
+        CASE
+            WHEN t.typtype = 'd' THEN
+                CASE
+                    WHEN bt.typelem <> 0 AND bt.typlen = -1 THEN 'ARRAY'
+                    WHEN btn.nspname = 'pg_catalog' THEN format_type(t.typbasetype, NULL)
+                    ELSE 'USER-DEFINED'
+                END
+            WHEN t.typelem <> 0 AND t.typlen = -1 THEN 'ARRAY'
+            WHEN tn.nspname = 'pg_catalog' THEN format_type(a.atttypid, NULL)
+            ELSE 'USER-DEFINED'
+        END AS data_type,
+        CASE WHEN a.attnotnull OR (t.typtype = 'd' AND t.typnotnull) THEN 'NO' ELSE 'YES' END AS is_nullable,
+        CASE WHEN a.attgenerated = '' THEN pg_get_expr(ad.adbin, ad.adrelid) END AS column_default,
+        information_schema._pg_char_max_length(
+            information_schema._pg_truetypid(a.*, t.*), information_schema._pg_truetypmod(a.*, t.*)
+        ) AS character_maximum_length,
+        information_schema._pg_numeric_precision(
+            information_schema._pg_truetypid(a.*, t.*), information_schema._pg_truetypmod(a.*, t.*)
+        ) AS numeric_precision,
+        information_schema._pg_numeric_scale(
+            information_schema._pg_truetypid(a.*, t.*), information_schema._pg_truetypmod(a.*, t.*)
+        ) AS numeric_scale,
+        col_description(a.attrelid, a.attnum) AS comment
+    FROM pg_attribute a
+    JOIN pg_class c ON c.oid = a.attrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    JOIN pg_type t ON t.oid = a.atttypid
+    JOIN pg_namespace tn ON tn.oid = t.typnamespace
+    LEFT JOIN pg_type bt ON t.typtype = 'd' AND bt.oid = t.typbasetype
+    LEFT JOIN pg_namespace btn ON btn.oid = bt.typnamespace
+    LEFT JOIN pg_attrdef ad ON ad.adrelid = a.attrelid AND ad.adnum = a.attnum
+    WHERE c.relkind IN ('r', 'p')
+    AND a.attnum > 0
+    AND NOT a.attisdropped
+    AND {CATALOG_TABLE_FILTER}
+    ORDER BY a.attrelid, a.attnum
+"""
+
+# Primary key, unique and foreign key constraints with their columns in key order
+CONSTRAINTS_SQL = f"""
+    SELECT 
+        con.conrelid AS table_oid,
+        n.nspname AS table_schema,
+        c.relname AS table_name,
+        con.conname AS constraint_name,
+        con.contype AS constraint_type,
+        ARRAY(
+            SELECT a.attname::text
+            FROM unnest(con.conkey) WITH ORDINALITY AS k(attnum, position)
+            JOIN pg_attribute a ON a.attrelid = con.conrelid AND a.attnum = k.attnum
+            ORDER BY k.position
+        ) AS columns,
+        fn.nspname AS foreign_table_schema,
+        fc.relname AS foreign_table_name,
+        ARRAY(
+            SELECT a.attname::text
+            FROM unnest(con.confkey) WITH ORDINALITY AS k(attnum, position)
+            JOIN pg_attribute a ON a.attrelid = con.confrelid AND a.attnum = k.attnum
+            ORDER BY k.position
+        ) AS foreign_columns
+    FROM pg_constraint con
+    JOIN pg_class c ON c.oid = con.conrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    LEFT JOIN pg_class fc ON fc.oid = con.confrelid
+    LEFT JOIN pg_namespace fn ON fn.oid = fc.relnamespace
+    WHERE con.contype IN ('p', 'u', 'f')
+    AND {CATALOG_TABLE_FILTER}
+    ORDER BY array_position(%(schemas)s, n.nspname::text), c.relname, con.conname
+"""
+
+INDEXES_SQL = f"""
+    SELECT 
+        n.nspname AS schemaname,
+        c.relname AS tablename,
+        i.relname AS indexname,
+        pg_get_indexdef(i.oid) AS indexdef
+    FROM pg_index x
+    JOIN pg_class c ON c.oid = x.indrelid
+    JOIN pg_class i ON i.oid = x.indexrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE c.relkind IN ('r', 'm', 'p')
+    AND i.relkind IN ('i', 'I')
+    AND {CATALOG_TABLE_FILTER}
+    ORDER BY array_position(%(schemas)s, n.nspname::text), c.relname, i.relname
+"""
+
+CATALOG_QUERIES = [TABLES_SQL, COLUMNS_SQL, CONSTRAINTS_SQL, INDEXES_SQL]
+
+# Hash of the catalog rows describing the tables in a set of schemas. Any
+# DDL (create/drop/alter, rewrite, constraint, default or comment change)
+# writes a new row version, so the xmins and relfilenodes change with it.
+SCHEMA_FINGERPRINT_SQL = """
+    SELECT md5(COALESCE(string_agg(entry, ',' ORDER BY entry), ''))
+    FROM (
+        SELECT 'r' || c.oid || ':' || c.relfilenode || ':' || c.xmin AS entry
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = ANY(%(schemas)s)
+        UNION ALL
+        SELECT 'a' || a.attrelid || ':' || a.attnum || ':' || a.xmin
+        FROM pg_attribute a
+        JOIN pg_class c ON c.oid = a.attrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = ANY(%(schemas)s) AND a.attnum > 0
+        UNION ALL
+        SELECT 'd' || ad.oid || ':' || ad.xmin
+        FROM pg_attrdef ad
+        JOIN pg_class c ON c.oid = ad.adrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = ANY(%(schemas)s)
+        UNION ALL
+        SELECT 'k' || con.oid || ':' || con.xmin
+        FROM pg_constraint con
+        JOIN pg_namespace n ON n.oid = con.connamespace
+        WHERE n.nspname = ANY(%(schemas)s)
+        UNION ALL
+        SELECT 'm' || d.objoid || ':' || d.objsubid || ':' || d.xmin
+        FROM pg_description d
+        JOIN pg_class c ON c.oid = d.objoid AND d.classoid = 'pg_class'::regclass
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = ANY(%(schemas)s)
+    ) AS catalog_entries
+"""
+
+COLUMN_FIELDS = [
+    'column_name', 'data_type', 'is_nullable', 'column_default',
+    'character_maximum_length', 'numeric_precision', 'numeric_scale', 'comment'
+]
+
+
+def _assemble_schema(schemas: List[str], tables: List[Dict[str, Any]], columns: List[Dict[str, Any]],
+                     constraints: List[Dict[str, Any]], indexes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Join the bulk catalog rows into the get_schema_json structure"""
+    columns_by_table: Dict[int, List[Dict[str, Any]]] = {}
+    for row in columns:
+        columns_by_table.setdefault(row['table_oid'], []).append({field: row[field] for field in COLUMN_FIELDS})
+    
+    constraints_by_table: Dict[int, List[Dict[str, Any]]] = {}
+    relationships = []
+    for row in constraints:
+        constraints_by_table.setdefault(row['table_oid'], []).append(row)
+        if row['constraint_type'] == 'f':
+            relationships.extend(
+                {
+                    'table_schema': row['table_schema'],
+                    'table_name': row['table_name'],
+                    **foreign_key
+                }
+                for foreign_key in _foreign_key_columns(row)
+            )
+    
+    schema_info = {
+        'database': 'trendsql_kg',
+        'schemas': {schema: [] for schema in schemas},
+        'tables': [],
+        'relationships': relationships,
+        'indexes': [dict(row) for row in indexes],
+        'version': '1.0.0'
+    }
+    
+    for row in tables:
+        table_constraints = constraints_by_table.get(row['table_oid'], [])
+        primary_key = next((con['columns'] for con in table_constraints if con['constraint_type'] == 'p'), None)
+        table_info = {
+            'name': row['table_name'],
+            'schema': row['table_schema'],
+            'type': row['table_type'],
+            'comment': row['comment'],
+            'columns': columns_by_table.get(row['table_oid'], []),
+            'primary_key': list(primary_key) if primary_key else None,
+            'foreign_keys': [
+                foreign_key
+                for con in table_constraints if con['constraint_type'] == 'f'
+                for foreign_key in _foreign_key_columns(con)
+            ],
+            'unique_constraints': [
+                {'constraint_name': con['constraint_name'], 'columns': list(con['columns'])}
+                for con in table_constraints if con['constraint_type'] == 'u'
+            ]
+        }
+        schema_info['schemas'][row['table_schema']].append(table_info)
+    
+    for schema in schemas:
+        schema_info['tables'].extend(schema_info['schemas'][schema])
+    
+    return schema_info
+
+
+def _foreign_key_columns(constraint: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """One entry per column pair of a (possibly composite) foreign key"""
+    return [
+        {
+            'column_name': column,
+            'foreign_table_schema': constraint['foreign_table_schema'],
+            'foreign_table_name': constraint['foreign_table_name'],
+            'foreign_column_name': foreign_column
+        }
+        for column, foreign_column in zip(constraint['columns'], constraint['foreign_columns'])
+    ]
+
+
+class SchemaCache:
+    """Introspected schemas keyed by schema list, validated against a catalog fingerprint"""
+    
+    def __init__(self, check_interval: float = 30.0, max_entries: int = 32):
+        """
+        Initialize schema cache
+        
+        Args:
+            check_interval: Seconds an entry is served before its fingerprint is checked again
+            max_entries: Number of schema lists kept (least recently used are dropped)
+        """
+        self.check_interval = check_interval
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, ...], Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'validated': 0, 'reloads': 0}
+    
+    @staticmethod
+    def make_key(schemas: List[str]) -> Tuple[str, ...]:
+        """Cache key of a schema list (order is kept, it orders the tables)"""
+        return tuple(schemas)
+    
+    def get(self, key: Tuple[str, ...]) -> Optional[Dict[str, Any]]:
+        """Get a value validated within check_interval, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry['checked_at'] >= self.check_interval:
+                return None
+            self._entries.move_to_end(key)
+            self._counters['hits'] += 1
+            return entry['value']
+    
+    def revalidate(self, key: Tuple[str, ...], fingerprint: str) -> Optional[Dict[str, Any]]:
+        """Get a value introspected at this catalog fingerprint, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry['fingerprint'] != fingerprint:
+                return None
+            entry['checked_at'] = time.monotonic()
+            self._entries.move_to_end(key)
+            self._counters['validated'] += 1
+            return entry['value']
+    
+    def put(self, key: Tuple[str, ...], fingerprint: str, value: Dict[str, Any]) -> None:
+        """Store a value introspected at the given catalog fingerprint"""
+        with self._lock:
+            self._entries[key] = {'value': value, 'fingerprint': fingerprint, 'checked_at': time.monotonic()}
+            self._entries.move_to_end(key)
+            self._counters['reloads'] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def peek(self, key: Tuple[str, ...]) -> Optional[Tuple[Dict[str, Any], str]]:
+        """Get a cached value and its fingerprint without validating or counting it"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return (entry['value'], entry['fingerprint']) if entry else None
+    
+    def get_profiles(self, key: Tuple[str, ...]) -> Tuple[Optional[Dict[str, Any]], Optional[float]]:
+        """Get the column profiles stored with a value and when they were computed (monotonic clock)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, None
+            return entry.get('profiles'), entry.get('profiled_at')
+    
+    def set_profiles(self, key: Tuple[str, ...], fingerprint: str, profiles: Optional[Dict[str, Any]]) -> bool:
+        """
+        Store column profiles computed against the value cached at a fingerprint
+        
+        Args:
+            key: Cache key
+            fingerprint: Catalog fingerprint of the value that was profiled
+            profiles: Column profiles, or None to keep the current ones (failed refresh)
+            
+        Returns:
+            False if the value was reloaded meanwhile and the profiles were dropped
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry['fingerprint'] != fingerprint:
+                return False
+            if profiles is not None:
+                entry['profiles'] = profiles
+            entry['profiled_at'] = time.monotonic()
+            return True
+    
+    def clear(self) -> None:
+        """Drop all entries"""
+        with self._lock:
+            self._entries.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/validation/reload counters"""
+        with self._lock:
+            return {**self._counters, 'entries': len(self._entries), 'check_interval': self.check_interval}
+
+
 class SchemaIntrospector:
     """Database schema introspector for TrendsQL-KG"""
     
-    def __init__(self, db_connection_string: str):
+    def __init__(self, db_connection_string: str, database: Optional[AsyncDatabase] = None,
+                 cache_check_interval: float = 30.0, profile_ttl: Optional[float] = None,
+                 profile_top_k: int = 8):
         """
         Initialize schema introspector
         
         Args:
             db_connection_string: PostgreSQL connection string
+            database: Optional async database for the non-blocking execution path
+            cache_check_interval: Seconds a cached schema is served before the catalog is checked for DDL
+            profile_ttl: Seconds before column profiles are recomputed (None: no column profiling)
+            profile_top_k: Values listed per low-cardinality column
         """
         self.db_connection_string = db_connection_string
-        self._schema_cache = None
-        self._cache_timestamp = None
-        self._cache_ttl = 3600  # 1 hour cache
+        self.database = database
+        self.profile_ttl = profile_ttl
+        self.profile_top_k = profile_top_k
+        self._schema_cache = SchemaCache(cache_check_interval)
+        self._profiling = set()
+        self._profiling_lock = threading.Lock()
     
     def get_schema_json(self, schemas: Optional[List[str]] = None) -> Dict[str, Any]:
         """
@@ -40,14 +389,59 @@ class SchemaIntrospector:
         if schemas is None:
             schemas = ['public']
         
-        # Check cache
-        if self._is_cache_valid():
-            return self._schema_cache
+        key = self._schema_cache.make_key(schemas)
+        schema_info = self._schema_cache.get(key)
+        if schema_info is not None:
+            return schema_info
         
         try:
             with psycopg.connect(self.db_connection_string) as conn:
-                schema_info = self._introspect_schema(conn, schemas)
-                self._update_cache(schema_info)
+                # Fingerprint first, so DDL racing with the introspection forces a reload
+                with conn.cursor() as cur:
+                    cur.execute(SCHEMA_FINGERPRINT_SQL, {'schemas': list(schemas)})
+                    fingerprint = cur.fetchone()[0]
+                
+                schema_info = self._schema_cache.revalidate(key, fingerprint)
+                if schema_info is None:
+                    schema_info = self._introspect_schema(conn, schemas)
+                    self._schema_cache.put(key, fingerprint, schema_info)
+                return schema_info
+                
+        except Exception as e:
+            logger.error(f"Schema introspection failed: {e}")
+            raise
+    
+    async def get_schema_json_async(self, schemas: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Get database schema as JSON without blocking the event loop
+        
+        Args:
+            schemas: List of schema names to include (default: ['public'])
+            
+        Returns:
+            Schema information as JSON-serializable dict
+        """
+        if schemas is None:
+            schemas = ['public']
+        
+        key = self._schema_cache.make_key(schemas)
+        schema_info = self._schema_cache.get(key)
+        if schema_info is not None:
+            return schema_info
+        
+        if self.database is None:
+            raise RuntimeError("Async database not configured for schema introspector")
+        
+        try:
+            async with self.database.connection() as conn:
+                async with conn.cursor() as cur:
+                    await cur.execute(SCHEMA_FINGERPRINT_SQL, {'schemas': list(schemas)})
+                    fingerprint = (await cur.fetchone())[0]
+                
+                schema_info = self._schema_cache.revalidate(key, fingerprint)
+                if schema_info is None:
+                    schema_info = await self._introspect_schema_async(conn, schemas)
+                    self._schema_cache.put(key, fingerprint, schema_info)
                 return schema_info
                 
         except Exception as e:
@@ -67,6 +461,63 @@ class SchemaIntrospector:
         schema_json = self.get_schema_json(schemas)
         return self._format_compact_schema(schema_json)
     
+    def get_column_profiles(self, schemas: Optional[List[str]] = None) -> Optional[Dict[str, Dict[str, Dict[str, Any]]]]:
+        """
+        Get column value profiles of a cached schema without waiting for them
+        
+        Profiles are computed in a background thread once the schema is
+        cached and recomputed after profile_ttl seconds; meanwhile the
+        previous profiles (or None) are returned. A reload of the schema
+        after DDL drops them.
+        
+        Args:
+            schemas: List of schema names (default: ['public'])
+            
+        Returns:
+            Profiles by qualified table name and column, or None if not computed yet
+        """
+        if not self.profile_ttl:
+            return None
+        if schemas is None:
+            schemas = ['public']
+        
+        key = self._schema_cache.make_key(schemas)
+        profiles, profiled_at = self._schema_cache.get_profiles(key)
+        if profiled_at is None or time.monotonic() - profiled_at >= self.profile_ttl:
+            self._start_profiling(key, schemas)
+        return profiles
+    
+    def _start_profiling(self, key: Tuple[str, ...], schemas: List[str]) -> None:
+        """Start a background profiler for a cached schema unless one is running"""
+        snapshot = self._schema_cache.peek(key)
+        if snapshot is None:
+            return
+        
+        with self._profiling_lock:
+            if key in self._profiling:
+                return
+            self._profiling.add(key)
+        
+        threading.Thread(
+            target=self._profile_columns, args=(key, schemas, *snapshot), name="column-profiler", daemon=True
+        ).start()
+    
+    def _profile_columns(self, key: Tuple[str, ...], schemas: List[str], schema_info: Dict[str, Any],
+                         fingerprint: str) -> None:
+        """Compute column profiles and store them with the cached schema"""
+        profiles = None
+        try:
+            with psycopg.connect(self.db_connection_string) as conn:
+                profiles = profile_schema(conn, schema_info, schemas, self.profile_top_k)
+            logger.info(f"Profiled columns of {len(profiles)} tables in {', '.join(schemas)}")
+        except Exception as e:
+            logger.warning(f"Column profiling failed, retrying in {self.profile_ttl:.0f}s: {e}")
+        finally:
+            # A failed run keeps the previous profiles until the next attempt
+            self._schema_cache.set_profiles(key, fingerprint, profiles)
+            with self._profiling_lock:
+                self._profiling.discard(key)
+    
     def get_table_info(self, table_name: str, schema: str = 'public') -> Optional[Dict[str, Any]]:
         """
         Get detailed information about a specific table
@@ -112,256 +563,62 @@ class SchemaIntrospector:
             return []
     
     def _introspect_schema(self, conn: psycopg.Connection, schemas: List[str]) -> Dict[str, Any]:
-        """Introspect database schema"""
-        schema_info = {
-            'database': 'trendsql_kg',
-            'schemas': {},
-            'tables': [],
-            'relationships': [],
-            'indexes': [],
-            'version': '1.0.0'
-        }
-        
-        # Get tables for each schema
-        for schema in schemas:
-            schema_info['schemas'][schema] = self._get_schema_tables(conn, schema)
-            schema_info['tables'].extend(schema_info['schemas'][schema])
-        
-        # Get relationships
-        schema_info['relationships'] = self._get_relationships(conn, schemas)
-        
-        # Get indexes
-        schema_info['indexes'] = self._get_indexes(conn, schemas)
-        
-        return schema_info
-    
-    def _get_schema_tables(self, conn: psycopg.Connection, schema: str) -> List[Dict[str, Any]]:
-        """Get tables in a schema"""
-        tables = []
-        
-        with conn.cursor(row_factory=dict_row) as cur:
-            # Get table information
-            cur.execute("""
-                SELECT 
-                    t.table_name,
-                    t.table_type,
-                    obj_description(format('%s.%s', %s, t.table_name)::regclass) as comment
-                FROM information_schema.tables t
-                WHERE t.table_schema = %s
-                AND t.table_type = 'BASE TABLE'
-                ORDER BY t.table_name
-            """, (schema, schema, schema))
-            
-            for table_row in cur.fetchall():
-                table_name = table_row['table_name']
-                table_info = {
-                    'name': table_name,
-                    'schema': schema,
-                    'type': table_row['table_type'],
-                    'comment': table_row['comment'],
-                    'columns': self._get_table_columns(cur, schema, table_name),
-                    'primary_key': self._get_primary_key(cur, schema, table_name),
-                    'foreign_keys': self._get_foreign_keys(cur, schema, table_name),
-                    'unique_constraints': self._get_unique_constraints(cur, schema, table_name)
-                }
-                tables.append(table_info)
-        
-        return tables
-    
-    def _get_table_columns(self, cur, schema: str, table_name: str) -> List[Dict[str, Any]]:
-        """Get columns for a table"""
-        cur.execute("""
-            SELECT 
-                c.column_name,
-                c.data_type,
-                c.is_nullable,
-                c.column_default,
-                c.character_maximum_length,
-                c.numeric_precision,
-                c.numeric_scale,
-                col_description(format('%s.%s', %s, %s)::regclass, c.ordinal_position) as comment
-            FROM information_schema.columns c
-            WHERE c.table_schema = %s AND c.table_name = %s
-            ORDER BY c.ordinal_position
-        """, (schema, table_name, schema, table_name, schema, table_name))
-        
-        return [dict(row) for row in cur.fetchall()]
-    
-    def _get_primary_key(self, cur, schema: str, table_name: str) -> Optional[List[str]]:
-        """Get primary key columns for a table"""
-        cur.execute("""
-            SELECT kcu.column_name
-            FROM information_schema.table_constraints tc
-            JOIN information_schema.key_column_usage kcu 
-                ON tc.constraint_name = kcu.constraint_name
-            WHERE tc.table_schema = %s 
-                AND tc.table_name = %s 
-                AND tc.constraint_type = 'PRIMARY KEY'
-            ORDER BY kcu.ordinal_position
-        """, (schema, table_name))
-        
-        result = cur.fetchall()
-        return [row['column_name'] for row in result] if result else None
-    
-    def _get_foreign_keys(self, cur, schema: str, table_name: str) -> List[Dict[str, Any]]:
-        """Get foreign key constraints for a table"""
-        cur.execute("""
-            SELECT 
-                kcu.column_name,
-                ccu.table_schema AS foreign_table_schema,
-                ccu.table_name AS foreign_table_name,
-                ccu.column_name AS foreign_column_name
-            FROM information_schema.table_constraints AS tc
-            JOIN information_schema.key_column_usage AS kcu
-                ON tc.constraint_name = kcu.constraint_name
-                AND tc.table_schema = kcu.table_schema
-            JOIN information_schema.constraint_column_usage AS ccu
-                ON ccu.constraint_name = tc.constraint_name
-                AND ccu.table_schema = tc.table_schema
-            WHERE tc.constraint_type = 'FOREIGN KEY' 
-                AND tc.table_schema = %s 
-                AND tc.table_name = %s
-        """, (schema, table_name))
-        
-        return [dict(row) for row in cur.fetchall()]
-    
-    def _get_unique_constraints(self, cur, schema: str, table_name: str) -> List[Dict[str, Any]]:
-        """Get unique constraints for a table"""
-        cur.execute("""
-            SELECT 
-                tc.constraint_name,
-                array_agg(kcu.column_name ORDER BY kcu.ordinal_position) as columns
-            FROM information_schema.table_constraints tc
-            JOIN information_schema.key_column_usage kcu 
-                ON tc.constraint_name = kcu.constraint_name
-            WHERE tc.table_schema = %s 
-                AND tc.table_name = %s 
-                AND tc.constraint_type = 'UNIQUE'
-            GROUP BY tc.constraint_name
-        """, (schema, table_name))
-        
-        return [dict(row) for row in cur.fetchall()]
-    
-    def _get_relationships(self, conn: psycopg.Connection, schemas: List[str]) -> List[Dict[str, Any]]:
-        """Get relationships between tables"""
-        relationships = []
+        """Introspect database schema with one bulk catalog query per object kind"""
+        params = {'schemas': list(schemas), 'table': None}
         
         with conn.cursor(row_factory=dict_row) as cur:
-            for schema in schemas:
-                cur.execute("""
-                    SELECT 
-                        tc.table_schema,
-                        tc.table_name,
-                        kcu.column_name,
-                        ccu.table_schema AS foreign_table_schema,
-                        ccu.table_name AS foreign_table_name,
-                        ccu.column_name AS foreign_column_name
-                    FROM information_schema.table_constraints AS tc
-                    JOIN information_schema.key_column_usage AS kcu
-                        ON tc.constraint_name = kcu.constraint_name
-                        AND tc.table_schema = kcu.table_schema
-                    JOIN information_schema.constraint_column_usage AS ccu
-                        ON ccu.constraint_name = tc.constraint_name
-                        AND ccu.table_schema = tc.table_schema
-                    WHERE tc.constraint_type = 'FOREIGN KEY' 
-                        AND tc.table_schema = %s
-                """, (schema,))
-                
-                for row in cur.fetchall():
-                    relationships.append(dict(row))
+            results = []
+            for query in CATALOG_QUERIES:
+                cur.execute(query, params)
+                results.append(cur.fetchall())
         
-        return relationships
+        return _assemble_schema(schemas, *results)
     
-    def _get_indexes(self, conn: psycopg.Connection, schemas: List[str]) -> List[Dict[str, Any]]:
-        """Get indexes for tables"""
-        indexes = []
+    async def _introspect_schema_async(self, conn: psycopg.AsyncConnection, schemas: List[str]) -> Dict[str, Any]:
+        """Introspect database schema over an async connection"""
+        params = {'schemas': list(schemas), 'table': None}
         
-        with conn.cursor(row_factory=dict_row) as cur:
-            for schema in schemas:
-                cur.execute("""
-                    SELECT 
-                        schemaname,
-                        tablename,
-                        indexname,
-                        indexdef
-                    FROM pg_indexes
-                    WHERE schemaname = %s
-                    ORDER BY tablename, indexname
-                """, (schema,))
-                
-                for row in cur.fetchall():
-                    indexes.append(dict(row))
+        async with conn.cursor(row_factory=dict_row) as cur:
+            results = []
+            for query in CATALOG_QUERIES:
+                await cur.execute(query, params)
+                results.append(await cur.fetchall())
         
-        return indexes
+        return _assemble_schema(schemas, *results)
     
     def _get_table_details(self, conn: psycopg.Connection, table_name: str, schema: str) -> Optional[Dict[str, Any]]:
         """Get detailed information about a specific table"""
+        params = {'schemas': [schema], 'table': table_name}
+        
         with conn.cursor(row_factory=dict_row) as cur:
-            # Get table info
-            cur.execute("""
-                SELECT 
-                    t.table_name,
-                    t.table_type,
-                    obj_description(format('%s.%s', %s, t.table_name)::regclass) as comment
-                FROM information_schema.tables t
-                WHERE t.table_schema = %s AND t.table_name = %s
-            """, (schema, table_name, schema, schema, table_name))
-            
-            table_row = cur.fetchone()
-            if not table_row:
-                return None
-            
-            table_info = dict(table_row)
-            table_info['columns'] = self._get_table_columns(cur, schema, table_name)
-            table_info['primary_key'] = self._get_primary_key(cur, schema, table_name)
-            table_info['foreign_keys'] = self._get_foreign_keys(cur, schema, table_name)
-            table_info['unique_constraints'] = self._get_unique_constraints(cur, schema, table_name)
-            
-            return table_info
-    
-    def _format_compact_schema(self, schema_info: Dict[str, Any]) -> str:
-        """Format schema as compact string for LLM prompts"""
-        lines = []
-        lines.append("Database Schema:")
-        lines.append("=" * 50)
+            results = []
+            for query in CATALOG_QUERIES:
+                cur.execute(query, params)
+                results.append(cur.fetchall())
         
-        for table in schema_info['tables']:
-            lines.append(f"\nTable: {table['schema']}.{table['name']}")
-            if table['comment']:
-                lines.append(f"Comment: {table['comment']}")
-            
-            lines.append("Columns:")
-            for col in table['columns']:
-                nullable = "NULL" if col['is_nullable'] == 'YES' else "NOT NULL"
-                default = f" DEFAULT {col['column_default']}" if col['column_default'] else ""
-                comment = f" -- {col['comment']}" if col['comment'] else ""
-                lines.append(f"  {col['column_name']}: {col['data_type']} {nullable}{default}{comment}")
-            
-            if table['primary_key']:
-                lines.append(f"Primary Key: {', '.join(table['primary_key'])}")
-            
-            if table['foreign_keys']:
-                lines.append("Foreign Keys:")
-                for fk in table['foreign_keys']:
-                    lines.append(f"  {fk['column_name']} -> {fk['foreign_table_schema']}.{fk['foreign_table_name']}.{fk['foreign_column_name']}")
+        tables = _assemble_schema([schema], *results)['tables']
+        if not tables:
+            return None
         
-        return "\n".join(lines)
+        table = tables[0]
+        return {
+            'table_name': table['name'],
+            'table_type': table['type'],
+            'comment': table['comment'],
+            'columns': table['columns'],
+            'primary_key': table['primary_key'],
+            'foreign_keys': table['foreign_keys'],
+            'unique_constraints': table['unique_constraints']
+        }
     
-    def _is_cache_valid(self) -> bool:
-        """Check if schema cache is still valid"""
-        if self._schema_cache is None or self._cache_timestamp is None:
-            return False
-        
-        import time
-        return (time.time() - self._cache_timestamp) < self._cache_ttl
+    def _format_compact_schema(self, schema_info: Dict[str, Any]) -> str:
+        """Format schema as compact string for LLM prompts (precomputed once per schema version)"""
+        return get_schema_prompt(schema_info).full_text
     
-    def _update_cache(self, schema_info: Dict[str, Any]) -> None:
-        """Update schema cache"""
-        import time
-        self._schema_cache = schema_info
-        self._cache_timestamp = time.time()
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get schema cache counters"""
+        return self._schema_cache.get_stats()
     
     def clear_cache(self) -> None:
         """Clear schema cache"""
-        self._schema_cache = None
-        self._cache_timestamp = None
+        self._schema_cache.clear()
@@ -0,0 +1,296 @@
+"""
+Schema Prompt Module for TrendsQL-KG
+Compact schema text built once per schema version and pruned per prompt to
+the relevant tables and columns within a token budget
+"""
+
+import math
+import re
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Set
+
+import numpy as np
+
+from .column_profiles import format_profile
+
+logger = logging.getLogger(__name__)
+
+# Rough token count for budgeting (about 4 characters per token for schema text)
+CHARS_PER_TOKEN = 4
+
+WORD_PATTERN = re.compile(r'[a-z][a-z0-9]*|[0-9]+')
+
+STOP_WORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'by', 'for', 'from', 'get', 'give', 'how', 'in', 'is',
+    'list', 'me', 'of', 'on', 'or', 'per', 'show', 'that', 'the', 'their', 'them', 'to', 'top',
+    'what', 'which', 'with'
+}
+
+# Lexical weights of a prompt term found in a table name, column name or comment
+TABLE_NAME_WEIGHT = 3.0
+COLUMN_NAME_WEIGHT = 1.0
+COMMENT_WEIGHT = 0.5
+
+# Weight of the prompt/table cosine similarity when embeddings are enabled
+EMBEDDING_WEIGHT = 4.0
+
+# Omitted tables are still named (most relevant first), up to this many
+MAX_OTHER_TABLES = 30
+
+SCHEMA_HEADER = ["Database Schema:", "=" * 50]
+
+Embedder = Callable[[List[str]], List[List[float]]]
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the prompt tokens of a text"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def extract_terms(text: Optional[str]) -> Set[str]:
+    """Lowercase words of a name, comment or prompt, singularized, without stop words"""
+    terms = set()
+    for word in WORD_PATTERN.findall((text or '').lower().replace('_', ' ')):
+        if word in STOP_WORDS:
+            continue
+        if len(word) > 4 and word.endswith('ies'):
+            word = word[:-3] + 'y'
+        elif len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+            word = word[:-1]
+        terms.add(word)
+    return terms
+
+
+class TableBlock:
+    """Prompt lines of one table plus the terms it is matched on"""
+    
+    def __init__(self, table: Dict[str, Any], profiles: Optional[Dict[str, Dict[str, Any]]] = None):
+        """
+        Build the block of a get_schema_json table
+        
+        Args:
+            table: Table entry of the schema JSON
+            profiles: Optional column value profiles of the table, by column name
+        """
+        profiles = profiles or {}
+        self.name = f"{table['schema']}.{table['name']}"
+        self.header = [f"\nTable: {self.name}"]
+        if table.get('comment'):
+            self.header.append(f"Description: {table['comment']}")
+        self.header.append("Columns:")
+        
+        key_columns = set(table.get('primary_key') or [])
+        key_columns.update(fk['column_name'] for fk in table.get('foreign_keys') or [])
+        
+        self.columns = []
+        for col in table.get('columns', []):
+            nullable = "NULL" if col['is_nullable'] == 'YES' else "NOT NULL"
+            default = f" DEFAULT {col['column_default']}" if col['column_default'] else ""
+            comment = f" -- {col['comment']}" if col['comment'] else ""
+            profile = profiles.get(col['column_name'])
+            values = f" [{format_profile(profile)}]" if profile else ""
+            self.columns.append({
+                'line': f"  {col['column_name']}: {col['data_type']} {nullable}{default}{values}{comment}",
+                'terms': (
+                    extract_terms(col['column_name']) | extract_terms(col['comment'])
+                    | extract_terms(' '.join(profile.get('values', []) if profile else []))
+                ),
+                'key': col['column_name'] in key_columns
+            })
+        
+        self.footer = []
+        if table.get('primary_key'):
+            self.footer.append(f"Primary Key: {', '.join(table['primary_key'])}")
+        if table.get('foreign_keys'):
+            self.footer.append("Foreign Keys:")
+            for fk in table['foreign_keys']:
+                self.footer.append(
+                    f"  {fk['column_name']} -> {fk['foreign_table_schema']}.{fk['foreign_table_name']}.{fk['foreign_column_name']}"
+                )
+        self.neighbors = {f"{fk['foreign_table_schema']}.{fk['foreign_table_name']}" for fk in table.get('foreign_keys') or []}
+        
+        self.name_terms = extract_terms(table['name'])
+        self.column_terms = set().union(*(extract_terms(col['column_name']) for col in table.get('columns', [])))
+        self.comment_terms = extract_terms(table.get('comment')).union(
+            *(extract_terms(col['comment']) for col in table.get('columns', []))
+        )
+        # Listed values count like comments, so "sales in the US" finds the region column
+        self.comment_terms.update(*(extract_terms(' '.join(p.get('values', []))) for p in profiles.values()))
+        self.text = self.render()
+        self.tokens = estimate_tokens(self.text)
+        self.embedding_text = ' '.join(
+            [table['name'].replace('_', ' '), table.get('comment') or '']
+            + [col['column_name'].replace('_', ' ') for col in table.get('columns', [])]
+        )
+    
+    def render(self, prompt_terms: Optional[Set[str]] = None) -> str:
+        """Render all columns, or with prompt_terms only key columns and columns matching them"""
+        columns = [
+            col['line'] for col in self.columns
+            if prompt_terms is None or col['key'] or col['terms'] & prompt_terms
+        ]
+        omitted = len(self.columns) - len(columns)
+        if omitted:
+            columns.append(f"  ... {omitted} more columns")
+        return "\n".join(self.header + columns + self.footer)
+    
+    def lexical_score(self, prompt_terms: Set[str]) -> float:
+        """Weighted count of prompt terms in the table name, column names and comments"""
+        return (
+            TABLE_NAME_WEIGHT * len(prompt_terms & self.name_terms)
+            + COLUMN_NAME_WEIGHT * len(prompt_terms & self.column_terms)
+            + COMMENT_WEIGHT * len(prompt_terms & self.comment_terms)
+        )
+
+
+class SchemaPrompt:
+    """Compact schema text of one schema version, split into prunable table blocks"""
+    
+    def __init__(self, schema_info: Dict[str, Any],
+                 column_profiles: Optional[Dict[str, Dict[str, Dict[str, Any]]]] = None):
+        """
+        Precompute the table blocks and full text of a schema
+        
+        Args:
+            schema_info: Schema JSON from SchemaIntrospector.get_schema_json
+            column_profiles: Optional column value profiles by qualified table name
+        """
+        column_profiles = column_profiles or {}
+        self.blocks = [
+            TableBlock(table, column_profiles.get(f"{table['schema']}.{table['name']}"))
+            for table in schema_info.get('tables', [])
+        ]
+        self.full_text = "\n".join(SCHEMA_HEADER + [block.text for block in self.blocks])
+        self.full_tokens = estimate_tokens(self.full_text)
+        # Content hash of the schema without column profiles, the same in every worker
+        schema_json = json.dumps(schema_info.get('tables', []), sort_keys=True, default=str)
+        self.version = hashlib.sha256(schema_json.encode('utf-8')).hexdigest()[:16]
+        self._embeddings: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+    
+    def render(self, prompt: Optional[str] = None, max_tokens: Optional[int] = None,
+               embed: Optional[Embedder] = None) -> str:
+        """
+        Get the schema text for a prompt
+        
+        The full text is returned when it fits max_tokens. Otherwise tables
+        are ranked by relevance to the prompt; the most relevant are added
+        with all columns while they fit, else with key and matching columns
+        only, followed by the tables they reference and then the rest.
+        
+        Args:
+            prompt: Natural language prompt
+            max_tokens: Token budget for the schema text (None or 0: unlimited)
+            embed: Optional embedding function adding semantic similarity to the ranking
+        
+        Returns:
+            Schema text in schema order
+        """
+        if not max_tokens or self.full_tokens <= max_tokens or not self.blocks:
+            return self.full_text
+        
+        prompt_terms = extract_terms(prompt)
+        scores = self.score(prompt or '', prompt_terms, embed)
+        ranked = sorted(range(len(self.blocks)), key=lambda i: -scores[i])
+        relevant = [i for i in ranked if scores[i] > 0]
+        by_name = {block.name: i for i, block in enumerate(self.blocks)}
+        neighbors = [
+            by_name[name] for i in relevant for name in sorted(self.blocks[i].neighbors) if name in by_name
+        ]
+        
+        # Without any relevant table, fall back to schema order
+        candidates = relevant + neighbors if relevant else list(range(len(self.blocks)))
+        budget = max_tokens - estimate_tokens("\n".join(SCHEMA_HEADER))
+        chosen: Dict[int, str] = {}
+        for i in candidates:
+            if i in chosen:
+                continue
+            block = self.blocks[i]
+            text = block.text
+            if block.tokens + 1 > budget and relevant:
+                text = block.render(prompt_terms)
+            tokens = estimate_tokens(text) + 1
+            if tokens <= budget:
+                chosen[i] = text
+                budget -= tokens
+        
+        lines = SCHEMA_HEADER + [chosen[i] for i in sorted(chosen)]
+        others = [self.blocks[i].name for i in ranked if i not in chosen]
+        if others:
+            lines.append(_other_tables_line(others, budget))
+        return "\n".join(lines)
+    
+    def score(self, prompt: str, prompt_terms: Set[str], embed: Optional[Embedder] = None) -> List[float]:
+        """Relevance of every table to a prompt (lexical, plus cosine similarity with embed)"""
+        scores = [block.lexical_score(prompt_terms) for block in self.blocks]
+        if embed is None:
+            return scores
+        
+        try:
+            table_vectors = self._table_embeddings(embed)
+            prompt_vector = _normalize(np.asarray(embed([prompt]), dtype=np.float32))[0]
+        except Exception as e:
+            logger.warning(f"Schema embedding failed, ranking tables lexically: {e}")
+            return scores
+        
+        similarities = table_vectors @ prompt_vector
+        return [score + EMBEDDING_WEIGHT * max(0.0, float(sim)) for score, sim in zip(scores, similarities)]
+    
+    def _table_embeddings(self, embed: Embedder) -> np.ndarray:
+        # Computed once per schema version, on first use
+        with self._lock:
+            if self._embeddings is None:
+                vectors = embed([block.embedding_text for block in self.blocks])
+                self._embeddings = _normalize(np.asarray(vectors, dtype=np.float32))
+            return self._embeddings
+
+
+def _other_tables_line(names: List[str], budget: int) -> str:
+    """Names of the omitted tables, as many as fit the remaining budget"""
+    listed = []
+    budget -= estimate_tokens("\nOther tables: , and 99999 more")
+    for name in names[:MAX_OTHER_TABLES]:
+        budget -= estimate_tokens(name) + 1
+        if budget < 0:
+            break
+        listed.append(name)
+    
+    remaining = len(names) - len(listed)
+    if not listed:
+        return f"\n({remaining} less relevant tables omitted)"
+    return f"\nOther tables: {', '.join(listed)}" + (f", and {remaining} more" if remaining else "")
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+# Precomputed prompts of recent schema versions. The schema cache hands out
+# the same dict until the catalog changes, so its identity is the version
+# (likewise for the column profiles stored with it); entries hold both
+# objects so their ids are never reused while cached.
+_schema_prompts: "OrderedDict[int, Any]" = OrderedDict()
+_schema_prompts_lock = threading.Lock()
+MAX_SCHEMA_PROMPTS = 8
+
+
+def get_schema_prompt(schema_info: Dict[str, Any],
+                      column_profiles: Optional[Dict[str, Dict[str, Dict[str, Any]]]] = None) -> SchemaPrompt:
+    """Get the precomputed SchemaPrompt of a schema JSON and its column profiles, building it on first use"""
+    with _schema_prompts_lock:
+        entry = _schema_prompts.get(id(schema_info))
+        if entry is not None and entry[0] is schema_info and entry[1] is column_profiles:
+            _schema_prompts.move_to_end(id(schema_info))
+            return entry[2]
+    
+    schema_prompt = SchemaPrompt(schema_info, column_profiles)
+    with _schema_prompts_lock:
+        _schema_prompts[id(schema_info)] = (schema_info, column_profiles, schema_prompt)
+        while len(_schema_prompts) > MAX_SCHEMA_PROMPTS:
+            _schema_prompts.popitem(last=False)
+    return schema_prompt
@@ -0,0 +1,360 @@
+"""
+SQL Cache Module for TrendsQL-KG
+Two-tier cache of generated SQL per prompt: an in-process LRU on the
+normalized prompt and schema version, backed by a Postgres table shared by
+all workers that can also answer semantically similar prompts via pgvector
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Callable, List, Optional
+import psycopg
+from psycopg_pool import ConnectionPool, PoolTimeout
+
+logger = logging.getLogger(__name__)
+
+# Exact tier: one row per normalized prompt, schema version and model
+SQL_CACHE_LOOKUP_SQL = """
+    UPDATE sql_cache SET hits = hits + 1, last_hit_at = NOW()
+    WHERE cache_key = %(cache_key)s AND created_at > NOW() - make_interval(secs => %(ttl)s)
+    RETURNING sql
+"""
+
+# Semantic tier: nearest cached prompts of the same schema version by cosine distance
+SQL_CACHE_SIMILAR_SQL = """
+    SELECT prompt, sql, 1 - (embedding <=> %(embedding)s::vector) AS similarity
+    FROM sql_cache
+    WHERE schema_version = %(schema_version)s
+      AND model = %(model)s
+      AND embedding_model = %(embedding_model)s
+      AND created_at > NOW() - make_interval(secs => %(ttl)s)
+      AND 1 - (embedding <=> %(embedding)s::vector) >= %(threshold)s
+    ORDER BY embedding <=> %(embedding)s::vector
+    LIMIT 5
+"""
+
+SQL_CACHE_STORE_SQL = """
+    INSERT INTO sql_cache (cache_key, schema_version, model, prompt, sql, embedding_model, embedding)
+    VALUES (%(cache_key)s, %(schema_version)s, %(model)s, %(prompt)s, %(sql)s, %(embedding_model)s, %(embedding)s::vector)
+    ON CONFLICT (cache_key) DO UPDATE SET
+        prompt = EXCLUDED.prompt,
+        sql = EXCLUDED.sql,
+        embedding_model = EXCLUDED.embedding_model,
+        embedding = EXCLUDED.embedding,
+        hits = 0,
+        created_at = NOW(),
+        last_hit_at = NULL
+"""
+
+SQL_CACHE_FORGET_SQL = "DELETE FROM sql_cache WHERE cache_key = %(cache_key)s"
+
+SQL_CACHE_EXPIRE_SQL = "DELETE FROM sql_cache WHERE created_at < NOW() - make_interval(secs => %(ttl)s)"
+
+# Numbers and quoted strings in a prompt, plus words with capitals (codes, names)
+LITERAL_PATTERN = re.compile(r"'[^']*'|\"[^\"]*\"|\d+(?:\.\d+)?|\b\w*[A-Z]\w*\b")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Case-fold a prompt and collapse whitespace and trailing punctuation"""
+    return re.sub(r'\s+', ' ', prompt).strip().rstrip('?!.;').strip().casefold()
+
+
+def prompt_literals(prompt: str) -> List[str]:
+    """
+    Values a prompt pins down: numbers, quoted strings and capitalized words after the first
+    
+    Two prompts can be close in embedding space yet ask for different
+    values ("top 10 topics in US" / "top 20 topics in IN"), so a similar
+    prompt is only reused when these match exactly.
+    """
+    words = prompt.strip().split(' ', 1)
+    return sorted(LITERAL_PATTERN.findall(words[1] if len(words) > 1 else ''))
+
+
+class SQLCache:
+    """Two-tier cache of generated SQL per prompt and schema version"""
+    
+    def __init__(self, db_connection_string: Optional[str] = None,
+                 max_entries: int = 1000,
+                 ttl_seconds: float = 7 * 24 * 3600,
+                 similarity_threshold: Optional[float] = None,
+                 embedding_model: Optional[str] = None,
+                 pool_size: int = 4):
+        """
+        Initialize SQL cache
+        
+        Args:
+            db_connection_string: PostgreSQL connection string of the shared sql_cache table
+                (None: in-process tier only)
+            max_entries: Prompts kept in process
+            ttl_seconds: Lifetime of a generated SQL in both tiers
+            similarity_threshold: Minimum prompt embedding cosine for reusing the SQL
+                of a similar prompt (None: exact matches only)
+            embedding_model: Embedding model of the similarity tier
+            pool_size: Maximum pooled connections to the shared table
+        """
+        self.db_connection_string = db_connection_string
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.embedding_model = embedding_model
+        self.pool_size = pool_size
+        self._pool: Optional[ConnectionPool] = None
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'shared_hits': 0, 'similar_hits': 0, 'misses': 0, 'stores': 0, 'errors': 0}
+    
+    @property
+    def shared(self) -> bool:
+        """Whether the shared sql_cache table is used"""
+        return self.db_connection_string is not None
+    
+    @property
+    def semantic(self) -> bool:
+        """Whether lookups also match similar prompts (callers then pass prompt embeddings)"""
+        return self.shared and bool(self.similarity_threshold) and bool(self.embedding_model)
+    
+    @staticmethod
+    def make_key(prompt: str, schema_version: str, model: str) -> str:
+        """
+        Build a cache key
+        
+        Args:
+            prompt: Natural language prompt (normalized here)
+            schema_version: Version of the schema the SQL was generated against
+            model: LLM that generated the SQL
+        
+        Returns:
+            Hex digest key
+        """
+        raw = json.dumps([normalize_prompt(prompt), schema_version, model])
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+    
+    def get(self, prompt: str, schema_version: str, model: str,
+            embedding: Optional[List[float]] = None) -> Optional[str]:
+        """
+        Look up the SQL of a prompt
+        
+        Args:
+            prompt: Natural language prompt
+            schema_version: Current schema version
+            model: LLM that would generate the SQL
+            embedding: Prompt embedding for the similarity tier
+        
+        Returns:
+            Cached SQL, or None on a miss
+        """
+        key = self.make_key(prompt, schema_version, model)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry['created_at'] < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self._counters['hits'] += 1
+                return entry['sql']
+        
+        sql = self._shared_lookup(key, prompt, schema_version, model, embedding) if self.shared else None
+        with self._lock:
+            if sql is None:
+                self._counters['misses'] += 1
+            else:
+                self._remember(key, sql)
+        return sql
+    
+    def put(self, prompt: str, schema_version: str, model: str, sql: str,
+            embedding: Optional[List[float]] = None) -> None:
+        """
+        Store the SQL generated for a prompt in both tiers
+        
+        Args:
+            prompt: Natural language prompt
+            schema_version: Schema version the SQL was generated against
+            model: LLM that generated the SQL
+            sql: Generated SQL
+            embedding: Prompt embedding for later similarity lookups
+        """
+        key = self.make_key(prompt, schema_version, model)
+        with self._lock:
+            self._remember(key, sql)
+            self._counters['stores'] += 1
+        if not self.shared:
+            return
+        
+        params = {
+            'cache_key': key,
+            'schema_version': schema_version,
+            'model': model,
+            'prompt': prompt,
+            'sql': sql,
+            'embedding_model': self.embedding_model if embedding else None,
+            'embedding': _vector_literal(embedding) if embedding else None,
+            'ttl': self.ttl_seconds
+        }
+        
+        def store(cur: psycopg.Cursor) -> None:
+            cur.execute(SQL_CACHE_STORE_SQL, params)
+            cur.execute(SQL_CACHE_EXPIRE_SQL, params)
+        
+        self._execute_shared(store)
+    
+    def forget(self, prompt: str, schema_version: str, model: str) -> None:
+        """Drop the SQL of a prompt from both tiers, e.g. after it failed to execute"""
+        key = self.make_key(prompt, schema_version, model)
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.shared:
+            self._execute_shared(lambda cur: cur.execute(SQL_CACHE_FORGET_SQL, {'cache_key': key}))
+    
+    def clear(self) -> None:
+        """Drop all in-process entries (the shared table is left as is)"""
+        with self._lock:
+            self._entries.clear()
+    
+    def close(self) -> None:
+        """Close the shared table connection pool (reopened on next use)"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.close()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and the in-process entry count"""
+        with self._lock:
+            return {
+                **self._counters,
+                'entries': len(self._entries),
+                'shared': self.shared,
+                'semantic': self.semantic
+            }
+    
+    def _remember(self, key: str, sql: str) -> None:
+        """Add an in-process entry, evicting the least recently used (caller holds the lock)"""
+        self._entries[key] = {'sql': sql, 'created_at': time.monotonic()}
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def _shared_lookup(self, key: str, prompt: str, schema_version: str, model: str,
+                       embedding: Optional[List[float]]) -> Optional[str]:
+        """Look a prompt up in the shared table, by key and then by similarity"""
+        params = {
+            'cache_key': key,
+            'schema_version': schema_version,
+            'model': model,
+            'embedding_model': self.embedding_model,
+            'embedding': _vector_literal(embedding) if embedding else None,
+            'threshold': self.similarity_threshold,
+            'ttl': self.ttl_seconds
+        }
+        
+        def lookup(cur: psycopg.Cursor) -> Optional[str]:
+            cur.execute(SQL_CACHE_LOOKUP_SQL, params)
+            row = cur.fetchone()
+            if row is not None:
+                self._count('shared_hits')
+                return row[0]
+            if not (self.semantic and embedding):
+                return None
+            
+            cur.execute(SQL_CACHE_SIMILAR_SQL, params)
+            literals = prompt_literals(prompt)
+            for similar_prompt, sql, similarity in cur.fetchall():
+                if prompt_literals(similar_prompt) == literals:
+                    logger.info(f"SQL cache: reusing SQL of similar prompt {similar_prompt!r} ({similarity:.3f})")
+                    self._count('similar_hits')
+                    return sql
+            return None
+        
+        return self._execute_shared(lookup)
+    
+    def _get_pool(self) -> ConnectionPool:
+        """Get the shared table connection pool, opening it on first use"""
+        with self._lock:
+            if self._pool is None:
+                self._pool = ConnectionPool(
+                    conninfo=self.db_connection_string,
+                    min_size=1,
+                    max_size=self.pool_size,
+                    timeout=5,
+                    kwargs={'connect_timeout': 5},
+                    check=ConnectionPool.check_connection,
+                    name="sql_cache",
+                    open=False
+                )
+                self._pool.open(wait=False)
+            return self._pool
+    
+    def _execute_shared(self, work: Callable[[psycopg.Cursor], Any]) -> Any:
+        """
+        Run work on the shared table; errors are logged as a miss, never raised
+        
+        Blocks for up to the pool timeout, so async callers run cache calls
+        in a worker thread.
+        """
+        try:
+            with self._get_pool().connection() as conn:
+                with conn.cursor() as cur:
+                    return work(cur)
+        except psycopg.errors.UndefinedTable:
+            logger.warning("SQL cache table missing (apply db/schema.sql), using the in-process tier only")
+            self.db_connection_string = None
+            self.close()
+        except (psycopg.Error, PoolTimeout) as e:
+            logger.warning(f"Shared SQL cache unavailable: {e}")
+            self._count('errors')
+        return None
+    
+    def _count(self, counter: str) -> None:
+        """Increment a counter"""
+        with self._lock:
+            self._counters[counter] += 1
+
+
+def _vector_literal(vector: List[float]) -> str:
+    """pgvector text input of an embedding"""
+    return '[' + ','.join(repr(float(value)) for value in vector) + ']'
+
+
+def get_sql_cache_settings() -> Dict[str, Any]:
+    """Get SQL cache limits and similarity threshold from environment"""
+    threshold = float(os.getenv("SQL_CACHE_SIMILARITY", "0"))
+    return {
+        'max_entries': int(os.getenv("SQL_CACHE_MAX_ENTRIES", "1000")),
+        'ttl_seconds': float(os.getenv("SQL_CACHE_TTL", str(7 * 24 * 3600))),
+        'similarity_threshold': threshold if threshold > 0 else None,
+        'shared': os.getenv("SQL_CACHE_SHARED", "true").lower() in ("1", "true", "yes"),
+        'pool_size': int(os.getenv("SQL_CACHE_POOL_SIZE", "4"))
+    }
+
+
+# Global instance
+sql_cache = None
+
+
+def init_sql_cache(db_connection_string: str, embedding_model: Optional[str] = None) -> Optional[SQLCache]:
+    """Initialize global SQL cache (disabled when SQL_CACHE_MAX_ENTRIES=0)"""
+    global sql_cache
+    settings = get_sql_cache_settings()
+    if settings['max_entries'] <= 0:
+        sql_cache = None
+        return None
+    
+    sql_cache = SQLCache(
+        db_connection_string if settings['shared'] else None,
+        settings['max_entries'],
+        settings['ttl_seconds'],
+        settings['similarity_threshold'],
+        embedding_model,
+        settings['pool_size']
+    )
+    return sql_cache
+
+
+def get_sql_cache() -> Optional[SQLCache]:
+    """Get global SQL cache"""
+    return sql_cache
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Columnar Export Benchmark for TrendsQL-KG
+Compares payload size, encode time and client (pandas) parse time of CSV,
+Arrow IPC and Parquet exports of gt_interest_over_time-shaped rows
+"""
+
+import argparse
+import io
+import sys
+import time
+from collections import namedtuple
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.formatters import CSVFormatter, ArrowFormatter
+
+# Stand-in for psycopg's cursor.description entries
+Column = namedtuple("Column", "name type_code precision scale")
+
+DESCRIPTION = [
+    Column("keyword", 25, None, None),
+    Column("date", 1082, None, None),
+    Column("interest", 23, None, None),
+    Column("geo", 25, None, None),
+    Column("category", 23, None, None),
+    Column("gprop", 25, None, None),
+    Column("created_at", 1184, None, None)
+]
+
+
+def generate_batches(rows: int, batch_size: int):
+    """Yield synthetic gt_interest_over_time rows as tuples"""
+    start_date = date(2004, 1, 1)
+    created_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    for offset in range(0, rows, batch_size):
+        yield [
+            (f"bench keyword {i % 1000}", start_date + timedelta(days=i // 1000), (i * 7919) % 101,
+             "US", 0, "", created_at)
+            for i in range(offset, min(rows, offset + batch_size))
+        ]
+
+
+def encode_csv(rows: int, batch_size: int) -> bytes:
+    """Encode with the /download-csv formatter"""
+    formatter = CSVFormatter()
+    headers = [column.name for column in DESCRIPTION]
+    chunks = []
+    for index, batch in enumerate(generate_batches(rows, batch_size)):
+        dict_rows = [dict(zip(headers, row)) for row in batch]
+        chunks.append(formatter.format_csv_chunk(dict_rows, headers, include_header=index == 0))
+    return "".join(chunks).encode("utf-8")
+
+
+def encode_columnar(rows: int, batch_size: int, export_format: str) -> bytes:
+    """Encode with the /export writer"""
+    writer = ArrowFormatter().open_writer(DESCRIPTION, export_format)
+    chunks = [writer.write(batch) for batch in generate_batches(rows, batch_size)]
+    chunks.append(writer.close())
+    return b"".join(chunks)
+
+
+PARSERS = {
+    "csv": lambda data: pd.read_csv(io.BytesIO(data), parse_dates=["date", "created_at"]),
+    "arrow": lambda data: pa.ipc.open_stream(data).read_pandas(),
+    "parquet": lambda data: pq.read_table(io.BytesIO(data)).to_pandas()
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark columnar export formats")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+    
+    print(f"{'format':<8} {'rows':>9} {'MB':>8} {'encode s':>9} {'parse s':>8}")
+    for rows in args.rows:
+        for export_format in ("csv", "arrow", "parquet"):
+            start = time.perf_counter()
+            if export_format == "csv":
+                data = encode_csv(rows, args.batch_size)
+            else:
+                data = encode_columnar(rows, args.batch_size, export_format)
+            encode_seconds = time.perf_counter() - start
+            
+            start = time.perf_counter()
+            frame = PARSERS[export_format](data)
+            parse_seconds = time.perf_counter() - start
+            assert len(frame) == rows
+            
+            print(f"{export_format:<8} {rows:>9} {len(data) / 1e6:>8.2f} {encode_seconds:>9.2f} {parse_seconds:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
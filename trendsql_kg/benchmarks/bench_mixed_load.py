@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Mixed Load Benchmark for TrendsQL-KG
+Measures /health latency while slow analytic queries are in flight
+"""
+
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.request
+from typing import List
+
+SLOW_SQL = "SELECT COUNT(*) AS n FROM generate_series(1, 20000000) AS g"
+
+
+def post_json(url: str, payload: dict, timeout: float = 120) -> None:
+    """POST a JSON payload and discard the response"""
+    req = urllib.request.Request(
+        url,
+        data=json.dumps(payload).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST"
+    )
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            resp.read()
+    except Exception:
+        pass
+
+
+def measure_health(base_url: str, samples: int, interval: float) -> List[float]:
+    """Sample /health latency in milliseconds"""
+    latencies = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(f"{base_url}/health", timeout=60) as resp:
+                resp.read()
+        except Exception:
+            pass
+        latencies.append((time.perf_counter() - start) * 1000)
+        time.sleep(interval)
+    return latencies
+
+
+def summarize(label: str, latencies: List[float]) -> None:
+    """Print latency percentiles"""
+    ordered = sorted(latencies)
+    p99 = ordered[max(0, int(len(ordered) * 0.99) - 1)]
+    print(f"{label:<22} p50={statistics.median(ordered):8.1f} ms  p99={p99:8.1f} ms  max={ordered[-1]:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure /health latency under slow-query load")
+    parser.add_argument("--url", default="http://localhost:8000", help="API base URL")
+    parser.add_argument("--slow-queries", type=int, default=4, help="Concurrent slow queries")
+    parser.add_argument("--samples", type=int, default=50, help="/health samples per phase")
+    parser.add_argument("--sql", default=SLOW_SQL, help="Slow analytic query")
+    args = parser.parse_args()
+    
+    base_url = args.url.rstrip("/")
+    
+    # Baseline: idle server
+    summarize("idle", measure_health(base_url, args.samples, 0.02))
+    
+    # Mixed: slow queries running in the background
+    workers = [
+        threading.Thread(
+            target=post_json,
+            args=(f"{base_url}/generate-html", {"sql": args.sql, "page": 1, "page_size": 10}),
+            daemon=True
+        )
+        for _ in range(args.slow_queries)
+    ]
+    for worker in workers:
+        worker.start()
+    time.sleep(0.2)
+    
+    summarize(f"{args.slow_queries} slow queries", measure_health(base_url, args.samples, 0.02))
+    
+    for worker in workers:
+        worker.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -44,6 +44,47 @@ CREATE TABLE IF NOT EXISTS gt_related_topics (
     created_at TIMESTAMPTZ DEFAULT NOW()
 );
 
+-- Data versions bumped by ingestion (result cache invalidation)
+CREATE TABLE IF NOT EXISTS data_versions (
+    table_name TEXT PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Incremental ingestion watermarks: last complete day per Google Trends
+-- series (keyword|geo|gprop|category), content hash per Exploding Topics file
+CREATE TABLE IF NOT EXISTS ingest_watermarks (
+    source TEXT NOT NULL,
+    watermark_key TEXT NOT NULL,
+    last_date DATE,
+    content_hash TEXT,
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (source, watermark_key)
+);
+
+-- Ingestion run ledger: one row per run, with per-stage timings
+CREATE TABLE IF NOT EXISTS ingest_runs (
+    run_id BIGSERIAL PRIMARY KEY,
+    source TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'running',
+    state JSONB NOT NULL DEFAULT '{}',
+    stage_seconds JSONB NOT NULL DEFAULT '{}',
+    result JSONB,
+    error TEXT,
+    started_at TIMESTAMPTZ DEFAULT NOW(),
+    finished_at TIMESTAMPTZ
+);
+
+-- Units (keyword payloads, CSV chunks) each run has committed
+CREATE TABLE IF NOT EXISTS ingest_run_units (
+    run_id BIGINT NOT NULL REFERENCES ingest_runs (run_id) ON DELETE CASCADE,
+    unit TEXT NOT NULL,
+    counts JSONB NOT NULL DEFAULT '{}',
+    completed_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (run_id, unit)
+);
+
 -- Knowledge Graph node summaries table (for vector search)
 CREATE TABLE IF NOT EXISTS kg_node_summaries (
     id BIGSERIAL PRIMARY KEY,
@@ -67,6 +108,20 @@ CREATE TABLE IF NOT EXISTS kg_community_summaries (
     updated_at TIMESTAMPTZ DEFAULT NOW()
 );
 
+-- Generated SQL per normalized prompt, shared by all API workers (SQL cache)
+CREATE TABLE IF NOT EXISTS sql_cache (
+    cache_key TEXT PRIMARY KEY,
+    schema_version TEXT NOT NULL,
+    model TEXT NOT NULL,
+    prompt TEXT NOT NULL,
+    sql TEXT NOT NULL,
+    embedding_model TEXT,
+    embedding VECTOR,                -- Prompt embedding for similarity lookups
+    hits BIGINT NOT NULL DEFAULT 0,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    last_hit_at TIMESTAMPTZ
+);
+
 -- Indexes for better performance
 CREATE INDEX IF NOT EXISTS idx_exploding_topics_topic ON exploding_topics(topic);
 CREATE INDEX IF NOT EXISTS idx_exploding_topics_region ON exploding_topics(region);
@@ -97,6 +152,10 @@ CREATE INDEX IF NOT EXISTS idx_kg_community_summaries_type ON kg_community_summa
 CREATE INDEX IF NOT EXISTS idx_kg_community_summaries_key ON kg_community_summaries(community_key);
 CREATE INDEX IF NOT EXISTS idx_kg_community_summaries_created_at ON kg_community_summaries(created_at);
 
+-- SQL cache indexes
+CREATE INDEX IF NOT EXISTS idx_sql_cache_schema_version ON sql_cache(schema_version, model);
+CREATE INDEX IF NOT EXISTS idx_sql_cache_created_at ON sql_cache(created_at);
+
 -- Vector indexes (if pgvector is enabled)
 CREATE INDEX IF NOT EXISTS idx_kg_node_summaries_embedding ON kg_node_summaries USING ivfflat (embedding vector_cosine_ops) WITH (lists = 100);
 
@@ -113,6 +172,7 @@ COMMENT ON TABLE gt_interest_over_time IS 'Google Trends interest over time data
 COMMENT ON TABLE gt_related_topics IS 'Google Trends related topics data';
 COMMENT ON TABLE kg_node_summaries IS 'Knowledge Graph node summaries with embeddings for vector search';
 COMMENT ON TABLE kg_community_summaries IS 'Knowledge Graph community summaries for GraphRAG';
+COMMENT ON TABLE sql_cache IS 'Generated SQL cached per prompt and schema version';
 
 COMMENT ON COLUMN exploding_topics.topic IS 'The trending topic name';
 COMMENT ON COLUMN exploding_topics.growth_score IS 'Growth score indicating trend velocity';
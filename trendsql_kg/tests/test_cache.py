@@ -0,0 +1,63 @@
+"""
+Test Result Cache Module
+"""
+
+import pytest
+from app.cache import ResultCache
+from app.pagination import PaginationHelper
+
+
+class TestResultCache:
+    """Test result page caching and invalidation"""
+    
+    def test_hit_after_put(self):
+        """Test a stored page is served while versions are unchanged"""
+        cache = ResultCache()
+        sql = "SELECT * FROM exploding_topics"
+        key = ResultCache.make_key(sql, 1, 50, None, 'exact')
+        versions = {'exploding_topics': 3}
+        
+        assert cache.get(key, versions) is None
+        cache.put(key, sql, [[{'topic': 'AI'}], 1, {'page': 1}], versions)
+        assert cache.get(key, versions) == [[{'topic': 'AI'}], 1, {'page': 1}]
+        
+        stats = cache.get_stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+    
+    def test_invalidated_by_touched_table(self):
+        """Test only entries over a bumped table go stale"""
+        cache = ResultCache()
+        versions = {'exploding_topics': 1, 'gt_related_topics': 1}
+        cache.put('topics', "SELECT topic FROM exploding_topics", [1], versions)
+        cache.put('related', "SELECT * FROM gt_related_topics r JOIN exploding_topics e ON e.topic = r.keyword", [2], versions)
+        
+        bumped = {'exploding_topics': 2, 'gt_related_topics': 1}
+        assert cache.get('topics', bumped) is None
+        assert cache.get('related', bumped) is None
+        
+        cache.put('trends', "SELECT * FROM gt_interest_over_time", [3], bumped)
+        assert cache.get('trends', {**bumped, 'gt_related_topics': 5}) == [3]
+    
+    def test_size_limits(self):
+        """Test oversized entries are skipped and LRU entries evicted"""
+        cache = ResultCache(max_bytes=100, max_entry_bytes=60)
+        
+        assert not cache.put('big', "SELECT 1", 'x' * 80, {})
+        cache.put('a', "SELECT 1", 'a' * 40, {})
+        cache.put('b', "SELECT 1", 'b' * 40, {})
+        cache.put('c', "SELECT 1", 'c' * 40, {})
+        
+        assert cache.get('a', {}) is None
+        assert cache.get('c', {}) is not None
+        assert cache.get_stats()['evictions'] == 1
+    
+    def test_cached_metadata_is_copied(self):
+        """Test callers annotating metadata do not modify the cached page"""
+        helper = PaginationHelper("postgresql://localhost/test", result_cache=ResultCache())
+        cached = [[{'topic': 'AI'}], 1, {'page': 1}]
+        
+        _, _, metadata = helper._from_cached(cached)
+        metadata['execution_time'] = 0.5
+        
+        assert 'execution_time' not in cached[2]
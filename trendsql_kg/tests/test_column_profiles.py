@@ -0,0 +1,135 @@
+"""
+Test Column Profiles Module
+"""
+
+import threading
+from unittest.mock import MagicMock, patch
+from app.column_profiles import COLUMN_STATS_SQL, format_profile, profile_schema
+from app.schema_introspect import SchemaCache, SchemaIntrospector
+from app.schema_prompt import SchemaPrompt
+
+
+def column(name, data_type):
+    """Column entry of the schema JSON"""
+    return {'column_name': name, 'data_type': data_type, 'is_nullable': 'YES', 'column_default': None,
+            'character_maximum_length': None, 'numeric_precision': None, 'numeric_scale': None, 'comment': None}
+
+
+SCHEMA_INFO = {
+    'tables': [
+        {'name': 'gt_interest_over_time', 'schema': 'public', 'type': 'BASE TABLE', 'comment': None,
+         'columns': [column('geo', 'text'), column('keyword', 'text'), column('date', 'date'),
+                     column('interest', 'integer')],
+         'primary_key': [], 'foreign_keys': [], 'unique_constraints': []},
+        {'name': 'staging_topics', 'schema': 'public', 'type': 'BASE TABLE', 'comment': None,
+         'columns': [column('status', 'text'), column('payload', 'jsonb')],
+         'primary_key': [], 'foreign_keys': [], 'unique_constraints': []},
+    ]
+}
+
+# schemaname, tablename, attname, null_frac, n_distinct, most_common_vals, most_common_freqs, histogram_bounds
+STATS = [
+    ('public', 'gt_interest_over_time', 'geo', 0.0, 3, ['US', 'IN', "O'Land"], [0.5, 0.3, 0.2], None),
+    ('public', 'gt_interest_over_time', 'keyword', 0.0, -0.4, ['ai'], [0.01], ['aardvark', 'zebra']),
+    ('public', 'gt_interest_over_time', 'date', 0.2, 900, None, None, ['2023-01-01', '2023-06-01', '2024-12-31']),
+    ('public', 'gt_interest_over_time', 'interest', 0.0, 101, ['100', '0'], [0.02, 0.01], None),
+]
+
+
+class TestProfileSchema:
+    """Test column profiles from planner statistics and row samples"""
+    
+    def test_profiles_from_stats_and_sample(self):
+        """Test analyzed tables use pg_stats and the others a bounded sample"""
+        conn = MagicMock()
+        cursor = conn.cursor.return_value.__enter__.return_value
+        cursor.fetchall.side_effect = [STATS, [('new',), ('new',), ('done',), (None,)]]
+        
+        profiles = profile_schema(conn, SCHEMA_INFO, ['public'], top_k=2)
+        
+        assert cursor.execute.call_args_list[0][0] == (COLUMN_STATS_SQL, {'schemas': ['public']})
+        trends = profiles['public.gt_interest_over_time']
+        assert trends['geo'] == {'null_frac': 0.0, 'values': ['US', 'IN']}
+        assert 'keyword' not in trends
+        assert trends['date'] == {'null_frac': 0.2, 'min': '2023-01-01', 'max': '2024-12-31'}
+        assert trends['interest'] == {'null_frac': 0.0, 'min': '0', 'max': '100'}
+        
+        assert cursor.execute.call_args_list[1][0][1] == (1000,)
+        assert profiles['public.staging_topics'] == {'status': {'null_frac': 0.25, 'values': ['new', 'done']}}
+    
+    def test_format_profile(self):
+        """Test profiles render as one compact annotation"""
+        assert format_profile({'null_frac': 0.0, 'values': ['US', "O''Land"]}) == "values: 'US', 'O''Land'"
+        assert format_profile({'null_frac': 0.2, 'min': '2023-01-01', 'max': '2024-12-31'}) == (
+            "range 2023-01-01 .. 2024-12-31; 20% null"
+        )
+
+
+class TestProfilesInPrompt:
+    """Test column profiles in the schema prompt"""
+    
+    PROFILES = {'public.gt_interest_over_time': {'geo': {'null_frac': 0.0, 'values': ['US', 'IN']}}}
+    
+    def test_values_annotate_columns(self):
+        """Test profiled columns carry their values in the schema text"""
+        text = SchemaPrompt(SCHEMA_INFO, self.PROFILES).full_text
+        
+        assert "  geo: text NULL [values: 'US', 'IN']" in text
+        assert "  keyword: text NULL\n" in text
+    
+    def test_values_match_prompt_terms(self):
+        """Test a prompt naming a listed value keeps that column when the table is compacted"""
+        block = SchemaPrompt(SCHEMA_INFO, self.PROFILES).blocks[0]
+        
+        assert block.lexical_score({'us'}) > 0
+        assert "geo:" in block.render({'us'})
+        assert "keyword:" not in block.render({'us'})
+
+
+class TestProfileCaching:
+    """Test column profiles stored with the schema cache"""
+    
+    def test_profiles_dropped_on_reload(self):
+        """Test profiles of a replaced schema version are discarded"""
+        cache = SchemaCache()
+        cache.put(('public',), 'v1', {'tables': []})
+        assert cache.set_profiles(('public',), 'v1', {'public.t': {}})
+        assert cache.get_profiles(('public',))[0] == {'public.t': {}}
+        
+        cache.put(('public',), 'v2', {'tables': []})
+        assert cache.get_profiles(('public',)) == (None, None)
+        assert not cache.set_profiles(('public',), 'v1', {'public.t': {}})
+    
+    def test_background_profiling(self):
+        """Test profiles are computed off the request path once and then served from the cache"""
+        introspector = SchemaIntrospector("postgresql://localhost/test", profile_ttl=3600)
+        introspector._schema_cache.put(('public',), 'v1', SCHEMA_INFO)
+        done = threading.Event()
+        
+        def profile(conn, schema_info, schemas, top_k):
+            assert schema_info is SCHEMA_INFO
+            return TestProfilesInPrompt.PROFILES
+        
+        def set_profiles(*args):
+            result = SchemaCache.set_profiles(introspector._schema_cache, *args)
+            done.set()
+            return result
+        
+        with patch('app.schema_introspect.psycopg.connect'), \
+                patch('app.schema_introspect.profile_schema', side_effect=profile) as mock_profile, \
+                patch.object(introspector._schema_cache, 'set_profiles', side_effect=set_profiles):
+            assert introspector.get_column_profiles() is None
+            assert done.wait(5)
+            assert introspector.get_column_profiles() == TestProfilesInPrompt.PROFILES
+        
+        assert mock_profile.call_count == 1
+    
+    def test_profiling_disabled(self):
+        """Test no profiler runs without a profile TTL"""
+        introspector = SchemaIntrospector("postgresql://localhost/test")
+        introspector._schema_cache.put(('public',), 'v1', SCHEMA_INFO)
+        
+        with patch('app.schema_introspect.threading.Thread') as mock_thread:
+            assert introspector.get_column_profiles() is None
+        
+        mock_thread.assert_not_called()
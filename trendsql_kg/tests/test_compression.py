@@ -0,0 +1,59 @@
+"""
+Test Compression Module
+"""
+
+import pytest
+import zstandard
+from fastapi import FastAPI
+from fastapi.responses import HTMLResponse, StreamingResponse
+from fastapi.testclient import TestClient
+from app.compression import CompressionMiddleware, select_encoding
+from app.formatters import format_html_table
+
+
+class TestCompression:
+    """Test negotiated response compression"""
+    
+    def setup_method(self):
+        """Build an app serving a real HTML table and a streamed CSV"""
+        app = FastAPI()
+        app.add_middleware(CompressionMiddleware, minimum_size=1024)
+        rows = [{'keyword': 'AI', 'interest': i} for i in range(200)]
+        self.html = format_html_table(rows)
+        
+        @app.get("/html", response_class=HTMLResponse)
+        async def html():
+            return self.html
+        
+        @app.get("/csv")
+        async def csv():
+            async def chunks():
+                yield "keyword,interest\r\n"
+                for i in range(200):
+                    yield f"AI,{i}\r\n"
+            return StreamingResponse(chunks(), media_type="text/csv")
+        
+        self.client = TestClient(app)
+    
+    def test_select_encoding(self):
+        """Test zstd is preferred unless weighted lower"""
+        assert select_encoding("gzip, deflate, zstd") == "zstd"
+        assert select_encoding("zstd;q=0.1, gzip") == "gzip"
+        assert select_encoding("identity") is None
+    
+    def test_gzip_html(self):
+        """Test HTML tables are gzip encoded and decode intact"""
+        response = self.client.get("/html", headers={"Accept-Encoding": "gzip"})
+        
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.text == self.html
+    
+    def test_zstd_stream(self):
+        """Test streamed CSV is zstd encoded without a content length"""
+        with self.client.stream("GET", "/csv", headers={"Accept-Encoding": "zstd"}) as response:
+            raw = b"".join(response.iter_raw())
+        
+        assert response.headers["content-encoding"] == "zstd"
+        assert "content-length" not in response.headers
+        body = zstandard.ZstdDecompressor().decompressobj().decompress(raw).decode()
+        assert body.endswith("AI,199\r\n")
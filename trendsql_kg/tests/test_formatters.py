@@ -0,0 +1,90 @@
+"""
+Test Formatters Module
+"""
+
+import io
+import pytest
+from collections import namedtuple
+from datetime import date, datetime, timezone
+from decimal import Decimal
+import pyarrow as pa
+import pyarrow.parquet as pq
+from app.formatters import CSVFormatter, ArrowFormatter
+
+# Stand-in for psycopg's cursor.description entries
+Column = namedtuple('Column', 'name type_code precision scale')
+
+
+class TestCSVFormatter:
+    """Test CSV formatting"""
+    
+    def test_chunks_match_full_csv(self):
+        """Test streamed chunks concatenate to the buffered CSV"""
+        formatter = CSVFormatter()
+        rows = [
+            {'keyword': 'AI', 'date': date(2024, 1, 15), 'interest': 85},
+            {'keyword': 'Pet care', 'date': date(2024, 1, 16), 'interest': None}
+        ]
+        headers = list(rows[0].keys())
+        
+        chunks = [
+            formatter.format_csv_chunk(rows[:1], headers, include_header=True),
+            formatter.format_csv_chunk(rows[1:], headers)
+        ]
+        
+        assert chunks[0].startswith("keyword,date,interest\r\n")
+        assert "".join(chunks) == formatter.format_csv(rows)
+
+
+class TestArrowFormatter:
+    """Test columnar export"""
+    
+    def setup_method(self):
+        """Describe a gt_interest_over_time-like result"""
+        self.description = [
+            Column('keyword', 25, None, None),
+            Column('date', 1082, None, None),
+            Column('interest', 23, None, None),
+            Column('growth_score', 1700, None, None),
+            Column('price', 1700, 10, 2),
+            Column('created_at', 1184, None, None),
+            Column('meta', 3802, None, None)
+        ]
+        self.rows = [
+            ('AI', date(2024, 1, day), day, Decimal('85.5'), Decimal('12.34'),
+             datetime(2024, 1, day, 9, 30, tzinfo=timezone.utc), {'source': 'gt'})
+            for day in range(1, 8)
+        ]
+    
+    def test_type_mapping(self):
+        """Test Postgres types map to Arrow types"""
+        schema, _ = ArrowFormatter().build_schema(self.description)
+        
+        assert schema.field('date').type == pa.date32()
+        assert schema.field('interest').type == pa.int32()
+        assert schema.field('growth_score').type == pa.float64()
+        assert schema.field('price').type == pa.decimal128(10, 2)
+        assert schema.field('created_at').type == pa.timestamp('us', tz='UTC')
+        assert schema.field('meta').type == pa.string()
+    
+    def test_arrow_stream_round_trip(self):
+        """Test IPC chunks concatenate to a readable stream"""
+        writer = ArrowFormatter().open_writer(self.description, 'arrow')
+        data = writer.write(self.rows[:4]) + writer.write(self.rows[4:]) + writer.close()
+        
+        table = pa.ipc.open_stream(data).read_all()
+        assert table.num_rows == 7
+        assert table.column('date')[0].as_py() == date(2024, 1, 1)
+        assert table.column('meta')[0].as_py() == '{"source": "gt"}'
+    
+    def test_parquet_row_groups(self):
+        """Test Parquet output buffers batches into row groups"""
+        writer = ArrowFormatter(parquet_row_group_size=4).open_writer(self.description, 'parquet')
+        chunks = [writer.write(self.rows[:2]), writer.write(self.rows[2:5]), writer.write(self.rows[5:]), writer.close()]
+        
+        # Only the magic bytes until the first row group fills
+        assert chunks[0] == b'PAR1'
+        parquet_file = pq.ParquetFile(io.BytesIO(b''.join(chunks)))
+        assert parquet_file.metadata.num_rows == 7
+        assert parquet_file.metadata.num_row_groups == 2
+        assert parquet_file.read().column('price')[0].as_py() == Decimal('12.34')
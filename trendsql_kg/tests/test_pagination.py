@@ -0,0 +1,159 @@
+"""
+Test Pagination Module
+"""
+
+import pytest
+from datetime import date
+from unittest.mock import MagicMock
+from app.pagination import PaginationHelper, TOTAL_COUNT_COLUMN, KEYSET_KEYS_SQL
+
+
+class TestPagination:
+    """Test pagination query building"""
+    
+    def setup_method(self):
+        """Create a helper without touching the database"""
+        self.helper = PaginationHelper("postgresql://localhost/test")
+    
+    def test_add_pagination(self):
+        """Test LIMIT/OFFSET are added and existing ones replaced"""
+        sql = self.helper.add_pagination("SELECT * FROM exploding_topics LIMIT 10", 3, 20)
+        assert sql == "SELECT * FROM exploding_topics LIMIT 20 OFFSET 40"
+    
+    def test_windowed_query(self):
+        """Test single round-trip query wraps the SQL and counts over the window"""
+        sql = self.helper._create_windowed_query(
+            "SELECT keyword, date FROM gt_interest_over_time ORDER BY date LIMIT 5", 2, 50
+        )
+        
+        assert sql.startswith("SELECT paginated_subquery.*, COUNT(*) OVER () AS " + TOTAL_COUNT_COLUMN)
+        assert "FROM (SELECT keyword, date FROM gt_interest_over_time ORDER BY date) AS paginated_subquery" in sql
+        assert sql.endswith("LIMIT 50 OFFSET 50")
+    
+    def test_window_count_eligibility(self):
+        """Test fallback to the two-query path for unsupported SQL shapes"""
+        assert self.helper._use_window_count("SELECT * FROM exploding_topics")
+        assert self.helper._use_window_count("WITH t AS (SELECT 1) SELECT * FROM t")
+        assert not self.helper._use_window_count("EXPLAIN SELECT * FROM exploding_topics")
+        assert not self.helper._use_window_count(f"SELECT 1 AS {TOTAL_COUNT_COLUMN}")
+        
+        two_query_helper = PaginationHelper("postgresql://localhost/test", single_round_trip=False)
+        assert not two_query_helper._use_window_count("SELECT * FROM exploding_topics")
+    
+    def test_split_window_count(self):
+        """Test the count column is stripped from rows"""
+        rows = [
+            {"topic": "a", TOTAL_COUNT_COLUMN: 42},
+            {"topic": "b", TOTAL_COUNT_COLUMN: 42},
+        ]
+        
+        results, total = self.helper._split_window_count(rows)
+        
+        assert total == 42
+        assert results == [{"topic": "a"}, {"topic": "b"}]
+        assert self.helper._split_window_count([]) == ([], None)
+    
+    def test_parse_order_by(self):
+        """Test ORDER BY parsing for keyset pagination"""
+        sql = "SELECT keyword, date FROM gt_interest_over_time g ORDER BY g.keyword, date DESC LIMIT 10"
+        assert self.helper.parse_order_by(sql) == [("keyword", "ASC"), ("date", "DESC")]
+        
+        assert self.helper.parse_order_by("SELECT * FROM exploding_topics") is None
+        assert self.helper.parse_order_by("SELECT * FROM (SELECT topic FROM exploding_topics ORDER BY topic) t") is None
+        assert self.helper.parse_order_by("SELECT topic FROM exploding_topics ORDER BY lower(topic)") is None
+    
+    def test_cursor_round_trip(self):
+        """Test cursor tokens carry typed key values and are bound to the query"""
+        sql = "SELECT keyword, date FROM gt_interest_over_time ORDER BY keyword, date"
+        order_keys = self.helper.parse_order_by(sql)
+        cursor = self.helper.encode_cursor(sql, order_keys, {"keyword": "AI", "date": date(2024, 1, 15)})
+        
+        assert self.helper.decode_cursor(sql, order_keys, cursor) == ["AI", date(2024, 1, 15)]
+        
+        with pytest.raises(ValueError):
+            self.helper.decode_cursor(sql + " DESC", self.helper.parse_order_by(sql + " DESC"), cursor)
+        with pytest.raises(ValueError):
+            self.helper.decode_cursor(sql, order_keys, "garbage")
+        with pytest.raises(ValueError):
+            self.helper.decode_cursor("SELECT * FROM exploding_topics", None, cursor)
+    
+    def test_add_keyset_pagination(self):
+        """Test keyset rewrite replaces OFFSET with a key predicate"""
+        sql = "SELECT keyword, date FROM gt_interest_over_time WHERE keyword LIKE '%dog%' ORDER BY keyword, date"
+        order_keys = self.helper.parse_order_by(sql)
+        
+        keyset_sql, params = self.helper.add_keyset_pagination(sql, order_keys, ["AI", date(2024, 1, 15)], 100)
+        
+        assert "LIKE '%%dog%%'" in keyset_sql
+        assert '("keyword", "date") > (%s, %s)' in keyset_sql
+        assert keyset_sql.endswith('ORDER BY "keyword" ASC, "date" ASC LIMIT 100')
+        assert "OFFSET" not in keyset_sql
+        assert params == ["AI", date(2024, 1, 15)]
+    
+    def test_next_cursor_only_for_full_page(self):
+        """Test a cursor is issued only when more rows may follow"""
+        sql = "SELECT keyword, date FROM gt_interest_over_time ORDER BY keyword, date"
+        order_keys = self.helper.parse_order_by(sql)
+        rows = [{"keyword": "AI", "date": date(2024, 1, d)} for d in (1, 2)]
+        cur = MagicMock()
+        cur.fetchone.return_value = {'unique_key': True, 'not_null': True}
+        
+        assert self.helper._next_cursor(cur, sql, order_keys, rows, 2) is not None
+        assert self.helper._next_cursor(cur, sql, order_keys, rows, 3) is None
+        assert cur.execute.call_count == 1
+    
+    def test_no_cursor_for_tied_keys(self):
+        """Test a non-unique ordering gets no cursor, and a unique tiebreaker pages across ties"""
+        rows = [{"id": i, "date": date(2024, 1, 15)} for i in (5, 4, 3)] + [{"id": 2, "date": date(2024, 1, 14)}]
+        cur = MagicMock()
+        
+        # date alone is not unique: the tied row 3 would be skipped by a cursor
+        sql = "SELECT id, date FROM gt_interest_over_time ORDER BY date DESC"
+        cur.fetchone.return_value = {'unique_key': False, 'not_null': True}
+        assert self.helper._next_cursor(cur, sql, self.helper.parse_order_by(sql), rows[:2], 2) is None
+        assert cur.execute.call_args[0] == (KEYSET_KEYS_SQL, {'table': 'gt_interest_over_time', 'columns': ['date']})
+        
+        # With the primary key as tiebreaker the next page starts at row 3
+        sql = "SELECT id, date FROM gt_interest_over_time ORDER BY date DESC, id DESC"
+        order_keys = self.helper.parse_order_by(sql)
+        cur.fetchone.return_value = {'unique_key': True, 'not_null': True}
+        last = self.helper.decode_cursor(sql, order_keys, self.helper._next_cursor(cur, sql, order_keys, rows[:2], 2))
+        assert [row for row in rows if (row["date"], row["id"]) < tuple(last)] == rows[2:]
+    
+    def test_no_cursor_for_nullable_or_derived_keys(self):
+        """Test nullable, computed and multi-table orderings get no cursor"""
+        rows = [{"id": 1, "geo": "US", "n": 3}]
+        cur = MagicMock()
+        cur.fetchone.return_value = {'unique_key': True, 'not_null': False}
+        
+        sql = "SELECT id, geo FROM gt_interest_over_time ORDER BY geo, id"
+        assert self.helper._next_cursor(cur, sql, self.helper.parse_order_by(sql), rows, 1) is None
+        for sql in ("SELECT geo, COUNT(*) AS n FROM gt_interest_over_time GROUP BY geo ORDER BY n",
+                    "SELECT interest AS id FROM gt_interest_over_time ORDER BY id",
+                    "SELECT t.id FROM exploding_topics t JOIN gt_related_topics r ON r.keyword = t.topic ORDER BY id"):
+            assert self.helper._next_cursor(cur, sql, self.helper.parse_order_by(sql), rows, 1) is None
+        assert cur.execute.call_count == 1
+    
+    def test_estimate_query(self):
+        """Test planner estimates are read from EXPLAIN (FORMAT JSON)"""
+        sql = self.helper._create_estimate_query("SELECT * FROM exploding_topics ORDER BY topic LIMIT 10")
+        assert sql == "EXPLAIN (FORMAT JSON) SELECT * FROM exploding_topics ORDER BY topic"
+        
+        plan = [{"Plan": {"Node Type": "Seq Scan", "Plan Rows": 2500}}]
+        assert self.helper._parse_plan_rows({"QUERY PLAN": plan}) == 2500
+        assert self.helper._parse_plan_rows(('[{"Plan": {"Plan Rows": 3}}]',)) == 3
+    
+    def test_count_mode_selection(self):
+        """Test auto mode keeps only estimates at or above the threshold"""
+        helper = PaginationHelper("postgresql://localhost/test", auto_count_threshold=1000)
+        
+        assert helper._accept_estimate('estimate', 10) == 10
+        assert helper._accept_estimate('auto', 10) is None
+        assert helper._accept_estimate('auto', 5000) == 5000
+        
+        assert helper._result_count_mode(5000, 5000) == 'estimate'
+        assert helper._result_count_mode(10, None) == 'exact'
+        assert helper._result_count_mode(None, None) is None
+        
+        with pytest.raises(ValueError):
+            helper.execute_paginated_query("SELECT 1", count_mode='guess')
@@ -0,0 +1,175 @@
+"""
+Test Schema Introspection Module
+"""
+
+from unittest.mock import MagicMock, patch
+from app.schema_introspect import SchemaIntrospector, SchemaCache, CATALOG_QUERIES
+
+
+TABLES = [
+    {'table_oid': 1, 'table_schema': 'public', 'table_name': 'categories', 'table_type': 'BASE TABLE', 'comment': None},
+    {'table_oid': 2, 'table_schema': 'public', 'table_name': 'topics', 'table_type': 'BASE TABLE', 'comment': 'Topics'},
+]
+
+COLUMNS = [
+    {'table_oid': oid, 'column_name': name, 'data_type': data_type, 'is_nullable': 'NO', 'column_default': None,
+     'character_maximum_length': None, 'numeric_precision': None, 'numeric_scale': None, 'comment': None}
+    for oid, name, data_type in [
+        (1, 'region', 'text'), (1, 'name', 'text'),
+        (2, 'id', 'integer'), (2, 'region', 'text'), (2, 'category', 'text'),
+    ]
+]
+
+CONSTRAINTS = [
+    {'table_oid': 1, 'table_schema': 'public', 'table_name': 'categories', 'constraint_name': 'categories_pkey',
+     'constraint_type': 'p', 'columns': ['region', 'name'], 'foreign_table_schema': None,
+     'foreign_table_name': None, 'foreign_columns': []},
+    {'table_oid': 2, 'table_schema': 'public', 'table_name': 'topics', 'constraint_name': 'topics_category_fkey',
+     'constraint_type': 'f', 'columns': ['region', 'category'], 'foreign_table_schema': 'public',
+     'foreign_table_name': 'categories', 'foreign_columns': ['region', 'name']},
+    {'table_oid': 2, 'table_schema': 'public', 'table_name': 'topics', 'constraint_name': 'topics_pkey',
+     'constraint_type': 'p', 'columns': ['id'], 'foreign_table_schema': None,
+     'foreign_table_name': None, 'foreign_columns': []},
+    {'table_oid': 2, 'table_schema': 'public', 'table_name': 'topics', 'constraint_name': 'topics_region_category_key',
+     'constraint_type': 'u', 'columns': ['region', 'category'], 'foreign_table_schema': None,
+     'foreign_table_name': None, 'foreign_columns': []},
+]
+
+INDEXES = [
+    {'schemaname': 'public', 'tablename': 'topics', 'indexname': 'topics_pkey',
+     'indexdef': 'CREATE UNIQUE INDEX topics_pkey ON public.topics USING btree (id)'},
+]
+
+
+def mock_connection():
+    """Connection whose cursor returns the catalog rows in query order"""
+    conn = MagicMock()
+    cursor = conn.cursor.return_value.__enter__.return_value
+    cursor.fetchall.side_effect = [TABLES, COLUMNS, CONSTRAINTS, INDEXES]
+    return conn, cursor
+
+
+class TestSchemaIntrospector:
+    """Test bulk catalog introspection"""
+    
+    def setup_method(self):
+        """Create an introspector without touching the database"""
+        self.introspector = SchemaIntrospector("postgresql://localhost/test")
+    
+    def test_query_count_independent_of_tables(self):
+        """Test the whole schema is read with one query per catalog"""
+        conn, cursor = mock_connection()
+        
+        self.introspector._introspect_schema(conn, ['public'])
+        
+        assert cursor.execute.call_count == len(CATALOG_QUERIES)
+        assert cursor.execute.call_args[0][1] == {'schemas': ['public'], 'table': None}
+    
+    def test_schema_structure(self):
+        """Test catalog rows are joined into the schema JSON structure"""
+        conn, _ = mock_connection()
+        
+        schema_info = self.introspector._introspect_schema(conn, ['public'])
+        
+        assert [table['name'] for table in schema_info['tables']] == ['categories', 'topics']
+        assert schema_info['schemas']['public'] == schema_info['tables']
+        assert schema_info['indexes'] == INDEXES
+        
+        topics = schema_info['tables'][1]
+        assert topics['comment'] == 'Topics'
+        assert [column['column_name'] for column in topics['columns']] == ['id', 'region', 'category']
+        assert 'table_oid' not in topics['columns'][0]
+        assert topics['primary_key'] == ['id']
+        assert topics['unique_constraints'] == [
+            {'constraint_name': 'topics_region_category_key', 'columns': ['region', 'category']}
+        ]
+        assert schema_info['tables'][0]['primary_key'] == ['region', 'name']
+        assert schema_info['tables'][0]['foreign_keys'] == []
+    
+    def test_composite_foreign_key_pairs_columns(self):
+        """Test composite foreign keys map each column to its referenced column only"""
+        conn, _ = mock_connection()
+        
+        schema_info = self.introspector._introspect_schema(conn, ['public'])
+        
+        expected = [
+            {'column_name': 'region', 'foreign_table_schema': 'public',
+             'foreign_table_name': 'categories', 'foreign_column_name': 'region'},
+            {'column_name': 'category', 'foreign_table_schema': 'public',
+             'foreign_table_name': 'categories', 'foreign_column_name': 'name'},
+        ]
+        assert schema_info['tables'][1]['foreign_keys'] == expected
+        assert schema_info['relationships'] == [
+            {'table_schema': 'public', 'table_name': 'topics', **foreign_key} for foreign_key in expected
+        ]
+    
+    def test_table_details(self):
+        """Test single-table lookups reuse the catalog queries filtered to one table"""
+        conn, cursor = mock_connection()
+        cursor.fetchall.side_effect = [TABLES[1:], COLUMNS[2:], CONSTRAINTS[1:], INDEXES]
+        
+        details = self.introspector._get_table_details(conn, 'topics', 'public')
+        
+        assert cursor.execute.call_args[0][1] == {'schemas': ['public'], 'table': 'topics'}
+        assert details['table_name'] == 'topics'
+        assert details['primary_key'] == ['id']
+        assert len(details['foreign_keys']) == 2
+        
+        conn, cursor = mock_connection()
+        cursor.fetchall.side_effect = [[], [], [], []]
+        assert self.introspector._get_table_details(conn, 'missing', 'public') is None
+
+
+class TestSchemaCache:
+    """Test schema caching per schema list"""
+    
+    def _connect(self, fingerprints):
+        """Patch psycopg.connect with a connection answering fingerprint and catalog queries"""
+        conn = MagicMock()
+        cursor = conn.cursor.return_value.__enter__.return_value
+        cursor.fetchone.side_effect = [(fingerprint,) for fingerprint in fingerprints]
+        cursor.fetchall.side_effect = lambda: []
+        connect = patch('app.schema_introspect.psycopg.connect')
+        mock_connect = connect.start()
+        mock_connect.return_value.__enter__.return_value = conn
+        return connect, cursor
+    
+    def test_keyed_by_schema_list(self):
+        """Test a different schema list is introspected rather than served from another entry"""
+        introspector = SchemaIntrospector("postgresql://localhost/test", cache_check_interval=0)
+        connect, cursor = self._connect(['v1', 'v1', 'v1'])
+        try:
+            public = introspector.get_schema_json(['public'])
+            both = introspector.get_schema_json(['public', 'analytics'])
+            assert introspector.get_schema_json(['public']) is public
+        finally:
+            connect.stop()
+        
+        assert list(both['schemas']) == ['public', 'analytics']
+        assert list(public['schemas']) == ['public']
+        assert introspector.get_cache_stats()['reloads'] == 2
+        assert introspector.get_cache_stats()['validated'] == 1
+    
+    def test_fingerprint_change_reloads(self):
+        """Test DDL (a new catalog fingerprint) forces a reload"""
+        introspector = SchemaIntrospector("postgresql://localhost/test", cache_check_interval=0)
+        connect, cursor = self._connect(['v1', 'v2'])
+        try:
+            first = introspector.get_schema_json(['public'])
+            assert introspector.get_schema_json(['public']) is not first
+        finally:
+            connect.stop()
+        
+        assert cursor.execute.call_count == 2 * (1 + len(CATALOG_QUERIES))
+    
+    def test_check_interval(self):
+        """Test entries are served without a query until the check interval passes"""
+        cache = SchemaCache(check_interval=60)
+        cache.put(('public',), 'v1', {'tables': []})
+        
+        assert cache.get(('public',)) == {'tables': []}
+        assert cache.get(('analytics',)) is None
+        assert cache.revalidate(('public',), 'v2') is None
+        
+        with patch('app.schema_introspect.time.monotonic', return_value=10 ** 9):
+            assert cache.get(('public',)) is None
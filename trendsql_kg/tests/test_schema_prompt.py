@@ -0,0 +1,103 @@
+"""
+Test Schema Prompt Module
+"""
+
+from app.schema_prompt import SchemaPrompt, get_schema_prompt, estimate_tokens, extract_terms
+
+
+def column(name, data_type='text', comment=None):
+    return {'column_name': name, 'data_type': data_type, 'is_nullable': 'YES', 'column_default': None, 'comment': comment}
+
+
+def make_schema(filler_tables=100):
+    """Trend tables plus unrelated filler tables"""
+    tables = [
+        {'schema': 'public', 'name': 'exploding_topics', 'comment': 'Trending topics',
+         'columns': [column('id', 'bigint'), column('topic'), column('growth_score', 'numeric'),
+                     column('region', comment="e.g. 'US'")],
+         'primary_key': ['id'], 'foreign_keys': []},
+        {'schema': 'public', 'name': 'gt_interest_over_time', 'comment': None,
+         'columns': [column('keyword'), column('date', 'date'), column('interest', 'integer'),
+                     column('topic_id', 'bigint')],
+         'primary_key': None,
+         'foreign_keys': [{'column_name': 'topic_id', 'foreign_table_schema': 'public',
+                           'foreign_table_name': 'exploding_topics', 'foreign_column_name': 'id'}]},
+    ]
+    for i in range(filler_tables):
+        tables.append({'schema': 'public', 'name': f'ledger_{i}', 'comment': None,
+                       'columns': [column(f'field_{j}') for j in range(12)],
+                       'primary_key': None, 'foreign_keys': []})
+    return {'tables': tables}
+
+
+class TestSchemaPrompt:
+    """Test precomputed, pruned schema prompt text"""
+    
+    def test_terms(self):
+        """Test names and prompts are split into singular lowercase words"""
+        assert extract_terms("Top categories of gt_related_topics") == {'category', 'gt', 'related', 'topic'}
+    
+    def test_full_text_within_budget(self):
+        """Test the whole schema is sent when it fits the budget"""
+        schema_prompt = SchemaPrompt(make_schema(0))
+        
+        assert schema_prompt.render("anything", 10 ** 6) == schema_prompt.full_text
+        assert schema_prompt.render("anything", None) == schema_prompt.full_text
+        assert "Description: Trending topics" in schema_prompt.full_text
+        assert "  topic_id -> public.exploding_topics.id" in schema_prompt.full_text
+    
+    def test_pruned_to_relevant_tables(self):
+        """Test only relevant tables (and the tables they reference) are sent within the budget"""
+        schema_prompt = SchemaPrompt(make_schema())
+        
+        text = schema_prompt.render("Weekly interest over time for keyword AI", 300)
+        
+        assert estimate_tokens(text) <= 300
+        assert "Table: public.gt_interest_over_time" in text
+        assert "Table: public.exploding_topics" in text
+        assert "Table: public.ledger_0" not in text
+        assert "Other tables: " in text
+    
+    def test_large_table_keeps_key_and_matching_columns(self):
+        """Test a relevant table too large for the budget keeps only key and prompt columns"""
+        schema = make_schema(0)
+        schema['tables'][0]['columns'] += [column(f'metric_{i}', 'numeric') for i in range(200)]
+        schema_prompt = SchemaPrompt(schema)
+        
+        text = schema_prompt.render("exploding topics by growth score", 200)
+        
+        assert "  id: bigint NULL" in text
+        assert "  growth_score: numeric NULL" in text
+        assert "metric_0" not in text
+        assert "... 201 more columns" in text
+    
+    def test_embedding_ranking(self):
+        """Test embedding similarity ranks tables no prompt word matches, computed once per schema"""
+        calls = []
+        
+        def embed(texts):
+            calls.append(len(texts))
+            return [[1.0, 0.0] if 'interest' in text or text == 'popularity' else [0.0, 1.0] for text in texts]
+        
+        schema_prompt = SchemaPrompt(make_schema())
+        text = schema_prompt.render("popularity", 200, embed)
+        schema_prompt.render("popularity", 200, embed)
+        
+        assert "Table: public.gt_interest_over_time" in text
+        assert calls == [102, 1, 1]
+    
+    def test_embedding_failure_falls_back(self):
+        """Test a failing embedding call falls back to lexical ranking"""
+        def embed(texts):
+            raise RuntimeError("rate limited")
+        
+        text = SchemaPrompt(make_schema()).render("exploding topics", 200, embed)
+        
+        assert "Table: public.exploding_topics" in text
+    
+    def test_precomputed_per_schema_version(self):
+        """Test the prompt is built once per schema dict"""
+        schema = make_schema(0)
+        
+        assert get_schema_prompt(schema) is get_schema_prompt(schema)
+        assert get_schema_prompt(make_schema(0)) is not get_schema_prompt(schema)
@@ -0,0 +1,169 @@
+"""
+Test SQL Cache Module
+"""
+
+import asyncio
+import psycopg
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.app import generate_sql_endpoint
+from app.models import SQLRequest
+from app.sql_cache import SQLCache, normalize_prompt, prompt_literals, SQL_CACHE_SIMILAR_SQL
+from app.llm_sql import LLMSQLGenerator
+
+
+SCHEMA_INFO = {
+    'tables': [
+        {'name': 'exploding_topics', 'schema': 'public', 'type': 'BASE TABLE', 'comment': None,
+         'columns': [{'column_name': 'topic', 'data_type': 'text', 'is_nullable': 'NO', 'column_default': None,
+                      'character_maximum_length': None, 'numeric_precision': None, 'numeric_scale': None,
+                      'comment': None}],
+         'primary_key': ['topic'], 'foreign_keys': [], 'unique_constraints': []}
+    ]
+}
+
+
+def shared_connection(fetchone=None, fetchall=None):
+    """Patch the shared table pool with a connection whose cursor returns the given rows"""
+    conn = MagicMock()
+    cursor = conn.cursor.return_value.__enter__.return_value
+    cursor.fetchone.return_value = fetchone
+    cursor.fetchall.return_value = fetchall or []
+    pool = patch('app.sql_cache.ConnectionPool')
+    pool.start().return_value.connection.return_value.__enter__.return_value = conn
+    return pool, cursor
+
+
+class TestSQLCache:
+    """Test the in-process and shared SQL cache tiers"""
+    
+    def test_prompt_normalization(self):
+        """Test prompts differing in case, spacing and trailing punctuation share a key"""
+        assert normalize_prompt("  Top 10 topics\n in  AI? ") == "top 10 topics in ai"
+        key = SQLCache.make_key("Top 10 topics in AI?", 'v1', 'gpt-4o-mini')
+        assert key == SQLCache.make_key("top 10 topics   in ai", 'v1', 'gpt-4o-mini')
+        assert key != SQLCache.make_key("top 10 topics in ai", 'v2', 'gpt-4o-mini')
+    
+    def test_local_tier(self):
+        """Test stored SQL is served in process without a database"""
+        cache = SQLCache(max_entries=2)
+        cache.put("a", 'v1', 'm', "SELECT 1")
+        cache.put("b", 'v1', 'm', "SELECT 2")
+        assert cache.get("A.", 'v1', 'm') == "SELECT 1"
+        cache.put("c", 'v1', 'm', "SELECT 3")
+        
+        assert cache.get("b", 'v1', 'm') is None
+        assert cache.get("a", 'v2', 'm') is None
+        stats = cache.get_stats()
+        assert (stats['hits'], stats['misses'], stats['entries']) == (1, 2, 2)
+    
+    def test_shared_exact_hit(self):
+        """Test a miss in process is answered by the shared table and then kept locally"""
+        cache = SQLCache("postgresql://localhost/test")
+        connect, cursor = shared_connection(fetchone=("SELECT 1",))
+        try:
+            assert cache.get("top topics", 'v1', 'm') == "SELECT 1"
+            assert cache.get("top topics", 'v1', 'm') == "SELECT 1"
+        finally:
+            connect.stop()
+        
+        assert cursor.execute.call_count == 1
+        assert cache.get_stats()['shared_hits'] == 1
+    
+    def test_similar_prompt_needs_same_literals(self):
+        """Test similar prompts are reused only when they pin the same values"""
+        cache = SQLCache("postgresql://localhost/test", similarity_threshold=0.9, embedding_model='embed')
+        rows = [("Top 20 topics in IN", "SELECT 20", 0.98), ("Top 10 topics in US", "SELECT 10", 0.95)]
+        connect, cursor = shared_connection(fetchall=rows)
+        try:
+            sql = cache.get("show the top 10 topics in US", 'v1', 'm', [0.5, 0.25])
+        finally:
+            connect.stop()
+        
+        assert sql == "SELECT 10"
+        assert cursor.execute.call_args[0][0] == SQL_CACHE_SIMILAR_SQL
+        assert cursor.execute.call_args[0][1]['embedding'] == '[0.5,0.25]'
+        assert prompt_literals("Top 10 topics in 'AI'") == ["'AI'", "10"]
+    
+    def test_shared_tier_reuses_pool(self):
+        """Test lookups and stores share one lazily opened pool instead of connecting per call"""
+        cache = SQLCache("postgresql://localhost/test")
+        with patch('app.sql_cache.ConnectionPool') as pool_class:
+            conn = pool_class.return_value.connection.return_value.__enter__.return_value
+            conn.cursor.return_value.__enter__.return_value.fetchone.return_value = None
+            assert cache.get("top topics", 'v1', 'm') is None
+            cache.put("top topics", 'v1', 'm', "SELECT 1")
+            cache.forget("top topics", 'v1', 'm')
+            cache.close()
+        
+        assert pool_class.call_count == 1
+        assert pool_class.return_value.connection.call_count == 3
+        pool_class.return_value.close.assert_called_once()
+    
+    def test_missing_table_disables_shared_tier(self):
+        """Test a missing sql_cache table falls back to the in-process tier"""
+        cache = SQLCache("postgresql://localhost/test")
+        connect, cursor = shared_connection()
+        cursor.execute.side_effect = psycopg.errors.UndefinedTable("relation \"sql_cache\" does not exist")
+        try:
+            assert cache.get("top topics", 'v1', 'm') is None
+        finally:
+            connect.stop()
+        
+        assert not cache.shared
+
+
+class TestCachedGeneration:
+    """Test LLMSQLGenerator with a SQL cache"""
+    
+    def setup_method(self):
+        """Create a generator with a mocked OpenAI client and an in-process SQL cache"""
+        with patch('app.llm_sql.OpenAI'):
+            self.generator = LLMSQLGenerator("sk-test", sql_cache=SQLCache())
+        response = MagicMock()
+        response.choices[0].message.content = "SELECT topic FROM exploding_topics LIMIT 10"
+        self.generator.client.chat.completions.create.return_value = response
+    
+    def test_hit_skips_llm(self):
+        """Test the second identical prompt is answered from the cache"""
+        first = self.generator.generate_sql("Top 10 topics", SCHEMA_INFO)
+        second = self.generator.generate_sql("top 10 topics", SCHEMA_INFO)
+        
+        assert first == ("SELECT topic FROM exploding_topics LIMIT 10", None, False)
+        assert second == ("SELECT topic FROM exploding_topics LIMIT 10", None, True)
+        assert self.generator.client.chat.completions.create.call_count == 1
+    
+    def test_schema_change_misses(self):
+        """Test SQL generated against another schema version is not reused"""
+        self.generator.generate_sql("Top 10 topics", SCHEMA_INFO)
+        changed = {'tables': [dict(SCHEMA_INFO['tables'][0], name='topics')]}
+        
+        assert self.generator.generate_sql("Top 10 topics", changed)[2] is False
+        assert self.generator.client.chat.completions.create.call_count == 2
+    
+    def test_failed_sql_forgotten(self):
+        """Test SQL that failed to execute is dropped from the cache"""
+        self.generator.generate_sql("Top 10 topics", SCHEMA_INFO)
+        self.generator.remember_sql("Top 10 topics", SCHEMA_INFO, None)
+        
+        assert self.generator.generate_sql("Top 10 topics", SCHEMA_INFO)[2] is False
+    
+    def test_failed_cached_sql_dropped_by_endpoint(self):
+        """Test cached SQL that fails to execute is not served again"""
+        self.generator.generate_sql("Top 10 topics", SCHEMA_INFO)
+        introspector = MagicMock()
+        introspector.get_schema_json_async = AsyncMock(return_value=SCHEMA_INFO)
+        introspector.get_column_profiles.return_value = None
+        failure = psycopg.errors.UndefinedColumn('column "topic" does not exist')
+        
+        with patch('app.llm_sql.llm_sql_generator', self.generator), \
+                patch('app.app.schema_introspector', introspector), \
+                patch('app.app.is_safe_sql', return_value=(True, None)), \
+                patch('app.app.improve_sql', return_value=("", "no fix")), \
+                patch('app.app.execute_paginated_query_async', AsyncMock(side_effect=failure)):
+            response = asyncio.run(generate_sql_endpoint(SQLRequest(prompt="top 10 topics", execute=True)))
+        
+        assert response.cache_hit is True
+        assert response.executed is False
+        assert 'does not exist' in response.error
+        assert self.generator.generate_sql("Top 10 topics", SCHEMA_INFO)[2] is False
+        assert self.generator.client.chat.completions.create.call_count == 2